@@ -9,6 +9,7 @@ from admin_dashboard.models import FieldRepCampaign
 import uuid
 from django.conf import settings
 from campaign_management.master_models import MasterCampaign
+from upload_jobs.services import check_upload_size
 
 
 PHONE_RE_CSV = re.compile(r'^\+?\d{8,15}$')  # naive validation for CSV
@@ -21,7 +22,7 @@ class FieldRepBulkUploadForm(forms.Form):
     CSV with: name,email,phone
     (No header row required but allowed.)
     """
-    csv_file = forms.FileField(help_text="CSV: name,email,phone – max 2 MB")
+    csv_file = forms.FileField(help_text="CSV: name,email,phone")
     campaign = forms.ModelChoiceField(
         queryset=Campaign.objects.all(),
         required=False,
@@ -29,19 +30,18 @@ class FieldRepBulkUploadForm(forms.Form):
     )
 
     def clean_csv_file(self):
-        f = self.cleaned_data['csv_file']
-        if f.size > 2*1024*1024:
-            raise ValidationError("CSV larger than 2 MB.")
-        return f
+        return check_upload_size(self.cleaned_data['csv_file'])
 
     def save(self, admin_user):
         """
         Returns (created_count, updated_count, campaign_assignments, errors[list]).
+        The created/updated users are left on ``self.saved_users``.
         """
         file_obj = io.StringIO(self.cleaned_data['csv_file'].read().decode())
         reader = csv.reader(file_obj)
         created = updated = campaign_assignments = 0
         errors = []
+        self.saved_users = []
         campaign = self.cleaned_data.get('campaign')
 
         for row_num, row in enumerate(reader, start=1):
@@ -70,6 +70,7 @@ class FieldRepBulkUploadForm(forms.Form):
                 )
                 created += 1 if is_new else 0
                 updated += 0 if is_new else 1
+                self.saved_users.append(obj)
                 
                 # Create campaign assignment if campaign is specified
                 if campaign and obj:
@@ -0,0 +1,29 @@
+# admin_dashboard/upload_handlers.py
+"""Background handler for the field-rep bulk upload (see upload_jobs)."""
+from upload_jobs.handlers import UploadOutcome, form_errors, register, split_row_error
+
+from .forms import FieldRepBulkUploadForm
+
+
+@register("fieldrep_bulk_upload")
+def fieldrep_bulk_upload(job, upload, progress):
+    from .views import _mirror_fieldreps_to_master
+
+    params = job.params or {}
+    form = FieldRepBulkUploadForm(
+        data={"campaign": params.get("campaign_id") or ""},
+        files={"csv_file": upload},
+    )
+    if not form.is_valid():
+        return UploadOutcome(errors=form_errors(form))
+
+    created, updated, campaign_assignments, errors = form.save(job.created_by)
+    progress("master_mirror", 0, len(form.saved_users))
+    _mirror_fieldreps_to_master(form.saved_users, params.get("campaign_param") or "")
+
+    return UploadOutcome(
+        created=created,
+        updated=updated,
+        errors=[split_row_error(e) for e in errors],
+        summary={"campaign_assignments": campaign_assignments},
+    )
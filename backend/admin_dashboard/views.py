@@ -26,11 +26,13 @@ from campaign_management.master_models import (
 )
 from collateral_management.models import CampaignCollateral
 from doctor_viewer.models import Doctor, DoctorEngagement
+from sharing_management.fieldrep_context import invalidate_fieldrep_contexts
 from sharing_management.models import ShareLog, VideoTrackingLog
 from user_management.models import User
 
 from .forms import DoctorForm, FieldRepBulkUploadForm
 from utils.recaptcha import recaptcha_required
+from upload_jobs.services import create_upload_job
 
 
 MASTER_DB_ALIAS = getattr(settings, "MASTER_DB_ALIAS", "master")
@@ -499,109 +501,272 @@ def dashboard(request):
 # but mirrors created/updated reps into master DB best-effort.
 # ─────────────────────────────────────────────────────────
 
+def _mirror_fieldrep_to_master(portal_user: User, brand_id, master_campaign_id) -> None:
+    email = (portal_user.email or "").strip().lower()
+    if not email or not brand_id:
+        return
+    with transaction.atomic(using=MASTER_DB_ALIAS):
+        mu, _ = MasterAuthUser.objects.using(MASTER_DB_ALIAS).get_or_create(
+            username=email,
+            defaults=dict(
+                email=email,
+                first_name=(portal_user.first_name or "").strip(),
+                last_name=(portal_user.last_name or "").strip(),
+                is_staff=False,
+                is_superuser=False,
+                is_active=bool(getattr(portal_user, "active", True)),
+                date_joined=timezone.now(),
+                password=make_password(None),
+            ),
+        )
+
+        dirty_u = []
+        if mu.email != email:
+            mu.email = email
+            dirty_u.append("email")
+        fn = (portal_user.first_name or "").strip()
+        ln = (portal_user.last_name or "").strip()
+        if fn and mu.first_name != fn:
+            mu.first_name = fn
+            dirty_u.append("first_name")
+        if ln and mu.last_name != ln:
+            mu.last_name = ln
+            dirty_u.append("last_name")
+        active = bool(getattr(portal_user, "active", True))
+        if mu.is_active != active:
+            mu.is_active = active
+            dirty_u.append("is_active")
+        if dirty_u:
+            mu.save(using=MASTER_DB_ALIAS, update_fields=dirty_u)
+
+        mrep = MasterFieldRep.objects.using(MASTER_DB_ALIAS).filter(user_id=mu.id).first()
+        if not mrep:
+            mrep = MasterFieldRep(
+                user_id=mu.id,
+                brand_id=brand_id,
+                full_name=(portal_user.get_full_name() or "").strip() or email.split("@", 1)[0],
+                phone_number=(getattr(portal_user, "phone_number", "") or "").strip(),
+                brand_supplied_field_rep_id=(getattr(portal_user, "field_id", "") or "").strip(),
+                is_active=active,
+            )
+            mrep.save(using=MASTER_DB_ALIAS)
+        else:
+            dirty_r = []
+            if mrep.brand_id != brand_id:
+                mrep.brand_id = brand_id
+                dirty_r.append("brand")
+            full_name = (portal_user.get_full_name() or "").strip() or email.split("@", 1)[0]
+            if mrep.full_name != full_name:
+                mrep.full_name = full_name
+                dirty_r.append("full_name")
+            phone = (getattr(portal_user, "phone_number", "") or "").strip()
+            if (mrep.phone_number or "") != phone:
+                mrep.phone_number = phone
+                dirty_r.append("phone_number")
+            fid = (getattr(portal_user, "field_id", "") or "").strip()
+            if (mrep.brand_supplied_field_rep_id or "") != fid:
+                mrep.brand_supplied_field_rep_id = fid
+                dirty_r.append("brand_supplied_field_rep_id")
+            if mrep.is_active != active:
+                mrep.is_active = active
+                dirty_r.append("is_active")
+            if dirty_r:
+                mrep.save(using=MASTER_DB_ALIAS, update_fields=dirty_r)
+
+        if master_campaign_id:
+            MasterCampaignFieldRep.objects.using(MASTER_DB_ALIAS).get_or_create(
+                campaign_id=master_campaign_id,
+                field_rep_id=mrep.id,
+            )
+
+
+MASTER_MIRROR_CHUNK_SIZE = 500
+
+
+def _chunks(items, size=MASTER_MIRROR_CHUNK_SIZE):
+    items = list(items)
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _mirror_fieldreps_to_master_batch(users, brand_id, master_campaign_id) -> None:
+    """
+    Same result as calling _mirror_fieldrep_to_master for each user, in a
+    fixed number of master round trips: existing auth users, reps and
+    campaign links are read with one IN query per chunk, diffed here, and
+    written with bulk_create / bulk_update in a single master transaction.
+    """
+    wanted = {}
+    for u in users:
+        email = (u.email or "").strip().lower()
+        if email:
+            wanted[email] = u
+    if not wanted or not brand_id:
+        return
+
+    master_users = MasterAuthUser.objects.using(MASTER_DB_ALIAS)
+    master_reps = MasterFieldRep.objects.using(MASTER_DB_ALIAS)
+
+    with transaction.atomic(using=MASTER_DB_ALIAS):
+        mu_by_email = {}
+        for chunk in _chunks(wanted):
+            mu_by_email.update((mu.username, mu) for mu in master_users.filter(username__in=chunk))
+
+        new_users = [
+            MasterAuthUser(
+                username=email,
+                email=email,
+                first_name=(u.first_name or "").strip(),
+                last_name=(u.last_name or "").strip(),
+                is_staff=False,
+                is_superuser=False,
+                is_active=bool(getattr(u, "active", True)),
+                date_joined=timezone.now(),
+                password=make_password(None),
+            )
+            for email, u in wanted.items()
+            if email not in mu_by_email
+        ]
+        dirty_users = []
+        for email, mu in mu_by_email.items():
+            u = wanted[email]
+            fn = (u.first_name or "").strip()
+            ln = (u.last_name or "").strip()
+            active = bool(getattr(u, "active", True))
+            dirty = mu.email != email or (fn and mu.first_name != fn) or (ln and mu.last_name != ln) or mu.is_active != active
+            if dirty:
+                mu.email = email
+                mu.first_name = fn or mu.first_name
+                mu.last_name = ln or mu.last_name
+                mu.is_active = active
+                dirty_users.append(mu)
+
+        if new_users:
+            master_users.bulk_create(new_users, batch_size=MASTER_MIRROR_CHUNK_SIZE)
+            # MySQL does not return ids from bulk inserts, so read them back.
+            for chunk in _chunks(mu.username for mu in new_users):
+                mu_by_email.update((mu.username, mu) for mu in master_users.filter(username__in=chunk))
+        if dirty_users:
+            master_users.bulk_update(
+                dirty_users,
+                ["email", "first_name", "last_name", "is_active"],
+                batch_size=MASTER_MIRROR_CHUNK_SIZE,
+            )
+
+        email_by_user_id = {mu.id: email for email, mu in mu_by_email.items()}
+        rep_by_email = {}
+        for chunk in _chunks(email_by_user_id):
+            for mrep in master_reps.filter(user_id__in=chunk).order_by("-id"):
+                rep_by_email[email_by_user_id[mrep.user_id]] = mrep
+
+        new_reps = []
+        dirty_reps = []
+        for email, u in wanted.items():
+            active = bool(getattr(u, "active", True))
+            full_name = (u.get_full_name() or "").strip() or email.split("@", 1)[0]
+            phone = (getattr(u, "phone_number", "") or "").strip()
+            fid = (getattr(u, "field_id", "") or "").strip()
+            mrep = rep_by_email.get(email)
+            if mrep is None:
+                new_reps.append(
+                    MasterFieldRep(
+                        user_id=mu_by_email[email].id,
+                        brand_id=brand_id,
+                        full_name=full_name,
+                        phone_number=phone,
+                        brand_supplied_field_rep_id=fid,
+                        is_active=active,
+                    )
+                )
+            elif (
+                mrep.brand_id != brand_id
+                or mrep.full_name != full_name
+                or (mrep.phone_number or "") != phone
+                or (mrep.brand_supplied_field_rep_id or "") != fid
+                or mrep.is_active != active
+            ):
+                mrep.brand_id = brand_id
+                mrep.full_name = full_name
+                mrep.phone_number = phone
+                mrep.brand_supplied_field_rep_id = fid
+                mrep.is_active = active
+                dirty_reps.append(mrep)
+
+        if new_reps:
+            master_reps.bulk_create(new_reps, batch_size=MASTER_MIRROR_CHUNK_SIZE)
+            new_user_ids = {mrep.user_id for mrep in new_reps}
+            for chunk in _chunks(new_user_ids):
+                for mrep in master_reps.filter(user_id__in=chunk).order_by("-id"):
+                    rep_by_email.setdefault(email_by_user_id[mrep.user_id], mrep)
+        if dirty_reps:
+            master_reps.bulk_update(
+                dirty_reps,
+                ["brand", "full_name", "phone_number", "brand_supplied_field_rep_id", "is_active"],
+                batch_size=MASTER_MIRROR_CHUNK_SIZE,
+            )
+
+        if master_campaign_id:
+            rep_ids = {mrep.id for mrep in rep_by_email.values()}
+            linked = set()
+            for chunk in _chunks(rep_ids):
+                linked.update(
+                    MasterCampaignFieldRep.objects.using(MASTER_DB_ALIAS)
+                    .filter(campaign_id=master_campaign_id, field_rep_id__in=chunk)
+                    .values_list("field_rep_id", flat=True)
+                )
+            MasterCampaignFieldRep.objects.using(MASTER_DB_ALIAS).bulk_create(
+                [
+                    MasterCampaignFieldRep(campaign_id=master_campaign_id, field_rep_id=rep_id)
+                    for rep_id in sorted(rep_ids - linked)
+                ],
+                batch_size=MASTER_MIRROR_CHUNK_SIZE,
+            )
+
+    # Bulk writes skip model signals, so drop cached field-rep sessions here.
+    invalidate_fieldrep_contexts()
+
+
+def _mirror_fieldreps_to_master(users, campaign_param) -> None:
+    """Best-effort mirror of bulk-uploaded portal reps into the master DB."""
+    if not _master_available():
+        return
+    master_campaign = _master_campaign_from_param(campaign_param)
+    brand_id = getattr(master_campaign, "brand_id", None) if master_campaign else None
+    master_campaign_id = _normalize_master_campaign_id(campaign_param)
+
+    try:
+        _mirror_fieldreps_to_master_batch(users, brand_id, master_campaign_id)
+        return
+    except Exception:
+        pass  # fall back to the per-rep path so one bad row cannot block the rest
+
+    for u in users:
+        try:
+            _mirror_fieldrep_to_master(u, brand_id, master_campaign_id)
+        except Exception:
+            pass
+
+
 @staff_member_required
 @recaptcha_required
 def bulk_upload_fieldreps(request):
     if request.method == "POST":
         form = FieldRepBulkUploadForm(request.POST, request.FILES)
         if form.is_valid():
-            created, updated, campaign_assignments, errors = form.save(request.user)
-
-            for err in errors:
-                messages.warning(request, err)
-
-            # Best-effort mirror to master
-            if _master_available():
-                campaign_param = _get_campaign_param_any(request)
-                master_campaign = _master_campaign_from_param(campaign_param)
-                brand_id = getattr(master_campaign, "brand_id", None) if master_campaign else None
-                master_campaign_id = _normalize_master_campaign_id(campaign_param)
-
-                def _mirror_one(portal_user: User):
-                    email = (portal_user.email or "").strip().lower()
-                    if not email or not brand_id:
-                        return
-                    with transaction.atomic(using=MASTER_DB_ALIAS):
-                        mu, _ = MasterAuthUser.objects.using(MASTER_DB_ALIAS).get_or_create(
-                            username=email,
-                            defaults=dict(
-                                email=email,
-                                first_name=(portal_user.first_name or "").strip(),
-                                last_name=(portal_user.last_name or "").strip(),
-                                is_staff=False,
-                                is_superuser=False,
-                                is_active=bool(getattr(portal_user, "active", True)),
-                                date_joined=timezone.now(),
-                                password=make_password(None),
-                            ),
-                        )
-
-                        dirty_u = []
-                        if mu.email != email:
-                            mu.email = email
-                            dirty_u.append("email")
-                        fn = (portal_user.first_name or "").strip()
-                        ln = (portal_user.last_name or "").strip()
-                        if fn and mu.first_name != fn:
-                            mu.first_name = fn
-                            dirty_u.append("first_name")
-                        if ln and mu.last_name != ln:
-                            mu.last_name = ln
-                            dirty_u.append("last_name")
-                        active = bool(getattr(portal_user, "active", True))
-                        if mu.is_active != active:
-                            mu.is_active = active
-                            dirty_u.append("is_active")
-                        if dirty_u:
-                            mu.save(using=MASTER_DB_ALIAS, update_fields=dirty_u)
-
-                        mrep = MasterFieldRep.objects.using(MASTER_DB_ALIAS).filter(user_id=mu.id).first()
-                        if not mrep:
-                            mrep = MasterFieldRep(
-                                user_id=mu.id,
-                                brand_id=brand_id,
-                                full_name=(portal_user.get_full_name() or "").strip() or email.split("@", 1)[0],
-                                phone_number=(getattr(portal_user, "phone_number", "") or "").strip(),
-                                brand_supplied_field_rep_id=(getattr(portal_user, "field_id", "") or "").strip(),
-                                is_active=active,
-                            )
-                            mrep.save(using=MASTER_DB_ALIAS)
-                        else:
-                            dirty_r = []
-                            if mrep.brand_id != brand_id:
-                                mrep.brand_id = brand_id
-                                dirty_r.append("brand")
-                            full_name = (portal_user.get_full_name() or "").strip() or email.split("@", 1)[0]
-                            if mrep.full_name != full_name:
-                                mrep.full_name = full_name
-                                dirty_r.append("full_name")
-                            phone = (getattr(portal_user, "phone_number", "") or "").strip()
-                            if (mrep.phone_number or "") != phone:
-                                mrep.phone_number = phone
-                                dirty_r.append("phone_number")
-                            fid = (getattr(portal_user, "field_id", "") or "").strip()
-                            if (mrep.brand_supplied_field_rep_id or "") != fid:
-                                mrep.brand_supplied_field_rep_id = fid
-                                dirty_r.append("brand_supplied_field_rep_id")
-                            if mrep.is_active != active:
-                                mrep.is_active = active
-                                dirty_r.append("is_active")
-                            if dirty_r:
-                                mrep.save(using=MASTER_DB_ALIAS, update_fields=dirty_r)
-
-                        if master_campaign_id:
-                            MasterCampaignFieldRep.objects.using(MASTER_DB_ALIAS).get_or_create(
-                                campaign_id=master_campaign_id,
-                                field_rep_id=mrep.id,
-                            )
-
-                for u in list(created) + list(updated):
-                    try:
-                        _mirror_one(u)
-                    except Exception:
-                        pass
-
-            return redirect("admin_dashboard:bulk_upload")
+            # Parsing, portal writes and the master mirror run as an upload job
+            # (admin_dashboard.upload_handlers.fieldrep_bulk_upload).
+            campaign = form.cleaned_data.get("campaign")
+            job = create_upload_job(
+                "fieldrep_bulk_upload",
+                form.cleaned_data["csv_file"],
+                user=request.user,
+                params={
+                    "campaign_id": campaign.pk if campaign else None,
+                    "campaign_param": _get_campaign_param_any(request) or "",
+                    "back_url": reverse("admin_dashboard:bulk_upload"),
+                },
+            )
+            return redirect("upload_job_detail", job_uid=job.uid)
     else:
         form = FieldRepBulkUploadForm()
 
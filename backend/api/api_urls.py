@@ -2,7 +2,7 @@ from rest_framework.routers import DefaultRouter
 from django.urls import path
 from .api_views import (
     CampaignViewSet, CollateralViewSet, ShortLinkViewSet,
-    ShareLogViewSet, DoctorEngagementViewSet, get_collateral_campaign
+    ShareLogViewSet, DoctorEngagementViewSet, get_collateral_campaign, get_collateral_campaigns
 )
 
 router = DefaultRouter()
@@ -14,4 +14,5 @@ router.register('engagements',      DoctorEngagementViewSet,basename='engagement
 
 urlpatterns = [
     path('get-collateral-campaign/<int:collateral_id>/', get_collateral_campaign, name='get_collateral_campaign'),
+    path('get-collateral-campaigns/', get_collateral_campaigns, name='get_collateral_campaigns'),
 ] + router.urls
\ No newline at end of file
@@ -1,16 +1,26 @@
+from datetime import datetime, time
+
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
 from rest_framework import viewsets, permissions
 from rest_framework.decorators import api_view, permission_classes
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
+from .pagination import TimestampCursorPagination
 from .serializers import (
     CampaignSerializer, CollateralSerializer, ShortLinkSerializer,
-    ShareLogSerializer, DoctorEngagementSerializer
+    ShareLogSerializer, DoctorEngagementSerializer, requested_fields
 )
+from campaign_management.campaign_ids import campaign_id_variants
+from collateral_management.campaign_resolver import resolve_collateral_campaign, resolve_collateral_campaigns
 from campaign_management.models  import Campaign
 from collateral_management.models import Collateral
 from shortlink_management.models import ShortLink
 from sharing_management.models    import ShareLog
 from doctor_viewer.models         import DoctorEngagement
+from sharing_management.services.master_access import master_db_alias
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
@@ -21,43 +31,39 @@ def get_collateral_campaign(request, collateral_id):
     falling back to campaign_management (Date fields), and finally direct collateral → campaign.
     """
     try:
-        from collateral_management.models import CampaignCollateral as CMBridge, Collateral
-        from campaign_management.models import CampaignCollateral as CMCampaign
-
-        # 1) Prefer bridging record from collateral_management
-        bridge = CMBridge.objects.select_related('campaign').filter(collateral_id=collateral_id).order_by('-updated_at').first()
-        if bridge:
-            return Response({
-                'success': True,
-                'brand_campaign_id': bridge.campaign.brand_campaign_id,
-                'start_date': bridge.start_date.strftime('%Y-%m-%d') if bridge.start_date else '',
-                'end_date': bridge.end_date.strftime('%Y-%m-%d') if bridge.end_date else ''
-            })
-
-        # 2) Fall back to campaign_management CampaignCollateral
-        cm_cc = CMCampaign.objects.select_related('campaign').filter(collateral_id=collateral_id).first()
-        if cm_cc:
-            return Response({
-                'success': True,
-                'brand_campaign_id': cm_cc.campaign.brand_campaign_id,
-                'start_date': cm_cc.start_date.strftime('%Y-%m-%d') if cm_cc.start_date else '',
-                'end_date': cm_cc.end_date.strftime('%Y-%m-%d') if cm_cc.end_date else ''
-            })
-
-        # 3) Finally, use direct collateral → campaign relationship
-        collateral = Collateral.objects.select_related('campaign').filter(id=collateral_id).first()
-        if collateral and collateral.campaign:
-            return Response({
-                'success': True,
-                'brand_campaign_id': collateral.campaign.brand_campaign_id,
-                'start_date': '',
-                'end_date': ''
-            })
+        resolved = resolve_collateral_campaign(collateral_id)
+        if resolved:
+            return Response({'success': True, **resolved})
 
         return Response({'success': False, 'error': 'No campaign found for this collateral'})
     except Exception as e:
         return Response({'success': False, 'error': str(e)})
 
+MAX_BATCH_COLLATERAL_IDS = 500
+
+@api_view(['GET', 'POST'])
+@permission_classes([IsAuthenticated])
+def get_collateral_campaigns(request):
+    """
+    Batch form of get_collateral_campaign: ``?ids=1,2,3`` (or POST {"ids": [...]}).
+    ``results`` maps each id to the same fields, or null when no campaign is found.
+    """
+    raw = request.data.get('ids') if request.method == 'POST' else request.query_params.get('ids', '')
+    if isinstance(raw, str):
+        raw = raw.split(',')
+    try:
+        ids = list(dict.fromkeys(int(str(value).strip()) for value in (raw or []) if str(value).strip()))
+    except (TypeError, ValueError):
+        return Response({'success': False, 'error': 'ids must be integers'}, status=400)
+    if len(ids) > MAX_BATCH_COLLATERAL_IDS:
+        return Response({'success': False, 'error': f'At most {MAX_BATCH_COLLATERAL_IDS} ids per request'}, status=400)
+
+    try:
+        resolved = resolve_collateral_campaigns(ids)
+        return Response({'success': True, 'results': {str(cid): resolved.get(cid) for cid in ids}})
+    except Exception as e:
+        return Response({'success': False, 'error': str(e)})
+
 class IsAdmin(permissions.BasePermission):
     def has_permission(self, request, view):
         return request.user.is_authenticated and request.user.role == 'admin'
@@ -72,22 +78,123 @@ class CollateralViewSet(viewsets.ModelViewSet):
     serializer_class   = CollateralSerializer
     permission_classes = [IsAdmin]
 
-class ShortLinkViewSet(viewsets.ModelViewSet):
+def _query_datetime(request, name):
+    """?since= / ?until= as an aware datetime; a bare date means its midnight."""
+    raw = (request.query_params.get(name) or "").strip()
+    if not raw:
+        return None
+    value = parse_datetime(raw)
+    if value is None:
+        day = parse_date(raw)
+        if day is None:
+            raise ValidationError({name: "Use YYYY-MM-DD or an ISO 8601 datetime."})
+        value = datetime.combine(day, time.min)
+    if timezone.is_naive(value):
+        value = timezone.make_aware(value)
+    return value
+
+
+class HighVolumeViewSetMixin:
+    """
+    Cursor-paginated on ``cursor_ordering``, filtered on ``?since=``/``?until=``
+    against ``timestamp_field``, and narrowed to the ``?fields=`` columns.
+    """
+    pagination_class = TimestampCursorPagination
+    timestamp_field  = "created_at"
+
+    @property
+    def cursor_ordering(self):
+        return (f"-{self.timestamp_field}", "-pk")
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        since = _query_datetime(self.request, "since")
+        until = _query_datetime(self.request, "until")
+        if since:
+            queryset = queryset.filter(**{f"{self.timestamp_field}__gte": since})
+        if until:
+            queryset = queryset.filter(**{f"{self.timestamp_field}__lt": until})
+
+        columns = {f.name for f in queryset.model._meta.concrete_fields}
+        wanted = requested_fields(self.request) & columns
+        if wanted:
+            queryset = queryset.only(*wanted, self.timestamp_field)
+        return queryset
+
+
+class ShortLinkViewSet(HighVolumeViewSetMixin, viewsets.ModelViewSet):
     queryset           = ShortLink.objects.all()
     serializer_class   = ShortLinkSerializer
     permission_classes = [IsAdmin]
+    timestamp_field    = "date_created"
+
+    @property
+    def cursor_ordering(self):
+        # date_created is not indexed; ids grow with it and are.
+        return ("-pk",)
+
+def _master_rep_ids(email):
+    from campaign_management.master_models import MasterFieldRep
+
+    try:
+        return list(
+            MasterFieldRep.objects.using(master_db_alias())
+            .filter(user__email__iexact=email)
+            .values_list("id", flat=True)
+        )
+    except Exception:
+        # Master DB unreachable: the email match below still applies.
+        return []
 
-class ShareLogViewSet(viewsets.ReadOnlyModelViewSet):
+
+def shares_of_portal_rep(user):
+    """
+    ShareLogs of a portal field rep. ShareLog.field_rep_id holds the MASTER
+    rep id, not the portal user pk, so rows are matched on the rep's email
+    and on the master reps registered under that email.
+    """
+    email = (getattr(user, "email", "") or "").strip()
+    if not email:
+        return ShareLog.objects.none()
+    match = Q(field_rep_email__iexact=email)
+    master_ids = _master_rep_ids(email)
+    if master_ids:
+        match |= Q(field_rep_id__in=master_ids)
+    return ShareLog.objects.filter(match)
+
+
+class ShareLogViewSet(HighVolumeViewSetMixin, viewsets.ReadOnlyModelViewSet):
+    """
+    Filters: ?campaign=<brand_campaign_id>, ?field_rep=<id>, ?collateral=<id>,
+    ?since= / ?until= on share_timestamp; each pairs with a
+    (column, share_timestamp) index on ShareLog.
+    """
     serializer_class   = ShareLogSerializer
     permission_classes = [permissions.IsAuthenticated]
+    timestamp_field    = "share_timestamp"
 
     def get_queryset(self):
         # field rep sees only their shares; admin sees all
         if self.request.user.role == 'field_rep':
-            return ShareLog.objects.filter(field_rep=self.request.user)
+            return shares_of_portal_rep(self.request.user)
         return ShareLog.objects.all()
 
-class DoctorEngagementViewSet(viewsets.ReadOnlyModelViewSet):
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        params = self.request.query_params
+        campaign = (params.get("campaign") or "").strip()
+        if campaign:
+            queryset = queryset.filter(brand_campaign_id__in=campaign_id_variants(campaign))
+        for param, column in (("field_rep", "field_rep_id"), ("collateral", "collateral_id")):
+            raw = (params.get(param) or "").strip()
+            if raw:
+                if not raw.isdigit():
+                    raise ValidationError({param: "Must be a numeric id."})
+                queryset = queryset.filter(**{column: int(raw)})
+        return queryset
+
+class DoctorEngagementViewSet(HighVolumeViewSetMixin, viewsets.ReadOnlyModelViewSet):
     serializer_class   = DoctorEngagementSerializer
     permission_classes = [permissions.IsAuthenticated]
-    queryset           = DoctorEngagement.objects.all()
\ No newline at end of file
+    queryset           = DoctorEngagement.objects.all()
+    timestamp_field    = "view_timestamp"
\ No newline at end of file
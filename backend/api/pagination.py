@@ -0,0 +1,16 @@
+from rest_framework.pagination import CursorPagination
+
+
+class TimestampCursorPagination(CursorPagination):
+    """
+    Keyset pagination on an indexed timestamp, newest first.
+
+    Each page is one indexed range scan whatever the table size, unlike
+    offset paging. Views set ``cursor_ordering`` to their timestamp column.
+    """
+    page_size = 100
+    page_size_query_param = "page_size"
+    max_page_size = 1000
+
+    def get_ordering(self, request, queryset, view):
+        return getattr(view, "cursor_ordering", ("-created_at",))
@@ -5,6 +5,29 @@ from shortlink_management.models import ShortLink
 from sharing_management.models import ShareLog
 from doctor_viewer.models import DoctorEngagement
 
+
+class SparseFieldsetMixin:
+    """
+    ``?fields=id,share_timestamp`` limits the output to those fields.
+    Unknown names are ignored; without the parameter every field is returned.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        requested = requested_fields(self.context.get("request")) & set(self.fields)
+        if requested:
+            for name in set(self.fields) - requested:
+                self.fields.pop(name)
+
+
+def requested_fields(request):
+    """Field names from ``?fields=`` on a GET; empty when absent."""
+    if request is None or request.method != "GET":
+        return set()
+    raw = request.query_params.get("fields", "")
+    return {name.strip() for name in raw.split(",") if name.strip()}
+
+
 class CampaignSerializer(serializers.ModelSerializer):
     class Meta:
         model  = Campaign
@@ -15,17 +38,17 @@ class CollateralSerializer(serializers.ModelSerializer):
         model  = Collateral
         fields = '__all__'
 
-class ShortLinkSerializer(serializers.ModelSerializer):
+class ShortLinkSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model  = ShortLink
         fields = '__all__'
 
-class ShareLogSerializer(serializers.ModelSerializer):
+class ShareLogSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model  = ShareLog
         fields = '__all__'
 
-class DoctorEngagementSerializer(serializers.ModelSerializer):
+class DoctorEngagementSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model  = DoctorEngagement
         fields = '__all__'
\ No newline at end of file
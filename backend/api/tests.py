@@ -0,0 +1,51 @@
+from unittest import mock
+
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from sharing_management.models import ShareLog
+from user_management.models import User
+
+
+class ShareLogScopingTests(TestCase):
+    def setUp(self):
+        self.rep = User.objects.create_user(
+            username="rep_a", email="rep.a@example.com", password="x", role="field_rep", phone_number="9000000001"
+        )
+        self.other_rep = User.objects.create_user(
+            username="rep_b", email="rep.b@example.com", password="x", role="field_rep", phone_number="9000000002"
+        )
+        self.client = APIClient()
+
+    def share(self, **fields):
+        return ShareLog.objects.create(doctor_identifier="+919800000000", share_channel="WhatsApp", **fields)
+
+    def shared_ids(self, user, master_ids=()):
+        self.client.force_authenticate(user)
+        with mock.patch("api.api_views._master_rep_ids", return_value=list(master_ids)):
+            response = self.client.get("/api/shares/")
+        self.assertEqual(response.status_code, 200)
+        return {row["id"] for row in response.json()["results"]}
+
+    def test_rep_does_not_see_shares_of_master_rep_with_their_portal_id(self):
+        # ShareLog.field_rep_id is a MASTER rep id; it can equal another rep's portal pk.
+        foreign = self.share(field_rep_id=self.rep.pk, field_rep_email=self.other_rep.email)
+
+        self.assertNotIn(foreign.pk, self.shared_ids(self.rep))
+
+    def test_rep_sees_own_shares_by_email_and_master_id(self):
+        by_email = self.share(field_rep_id=501, field_rep_email="REP.A@example.com")
+        by_master_id = self.share(field_rep_id=502, field_rep_email="")
+        foreign = self.share(field_rep_id=503, field_rep_email=self.other_rep.email)
+
+        visible = self.shared_ids(self.rep, master_ids=[502])
+
+        self.assertEqual(visible, {by_email.pk, by_master_id.pk})
+        self.assertEqual(self.shared_ids(self.other_rep), {foreign.pk})
+
+    def test_rep_without_email_sees_nothing(self):
+        self.share(field_rep_id=0, field_rep_email="")
+        self.rep.email = ""
+        self.rep.save(update_fields=["email"])
+
+        self.assertEqual(self.shared_ids(self.rep), set())
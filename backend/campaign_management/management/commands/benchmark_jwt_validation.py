@@ -0,0 +1,81 @@
+import time
+
+import jwt
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from django.core.management.base import BaseCommand
+
+from campaign_management.publisher_auth import JWTValidator
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare plain jwt.decode with JWTValidator (parsed keys, verified-token "
+        "cache) for HS256 and RS256 tokens, using throwaway keys."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=2000)
+        parser.add_argument(
+            "--distinct-tokens",
+            type=int,
+            default=50,
+            help="Distinct tokens cycled through (default 50, i.e. repeated page loads).",
+        )
+
+    def handle(self, *args, **options):
+        iterations = max(options["iterations"], 1)
+        distinct = max(options["distinct_tokens"], 1)
+
+        private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        public_pem = private_key.public_key().public_bytes(
+            serialization.Encoding.PEM,
+            serialization.PublicFormat.SubjectPublicKeyInfo,
+        ).decode()
+        private_pem = private_key.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption(),
+        ).decode()
+        secret = "benchmark-secret-" + "x" * 32
+
+        for algorithm, signing_key, verify_key in (
+            ("HS256", secret, secret),
+            ("RS256", private_pem, public_pem),
+        ):
+            now = int(time.time())
+            tokens = [
+                jwt.encode(
+                    {"sub": str(i), "iss": "bench", "aud": "bench", "iat": now, "exp": now + 3600, "roles": ["publisher"]},
+                    signing_key,
+                    algorithm=algorithm,
+                )
+                for i in range(distinct)
+            ]
+
+            def plain(token):
+                jwt.decode(
+                    token,
+                    key=verify_key,
+                    algorithms=[algorithm],
+                    issuer="bench",
+                    audience="bench",
+                    options={"require": JWTValidator.REQUIRED_CLAIMS},
+                )
+
+            uncached = JWTValidator([verify_key], algorithms=[algorithm], issuer="bench", audience="bench", cache_size=0)
+            cached = JWTValidator([verify_key], algorithms=[algorithm], issuer="bench", audience="bench")
+
+            for label, fn in (
+                ("jwt.decode", plain),
+                ("validator, no cache", uncached.decode),
+                ("validator, cached", cached.decode),
+            ):
+                started = time.perf_counter()
+                for i in range(iterations):
+                    fn(tokens[i % distinct])
+                elapsed = time.perf_counter() - started
+                self.stdout.write(
+                    f"{algorithm} {label:<22} {iterations / elapsed:>12,.0f} tokens/s  "
+                    f"({elapsed / iterations * 1e6:.1f} us each)"
+                )
@@ -1,13 +1,19 @@
 from __future__ import annotations
 
+import copy
+import hashlib
+import threading
 import time
+from collections import OrderedDict
 from functools import wraps
-from typing import Any, Callable, Dict, Optional, Tuple
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 import jwt
-from jwt import InvalidTokenError
+from jwt import InvalidSignatureError, InvalidTokenError
+from jwt.algorithms import get_default_algorithms
 
 from django.conf import settings
+from django.core.signals import setting_changed
 from django.http import HttpRequest, HttpResponse
 import logging
 
@@ -47,22 +53,159 @@ def extract_jwt_from_request(request: HttpRequest) -> Tuple[Optional[str], str]:
     return None, "none"
 
 
+class JWTValidator:
+    """
+    Verifies publisher/field-rep JWTs against one or more keys.
+
+    Keys are parsed once per algorithm (PEM parsing dominates RS256/ES256
+    cost) and tried in order, so a new key can be added next to the old one
+    while issuers rotate; a token whose header names a ``kid`` only tries that
+    key when ``keys`` is a {kid: key} mapping. Verified tokens are kept in a
+    bounded LRU keyed by the token's SHA-256 until their ``exp``, so reloads
+    with the same token skip signature verification. Failures are never cached.
+    """
+
+    REQUIRED_CLAIMS = ["exp", "iat", "iss", "aud", "sub"]
+
+    def __init__(
+        self,
+        keys,
+        *,
+        algorithms: List[str],
+        issuer: str,
+        audience: str,
+        leeway: int = 0,
+        cache_size: int = 1024,
+    ):
+        if isinstance(keys, dict):
+            self._keys = [(kid, key) for kid, key in keys.items() if key]
+        else:
+            self._keys = [(None, key) for key in keys if key]
+        self.algorithms = [alg.strip() for alg in algorithms if alg and alg.strip()]
+        self.issuer = issuer
+        self.audience = audience
+        self.leeway = leeway
+        self.cache_size = max(int(cache_size), 0)
+        self._algorithm_objects = get_default_algorithms()
+        self._prepared: Dict[Tuple[int, str], Any] = {}
+        self._verified: "OrderedDict[bytes, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _prepared_key(self, index: int, key, algorithm: str):
+        cache_key = (index, algorithm)
+        if cache_key not in self._prepared:
+            try:
+                prepared = self._algorithm_objects[algorithm].prepare_key(key)
+            except Exception:
+                # e.g. a PEM offered for HS256; the key just cannot sign this alg
+                prepared = None
+            self._prepared[cache_key] = prepared
+        return self._prepared[cache_key]
+
+    def _candidate_keys(self, header: Dict[str, Any]):
+        algorithm = header.get("alg")
+        if algorithm not in self.algorithms or algorithm not in self._algorithm_objects:
+            raise InvalidTokenError("The specified alg value is not allowed")
+        kid = header.get("kid")
+        keyed = [(i, key) for i, (key_id, key) in enumerate(self._keys) if kid and key_id == kid]
+        for index, key in keyed or list(enumerate(k for _, k in self._keys)):
+            prepared = self._prepared_key(index, key, algorithm)
+            if prepared is not None:
+                yield algorithm, prepared
+
+    def _decode(self, token: str) -> Dict[str, Any]:
+        header = jwt.get_unverified_header(token)
+        last_error: Exception = InvalidSignatureError("No key matches the token")
+        for algorithm, key in self._candidate_keys(header):
+            try:
+                return jwt.decode(
+                    token,
+                    key=key,
+                    algorithms=[algorithm],
+                    issuer=self.issuer,
+                    audience=self.audience,
+                    options={"require": self.REQUIRED_CLAIMS},
+                    leeway=self.leeway,
+                )
+            except InvalidSignatureError as exc:
+                last_error = exc
+        raise last_error
+
+    def decode(self, token: str) -> Dict[str, Any]:
+        digest = hashlib.sha256((token or "").encode("utf-8")).digest()
+        now = time.time()
+        with self._lock:
+            cached = self._verified.get(digest)
+            if cached and cached[0] > now:
+                self._verified.move_to_end(digest)
+                return copy.deepcopy(cached[1])
+            if cached:
+                del self._verified[digest]
+
+        payload = self._decode(token)
+
+        exp = payload.get("exp")
+        if self.cache_size and isinstance(exp, (int, float)) and exp > now:
+            with self._lock:
+                self._verified[digest] = (float(exp), copy.deepcopy(payload))
+                self._verified.move_to_end(digest)
+                while len(self._verified) > self.cache_size:
+                    self._verified.popitem(last=False)
+        return payload
+
+    def clear(self) -> None:
+        with self._lock:
+            self._verified.clear()
+
+
+_publisher_jwt_validator: Optional[JWTValidator] = None
+_publisher_jwt_validator_lock = threading.Lock()
+
+
+def get_publisher_jwt_validator() -> JWTValidator:
+    """
+    Process-wide validator built from the PUBLISHER_JWT_* settings.
+
+    The current key (PUBLISHER_JWT_PUBLIC_KEY, else PUBLISHER_JWT_SECRET) is
+    tried first, then PUBLISHER_JWT_ADDITIONAL_KEYS (a list, or a {kid: key}
+    mapping) for keys being rotated in or out.
+    """
+    global _publisher_jwt_validator
+    if _publisher_jwt_validator is None:
+        with _publisher_jwt_validator_lock:
+            if _publisher_jwt_validator is None:
+                primary = (getattr(settings, "PUBLISHER_JWT_PUBLIC_KEY", None)
+                           or getattr(settings, "PUBLISHER_JWT_SECRET", None))
+                additional = getattr(settings, "PUBLISHER_JWT_ADDITIONAL_KEYS", None) or []
+                if isinstance(additional, dict):
+                    keys = {"": primary, **additional}
+                else:
+                    keys = [primary, *additional]
+                _publisher_jwt_validator = JWTValidator(
+                    keys,
+                    algorithms=getattr(settings, "PUBLISHER_JWT_ALGORITHMS", ["HS256"]),
+                    issuer=getattr(settings, "PUBLISHER_JWT_ISSUER", "project1"),
+                    audience=getattr(settings, "PUBLISHER_JWT_AUDIENCE", "project2"),
+                    leeway=int(getattr(settings, "PUBLISHER_JWT_LEEWAY_SECONDS", 0) or 0),
+                    cache_size=int(getattr(settings, "PUBLISHER_JWT_CACHE_SIZE", 1024)),
+                )
+    return _publisher_jwt_validator
+
+
+def _reset_publisher_jwt_validator(*, setting, **kwargs) -> None:
+    global _publisher_jwt_validator
+    if setting.startswith("PUBLISHER_JWT_") or setting == "PUBLISHER_SSO_SHARED_SECRET":
+        _publisher_jwt_validator = None
+
+
+setting_changed.connect(_reset_publisher_jwt_validator)
+
+
 def validate_publisher_jwt(token: str) -> Dict[str, Any]:
     logger.info("validate_publisher_jwt called")
 
     try:
-        payload = jwt.decode(
-            token,
-            key=(getattr(settings, "PUBLISHER_JWT_PUBLIC_KEY", None)
-                 or getattr(settings, "PUBLISHER_JWT_SECRET", None)),
-            algorithms=getattr(settings, "PUBLISHER_JWT_ALGORITHMS", ["HS256"]),
-            issuer=getattr(settings, "PUBLISHER_JWT_ISSUER", "project1"),
-            audience=getattr(settings, "PUBLISHER_JWT_AUDIENCE", "project2"),
-            options={
-                "require": ["exp", "iat", "iss", "aud", "sub"],
-            },
-            leeway=int(getattr(settings, "PUBLISHER_JWT_LEEWAY_SECONDS", 0) or 0),
-        )
+        payload = get_publisher_jwt_validator().decode(token)
     except Exception:
         logger.exception("JWT decode failed")
         raise
@@ -87,18 +230,7 @@ def validate_fieldrep_jwt(token: str) -> Dict[str, Any]:
     logger.info("validate_fieldrep_jwt called")
 
     try:
-        payload = jwt.decode(
-            token,
-            key=(getattr(settings, "PUBLISHER_JWT_PUBLIC_KEY", None)
-                 or getattr(settings, "PUBLISHER_JWT_SECRET", None)),
-            algorithms=getattr(settings, "PUBLISHER_JWT_ALGORITHMS", ["HS256"]),
-            issuer=getattr(settings, "PUBLISHER_JWT_ISSUER", "project1"),
-            audience=getattr(settings, "PUBLISHER_JWT_AUDIENCE", "project2"),
-            options={
-                "require": ["exp", "iat", "iss", "aud", "sub"],
-            },
-            leeway=int(getattr(settings, "PUBLISHER_JWT_LEEWAY_SECONDS", 0) or 0),
-        )
+        payload = get_publisher_jwt_validator().decode(token)
     except Exception:
         logger.exception("Field Rep JWT decode failed")
         raise
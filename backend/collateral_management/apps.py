@@ -4,3 +4,24 @@ from django.apps import AppConfig
 class CollateralManagementConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'collateral_management'
+
+    def ready(self):
+        from collateral_management.campaign_resolver import invalidate_collateral_campaigns
+        from collateral_management.live_index import invalidate_live_collaterals
+        from utils.cache_generation import connect_save_delete
+
+        # Any of these can change which campaign (and dates) a collateral resolves to.
+        campaign_sources = (
+            "collateral_management.CampaignCollateral",
+            "campaign_management.CampaignCollateral",
+            "collateral_management.Collateral",
+            "campaign_management.Campaign",
+        )
+        connect_save_delete(invalidate_collateral_campaigns, campaign_sources, "collateral_campaign")
+
+        # Bridge rows and collaterals decide what is live for a campaign today.
+        connect_save_delete(
+            invalidate_live_collaterals,
+            ("collateral_management.CampaignCollateral", "collateral_management.Collateral"),
+            "live_collateral_index",
+        )
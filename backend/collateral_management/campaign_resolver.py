@@ -0,0 +1,116 @@
+# collateral_management/campaign_resolver.py
+"""
+Collateral -> (brand campaign id, start date, end date), for many collaterals at once.
+
+Fallback order per collateral, as the admin forms expect:
+  1. collateral_management.CampaignCollateral (latest updated_at wins)
+  2. campaign_management.CampaignCollateral (lowest id wins)
+  3. Collateral.campaign
+
+Each tier is one query for every collateral still unresolved. Results,
+including "no campaign", are cached per collateral under a generation that
+the bridge, collateral and campaign save/delete signals bump.
+"""
+from __future__ import annotations
+
+from typing import Iterable, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+
+from utils.cache_generation import CacheGeneration
+
+
+# Signals only reach the process that saved the change; with a per-process
+# cache backend this timeout bounds how long other workers can lag behind.
+RESOLVER_CACHE_TIMEOUT = getattr(settings, "COLLATERAL_CAMPAIGN_CACHE_SECONDS", 300)
+_generation = CacheGeneration("collateral_campaign:generation")
+
+# Cached marker for "no campaign", so misses are cached as well.
+_NO_CAMPAIGN = ""
+
+
+def invalidate_collateral_campaigns(*args, **kwargs) -> None:
+    """Drop every cached resolution by moving to a new cache generation."""
+    _generation.bump()
+
+
+def _format_date(value) -> str:
+    return value.strftime("%Y-%m-%d") if value else ""
+
+
+def _resolve_uncached(collateral_ids: set[int]) -> dict[int, Optional[dict]]:
+    from campaign_management.models import CampaignCollateral as CampaignMgmtCampaignCollateral
+    from collateral_management.models import CampaignCollateral as CollateralMgmtCampaignCollateral, Collateral
+
+    resolved: dict[int, Optional[dict]] = {}
+
+    def _take_first(rows):
+        # rows are ordered by collateral_id, then by preference
+        for collateral_id, brand_campaign_id, start_date, end_date in rows:
+            if collateral_id not in resolved:
+                resolved[collateral_id] = {
+                    "brand_campaign_id": brand_campaign_id,
+                    "start_date": _format_date(start_date),
+                    "end_date": _format_date(end_date),
+                }
+
+    _take_first(
+        CollateralMgmtCampaignCollateral.objects.filter(collateral_id__in=collateral_ids)
+        .order_by("collateral_id", "-updated_at")
+        .values_list("collateral_id", "campaign__brand_campaign_id", "start_date", "end_date")
+    )
+
+    remaining = collateral_ids - set(resolved)
+    if remaining:
+        _take_first(
+            CampaignMgmtCampaignCollateral.objects.filter(collateral_id__in=remaining)
+            .order_by("collateral_id", "pk")
+            .values_list("collateral_id", "campaign__brand_campaign_id", "start_date", "end_date")
+        )
+
+    remaining = collateral_ids - set(resolved)
+    if remaining:
+        _take_first(
+            (collateral_id, brand_campaign_id, None, None)
+            for collateral_id, brand_campaign_id in Collateral.objects.filter(
+                id__in=remaining, campaign__isnull=False
+            ).values_list("id", "campaign__brand_campaign_id")
+        )
+
+    for collateral_id in collateral_ids - set(resolved):
+        resolved[collateral_id] = None
+    return resolved
+
+
+def resolve_collateral_campaigns(collateral_ids: Iterable) -> dict[int, Optional[dict]]:
+    """
+    Map each collateral id to {"brand_campaign_id", "start_date", "end_date"}
+    (dates as YYYY-MM-DD or ""), or None when no campaign is linked.
+    """
+    ids = {int(collateral_id) for collateral_id in collateral_ids}
+    if not ids:
+        return {}
+
+    generation = _generation.current()
+    keys = {collateral_id: f"collateral_campaign:{generation}:{collateral_id}" for collateral_id in ids}
+    cached = cache.get_many(keys.values())
+
+    result: dict[int, Optional[dict]] = {}
+    for collateral_id, key in keys.items():
+        if key in cached:
+            result[collateral_id] = cached[key] or None
+
+    missing = ids - set(result)
+    if missing:
+        fresh = _resolve_uncached(missing)
+        cache.set_many(
+            {keys[collateral_id]: value or _NO_CAMPAIGN for collateral_id, value in fresh.items()},
+            RESOLVER_CACHE_TIMEOUT,
+        )
+        result.update(fresh)
+    return result
+
+
+def resolve_collateral_campaign(collateral_id) -> Optional[dict]:
+    return resolve_collateral_campaigns([collateral_id]).get(int(collateral_id))
@@ -0,0 +1,163 @@
+# collateral_management/live_index.py
+"""
+Per-campaign index of the collaterals that are live today.
+
+A collateral is live for a campaign when it is active and either
+  - a collateral_management.CampaignCollateral row links them and today (by
+    date) falls inside its start/end window (NULL ends are open), or
+  - Collateral.campaign points at the campaign (older deployments).
+
+The answer is stored in CampaignLiveCollateral, stamped with the day it was
+computed for. Saving or deleting a bridge row or a collateral rebuilds the
+campaigns involved once the transaction commits; the daily task rebuilds
+everything after midnight so date windows roll over. Readers that find no
+build for today rebuild that campaign on the spot, so a missed signal or a
+late task only costs one recomputation.
+"""
+from __future__ import annotations
+
+from collections import defaultdict
+from typing import Iterable, Optional
+
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from myproject.applog import get_logger
+
+log = get_logger(__name__)
+
+
+def _window_q(today) -> Q:
+    # DATE comparisons, so a window ending today still counts all day.
+    return (
+        (Q(start_date__isnull=True) | Q(start_date__date__lte=today)) &
+        (Q(end_date__isnull=True) | Q(end_date__date__gte=today))
+    )
+
+
+def _compute(campaign_ids: set[int], today) -> dict[int, dict[int, bool]]:
+    """campaign id -> {collateral id: via_bridge} for every campaign asked for."""
+    from .models import CampaignCollateral, Collateral
+
+    live: dict[int, dict[int, bool]] = defaultdict(dict)
+    bridge_rows = (
+        CampaignCollateral.objects
+        .filter(campaign_id__in=campaign_ids, collateral__is_active=True)
+        .filter(_window_q(today))
+        .values_list("campaign_id", "collateral_id")
+    )
+    for campaign_id, collateral_id in bridge_rows:
+        live[campaign_id][collateral_id] = True
+
+    legacy_rows = (
+        Collateral.objects
+        .filter(campaign_id__in=campaign_ids, is_active=True)
+        .values_list("campaign_id", "id")
+    )
+    for campaign_id, collateral_id in legacy_rows:
+        live[campaign_id].setdefault(collateral_id, False)
+    return live
+
+
+def rebuild_live_collaterals(campaign_ids: Iterable[int], today=None) -> int:
+    """Recompute the index for ``campaign_ids``; returns the number of live rows written."""
+    from campaign_management.models import Campaign
+    from .models import CampaignLiveCollateral, CampaignLiveCollateralBuild
+
+    campaign_ids = {int(campaign_id) for campaign_id in campaign_ids if campaign_id}
+    if not campaign_ids:
+        return 0
+    # A campaign deleted before an on_commit rebuild ran has nothing to index.
+    campaign_ids = set(Campaign.objects.filter(pk__in=campaign_ids).values_list("pk", flat=True))
+    if not campaign_ids:
+        return 0
+    today = today or timezone.localdate()
+    live = _compute(campaign_ids, today)
+
+    rows = [
+        CampaignLiveCollateral(campaign_id=campaign_id, collateral_id=collateral_id, live_on=today, via_bridge=via_bridge)
+        for campaign_id, collaterals in live.items()
+        for collateral_id, via_bridge in collaterals.items()
+    ]
+    with transaction.atomic():
+        CampaignLiveCollateral.objects.filter(campaign_id__in=campaign_ids).delete()
+        CampaignLiveCollateral.objects.bulk_create(rows, batch_size=1000, ignore_conflicts=True)
+        already_built = set(
+            CampaignLiveCollateralBuild.objects.filter(campaign_id__in=campaign_ids).values_list("campaign_id", flat=True)
+        )
+        CampaignLiveCollateralBuild.objects.filter(campaign_id__in=already_built).update(built_for=today)
+        try:
+            with transaction.atomic():
+                CampaignLiveCollateralBuild.objects.bulk_create([
+                    CampaignLiveCollateralBuild(campaign_id=campaign_id, built_for=today)
+                    for campaign_id in campaign_ids - already_built
+                ])
+        except IntegrityError:
+            # A concurrent rebuild created the marker first; its rows are as fresh as ours.
+            pass
+    return len(rows)
+
+
+def rebuild_all_live_collaterals(today=None, chunk_size: int = 500) -> int:
+    """Rebuild every campaign, ``chunk_size`` campaigns per transaction."""
+    from campaign_management.models import Campaign
+
+    today = today or timezone.localdate()
+    campaign_ids = list(Campaign.objects.order_by("pk").values_list("pk", flat=True))
+    written = 0
+    for start in range(0, len(campaign_ids), chunk_size):
+        written += rebuild_live_collaterals(campaign_ids[start:start + chunk_size], today=today)
+    return written
+
+
+def _ensure_built(campaign_id: int, today) -> None:
+    from .models import CampaignLiveCollateralBuild
+
+    if not CampaignLiveCollateralBuild.objects.filter(campaign_id=campaign_id, built_for=today).exists():
+        rebuild_live_collaterals([campaign_id], today=today)
+
+
+def live_collaterals(campaign_id, *, bridge_only: bool = False):
+    """Collateral queryset of what is live today for the campaign."""
+    from .models import Collateral
+
+    today = timezone.localdate()
+    _ensure_built(int(campaign_id), today)
+    entries = Q(live_campaign_entries__campaign_id=campaign_id, live_campaign_entries__live_on=today)
+    if bridge_only:
+        entries &= Q(live_campaign_entries__via_bridge=True)
+    return Collateral.objects.filter(entries)
+
+
+def invalidate_live_collaterals(sender, instance, **kwargs) -> None:
+    """
+    Signal receiver for CampaignCollateral / Collateral changes: mark the
+    affected campaigns unbuilt now, rebuild them after commit.
+    """
+    from .models import CampaignCollateral, CampaignLiveCollateral, CampaignLiveCollateralBuild
+
+    campaign_ids: set[Optional[int]] = {getattr(instance, "campaign_id", None)}
+    if sender is not CampaignCollateral and instance.pk:
+        # Bridges of the collateral, plus campaigns it is indexed under now
+        # (covers Collateral.campaign moving away).
+        campaign_ids.update(
+            CampaignCollateral.objects.filter(collateral_id=instance.pk).values_list("campaign_id", flat=True)
+        )
+        campaign_ids.update(
+            CampaignLiveCollateral.objects.filter(collateral_id=instance.pk).values_list("campaign_id", flat=True)
+        )
+    campaign_ids.discard(None)
+    if not campaign_ids:
+        return
+
+    CampaignLiveCollateralBuild.objects.filter(campaign_id__in=campaign_ids).delete()
+
+    def _rebuild():
+        try:
+            rebuild_live_collaterals(campaign_ids)
+        except Exception as e:
+            # Readers rebuild unbuilt campaigns themselves.
+            log.warning("live_index_rebuild_failed", campaign_ids=sorted(campaign_ids), error=e)
+
+    transaction.on_commit(_rebuild)
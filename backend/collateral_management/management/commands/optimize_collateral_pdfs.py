@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from collateral_management.models import Collateral
+from collateral_management.pdf_optimizer import optimize_collateral_pdf
+
+
+class Command(BaseCommand):
+    help = (
+        "Build size-optimized copies of collateral PDFs that have none yet, and "
+        "record content hashes of files that have none (uploads from before the "
+        "optimizer existed, or ones the queue missed)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--ids", nargs="+", type=int, help="Only these collateral ids.")
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Re-optimize collaterals that were already processed.",
+        )
+
+    def handle(self, *args, **options):
+        qs = Collateral.objects.exclude(file="").exclude(file__isnull=True)
+        if options["ids"]:
+            qs = qs.filter(pk__in=options["ids"])
+        if not options["force"]:
+            qs = qs.filter(Q(file__iendswith=".pdf", optimized_at__isnull=True) | Q(file_hash=""))
+
+        saved = 0
+        for collateral_id in qs.order_by("pk").values_list("pk", flat=True).iterator():
+            try:
+                result = optimize_collateral_pdf(collateral_id)
+            except Exception as e:
+                self.stderr.write(f"collateral {collateral_id}: failed ({e})")
+                continue
+            if not result:
+                continue
+            if result["optimized"] is None:
+                self.stdout.write(f"collateral {collateral_id}: {result['original']:,} bytes, hashed, not reduced")
+                continue
+            saved += result["original"] - result["optimized"]
+            self.stdout.write(
+                f"collateral {collateral_id}: {result['original']:,} -> {result['optimized']:,} bytes"
+            )
+        self.stdout.write(self.style.SUCCESS(f"Done, {saved:,} bytes saved."))
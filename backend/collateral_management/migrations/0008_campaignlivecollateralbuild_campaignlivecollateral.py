@@ -0,0 +1,37 @@
+# Generated by Django 4.2.11 on 2026-10-19 16:49
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('campaign_management', '0014_campaign_fieldrep_login_background_image'),
+        ('collateral_management', '0007_collateralmessage_reminder_message'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CampaignLiveCollateralBuild',
+            fields=[
+                ('campaign', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='live_collateral_build', serialize=False, to='campaign_management.campaign')),
+                ('built_for', models.DateField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='CampaignLiveCollateral',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('live_on', models.DateField()),
+                ('via_bridge', models.BooleanField(default=False)),
+                ('campaign', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='live_collateral_entries', to='campaign_management.campaign')),
+                ('collateral', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='live_campaign_entries', to='collateral_management.collateral')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['campaign', 'live_on'], name='idx_live_collateral_campaign')],
+                'unique_together': {('campaign', 'collateral')},
+            },
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 4.2.11 on 2026-10-19 16:52
+
+import collateral_management.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('collateral_management', '0008_campaignlivecollateralbuild_campaignlivecollateral'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='collateral',
+            name='file_size_optimized',
+            field=models.PositiveBigIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='collateral',
+            name='file_size_original',
+            field=models.PositiveBigIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='collateral',
+            name='optimized_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='collateral',
+            name='optimized_file',
+            field=models.FileField(blank=True, null=True, upload_to=collateral_management.models.collateral_upload_path),
+        ),
+    ]
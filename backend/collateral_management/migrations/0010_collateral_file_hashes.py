@@ -0,0 +1,23 @@
+# Generated by Django 4.2.11 on 2026-10-19 17:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('collateral_management', '0009_collateral_file_size_optimized_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='collateral',
+            name='file_hash',
+            field=models.CharField(blank=True, default='', max_length=16),
+        ),
+        migrations.AddField(
+            model_name='collateral',
+            name='optimized_file_hash',
+            field=models.CharField(blank=True, default='', max_length=16),
+        ),
+    ]
@@ -2,6 +2,10 @@ from django.db import models
 from django.conf import settings
 from django.utils import timezone
 
+from myproject.applog import get_logger
+
+log = get_logger(__name__)
+
 
 # ------------------------------------------------------------------
 # helper: where uploaded files go
@@ -11,8 +15,7 @@ def collateral_upload_path(instance, filename):
     MEDIA_ROOT/collaterals/<id or tmp>/<filename>
     """
     upload_path = f"collaterals/{instance.id or 'tmp'}/{filename}"
-    print(f"[collateral_upload_path] Uploading file '{filename}' to path: {upload_path}")
-    print(f"[collateral_upload_path] Instance ID: {instance.id or 'tmp'}, Instance: {instance}")
+    log.debug("collateral_upload_path", filename=filename, path=upload_path)
     return upload_path
     
 
@@ -59,6 +62,14 @@ class Collateral(models.Model):
     type        = models.CharField(max_length=10, choices=COLLATERAL_TYPE_CHOICES)
 
     file        = models.FileField(upload_to=collateral_upload_path, blank=True, null=True)
+    # size-optimized copy of ``file`` served to doctors (see pdf_optimizer)
+    optimized_file      = models.FileField(upload_to=collateral_upload_path, blank=True, null=True)
+    file_size_original  = models.PositiveBigIntegerField(null=True, blank=True)
+    file_size_optimized = models.PositiveBigIntegerField(null=True, blank=True)
+    optimized_at        = models.DateTimeField(null=True, blank=True)
+    # short sha256 of ``file`` / ``optimized_file``, used as the ?v= cache buster
+    file_hash           = models.CharField(max_length=16, blank=True, default="")
+    optimized_file_hash = models.CharField(max_length=16, blank=True, default="")
     vimeo_url   = models.URLField(blank=True, null=True)
     content_id  = models.CharField(max_length=100, blank=True, null=True)
 
@@ -104,6 +115,16 @@ class Collateral(models.Model):
         
         super().save(*args, **kwargs)
     
+    @property
+    def doctor_file(self):
+        """The optimized PDF when one exists for the current upload, else the original."""
+        return self.optimized_file or self.file
+
+    @property
+    def doctor_file_version(self) -> str:
+        """Stored content hash of ``doctor_file`` ("" until it has been computed)."""
+        return self.optimized_file_hash if self.optimized_file else self.file_hash
+
     # helper (optional)
     def webinar_month_year(self):
         if self.webinar_date:
@@ -168,3 +189,47 @@ class CollateralMessage(models.Model):
     
     def __str__(self):
         return f"{self.campaign.brand_campaign_id} - {self.collateral.title} Message"
+
+
+# ------------------------------------------------------------------
+# precomputed "live today" collaterals per campaign
+# (maintained by collateral_management.live_index; never edit by hand)
+# ------------------------------------------------------------------
+class CampaignLiveCollateral(models.Model):
+    """A collateral that is live for a campaign on ``live_on``."""
+    campaign   = models.ForeignKey(
+        "campaign_management.Campaign",
+        on_delete=models.CASCADE,
+        related_name="live_collateral_entries",
+    )
+    collateral = models.ForeignKey(
+        Collateral,
+        on_delete=models.CASCADE,
+        related_name="live_campaign_entries",
+    )
+    live_on    = models.DateField()
+    via_bridge = models.BooleanField(default=False)  # live through CampaignCollateral, not only Collateral.campaign
+
+    class Meta:
+        unique_together = ("campaign", "collateral")
+        indexes = [
+            models.Index(fields=["campaign", "live_on"], name="idx_live_collateral_campaign"),
+        ]
+
+    def __str__(self):
+        return f"{self.campaign_id} – {self.collateral_id} ({self.live_on})"
+
+
+class CampaignLiveCollateralBuild(models.Model):
+    """Day the live-collateral rows of a campaign were last computed for."""
+    campaign   = models.OneToOneField(
+        "campaign_management.Campaign",
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="live_collateral_build",
+    )
+    built_for  = models.DateField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.campaign_id} built for {self.built_for}"
@@ -0,0 +1,178 @@
+# collateral_management/pdf_optimizer.py
+"""
+Shrink uploaded collateral PDFs for doctors on mobile data.
+
+After an upload the original stays in ``Collateral.file``. A background task
+writes a copy to ``Collateral.optimized_file``:
+  - images above COLLATERAL_PDF_IMAGE_DPI_THRESHOLD are resampled down to
+    COLLATERAL_PDF_IMAGE_DPI and re-encoded at COLLATERAL_PDF_IMAGE_QUALITY;
+  - embedded fonts are subset to the glyphs in use;
+  - unused and duplicate objects are dropped, and streams are compressed
+    into object streams.
+The copy is only kept when it is smaller, and both sizes are recorded on
+the collateral. Doctors are served ``Collateral.doctor_file``.
+
+The same task records the content hash of every uploaded file, PDF or not,
+and of the optimized copy (``file_hash`` / ``optimized_file_hash``). These
+are the ?v= cache busters in doctor-facing URLs (see views_media).
+
+MuPDF 1.22+ (PyMuPDF 1.26 is pinned) can no longer write linearized files,
+so there is no fast-web-view pass; object streams give most of the size
+benefit instead.
+"""
+from __future__ import annotations
+
+import io
+import os
+from typing import Optional
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import transaction
+from django.utils import timezone
+
+from myproject.applog import get_logger
+
+from .views_media import content_hash
+
+try:
+    import fitz  # PyMuPDF
+except Exception:  # pragma: no cover - optional at import time, like doctor_viewer
+    fitz = None
+
+log = get_logger(__name__)
+
+PDF_OPTIMIZATION_ENABLED = getattr(settings, "COLLATERAL_PDF_OPTIMIZE", True)
+PDF_IMAGE_DPI = getattr(settings, "COLLATERAL_PDF_IMAGE_DPI", 150)
+PDF_IMAGE_DPI_THRESHOLD = getattr(settings, "COLLATERAL_PDF_IMAGE_DPI_THRESHOLD", 200)
+PDF_IMAGE_QUALITY = getattr(settings, "COLLATERAL_PDF_IMAGE_QUALITY", 75)
+
+
+def _is_pdf(file_field) -> bool:
+    return bool(file_field) and file_field.name.lower().endswith(".pdf")
+
+
+def optimize_pdf_bytes(data: bytes) -> bytes:
+    """Return an optimized copy of the PDF in ``data``."""
+    with fitz.open(stream=data, filetype="pdf") as doc:
+        doc.rewrite_images(
+            dpi_threshold=PDF_IMAGE_DPI_THRESHOLD,
+            dpi_target=PDF_IMAGE_DPI,
+            quality=PDF_IMAGE_QUALITY,
+        )
+        doc.subset_fonts()
+        return doc.tobytes(garbage=4, clean=True, deflate=True, use_objstms=1)
+
+
+def _delete_file(storage, name: Optional[str]) -> None:
+    if not name:
+        return
+    try:
+        storage.delete(name)
+    except Exception as e:
+        log.warning("optimized_pdf_delete_failed", name=name, error=e)
+
+
+def _hash_bytes(data: bytes) -> str:
+    return content_hash(io.BytesIO(data))
+
+
+def _record_file_hash(collateral) -> Optional[dict]:
+    """Hash a file that is not optimized; returns the same shape as optimize_collateral_pdf."""
+    from .models import Collateral
+
+    source_name = collateral.file.name
+    with collateral.file.open("rb") as fh:
+        digest = content_hash(fh)
+        size = fh.tell()
+    updated = Collateral.objects.filter(pk=collateral.pk, file=source_name).update(
+        file_hash=digest,
+        file_size_original=size,
+    )
+    return {"original": size, "optimized": None} if updated else None
+
+
+def optimize_collateral_pdf(collateral_id: int) -> Optional[dict]:
+    """
+    Build the optimized copy for one collateral and record the content hashes.
+
+    Returns {"original": size in bytes, "optimized": size in bytes, or None
+    when no smaller copy was kept}, or None when there was nothing to do.
+    Files that are not PDFs, or when optimization is off, are only hashed.
+    """
+    from .models import Collateral, collateral_upload_path
+
+    collateral = Collateral.objects.filter(pk=collateral_id).first()
+    if not collateral or not collateral.file:
+        return None
+    if not (PDF_OPTIMIZATION_ENABLED and _is_pdf(collateral.file) and fitz is not None):
+        return _record_file_hash(collateral)
+
+    source_name = collateral.file.name
+    with collateral.file.open("rb") as fh:
+        original = fh.read()
+    optimized = optimize_pdf_bytes(original)
+    keep = len(optimized) < len(original)
+
+    storage = collateral.optimized_file.storage
+    optimized_name = None
+    if keep:
+        base = os.path.splitext(os.path.basename(source_name))[0]
+        optimized_name = storage.save(
+            collateral_upload_path(collateral, f"{base}.optimized.pdf"),
+            ContentFile(optimized),
+        )
+
+    previous_optimized = collateral.optimized_file.name
+    # Only record the result if the upload was not replaced meanwhile;
+    # update() keeps the collateral save signals out of it.
+    updated = Collateral.objects.filter(pk=collateral_id, file=source_name).update(
+        optimized_file=optimized_name,
+        file_size_original=len(original),
+        file_size_optimized=len(optimized) if keep else None,
+        file_hash=_hash_bytes(original),
+        optimized_file_hash=_hash_bytes(optimized) if keep else "",
+        optimized_at=timezone.now(),
+    )
+    if not updated:
+        _delete_file(storage, optimized_name)
+        return None
+    if previous_optimized and previous_optimized != optimized_name:
+        _delete_file(storage, previous_optimized)
+
+    return {"original": len(original), "optimized": len(optimized) if keep else None}
+
+
+def dispatch_pdf_optimization(collateral_id: int) -> None:
+    """Queue the optimization; without a task queue doctors keep getting the original, unversioned."""
+    from collateral_management.tasks import optimize_collateral_pdf_task
+
+    try:
+        optimize_collateral_pdf_task.apply_async(args=[collateral_id], retry=False)
+    except Exception as e:
+        log.warning("pdf_optimization_not_queued", collateral_id=collateral_id, error=e)
+
+
+def schedule_pdf_optimization(collateral) -> None:
+    """
+    Call after a collateral's file was uploaded or replaced: drops the
+    optimized copy and hashes of the old file and queues new ones after commit.
+    """
+    from .models import Collateral
+
+    if collateral.optimized_file:
+        _delete_file(collateral.optimized_file.storage, collateral.optimized_file.name)
+    cleared = {
+        "optimized_file": None,
+        "file_size_original": None,
+        "file_size_optimized": None,
+        "optimized_at": None,
+        "file_hash": "",
+        "optimized_file_hash": "",
+    }
+    Collateral.objects.filter(pk=collateral.pk).update(**cleared)
+    # Also on the instance, so a later save() in the caller keeps them cleared.
+    for field, value in cleared.items():
+        setattr(collateral, field, value)
+    if collateral.file:
+        transaction.on_commit(lambda: dispatch_pdf_optimization(collateral.pk))
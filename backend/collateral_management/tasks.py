@@ -0,0 +1,13 @@
+from celery import shared_task
+
+from collateral_management.live_index import rebuild_all_live_collaterals
+from collateral_management.pdf_optimizer import optimize_collateral_pdf
+
+@shared_task
+def refresh_live_collateral_index():
+    return rebuild_all_live_collaterals()
+
+
+@shared_task
+def optimize_collateral_pdf_task(collateral_id):
+    return optimize_collateral_pdf(collateral_id)
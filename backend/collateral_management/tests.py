@@ -1,3 +1,172 @@
-from django.test import TestCase
+import os
+import shutil
+import tempfile
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.http import Http404
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from django.utils.http import http_date
+
+from collateral_management.views_media import (
+    IMMUTABLE_CACHE_CONTROL,
+    REVALIDATE_CACHE_CONTROL,
+    collateral_file_url,
+    content_hash,
+    serve_collateral_media,
+)
+
+
+class CollateralMediaViewTests(SimpleTestCase):
+    payload = bytes(range(256)) * 512  # 128 KiB, spans several stream chunks
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        os.makedirs(os.path.join(self.media_root, "collaterals", "7"))
+        self.full_path = os.path.join(self.media_root, "collaterals", "7", "brochure.pdf")
+        with open(self.full_path, "wb") as fh:
+            fh.write(self.payload)
+
+        settings_override = override_settings(
+            MEDIA_ROOT=self.media_root,
+            COLLATERAL_MEDIA_OFFLOAD="",
+            CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}},
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        cache.clear()
+        self.factory = RequestFactory()
+
+    def get(self, path="7/brochure.pdf", query="", **extra):
+        request = self.factory.get(f"/media/collaterals/{path}{query}", **extra)
+        return serve_collateral_media(request, path)
+
+    def body(self, response):
+        return b"".join(response.streaming_content)
+
+    def test_full_response_advertises_ranges_and_validators(self):
+        response = self.get()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.body(response), self.payload)
+        self.assertEqual(response["Accept-Ranges"], "bytes")
+        self.assertEqual(response["Content-Type"], "application/pdf")
+        self.assertTrue(response["ETag"])
+        self.assertTrue(response["Last-Modified"])
+        self.assertEqual(response["Cache-Control"], REVALIDATE_CACHE_CONTROL)
+
+    def test_byte_range_returns_partial_content(self):
+        response = self.get(HTTP_RANGE="bytes=100-70099")
+
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response["Content-Range"], f"bytes 100-70099/{len(self.payload)}")
+        self.assertEqual(response["Content-Length"], "70000")
+        self.assertEqual(self.body(response), self.payload[100:70100])
+
+    def test_open_and_suffix_ranges(self):
+        size = len(self.payload)
+
+        tail = self.get(HTTP_RANGE=f"bytes={size - 10}-")
+        suffix = self.get(HTTP_RANGE="bytes=-25")
+
+        self.assertEqual(tail.status_code, 206)
+        self.assertEqual(self.body(tail), self.payload[-10:])
+        self.assertEqual(suffix["Content-Range"], f"bytes {size - 25}-{size - 1}/{size}")
+        self.assertEqual(self.body(suffix), self.payload[-25:])
+
+    def test_range_past_end_is_not_satisfiable(self):
+        response = self.get(HTTP_RANGE=f"bytes={len(self.payload)}-")
+
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response["Content-Range"], f"bytes */{len(self.payload)}")
+
+    def test_multiple_ranges_fall_back_to_full_file(self):
+        response = self.get(HTTP_RANGE="bytes=0-1,5-6")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.body(response), self.payload)
+
+    def test_matching_etag_gets_not_modified(self):
+        etag = self.get()["ETag"]
+
+        response = self.get(HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["ETag"], etag)
+        self.assertEqual(response.content, b"")
+
+    def test_if_modified_since_gets_not_modified(self):
+        response = self.get(HTTP_IF_MODIFIED_SINCE=http_date(os.stat(self.full_path).st_mtime + 60))
+
+        self.assertEqual(response.status_code, 304)
+
+    def test_replaced_file_invalidates_etag(self):
+        etag = self.get()["ETag"]
+        with open(self.full_path, "wb") as fh:
+            fh.write(b"%PDF-1.7 replaced")
+
+        response = self.get(HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.body(response), b"%PDF-1.7 replaced")
+
+    def test_stale_if_range_serves_full_file(self):
+        response = self.get(HTTP_RANGE="bytes=0-9", HTTP_IF_RANGE='"stale"')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.body(response), self.payload)
+
+    def stored(self, version, size):
+        return mock.patch("collateral_management.views_media._stored_version", return_value=(version, size))
+
+    def test_content_hashed_url_is_immutable(self):
+        with open(self.full_path, "rb") as fh:
+            version = content_hash(fh)
+
+        with self.stored(version, len(self.payload)):
+            current = self.get(query=f"?v={version}")
+            outdated = self.get(query="?v=0000000000000000")
+
+        self.assertEqual(current["Cache-Control"], IMMUTABLE_CACHE_CONTROL)
+        self.assertEqual(outdated["Cache-Control"], REVALIDATE_CACHE_CONTROL)
+
+    def test_file_replaced_after_hashing_is_not_immutable(self):
+        with self.stored("abc123", len(self.payload)):
+            with open(self.full_path, "wb") as fh:
+                fh.write(b"%PDF-1.7 replaced in place")
+            response = self.get(query="?v=abc123")
+
+        self.assertEqual(response["Cache-Control"], REVALIDATE_CACHE_CONTROL)
+
+    def test_file_url_carries_stored_version_only(self):
+        field = mock.Mock(url="/media/collaterals/7/brochure.pdf")
+        field.name = "collaterals/7/brochure.pdf"
+
+        self.assertEqual(collateral_file_url(field, "abc123"), "/media/collaterals/7/brochure.pdf?v=abc123")
+        self.assertEqual(collateral_file_url(field), "/media/collaterals/7/brochure.pdf")
+        self.assertFalse(field.path.called)
+
+    def test_x_accel_redirect_hands_off_to_front_server(self):
+        with override_settings(COLLATERAL_MEDIA_OFFLOAD="x-accel-redirect", COLLATERAL_MEDIA_ACCEL_PREFIX="/protected-media/"):
+            response = self.get()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["X-Accel-Redirect"], "/protected-media/collaterals/7/brochure.pdf")
+        self.assertEqual(response.content, b"")
+        self.assertTrue(response["ETag"])
+
+    def test_x_sendfile_sends_filesystem_path(self):
+        with override_settings(COLLATERAL_MEDIA_OFFLOAD="x-sendfile"):
+            response = self.get()
+
+        self.assertEqual(response["X-Sendfile"], self.full_path)
+
+    def test_paths_outside_collaterals_are_not_served(self):
+        with open(os.path.join(self.media_root, "secret.txt"), "w") as fh:
+            fh.write("x")
+
+        with self.assertRaises(Http404):
+            self.get("../secret.txt")
+        with self.assertRaises(Http404):
+            self.get("7/missing.pdf")
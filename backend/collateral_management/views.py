@@ -14,6 +14,10 @@ from .models import Collateral, CampaignCollateral, CollateralMessage
 from .forms import CollateralForm, CampaignCollateralForm
 from campaign_management.models import Campaign
 from .campaign_ids import campaign_id_variants, ensure_portal_campaign
+from .pdf_optimizer import schedule_pdf_optimization
+from myproject.applog import get_logger
+
+log = get_logger(__name__)
 from .forms import CampaignCollateralDateForm
 
 class CollateralListView(ListView):
@@ -191,6 +195,8 @@ def add_collateral_with_campaign(request, brand_campaign_id=None):
                     collateral.campaign = selected_campaign
                 
                 collateral.save()
+                if collateral.file:
+                    schedule_pdf_optimization(collateral)
 
                 # --------------------------------------------------
                 # Auto-create a default WhatsApp message template
@@ -301,6 +307,8 @@ def edit_collateral_with_campaign(request, pk):
                     updated_collateral.campaign = selected_campaign
 
                 updated_collateral.save()
+                if "file" in form.changed_data:
+                    schedule_pdf_optimization(updated_collateral)
 
                 effective_campaign = updated_collateral.campaign or selected_campaign or form.cleaned_data.get("campaign")
                 if effective_campaign:
@@ -470,7 +478,7 @@ def replace_collateral(request, pk):
                 else:
                     campaign_id = 'Unknown'
         except Exception as e:
-            print(f"Error getting campaign link: {str(e)}")
+            log.warning("campaign_link_lookup_failed", collateral_id=collateral.id, error=e)
             campaign_id = 'Unknown'
         
         # Define the form class
@@ -640,7 +648,7 @@ def replace_collateral(request, pk):
                                 storage, path = instance.file.storage, instance.file.path
                                 storage.delete(path)
                             except Exception as e:
-                                print(f"Error deleting old file: {str(e)}")
+                                log.warning("old_file_delete_failed", collateral_id=instance.pk, error=e)
                         
                         # Set new file with original filename but new content
                         original_filename = os.path.basename(instance.file.name) if instance.file else new_file.name
@@ -671,6 +679,8 @@ def replace_collateral(request, pk):
                     
                     # Save the instance with the new files
                     instance.save()
+                    if 'file' in files and files['file']:
+                        schedule_pdf_optimization(instance)
                     
                     # Save many-to-many fields if any
                     form.save_m2m()
@@ -678,12 +688,10 @@ def replace_collateral(request, pk):
                     # Redirect back to the same page instead of dashboard
                     return redirect('replace_collateral', pk=instance.pk)
                     
-                except Exception as e:
-                    # Log the error for debugging
-                    print(f"Error saving collateral: {str(e)}")
+                except Exception:
+                    log.exception("replace_collateral_save_failed", collateral_id=pk)
             else:
-                # Log form errors for debugging
-                print("Form errors:", form.errors)
+                log.debug("replace_collateral_form_invalid", collateral_id=pk, errors=form.errors.as_json())
                 for field, errors in form.errors.items():
                     for error in errors:
                         messages.error(request, f"{field}: {error}")
@@ -692,16 +700,6 @@ def replace_collateral(request, pk):
         form = SimpleCollateralForm(instance=collateral, initial=initial_data)
         form.fields['campaign'].initial = campaign_id
         
-        # Debug: Print all attributes of the collateral object
-        print("Collateral object attributes:")
-        for attr in dir(collateral):
-            if not attr.startswith('_'):  # Skip private attributes
-                try:
-                    value = getattr(collateral, attr)
-                    print(f"  {attr}: {value}")
-                except Exception as e:
-                    print(f"  {attr}: <error accessing>")
-        
         # Get the title with multiple fallbacks
         collateral_title = (
             getattr(collateral, 'title', None) or 
@@ -718,11 +716,13 @@ def replace_collateral(request, pk):
         if 'title' in form.fields:
             form.fields.pop('title')
         
-        # Debug output
-        print(f"Final collateral title: {collateral_title}")
-        print(f"Collateral ID: {getattr(collateral, 'id', 'N/A')}")
-        print(f"Collateral type: {type(collateral)}")
-        print(f"Form fields: {form.fields.keys()}")
+        log.debug(
+            "replace_collateral_form",
+            collateral_id=getattr(collateral, 'id', None),
+            title=collateral_title,
+            model=type(collateral).__name__,
+            fields=list(form.fields),
+        )
         
         # Create a simple dictionary with the collateral data
         collateral_data = {
@@ -741,7 +741,7 @@ def replace_collateral(request, pk):
         
         return render(request, 'collateral_management/replace_collateral_simple_updated.html', context)
     except Exception as e:
-        print(f"Error in replace_collateral: {str(e)}")
+        log.warning("replace_collateral_fallback", collateral_id=pk, error=e)
         # Fallback to collateral_management.Collateral
         collateral = get_object_or_404(Collateral, pk=pk)
         if request.method == 'POST':
@@ -764,33 +764,18 @@ def dashboard_delete_collateral(request, pk):
 
 
 def preview_collateral(request, pk):
-    print("\n--- preview_collateral START ---")
-    print(f"Requested PK: {pk}")
-
     collateral = get_object_or_404(Collateral, pk=pk)
-    print(f"Collateral loaded: {collateral}")
 
     absolute_pdf_url = None
 
     try:
-        print("Checking if collateral has a file...")
-
         if getattr(collateral, 'file', None):
-            print(f"File found: {collateral.file}")
-
             absolute_pdf_url = request.build_absolute_uri(collateral.file.url)
-            print(f"Generated absolute PDF URL: {absolute_pdf_url}")
-
-        else:
-            print("No file attached to collateral.")
-
     except Exception as e:
-        print("Exception while generating PDF URL:")
-        print(e)
+        log.warning("preview_pdf_url_failed", collateral_id=pk, error=e)
         absolute_pdf_url = None
 
-    print("Rendering template with context...")
-    print("--- preview_collateral END ---\n")
+    log.debug("preview_collateral", collateral_id=pk, pdf_url=absolute_pdf_url)
 
     return render(request, 'doctor_viewer/view.html', {
         'verified': True,
@@ -8,6 +8,9 @@ from django.contrib.auth.decorators import login_required
 from .models import CollateralMessage, Collateral
 from campaign_management.models import Campaign
 from .forms import CollateralMessageForm, CollateralMessageSearchForm
+from myproject.applog import get_logger
+
+log = get_logger(__name__)
 
 
 @login_required
@@ -44,8 +47,7 @@ def collateral_message_create(request):
             form.save()
             return redirect('collateral_message_list')
         else:
-            # 🔹 Debug: print form errors in server log
-            print("FORM VALIDATION ERRORS:", form.errors)
+            log.debug("collateral_message_form_invalid", errors=form.errors.as_json())
     else:
         form = CollateralMessageForm()
     
@@ -109,6 +111,8 @@ def get_collaterals_by_campaign(request):
       - If the deployment still uses a direct FK (Collateral.campaign), support that as a fallback.
       - If start_date / end_date exist on CampaignCollateral, apply an "active window" filter
         using DATE comparisons (to avoid midnight cutoff issues).
+
+    The rules are evaluated ahead of time by collateral_management.live_index.
     """
     campaign_id_str = (request.GET.get('campaign_id') or '').strip()
 
@@ -124,51 +128,19 @@ def get_collaterals_by_campaign(request):
         return JsonResponse({'collaterals': []})
 
     try:
-        from django.db.models import Q
-        from django.utils import timezone
-        today = timezone.localdate()
-
-        # Start with an empty queryset and UNION the available sources.
-        collaterals_qs = Collateral.objects.none()
-
-        # 1) Preferred: collateral_management.CampaignCollateral bridge
-        try:
-            from .models import CampaignCollateral as CMCampaignCollateral  # type: ignore
-
-            window_q = (
-                (Q(start_date__isnull=True) | Q(start_date__date__lte=today)) &
-                (Q(end_date__isnull=True) | Q(end_date__date__gte=today))
-            )
-
-            cc_ids = (
-                CMCampaignCollateral.objects
-                .filter(campaign=campaign)
-                .filter(window_q)
-                .values_list('collateral_id', flat=True)
-            )
-
-            collaterals_qs = collaterals_qs | Collateral.objects.filter(id__in=cc_ids, is_active=True)
-        except Exception:
-            # If the bridge model/table is unavailable, ignore and try fallback below.
-            pass
-
-        # 2) Fallback: direct FK Collateral.campaign (some older deployments)
-        try:
-            # Only attempt if the field exists; avoids FieldError in newer schemas.
-            Collateral._meta.get_field('campaign')
-            collaterals_qs = collaterals_qs | Collateral.objects.filter(campaign=campaign, is_active=True)
-        except Exception:
-            pass
+        # Precomputed "live today" set (bridge window or legacy FK, active only).
+        from .live_index import live_collaterals
 
-        collaterals_qs = collaterals_qs.distinct().order_by('title')
+        collaterals_qs = live_collaterals(campaign.pk).filter(is_active=True)
+        collaterals_qs = collaterals_qs.order_by('title')
 
         collaterals_data = [
             {
-                'id': c.id,
-                'title': getattr(c, 'title', str(c)),
-                'type': getattr(c, 'type', ''),
+                'id': c['id'],
+                'title': c['title'],
+                'type': c['type'],
             }
-            for c in collaterals_qs
+            for c in collaterals_qs.values('id', 'title', 'type')
         ]
 
         return JsonResponse({'collaterals': collaterals_data})
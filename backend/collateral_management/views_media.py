@@ -0,0 +1,229 @@
+# collateral_management/views_media.py
+"""
+Delivery of files under MEDIA_ROOT/collaterals/.
+
+Unlike django.views.static.serve this view
+  - answers single byte ranges (206 / 416), so PDF viewers can fetch pages
+    on demand and resume interrupted downloads;
+  - validates with ETag / Last-Modified and returns 304s;
+  - marks URLs carrying the file's content hash (?v=, see
+    collateral_file_url) immutable, and everything else "revalidate". The
+    hash is computed in the background after upload (pdf_optimizer) and
+    stored on the collateral, never on a request;
+  - with COLLATERAL_MEDIA_OFFLOAD set, only checks validators and hands the
+    transfer to the front server via X-Accel-Redirect (nginx) or
+    X-Sendfile (Apache / lighttpd), which then handle ranges themselves.
+"""
+from __future__ import annotations
+
+import hashlib
+import mimetypes
+import os
+import re
+from typing import Optional
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import SuspiciousFileOperation
+from django.db.models import Q
+from django.http import FileResponse, Http404, HttpResponse, StreamingHttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date_safe
+from django.views.decorators.http import require_safe
+
+
+COLLATERAL_MEDIA_DIR = "collaterals"
+MEDIA_STREAM_CHUNK_SIZE = 64 * 1024
+STORED_VERSION_CACHE_SECONDS = 300
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "public, no-cache"
+
+_RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+class _RangeNotSatisfiable(Exception):
+    pass
+
+
+def _offload_mode() -> str:
+    return (getattr(settings, "COLLATERAL_MEDIA_OFFLOAD", "") or "").strip().lower()
+
+
+def _collateral_path(path: str) -> str:
+    try:
+        full_path = safe_join(os.path.join(settings.MEDIA_ROOT, COLLATERAL_MEDIA_DIR), path)
+    except SuspiciousFileOperation:
+        raise Http404("File not found")
+    if not os.path.isfile(full_path):
+        raise Http404("File not found")
+    return full_path
+
+
+def _stat_etag(stat) -> str:
+    return f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+
+
+def content_hash(fh) -> str:
+    """Short sha256 of an open binary file, read in chunks."""
+    sha = hashlib.sha256()
+    for chunk in iter(lambda: fh.read(MEDIA_STREAM_CHUNK_SIZE), b""):
+        sha.update(chunk)
+    return sha.hexdigest()[:16]
+
+
+def collateral_file_url(file_field, version: str = "") -> Optional[str]:
+    """
+    ``file_field.url`` plus ``?v=<version>`` for local collateral files, so
+    browsers may cache them for good; the URL changes when the file does.
+    ``version`` is the hash stored on the collateral (see
+    Collateral.doctor_file_version); without one the plain URL is returned.
+    """
+    if not file_field:
+        return None
+    url = file_field.url
+    name = file_field.name or ""
+    if not version or not name.startswith(f"{COLLATERAL_MEDIA_DIR}/"):
+        return url
+    return f"{url}?v={version}"
+
+
+def _stored_version(name: str) -> Optional[tuple[str, Optional[int]]]:
+    """(hash, size when hashed) stored on the collateral owning media file ``name``."""
+    key = f"collateral_media:version:{hashlib.sha1(name.encode('utf-8')).hexdigest()}"
+    stored = cache.get(key)
+    if stored is None:
+        from .models import Collateral
+
+        row = (
+            Collateral.objects.filter(Q(file=name) | Q(optimized_file=name))
+            .values_list("file", "file_hash", "file_size_original", "optimized_file_hash", "file_size_optimized")
+            .first()
+        )
+        stored = ("", None)
+        if row:
+            file_name, file_hash, original_size, optimized_hash, optimized_size = row
+            stored = (file_hash, original_size) if file_name == name else (optimized_hash, optimized_size)
+        cache.set(key, stored, STORED_VERSION_CACHE_SECONDS)
+    return stored
+
+
+def _is_current_version(path: str, version: str, stat) -> bool:
+    if not version:
+        return False
+    stored_hash, stored_size = _stored_version(f"{COLLATERAL_MEDIA_DIR}/{path}")
+    # The size check catches a file replaced in place after it was hashed.
+    return version == stored_hash and stored_size == stat.st_size
+
+
+def _parse_range(header: str, size: int) -> Optional[tuple[int, int]]:
+    """
+    (first, last) byte of a single-range request. None means serve the whole
+    file (no header, malformed, or multiple ranges).
+    """
+    match = _RANGE_RE.match(header.strip())
+    if not match:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        suffix = int(last)
+        if suffix == 0 or size == 0:
+            raise _RangeNotSatisfiable
+        return max(size - suffix, 0), size - 1
+    first = int(first)
+    if first >= size:
+        raise _RangeNotSatisfiable
+    last = int(last) if last else size - 1
+    if last < first:
+        return None
+    return first, min(last, size - 1)
+
+
+def _if_range_allows(request, etag: str, last_modified: int) -> bool:
+    if_range = request.META.get("HTTP_IF_RANGE")
+    if not if_range:
+        return True
+    if if_range.startswith('"') or if_range.startswith("W/"):
+        return if_range == etag
+    return parse_http_date_safe(if_range) == last_modified
+
+
+def _iter_file_range(full_path: str, first: int, length: int):
+    with open(full_path, "rb") as fh:
+        fh.seek(first)
+        while length > 0:
+            chunk = fh.read(min(MEDIA_STREAM_CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+
+def _offloaded_response(path: str, full_path: str, mode: str) -> HttpResponse:
+    response = HttpResponse()
+    if mode == "x-sendfile":
+        response["X-Sendfile"] = full_path
+    else:
+        prefix = getattr(settings, "COLLATERAL_MEDIA_ACCEL_PREFIX", "/protected-media/")
+        response["X-Accel-Redirect"] = f"{prefix.rstrip('/')}/{COLLATERAL_MEDIA_DIR}/{quote(path)}"
+    # The front server sets the real type and length from the file.
+    del response["Content-Type"]
+    return response
+
+
+@require_safe
+def serve_collateral_media(request, path: str):
+    full_path = _collateral_path(path)
+    stat = os.stat(full_path)
+    etag = _stat_etag(stat)
+    last_modified = int(stat.st_mtime)
+
+    immutable = _is_current_version(path, request.GET.get("v") or "", stat)
+    validators = {
+        "ETag": etag,
+        "Last-Modified": http_date(last_modified),
+        "Cache-Control": IMMUTABLE_CACHE_CONTROL if immutable else REVALIDATE_CACHE_CONTROL,
+    }
+
+    def finish(response):
+        for header, value in validators.items():
+            response[header] = value
+        return response
+
+    not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if not_modified is not None:
+        return finish(not_modified)
+
+    mode = _offload_mode()
+    if mode in {"x-accel-redirect", "x-sendfile"}:
+        return finish(_offloaded_response(path, full_path, mode))
+
+    content_type = mimetypes.guess_type(full_path)[0] or "application/octet-stream"
+    size = stat.st_size
+    byte_range = None
+    if request.META.get("HTTP_RANGE") and _if_range_allows(request, etag, last_modified):
+        try:
+            byte_range = _parse_range(request.META["HTTP_RANGE"], size)
+        except _RangeNotSatisfiable:
+            response = HttpResponse(status=416)
+            response["Content-Range"] = f"bytes */{size}"
+            response["Accept-Ranges"] = "bytes"
+            return finish(response)
+
+    if byte_range is None:
+        response = FileResponse(open(full_path, "rb"), content_type=content_type)
+    else:
+        first, last = byte_range
+        length = last - first + 1
+        response = StreamingHttpResponse(
+            _iter_file_range(full_path, first, length),
+            status=206,
+            content_type=content_type,
+        )
+        response["Content-Length"] = str(length)
+        response["Content-Range"] = f"bytes {first}-{last}/{size}"
+    response["Accept-Ranges"] = "bytes"
+    return finish(response)
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.11 on 2026-10-19 16:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('doctor_viewer', '0008_doctor_source'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='doctorengagement',
+            index=models.Index(fields=['view_timestamp'], name='idx_engagement_view_ts'),
+        ),
+    ]
@@ -70,6 +70,12 @@ class DoctorEngagement(models.Model):
     created_at = models.DateTimeField(default=timezone.now)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            # /api/engagements/ cursor pagination and date-range filter
+            models.Index(fields=["view_timestamp"], name="idx_engagement_view_ts"),
+        ]
+
     def __str__(self):
         return f"{self.short_link.short_code} @ {self.view_timestamp:%Y-%m-%d %H:%M}"
 
@@ -30,9 +30,11 @@ except ImportError:
 from shortlink_management.models import ShortLink
 from collateral_management.models import Collateral
 from collateral_management.models import CampaignCollateral as CollateralCampaignLink
+from collateral_management.views_media import collateral_file_url
 from campaign_management.models import CampaignCollateral as LegacyCampaignCollateral
 from .models import DoctorEngagement
 from sharing_management.models import ShareLog
+from myproject.applog import get_logger
 from sharing_management.services.transactions import (
     mark_downloaded_pdf,
     mark_pdf_progress,
@@ -40,6 +42,8 @@ from sharing_management.services.transactions import (
 )
 from sharing_management.services.transactions import mark_video_event
 
+log = get_logger(__name__)
+
 # ──────────────────────────────────────────────────────────────
 # Safe page count helper – works with local + remote storage
 # ──────────────────────────────────────────────────────────────
@@ -68,18 +72,19 @@ def _page_count(collateral: Collateral) -> int:
 # ──────────────────────────────────────────────────────────────
 # Safe file URL helper – avoids ValueError for missing files
 # ──────────────────────────────────────────────────────────────
-def _safe_absolute_file_url(request, file_field):
+def _safe_absolute_file_url(request, file_field, version=""):
     """
     Return an absolute URL for a Django FileField/ImageField or None.
 
     Django raises ValueError when accessing `.url` on an empty FileField.
     Some collateral types (e.g., video-only) legitimately have no file,
-    and that should not break the verification flow.
+    and that should not break the verification flow. ``version`` is the
+    stored content hash, appended as ?v= so the file can be cached for good.
     """
     if not file_field:
         return None
     try:
-        return request.build_absolute_uri(file_field.url)
+        return request.build_absolute_uri(collateral_file_url(file_field, version))
     except Exception:
         return None
 
@@ -133,7 +138,7 @@ def _prepare_sharelog_for_tracking(share_log: ShareLog | None) -> ShareLog | Non
                     getattr(link.campaign, "brand_campaign_id", "") or ""
                 )
     except Exception as e:
-        print("[TRACKING DEBUG] brand_campaign_id inference error:", e)
+        log.warning("brand_campaign_id_inference_failed", share_log_id=share_log.id, error=e)
 
     return share_log
 
@@ -159,7 +164,7 @@ def _sharelog_for_tracking_by_id(share_log_id) -> ShareLog | None:
         )
         return _prepare_sharelog_for_tracking(rows[0] if rows else None)
     except Exception as e:
-        print("[TRACKING DEBUG] ShareLog raw lookup failed:", e)
+        log.warning("sharelog_lookup_failed", share_log_id=share_log_id, error=e)
         return None
 
 
@@ -181,7 +186,7 @@ def _matching_sharelog_id_for_phone(short_link_id, whatsapp_number: str | None)
             if _last10_digits(row.get("doctor_identifier") or "") == input_last10:
                 return row["id"]
     except Exception as e:
-        print("[TRACKING DEBUG] ShareLog phone match failed:", e)
+        log.warning("sharelog_phone_match_failed", short_link_id=short_link_id, error=e)
 
     return None
 
@@ -197,7 +202,7 @@ def _mark_prepared_sharelog_viewed(share_log: ShareLog | None, debug_prefix: str
             mark_viewed(share_log, sm_engagement_id=None)
         return share_log
     except Exception as e:
-        print(f"[{debug_prefix}] mark_viewed failed:", e)
+        log.warning("mark_viewed_failed", share_log_id=share_log.id, source=debug_prefix, error=e)
         return None
 
 
@@ -442,7 +447,7 @@ def _doctor_view_context(request, *, short_link: ShortLink, collateral: Collater
         "short_link": short_link,
         "verified": True,
         "archives": archives,
-        "absolute_pdf_url": _safe_absolute_file_url(request, collateral.file),
+        "absolute_pdf_url": _safe_absolute_file_url(request, collateral.doctor_file, collateral.doctor_file_version),
         "share_id": share_id,
         "engagement_id": engagement.id,
         "short_code": short_link.short_code,
@@ -511,7 +516,7 @@ def resolve_view(request, code: str):
             request.session["share_id"] = sl.id
 
     except Exception as e:
-        print("[VIEW DEBUG] ShareLog raw lookup failed:", e)
+        log.warning("sharelog_lookup_failed", short_link_id=short_link.id, error=e)
 
     context = _doctor_view_context(
         request,
@@ -632,28 +637,19 @@ def log_engagement(request):
     new_video_pct = int(engagement.video_watch_percentage or 0)
     new_status = int(engagement.status or 0)
 
-    if new_last_page != old_last_page:
-        print(
-            f"[TRACKING DEBUG] PDF last_page_scrolled changed: {old_last_page} -> {new_last_page} "
-            f"(engagement_id={engagement.id}, share_id={share_id}, event={event})"
-        )
-
-    if new_status != old_status:
-        print(
-            f"[TRACKING DEBUG] PDF status changed: {old_status} -> {new_status} "
-            f"(0=no scroll, 1=half, 2=full) (engagement_id={engagement.id}, share_id={share_id})"
-        )
-
-    if new_pdf_completed != old_pdf_completed:
-        print(
-            f"[TRACKING DEBUG] PDF downloaded changed: {old_pdf_completed} -> {new_pdf_completed} "
-            f"(engagement_id={engagement.id}, share_id={share_id})"
-        )
-
-    if new_video_pct != old_video_pct:
-        print(
-            f"[TRACKING DEBUG] Video % changed: {old_video_pct}% -> {new_video_pct}% "
-            f"(engagement_id={engagement.id}, share_id={share_id})"
+    if (new_last_page, new_status, new_pdf_completed, new_video_pct) != (
+        old_last_page, old_status, old_pdf_completed, old_video_pct
+    ):
+        # status: 0=no scroll, 1=half, 2=full
+        log.debug(
+            "engagement_changed",
+            engagement_id=engagement.id,
+            share_id=share_id,
+            event=event,
+            last_page=f"{old_last_page}->{new_last_page}",
+            status=f"{old_status}->{new_status}",
+            pdf_completed=f"{old_pdf_completed}->{new_pdf_completed}",
+            video_pct=f"{old_video_pct}->{new_video_pct}",
         )
 
     # -----------------------------
@@ -665,7 +661,7 @@ def log_engagement(request):
             try:
                 share_id_int = int(share_id)
             except Exception:
-                print(f"[TRACKING DEBUG] share_id not int: {share_id}")
+                log.debug("share_id_not_int", share_id=share_id)
                 return JsonResponse({"ok": True, "event": event})
 
             # IMPORTANT:
@@ -687,7 +683,7 @@ def log_engagement(request):
             )
 
             if not sl:
-                print(f"[TRACKING DEBUG] ShareLog not found for share_id={share_id_int}")
+                log.debug("sharelog_not_found", share_id=share_id_int)
                 return JsonResponse({"ok": True, "event": event})
 
             # Prevent any deferred fetch of columns that may not exist yet in DB
@@ -710,12 +706,12 @@ def log_engagement(request):
                         if bc:
                             sl.__dict__["brand_campaign_id"] = bc
             except Exception as e:
-                print("[TRACKING DEBUG] brand_campaign_id inference error:", e)
+                log.warning("brand_campaign_id_inference_failed", share_log_id=sl.id, error=e)
 
             # ---- CRITICAL FIX:
             # If field_rep_id is NULL in ShareLog, resolve it from master DB (by email)
             if sl.field_rep_id is None:
-                print("[TRACKING DEBUG] ShareLog.field_rep_id is None; attempting backfill...")
+                log.debug("field_rep_backfill_started", share_log_id=sl.id)
 
                 email_guess = ""
                 try:
@@ -730,9 +726,9 @@ def log_engagement(request):
                     if sh and getattr(sh, "created_by", None):
                         email_guess = (sh.created_by.email or "").strip()
                 except Exception as e:
-                    print("[TRACKING DEBUG] ShortLink created_by lookup failed:", e)
+                    log.warning("shortlink_creator_lookup_failed", short_link_id=sl.short_link_id, error=e)
 
-                print("[TRACKING DEBUG] email_guess =", email_guess)
+                log.debug("field_rep_backfill_email", share_log_id=sl.id, email=email_guess)
 
                 # Resolve master DB alias
                 master_alias = getattr(settings, "MASTER_DB_ALIAS", None)
@@ -767,31 +763,31 @@ def log_engagement(request):
                             try:
                                 sl.updated_at = timezone.now()
                                 sl.save(update_fields=["field_rep_id", "field_rep_email", "updated_at"])
-                                print("[TRACKING DEBUG] ✅ backfilled ShareLog.field_rep_id =", sl.field_rep_id)
+                                log.debug("field_rep_backfilled", share_log_id=sl.id, field_rep_id=sl.field_rep_id)
                             except Exception as e1:
                                 try:
                                     sl.updated_at = timezone.now()
                                     sl.save(update_fields=["field_rep_id", "updated_at"])
-                                    print("[TRACKING DEBUG] ✅ backfilled ShareLog.field_rep_id (id-only) =", sl.field_rep_id)
+                                    log.debug("field_rep_backfilled", share_log_id=sl.id, field_rep_id=sl.field_rep_id, id_only=True)
                                 except Exception as e2:
-                                    print("[TRACKING DEBUG] ❌ failed to persist field_rep_id backfill:", e1, e2)
+                                    log.warning("field_rep_backfill_save_failed", share_log_id=sl.id, error=e1, fallback_error=e2)
                         else:
-                            print("[TRACKING DEBUG] ❌ no MasterFieldRep found for email:", email_guess)
+                            log.debug("field_rep_backfill_no_master_rep", share_log_id=sl.id, email=email_guess)
 
                     except Exception as e:
-                        print("[TRACKING DEBUG] master fieldrep resolution error:", e)
-
-            print(
-                "[TRACKING DEBUG] using ShareLog:",
-                "id=", sl.id,
-                "field_rep_id=", sl.field_rep_id,
-                "doctor_identifier=", getattr(sl, "doctor_identifier", None),
-                "brand_campaign_id(dict)=", sl.__dict__.get("brand_campaign_id", ""),
+                        log.warning("field_rep_backfill_failed", share_log_id=sl.id, error=e)
+
+            log.debug(
+                "tracking_sharelog",
+                share_log_id=sl.id,
+                field_rep_id=sl.field_rep_id,
+                doctor_identifier=getattr(sl, "doctor_identifier", None),
+                brand_campaign_id=sl.__dict__.get("brand_campaign_id", ""),
             )
 
             if sl.field_rep_id is None:
                 # Avoid raising inside transaction code
-                print("[TRACKING DEBUG] ⚠️ field_rep_id still None; skipping mark_* calls.")
+                log.debug("tracking_skipped_no_field_rep", share_log_id=sl.id)
                 return JsonResponse({"ok": True, "event": event})
 
             # Now safe to call transaction updaters
@@ -824,14 +820,14 @@ def log_engagement(request):
                     total_pages=pdf_total_pages,
                 )
 
-            print("[TRACKING DEBUG] ✅ mark_pdf_progress called share_id =", sl.id)
+            log.debug("pdf_progress_marked", share_log_id=sl.id)
 
             if engagement.pdf_completed:
                 try:
                     mark_downloaded_pdf(sl, when=when)
                 except TypeError:
                     mark_downloaded_pdf(sl)
-                print("[TRACKING DEBUG] ✅ mark_downloaded_pdf called share_id =", sl.id)
+                log.debug("pdf_download_marked", share_log_id=sl.id)
 
             if event == "video_progress":
                 mark_video_event(
@@ -841,10 +837,10 @@ def log_engagement(request):
                     event_id=0,
                     when=timezone.now(),
                 )
-                print("[TRACKING DEBUG] ✅ mark_video_event called share_id =", sl.id)
+                log.debug("video_event_marked", share_log_id=sl.id)
 
-        except Exception as e:
-            print("[TRACKING DEBUG] ERROR updating ShareLog/CollateralTransaction:", e)
+        except Exception:
+            log.exception("tracking_update_failed", share_id=share_id)
 
     return JsonResponse({"ok": True, "event": event})
 
@@ -890,7 +886,7 @@ def doctor_collateral_verify(request):
             pdf_preview_image = None
 
             if collateral.file:
-                media_path = collateral.file.name
+                media_path = collateral.doctor_file.name
                 file_path = os.path.join(settings.MEDIA_ROOT, media_path)
                 pdf_preview_url = request.build_absolute_uri(f"{settings.MEDIA_URL}{media_path}")
 
@@ -938,7 +934,7 @@ def doctor_collateral_verify(request):
                                 f.write(response.content)
                             video_preview_image = f"{settings.MEDIA_URL}previews/{video_preview_filename}"
                 except Exception as e:
-                    print("[VERIFYDBG] video thumbnail error:", e)
+                    log.warning("video_thumbnail_failed", collateral_id=collateral.id, error=e)
 
             return render(request, "doctor_viewer/doctor_collateral_verify.html", {
                 "short_link_id": short_link_id,
@@ -949,7 +945,7 @@ def doctor_collateral_verify(request):
             })
 
         except Exception as e:
-            print("[VERIFYDBG] GET verify error:", e)
+            log.warning("verify_page_failed", short_link_id=short_link_id, error=e)
             messages.error(request, "Invalid or expired access link.")
             return render(request, "doctor_viewer/doctor_collateral_verify.html")
 
@@ -960,8 +956,7 @@ def doctor_collateral_verify(request):
         whatsapp_number = (request.POST.get("whatsapp_number") or "").strip()
         short_link_id = request.POST.get("short_link_id")
 
-        print("[VERIFYDBG] POST verify received")
-        print(f"[VERIFYDBG] raw whatsapp_number='{whatsapp_number}' short_link_id='{short_link_id}'")
+        log.debug("verify_post", short_link_id=short_link_id)
 
         try:
             short_link_id = int(short_link_id)
@@ -974,7 +969,6 @@ def doctor_collateral_verify(request):
             return render(request, "doctor_viewer/doctor_collateral_verify.html")
 
         input_last10 = _last10_digits(whatsapp_number)
-        print("[VERIFYDBG] input_last10 =", input_last10)
 
         matched = False
         matched_sharelog_id = None
@@ -986,12 +980,7 @@ def doctor_collateral_verify(request):
                 .exclude(doctor_identifier__exact="")
                 .values("id", "doctor_identifier")
             )
-            print(f"[VERIFYDBG] ShareLog rows for short_link_id={short_link_id}: count={len(logs)}")
-
-            # Print up to 10 rows as last10 only (safe + useful)
-            for row in logs[:10]:
-                stored = row.get("doctor_identifier") or ""
-                print(f"[VERIFYDBG] row id={row.get('id')} stored_last10={_last10_digits(stored)} stored_raw='{stored}'")
+            log.debug("verify_candidates", short_link_id=short_link_id, count=len(logs))
 
             for row in logs:
                 stored = row.get("doctor_identifier") or ""
@@ -1001,9 +990,9 @@ def doctor_collateral_verify(request):
                     break
 
         except Exception as e:
-            print("[VERIFYDBG] ERROR reading ShareLog:", e)
+            log.warning("verify_sharelog_read_failed", short_link_id=short_link_id, error=e)
 
-        print("[VERIFYDBG] verification matched =", matched, " matched_sharelog_id =", matched_sharelog_id)
+        log.debug("verify_result", short_link_id=short_link_id, matched=matched, share_log_id=matched_sharelog_id)
 
         if not matched:
             messages.error(
@@ -1033,7 +1022,7 @@ def doctor_collateral_verify(request):
             doctor_identifier=whatsapp_number,
         )
 
-        absolute_pdf_url = _safe_absolute_file_url(request, collateral.file)
+        absolute_pdf_url = _safe_absolute_file_url(request, collateral.doctor_file, collateral.doctor_file_version)
 
         session_key = f"dv_engagement_id_{short_link_id}"
         existing_engagement_id = request.session.get(session_key)
@@ -1046,7 +1035,7 @@ def doctor_collateral_verify(request):
             engagement = DoctorEngagement.objects.create(short_link=short_link)
             request.session[session_key] = engagement.id
 
-        print("[VERIFYDBG] ✅ access granted; engagement_id =", engagement.id)
+        log.debug("verify_access_granted", short_link_id=short_link_id, engagement_id=engagement.id)
 
         return render(request, "doctor_viewer/doctor_collateral_view.html", {
             "collateral": collateral,
@@ -1102,7 +1091,7 @@ def doctor_collateral_view(request):
                     if sl:
                         mark_downloaded_pdf(sl)
                 except Exception as e:
-                    print("[OTP VIEW DEBUG] mark_downloaded_pdf failed:", e)
+                    log.warning("mark_downloaded_pdf_failed", share_log_id=matched_sharelog_id, error=e)
 
                 archives = _doctor_archive_items(
                     current_collateral=collateral,
@@ -1110,7 +1099,7 @@ def doctor_collateral_view(request):
                     doctor_identifier=whatsapp_number,
                 )
 
-                absolute_pdf_url = _safe_absolute_file_url(request, collateral.file)
+                absolute_pdf_url = _safe_absolute_file_url(request, collateral.doctor_file, collateral.doctor_file_version)
 
                 return render(
                     request,
@@ -1125,8 +1114,8 @@ def doctor_collateral_view(request):
                     },
                 )
 
-            except Exception as e:
-                print("[OTP VIEW DEBUG] ERROR:", e)
+            except Exception:
+                log.exception("otp_view_failed", short_link_id=short_link_id)
                 messages.error(request, "Error verifying OTP. Please try again.")
         else:
             messages.error(request, "Please provide all required information.")
@@ -0,0 +1,209 @@
+# myproject/applog.py
+"""
+Application logging: key=value records, written off the request thread.
+
+    from myproject.applog import get_logger
+
+    log = get_logger(__name__)
+    log.debug("sharelog_lookup_failed", short_link_id=short_link_id, error=e)
+    # -> [...] DEBUG doctor_viewer.views:512 sharelog_lookup_failed short_link_id=42 error='...'
+
+Levels are set per app (or per module) from APP_LOG_LEVEL / APP_LOG_LEVELS in
+settings, so a disabled call costs one level check: no formatting, no I/O.
+Enabled records go through ``queue_handler``: the request thread only puts
+them on an in-memory queue, and a QueueListener thread writes them out.
+``RateLimitFilter`` on that handler keeps repetitive debug lines from
+flooding the log.
+"""
+from __future__ import annotations
+
+import atexit
+import logging
+import logging.handlers
+import os
+import queue
+import threading
+import time
+from typing import Iterable
+
+
+def _format_value(value) -> str:
+    text = str(value)
+    if not text or any(ch.isspace() or ch in "\"'=" for ch in text):
+        return repr(text)
+    return text
+
+
+class KeyValueLogger(logging.LoggerAdapter):
+    """
+    ``log.<level>(event, **fields)``. Fields are rendered as key=value after
+    the event name and also kept on the record as ``record.event`` /
+    ``record.fields`` for formatters that want them.
+    """
+
+    def __init__(self, logger: logging.Logger):
+        super().__init__(logger, {})
+
+    def _emit(self, level, event, exc_info, stack_info, stacklevel, fields):
+        if not self.logger.isEnabledFor(level):
+            return
+        message = event
+        if fields:
+            message = f"{event} " + " ".join(f"{key}={_format_value(value)}" for key, value in fields.items())
+        self.logger.log(
+            level,
+            message,
+            exc_info=exc_info,
+            stack_info=stack_info,
+            # skip _emit and the public method so the record points at the caller
+            stacklevel=stacklevel + 2,
+            extra={"event": event, "fields": fields},
+        )
+
+    def log(self, level, event, *, exc_info=None, stack_info=False, stacklevel=1, **fields):
+        self._emit(level, event, exc_info, stack_info, stacklevel, fields)
+
+    def debug(self, event, *, exc_info=None, stack_info=False, stacklevel=1, **fields):
+        self._emit(logging.DEBUG, event, exc_info, stack_info, stacklevel, fields)
+
+    def info(self, event, *, exc_info=None, stack_info=False, stacklevel=1, **fields):
+        self._emit(logging.INFO, event, exc_info, stack_info, stacklevel, fields)
+
+    def warning(self, event, *, exc_info=None, stack_info=False, stacklevel=1, **fields):
+        self._emit(logging.WARNING, event, exc_info, stack_info, stacklevel, fields)
+
+    def error(self, event, *, exc_info=None, stack_info=False, stacklevel=1, **fields):
+        self._emit(logging.ERROR, event, exc_info, stack_info, stacklevel, fields)
+
+    def exception(self, event, *, exc_info=True, stack_info=False, stacklevel=1, **fields):
+        self._emit(logging.ERROR, event, exc_info, stack_info, stacklevel, fields)
+
+    def critical(self, event, *, exc_info=None, stack_info=False, stacklevel=1, **fields):
+        self._emit(logging.CRITICAL, event, exc_info, stack_info, stacklevel, fields)
+
+
+def get_logger(name: str) -> KeyValueLogger:
+    return KeyValueLogger(logging.getLogger(name))
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Let through at most ``rate`` records per ``window`` seconds for each
+    (logger, event) pair at or below ``max_level``. The first record of the
+    next window carries ``suppressed=N`` for what was dropped.
+    """
+
+    MAX_KEYS = 10000
+
+    def __init__(self, rate: int = 20, window: float = 60.0, max_level="DEBUG"):
+        super().__init__()
+        self.rate = int(rate)
+        self.window = float(window)
+        self.max_level = logging._checkLevel(max_level)
+        self._lock = threading.Lock()
+        self._buckets: dict[tuple[str, str], list] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > self.max_level or self.rate <= 0:
+            return True
+        key = (record.name, getattr(record, "event", None) or str(record.msg))
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None or now - bucket[0] >= self.window:
+                suppressed = bucket[2] if bucket else 0
+                if len(self._buckets) >= self.MAX_KEYS:
+                    self._buckets.clear()
+                self._buckets[key] = [now, 1, 0]
+                if suppressed:
+                    record.msg = f"{record.msg} suppressed={suppressed}"
+                return True
+            if bucket[1] < self.rate:
+                bucket[1] += 1
+                return True
+            bucket[2] += 1
+            return False
+
+
+def _handler_by_name(name: str):
+    lookup = getattr(logging, "getHandlerByName", None)  # Python 3.12+
+    return lookup(name) if lookup else logging._handlers.get(name)
+
+
+class BackgroundQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler whose QueueListener (feeding ``targets``) starts on the first
+    record in each process, so forked gunicorn workers get their own thread.
+    A full queue drops the record instead of blocking the request.
+    """
+
+    def __init__(self, targets: Iterable[logging.Handler] = (), queue_size: int = 10000):
+        self.queue_size = int(queue_size)
+        super().__init__(queue.Queue(self.queue_size))
+        self.targets = list(targets)
+        self.dropped = 0
+        self._listener = None
+        self._listener_pid = None
+        self._start_lock = threading.Lock()
+
+    def _ensure_listener(self) -> None:
+        if self._listener_pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._listener_pid == os.getpid():
+                return
+            if self._listener_pid is not None:
+                # Inherited through fork: the parent's thread is not running here.
+                self.queue = queue.Queue(self.queue_size)
+            self._listener = logging.handlers.QueueListener(self.queue, *self.targets, respect_handler_level=True)
+            self._listener.start()
+            self._listener_pid = os.getpid()
+            atexit.register(self.flush_and_stop)
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Freeze the message now (args may change after we return), but leave
+        # traceback formatting to the listener thread.
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self._ensure_listener()
+        super().emit(record)
+
+    def flush_and_stop(self) -> None:
+        listener = self._listener
+        if listener is not None and self._listener_pid == os.getpid():
+            self._listener = None
+            self._listener_pid = None
+            listener.stop()  # drains what is already queued
+
+    def close(self) -> None:
+        self.flush_and_stop()
+        super().close()
+
+
+def queue_handler(targets: Iterable[str] = (), queue_size: int = 10000) -> BackgroundQueueHandler:
+    """
+    dictConfig factory (``"()": "myproject.applog.queue_handler"``), with
+    ``targets`` naming other handlers in the same config. A factory rather
+    than ``"class"``, because Python 3.12+ dictConfig rewires any QueueHandler
+    configured by class with its own listener.
+
+    dictConfig builds handlers in name order, so the targets' names must sort
+    before this handler's. They are looked up here, not on first use, because
+    the registry only holds weak references.
+    """
+    handlers = []
+    for name in targets:
+        handler = _handler_by_name(name)
+        if handler is None:
+            raise ValueError(f"queue target {name!r} is not configured; its name must sort before the queue handler's")
+        handlers.append(handler)
+    return BackgroundQueueHandler(targets=handlers, queue_size=queue_size)
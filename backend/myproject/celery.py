@@ -14,4 +14,14 @@ app.conf.beat_schedule = {
         'task': 'reporting_etl.tasks.scheduled_etl',
         'schedule': crontab(minute=0, hour='*/6'),
     },
+    # Expired OTPs and old WhatsApp login audits, off-peak
+    'sweep-expired-credentials-nightly': {
+        'task': 'sharing_management.tasks.sweep_expired_credentials_task',
+        'schedule': crontab(minute=30, hour=2),
+    },
+    # Roll campaign date windows over to the new day
+    'refresh-live-collateral-index-daily': {
+        'task': 'collateral_management.tasks.refresh_live_collateral_index',
+        'schedule': crontab(minute=1, hour=0),
+    },
 }
@@ -75,6 +75,7 @@ INSTALLED_APPS = [
     "django_celery_beat",
     "user_management.apps.UserManagementConfig",
     "reporting_etl.apps.ReportingEtlConfig",
+    "upload_jobs.apps.UploadJobsConfig",
 ]
 
 # ──────────────────────────────────────────────────────────────
@@ -146,6 +147,10 @@ DATABASES = {
         'PASSWORD': 'Hemsod-vytsew-7qypxa',    # Enter the correct root password
         'HOST': 'new-forms-rds.cbnobb8kfeuq.ap-south-1.rds.amazonaws.com',
         'PORT': '3306',
+        # Reuse the RDS connection across requests instead of reconnecting per
+        # login; health checks drop connections the server has closed.
+        'CONN_MAX_AGE': int(os.getenv("MASTER_DB_CONN_MAX_AGE", "300")),
+        'CONN_HEALTH_CHECKS': True,
         'OPTIONS': {
             'charset': 'utf8mb4',
             'init_command': "SET sql_mode='STRICT_TRANS_TABLES'",
@@ -191,6 +196,11 @@ STATICFILES_STORAGE = (
 # MEDIA_URL   = "/media/"
 MEDIA_URL   = "/media/"
 MEDIA_ROOT = Path("/var/www/inclinic-media")
+# MEDIA_URL/collaterals/ is served by collateral_management.views_media. Set
+# to "x-accel-redirect" (nginx, internal location at the prefix below) or
+# "x-sendfile" to let the front server send the bytes.
+COLLATERAL_MEDIA_OFFLOAD = os.getenv("COLLATERAL_MEDIA_OFFLOAD", "").strip().lower()
+COLLATERAL_MEDIA_ACCEL_PREFIX = os.getenv("COLLATERAL_MEDIA_ACCEL_PREFIX", "/protected-media/")
 
 # ──────────────────────────────────────────────────────────────
 # 10  Social auth / reCAPTCHA
@@ -251,9 +261,43 @@ CORS_ALLOW_ALL_ORIGINS = True
 # ──────────────────────────────────────────────────────────────
 # 13  Logging (errors to file + stderr)
 # ──────────────────────────────────────────────────────────────
+# App loggers (myproject.applog) go through a background queue. Levels:
+#   APP_LOG_LEVEL=WARNING                        default for every app
+#   APP_LOG_LEVELS=doctor_viewer=DEBUG,sharing_management.utils.db_operations=INFO
+APP_LOG_LEVEL = os.getenv("APP_LOG_LEVEL", "WARNING").strip().upper()
+APP_LOG_LEVELS = dict(
+    (item.split("=", 1)[0].strip(), item.split("=", 1)[1].strip().upper())
+    for item in _env_list("APP_LOG_LEVELS")
+    if "=" in item
+)
+APP_LOG_MODULES = [
+    "myproject",
+    "admin_dashboard",
+    "api",
+    "campaign_management",
+    "collateral_management",
+    "shortlink_management",
+    "sharing_management",
+    "doctor_viewer",
+    "user_management",
+    "reporting_etl",
+    "upload_jobs",
+    "utils",
+]
+# Per (logger, event): at most RATE debug lines per WINDOW seconds.
+APP_LOG_DEBUG_RATE = int(os.getenv("APP_LOG_DEBUG_RATE", "20"))
+APP_LOG_DEBUG_WINDOW = float(os.getenv("APP_LOG_DEBUG_WINDOW", "60"))
+
 LOGGING = {
     "version": 1,
     "disable_existing_loggers": False,
+    "filters": {
+        "debug_rate_limit": {
+            "()": "myproject.applog.RateLimitFilter",
+            "rate": APP_LOG_DEBUG_RATE,
+            "window": APP_LOG_DEBUG_WINDOW,
+        },
+    },
     "handlers": {
         "stderr": {
             "class": "logging.StreamHandler",
@@ -263,6 +307,18 @@ LOGGING = {
             "class": "logging.FileHandler",
             "filename": "/var/log/inclinic/django-error.log",
             "formatter": "verbose",
+            "level": "ERROR",
+        },
+        "app_stdout": {
+            "class": "logging.StreamHandler",
+            "stream": "ext://sys.stdout",
+            "formatter": "verbose",
+        },
+        # named to sort after its targets: dictConfig builds handlers in name order
+        "queue": {
+            "()": "myproject.applog.queue_handler",
+            "targets": ["app_stdout", "file"],
+            "filters": ["debug_rate_limit"],
         },
     },
     "formatters": {
@@ -275,6 +331,22 @@ LOGGING = {
         "handlers": ["stderr", "file"],
         "level": "ERROR",
     },
+    "loggers": {
+        **{
+            module: {
+                "handlers": ["queue"],
+                "level": APP_LOG_LEVELS.get(module, APP_LOG_LEVEL),
+                "propagate": False,
+            }
+            for module in APP_LOG_MODULES
+        },
+        # dotted entries only adjust the level; records still reach the app's handler
+        **{
+            module: {"level": level}
+            for module, level in APP_LOG_LEVELS.items()
+            if module not in APP_LOG_MODULES
+        },
+    },
 }
 # ----------------------------------------------------------------------------
 # Email Configuration (SMTP with Gmail)
@@ -332,6 +404,8 @@ PUBLISHER_JWT_ALGORITHMS = os.getenv("PUBLISHER_JWT_ALGORITHMS", "HS256").split(
 PUBLISHER_JWT_ISSUER = os.getenv("PUBLISHER_JWT_ISSUER", "project1")
 PUBLISHER_JWT_AUDIENCE = os.getenv("PUBLISHER_JWT_AUDIENCE", "project2")
 PUBLISHER_JWT_LEEWAY_SECONDS = int(os.getenv("PUBLISHER_JWT_LEEWAY_SECONDS", "30"))
+PUBLISHER_JWT_ADDITIONAL_KEYS = []  # keys still accepted during rotation (list, or {kid: key})
+PUBLISHER_JWT_CACHE_SIZE = int(os.getenv("PUBLISHER_JWT_CACHE_SIZE", "1024"))  # verified tokens kept per process
 
 # Master DB table names (configurable, since master system schema naming may differ)
 MASTER_CAMPAIGN_DB_TABLE = "campaign_campaign"
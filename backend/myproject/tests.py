@@ -0,0 +1,158 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from django.core.cache import cache
+from django.http import StreamingHttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from myproject.views import support_widget_proxy
+
+
+class FakeSupportUpstream(BaseHTTPRequestHandler):
+    """
+    Local stand-in for the help-center host. ``routes`` maps a path to
+    (content_type, body, extra headers); every request is recorded in ``hits``.
+    """
+    routes = {}
+    hits = []
+
+    def do_GET(self):
+        self.hits.append((self.path, self.headers.get("If-None-Match")))
+        if self.path not in self.routes:
+            self.send_response(404)
+            self.end_headers()
+            return
+        content_type, body, headers = self.routes[self.path]
+        etag = headers.get("ETag")
+        if etag and self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class SupportWidgetProxyCacheTests(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), FakeSupportUpstream)
+        cls.upstream = f"http://127.0.0.1:{cls.server.server_address[1]}"
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.settings_override = override_settings(
+            SUPPORT_WIDGET_PROXY_BASE_URL=cls.upstream,
+            CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}},
+        )
+        cls.settings_override.enable()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.settings_override.disable()
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        cache.clear()
+        FakeSupportUpstream.routes = {}
+        FakeSupportUpstream.hits = []
+        self.factory = RequestFactory()
+
+    def get(self, path, **extra):
+        request = self.factory.get(f"/support/chat/proxy/{path}", **extra)
+        return support_widget_proxy(request, path)
+
+    def upstream_hits(self, path):
+        return [hit for hit in FakeSupportUpstream.hits if hit[0] == "/" + path]
+
+    def test_fresh_markup_is_served_from_cache_already_rewritten(self):
+        FakeSupportUpstream.routes["/support/widget.js"] = (
+            "application/javascript",
+            f'load("{self.upstream}/support/api/config");'.encode(),
+            {"Cache-Control": "max-age=600"},
+        )
+
+        first = self.get("support/widget.js")
+        second = self.get("support/widget.js")
+
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(second.content, first.content)
+        self.assertIn(b"http://testserver/support/chat/proxy/support/api/config", second.content)
+        self.assertEqual(second["Cache-Control"], "max-age=600")
+        self.assertEqual(len(self.upstream_hits("support/widget.js")), 1)
+
+    def test_stale_entry_is_revalidated_with_etag(self):
+        FakeSupportUpstream.routes["/support/index.html"] = (
+            "text/html; charset=utf-8",
+            b"<p>help</p>",
+            {"Cache-Control": "no-cache", "ETag": '"v1"'},
+        )
+
+        first = self.get("support/index.html")
+        second = self.get("support/index.html")
+
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(
+            self.upstream_hits("support/index.html"),
+            [("/support/index.html", None), ("/support/index.html", '"v1"')],
+        )
+
+    def test_changed_upstream_replaces_cached_entry(self):
+        path = "/support/index.html"
+        FakeSupportUpstream.routes[path] = ("text/html", b"old", {"Cache-Control": "no-cache", "ETag": '"v1"'})
+        self.get("support/index.html")
+
+        FakeSupportUpstream.routes[path] = ("text/html", b"new", {"Cache-Control": "no-cache", "ETag": '"v2"'})
+        response = self.get("support/index.html")
+
+        self.assertEqual(response.content, b"new")
+        self.assertEqual(response["ETag"], '"v2"')
+
+    def test_no_store_is_not_cached(self):
+        FakeSupportUpstream.routes["/support/api/session"] = (
+            "application/json",
+            b"{}",
+            {"Cache-Control": "no-store"},
+        )
+
+        self.get("support/api/session")
+        self.get("support/api/session")
+
+        self.assertEqual(len(self.upstream_hits("support/api/session")), 2)
+
+    def test_client_etag_gets_not_modified(self):
+        FakeSupportUpstream.routes["/support/widget.css"] = (
+            "text/css",
+            b"body{}",
+            {"Cache-Control": "max-age=600", "ETag": '"css1"'},
+        )
+        self.get("support/widget.css")
+
+        response = self.get("support/widget.css", HTTP_IF_NONE_MATCH='"css1"')
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(len(self.upstream_hits("support/widget.css")), 1)
+
+    def test_binary_assets_are_streamed_not_buffered(self):
+        payload = bytes(range(256)) * 1024
+        FakeSupportUpstream.routes["/support/font.woff2"] = (
+            "font/woff2",
+            payload,
+            {"Cache-Control": "max-age=600"},
+        )
+
+        response = self.get("support/font.woff2")
+
+        self.assertIsInstance(response, StreamingHttpResponse)
+        self.assertEqual(b"".join(response.streaming_content), payload)
+        self.assertEqual(response["Content-Length"], str(len(payload)))
@@ -26,6 +26,7 @@ from campaign_management.views import CampaignCreateView, CampaignUpdateView
 from user_management.views_custom import CustomAdminLoginView
 from sharing_management.views_transactions_page import collateral_transactions_dashboard
 from admin_dashboard import views as admin_dashboard_views
+from collateral_management.views_media import serve_collateral_media
 
 urlpatterns = [
     path('', home_view, name='home'),
@@ -67,7 +68,10 @@ urlpatterns = [
     # path('admin_dashboard/', include(('admin_dashboard.urls', 'admin_dashboard'), namespace='admin-dashboard')),
     path('auth/logout/', auth_views.LogoutView.as_view(), name='logout'),
     path('shortlinks/', include('shortlink_management.urls')),
+    path('uploads/', include('upload_jobs.urls')),
     path("support/chat/proxy/<path:remote_path>", support_widget_proxy, name="support_widget_proxy"),
+    # Collateral files get range/conditional handling; other media stays on static() below.
+    path(f"{settings.MEDIA_URL.lstrip('/')}collaterals/<path:path>", serve_collateral_media, name="collateral_media"),
     path("reports/collateral-transactions/<str:brand_campaign_id>/", collateral_transactions_dashboard, name="collateral_transactions_dashboard"),
 
     # Publisher campaign-scoped Field Rep routes
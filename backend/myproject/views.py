@@ -1,8 +1,18 @@
+import hashlib
+import re
+import time
 from urllib.error import HTTPError, URLError
 from urllib.request import Request, urlopen
 
 from django.conf import settings
-from django.http import HttpResponse, HttpResponseBadRequest, HttpResponseNotAllowed
+from django.core.cache import cache
+from django.http import (
+    HttpResponse,
+    HttpResponseBadRequest,
+    HttpResponseNotAllowed,
+    HttpResponseNotModified,
+    StreamingHttpResponse,
+)
 from django.shortcuts import render
 from django.views.decorators.csrf import csrf_exempt
 
@@ -33,19 +43,35 @@ def _support_proxy_destination(remote_path: str, query_string: str = "") -> str:
     return f"{base}{path}"
 
 
+SUPPORT_PROXY_TEXTUAL_TYPES = (
+    "text/html",
+    "text/css",
+    "text/javascript",
+    "application/javascript",
+    "application/json",
+)
+SUPPORT_PROXY_STREAM_CHUNK_SIZE = 64 * 1024
+SUPPORT_PROXY_TIMEOUT = 20
+
+
+def _support_proxy_cache_seconds() -> int:
+    # Freshness for assets that send neither max-age nor no-cache.
+    return int(getattr(settings, "SUPPORT_WIDGET_PROXY_CACHE_SECONDS", 300))
+
+
+def _support_proxy_cache_max_bytes() -> int:
+    return int(getattr(settings, "SUPPORT_WIDGET_PROXY_CACHE_MAX_BYTES", 1024 * 1024))
+
+
+def _is_textual_support_type(content_type: str) -> bool:
+    return (content_type or "").split(";", 1)[0].strip().lower() in SUPPORT_PROXY_TEXTUAL_TYPES
+
+
 def _rewrite_support_markup(body: bytes, *, proxy_prefix: str, upstream_base: str, content_type: str) -> bytes:
     if not body:
         return body
 
-    textual_types = (
-        "text/html",
-        "text/css",
-        "text/javascript",
-        "application/javascript",
-        "application/json",
-    )
-    normalized_content_type = (content_type or "").split(";", 1)[0].strip().lower()
-    if normalized_content_type not in textual_types:
+    if not _is_textual_support_type(content_type):
         return body
 
     try:
@@ -63,6 +89,79 @@ def _rewrite_support_markup(body: bytes, *, proxy_prefix: str, upstream_base: st
     return text.encode("utf-8")
 
 
+def _support_proxy_cache_key(upstream_url: str, accept: str, proxy_prefix: str) -> str:
+    # Cached bodies are already rewritten, so the proxy prefix is part of the key.
+    raw = "|".join([upstream_url, accept or "", proxy_prefix])
+    return "support_widget_proxy:" + hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def _support_proxy_freshness(cache_control: str):
+    """
+    Seconds an upstream response may be served without revalidation, or None
+    when it must not be stored at all.
+    """
+    directives = {}
+    for part in (cache_control or "").lower().split(","):
+        name, _, value = part.strip().partition("=")
+        if name:
+            directives[name] = value.strip().strip('"')
+    if "no-store" in directives or "private" in directives:
+        return None
+    if "no-cache" in directives:
+        return 0
+    for name in ("s-maxage", "max-age"):
+        if re.fullmatch(r"\d+", directives.get(name, "")):
+            return int(directives[name])
+    return _support_proxy_cache_seconds()
+
+
+def _support_proxy_etag_matches(if_none_match: str, etag: str) -> bool:
+    if not if_none_match or not etag:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    def opaque(tag):
+        tag = tag.strip()
+        return tag[2:] if tag.startswith("W/") else tag
+
+    return opaque(etag) in {opaque(tag) for tag in if_none_match.split(",")}
+
+
+def _support_proxy_cached_response(request, entry) -> HttpResponse:
+    if _support_proxy_etag_matches(request.META.get("HTTP_IF_NONE_MATCH", ""), entry.get("etag")):
+        response = HttpResponseNotModified()
+    else:
+        response = HttpResponse(entry["body"], status=entry["status"], content_type=entry["content_type"])
+    for header, key in (("Cache-Control", "cache_control"), ("ETag", "etag"), ("Last-Modified", "last_modified")):
+        if entry.get(key):
+            response[header] = entry[key]
+    return response
+
+
+def _support_proxy_store(cache_key, entry) -> None:
+    freshness = _support_proxy_freshness(entry.get("cache_control"))
+    if freshness is None or len(entry["body"]) > _support_proxy_cache_max_bytes():
+        cache.delete(cache_key)
+        return
+    if freshness == 0 and not (entry.get("etag") or entry.get("last_modified")):
+        cache.delete(cache_key)
+        return
+    entry["fresh_until"] = time.time() + freshness
+    # Keep stale entries a while longer so they can be revalidated with a 304.
+    cache.set(cache_key, entry, max(freshness, _support_proxy_cache_seconds()) + 86400)
+
+
+def _support_proxy_stream(upstream_response):
+    try:
+        while True:
+            chunk = upstream_response.read(SUPPORT_PROXY_STREAM_CHUNK_SIZE)
+            if not chunk:
+                break
+            yield chunk
+    finally:
+        upstream_response.close()
+
+
 @csrf_exempt
 def support_widget_proxy(request, remote_path: str):
     if request.method not in {"GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"}:
@@ -73,6 +172,7 @@ def support_widget_proxy(request, remote_path: str):
 
     upstream_base = _support_proxy_base_url()
     upstream_url = _support_proxy_destination(remote_path, request.META.get("QUERY_STRING", ""))
+    proxy_prefix = request.build_absolute_uri("/support/chat/proxy/").rstrip("/")
 
     headers = {
         "User-Agent": request.META.get("HTTP_USER_AGENT", "InclinicSupportProxy/1.0"),
@@ -83,33 +183,45 @@ def support_widget_proxy(request, remote_path: str):
     if content_type:
         headers["Content-Type"] = content_type
 
+    # GETs are served from the cache while fresh and revalidated with the
+    # stored ETag / Last-Modified once stale; other methods always go upstream.
+    cache_key = None
+    entry = None
+    if request.method == "GET":
+        cache_key = _support_proxy_cache_key(upstream_url, headers["Accept"], proxy_prefix)
+        entry = cache.get(cache_key)
+        if entry and entry.get("fresh_until", 0) > time.time():
+            return _support_proxy_cached_response(request, entry)
+        if entry:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+        else:
+            # Nothing cached: let the browser's validators through so binary
+            # assets can still be answered with a 304.
+            for header, meta_key in (("If-None-Match", "HTTP_IF_NONE_MATCH"), ("If-Modified-Since", "HTTP_IF_MODIFIED_SINCE")):
+                if request.META.get(meta_key):
+                    headers[header] = request.META[meta_key]
+
     body = request.body if request.method in {"POST", "PUT", "PATCH"} else None
     upstream_request = Request(upstream_url, data=body, headers=headers, method=request.method)
 
     try:
-        with urlopen(upstream_request, timeout=20) as upstream_response:
-            response_body = upstream_response.read()
-            response_content_type = upstream_response.headers.get("Content-Type", "text/html; charset=utf-8")
-            proxy_prefix = request.build_absolute_uri("/support/chat/proxy/").rstrip("/")
-            response_body = _rewrite_support_markup(
-                response_body,
-                proxy_prefix=proxy_prefix,
-                upstream_base=upstream_base,
-                content_type=response_content_type,
-            )
-            response = HttpResponse(
-                response_body,
-                status=upstream_response.getcode(),
-                content_type=response_content_type,
-            )
-            cache_control = upstream_response.headers.get("Cache-Control")
-            if cache_control:
-                response["Cache-Control"] = cache_control
-            return response
+        upstream_response = urlopen(upstream_request, timeout=SUPPORT_PROXY_TIMEOUT)
     except HTTPError as exc:
+        if exc.code == 304 and entry:
+            entry["cache_control"] = exc.headers.get("Cache-Control") or entry.get("cache_control")
+            _support_proxy_store(cache_key, entry)
+            return _support_proxy_cached_response(request, entry)
+        if exc.code == 304:
+            response = HttpResponseNotModified()
+            for header in ("Cache-Control", "ETag", "Last-Modified"):
+                if exc.headers.get(header):
+                    response[header] = exc.headers[header]
+            return response
         error_body = exc.read()
         response_content_type = exc.headers.get("Content-Type", "text/plain; charset=utf-8")
-        proxy_prefix = request.build_absolute_uri("/support/chat/proxy/").rstrip("/")
         error_body = _rewrite_support_markup(
             error_body,
             proxy_prefix=proxy_prefix,
@@ -119,3 +231,51 @@ def support_widget_proxy(request, remote_path: str):
         return HttpResponse(error_body or b"Support widget request failed.", status=exc.code, content_type=response_content_type)
     except (URLError, ValueError):
         return HttpResponse("Support widget is temporarily unavailable.", status=502, content_type="text/plain; charset=utf-8")
+
+    response_content_type = upstream_response.headers.get("Content-Type", "text/html; charset=utf-8")
+    passthrough_headers = {
+        header: upstream_response.headers.get(header)
+        for header in ("Cache-Control", "ETag", "Last-Modified")
+        if upstream_response.headers.get(header)
+    }
+
+    if not _is_textual_support_type(response_content_type):
+        # Binary assets (fonts, images) are never rewritten: stream them
+        # through instead of holding the whole file in memory.
+        response = StreamingHttpResponse(
+            _support_proxy_stream(upstream_response),
+            status=upstream_response.getcode(),
+            content_type=response_content_type,
+        )
+        content_length = upstream_response.headers.get("Content-Length")
+        if content_length:
+            response["Content-Length"] = content_length
+        for header, value in passthrough_headers.items():
+            response[header] = value
+        return response
+
+    with upstream_response:
+        response_body = _rewrite_support_markup(
+            upstream_response.read(),
+            proxy_prefix=proxy_prefix,
+            upstream_base=upstream_base,
+            content_type=response_content_type,
+        )
+        status = upstream_response.getcode()
+
+    entry = {
+        "status": status,
+        "content_type": response_content_type,
+        "body": response_body,
+        "cache_control": passthrough_headers.get("Cache-Control"),
+        "etag": passthrough_headers.get("ETag"),
+        "last_modified": passthrough_headers.get("Last-Modified"),
+    }
+    if cache_key and status == 200:
+        _support_proxy_store(cache_key, entry)
+        return _support_proxy_cached_response(request, entry)
+
+    response = HttpResponse(response_body, status=status, content_type=response_content_type)
+    for header, value in passthrough_headers.items():
+        response[header] = value
+    return response
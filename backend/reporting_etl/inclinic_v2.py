@@ -6,16 +6,18 @@ import re
 import uuid
 from collections import defaultdict
 from datetime import date, datetime
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Iterable
+from typing import Any, Iterable, Iterator
 
-from django.db import connections
+from django.db import connections, router
 from django.utils import timezone
 
 
 TARGET_CAMPAIGN_ID = "83ce7fc7c965433ab2b9717394abe3c1"
 SYSTEM_NAME = "inclinic"
 UUID_NAMESPACE = uuid.UUID("8a2f1b96-bf9c-47e3-a2c6-3c4eb266a2e2")
+DEFAULT_KEY_CACHE_SIZE = 65536
 
 
 FIELD_REP_CONFLICT_TRANSACTION_EXCLUSION_CAMPAIGN_IDS = {
@@ -173,6 +175,27 @@ def clean_text(value: Any) -> str:
     return str(value).strip()
 
 
+class KeyCache:
+    """Per-run memo of the pure key and normalization helpers.
+
+    A backfill builds one instance per run, so entries never outlive the run and
+    each wrapped helper is bounded to ``maxsize`` entries.
+    """
+
+    CACHED_FUNCTIONS = ("stable_uuid", "normalize_phone", "normalize_campaign_id", "normalize_email", "normalize_name")
+
+    def __init__(self, maxsize: int = DEFAULT_KEY_CACHE_SIZE):
+        memo = lru_cache(maxsize=maxsize, typed=True)
+        self.stable_uuid = memo(stable_uuid)
+        self.normalize_phone = memo(normalize_phone)
+        self.normalize_campaign_id = memo(normalize_campaign_id)
+        self.normalize_email = memo(normalize_email)
+        self.normalize_name = memo(normalize_name)
+
+    def stats(self) -> dict[str, Any]:
+        return {name: getattr(self, name).cache_info() for name in self.CACHED_FUNCTIONS}
+
+
 def to_json(value: Any) -> str:
     def default(obj):
         if isinstance(obj, (datetime, date)):
@@ -206,20 +229,27 @@ def fetch_rows(alias: str, table: str) -> list[dict[str, Any]]:
         return [dict(zip(columns, row)) for row in cursor.fetchall()]
 
 
-def load_source_csv(path: str | Path) -> list[dict[str, Any]]:
+def iter_source_csv(path: str | Path, chunk_size: int = 5000) -> Iterator[list[dict[str, Any]]]:
+    """Yield active CSV rows in lists of at most ``chunk_size`` without reading the whole file."""
     path = Path(path)
     if not path.exists():
-        return []
+        return
 
+    chunk: list[dict[str, Any]] = []
     with path.open(newline="", encoding="utf-8-sig") as fh:
-        rows = list(csv.DictReader(fh))
+        for row in csv.DictReader(fh):
+            if str(row.get("_is_deleted", "")).strip().lower() in {"1", "true", "t", "yes", "y"}:
+                continue
+            chunk.append({key: (None if value == "" else value) for key, value in row.items()})
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+    if chunk:
+        yield chunk
+
 
-    active_rows = [
-        {key: (None if value == "" else value) for key, value in row.items()}
-        for row in rows
-        if str(row.get("_is_deleted", "")).strip().lower() not in {"1", "true", "t", "yes", "y"}
-    ]
-    return latest_by_pk(active_rows)
+def load_source_csv(path: str | Path) -> list[dict[str, Any]]:
+    return latest_by_pk(row for chunk in iter_source_csv(path) for row in chunk)
 
 
 def latest_by_pk(rows: Iterable[dict[str, Any]], pk: str = "id") -> list[dict[str, Any]]:
@@ -275,6 +305,26 @@ def update_by_pk(model, pk_value: str, defaults: dict[str, Any]):
     return obj, created
 
 
+def bulk_upsert_by_pk(model, rows: dict[str, dict[str, Any]], batch_size: int = 500) -> int:
+    """Insert or update many ``pk -> defaults`` rows with batched upserts, like ``update_by_pk``."""
+    if not rows:
+        return 0
+    pk_name = model._meta.pk.name
+    objs = [model(**{pk_name: pk_value}, **defaults) for pk_value, defaults in rows.items()]
+    update_fields = sorted({name for defaults in rows.values() for name in defaults})
+    features = connections[router.db_for_write(model)].features
+    # MySQL's ON DUPLICATE KEY UPDATE takes no conflict target.
+    conflict_target = {"unique_fields": [pk_name]} if features.supports_update_conflicts_with_target else {}
+    model.objects.bulk_create(
+        objs,
+        batch_size=batch_size,
+        update_conflicts=True,
+        update_fields=update_fields,
+        **conflict_target,
+    )
+    return len(objs)
+
+
 def parse_bool(value: Any) -> bool | None:
     if value is None:
         return None
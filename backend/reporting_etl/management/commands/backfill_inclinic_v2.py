@@ -1,32 +1,35 @@
 from __future__ import annotations
 
+import cProfile
+import io
+import json
+import pstats
 import re
 import warnings
+from itertools import islice
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable, Iterable
 
 from django.conf import settings
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
 from django.db import transaction
 from django.utils import timezone
 
 from reporting_etl.inclinic_v2 import (
+    DEFAULT_KEY_CACHE_SIZE,
     DUPLICATE_ASM_DOCTOR_OVERRIDES,
     FIELD_REP_CONFLICT_TRANSACTION_EXCLUSION_CAMPAIGN_IDS,
     LEGACY_DOCTOR_REP_ALIASES,
     SYSTEM_NAME,
     TARGET_CAMPAIGN_ID,
     WRONG_DOCTOR_NUMBER_EXCLUSIONS_BY_RAW_DIGITS,
+    KeyCache,
+    bulk_upsert_by_pk,
     clean_text,
     common_fields,
     fetch_rows,
     first_by,
     group_by,
-    load_source_csv,
-    normalize_campaign_id,
-    normalize_email,
-    normalize_name,
-    normalize_phone,
     parse_bool,
     parse_int,
     parse_mismatch_csv,
@@ -51,9 +54,17 @@ from reporting_etl.models import (
     MigrationExceptionV2,
     SourceMigrationBatchV2,
 )
+from reporting_etl.v2_staging import DEFAULT_CSV_CHUNK_SIZE, StagedCsvTable
 
 
 DEFAULT_MISMATCH_CSV = "/Users/inditech-tech/Desktop/raw_server1.campaign_campaignfieldrep (1) - mismatch data.csv"
+DEFAULT_CHUNK_SIZE = 1000
+
+
+def source_order_key(row: dict[str, Any]) -> tuple[int, str]:
+    # Numeric-looking ids sort numerically so chunk boundaries stay stable across resumes.
+    value = clean_text(row.get("id"))
+    return len(value), value
 
 
 class Command(BaseCommand):
@@ -71,6 +82,35 @@ class Command(BaseCommand):
         parser.add_argument("--campaign-fieldrep-csv", default="")
         parser.add_argument("--doctor-csv", default="")
         parser.add_argument("--collateral-transaction-csv", default="")
+        parser.add_argument(
+            "--resume",
+            action="store_true",
+            help="Continue the existing --batch-id from its last checkpoint instead of starting it over.",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=DEFAULT_CHUNK_SIZE,
+            help="Rows committed per checkpointed chunk. A resumed batch keeps the chunk size it started with.",
+        )
+        parser.add_argument(
+            "--key-cache-size",
+            type=int,
+            default=DEFAULT_KEY_CACHE_SIZE,
+            help="Maximum entries kept per memoized key/normalization helper for this run.",
+        )
+        parser.add_argument(
+            "--profile",
+            action="store_true",
+            help="Print per-function call counts and timings plus key cache hit rates after the run.",
+        )
+        parser.add_argument(
+            "--csv-chunk-size",
+            type=int,
+            default=DEFAULT_CSV_CHUNK_SIZE,
+            help="Rows parsed and bulk-inserted per batch when staging --*-csv overlay files.",
+        )
+        parser.add_argument("--profile-limit", type=int, default=40, help="Number of functions listed by --profile.")
 
     def handle(self, *args, **options):
         warnings.filterwarnings(
@@ -78,12 +118,15 @@ class Command(BaseCommand):
             message=r"DateTimeField .* received a naive datetime.*",
             category=RuntimeWarning,
         )
+        self.keys = KeyCache(max(1, options["key_cache_size"]))
         self.default_alias = options["default_alias"]
         self.master_alias = options["master_alias"]
         self.campaign_id = clean_text(options["campaign_id"]) or TARGET_CAMPAIGN_ID
-        self.campaign_id_norm = normalize_campaign_id(self.campaign_id)
+        self.campaign_id_norm = self.keys.normalize_campaign_id(self.campaign_id)
         self.batch_id = clean_text(options["batch_id"]) or f"inclinic_v2_{timezone.now():%Y%m%d%H%M%S}"
         self.counts: dict[str, int] = {}
+        if options["resume"] and not clean_text(options["batch_id"]):
+            raise CommandError("--resume requires --batch-id.")
 
         input_files = []
         if not options["skip_mismatch_csv"]:
@@ -98,48 +141,141 @@ class Command(BaseCommand):
             "doctors": options["doctor_csv"],
             "transactions": options["collateral_transaction_csv"],
         }
-
-        SourceMigrationBatchV2.objects.update_or_create(
-            migration_batch_id=self.batch_id,
-            defaults={
-                "system_name": SYSTEM_NAME,
-                "database_name": source_database(self.default_alias),
-                "started_at": timezone.now(),
-                "completed_at": None,
-                "status": "running",
-                "input_file_names": to_json(input_files),
-                "created_by": options["created_by"],
-                "notes": "InClinic v2 source-system lineage backfill",
-            },
-        )
-
-        with transaction.atomic():
-            self.load_sources()
-            self.backfill_field_rep_identity()
-            self.backfill_campaign_assignments()
-            self.backfill_non_authoritative_assignment_audit()
-            self.load_legacy_alias_bridge()
-            self.backfill_doctors()
-            self.backfill_collaterals()
-            self.backfill_campaign_collaterals()
-            self.backfill_share_events()
-            self.backfill_collateral_transactions()
-            if not options["skip_mismatch_csv"]:
-                self.parse_and_backfill_assigned_roster(Path(options["mismatch_csv"]))
-            self.backfill_activity_events()
-
+        self.csv_chunk_size = max(1, options["csv_chunk_size"])
+        self.staged_overlays: dict[str, StagedCsvTable] = {}
+
+        if options["resume"]:
+            batch = SourceMigrationBatchV2.objects.filter(migration_batch_id=self.batch_id).first()
+            if batch is None:
+                raise CommandError(f"Cannot resume unknown migration batch {self.batch_id}.")
+            try:
+                self.checkpoint = json.loads(batch.checkpoint_json or "{}")
+            except json.JSONDecodeError:
+                self.checkpoint = {}
+            self.checkpoint.setdefault("chunk_size", max(1, options["chunk_size"]))
+            self.checkpoint.setdefault("stages", {})
+            self.counts = dict(self.checkpoint.get("counts") or {})
             SourceMigrationBatchV2.objects.filter(migration_batch_id=self.batch_id).update(
-                completed_at=timezone.now(),
-                status="completed",
+                completed_at=None,
+                status="running",
+                notes="InClinic v2 source-system lineage backfill (resumed)",
+            )
+            self.stdout.write(f"[RESUME] batch_id={self.batch_id} chunk_size={self.checkpoint['chunk_size']}")
+        else:
+            self.checkpoint = {"chunk_size": max(1, options["chunk_size"]), "stages": {}}
+            SourceMigrationBatchV2.objects.update_or_create(
+                migration_batch_id=self.batch_id,
+                defaults={
+                    "system_name": SYSTEM_NAME,
+                    "database_name": source_database(self.default_alias),
+                    "started_at": timezone.now(),
+                    "completed_at": None,
+                    "status": "running",
+                    "input_file_names": to_json(input_files),
+                    "created_by": options["created_by"],
+                    "notes": "InClinic v2 source-system lineage backfill",
+                    "checkpoint_json": to_json(self.checkpoint),
+                },
             )
 
+        profiler = cProfile.Profile() if options["profile"] else None
+        if profiler:
+            profiler.enable()
+
+        # Each stage commits in checkpointed chunks so a failed run can be
+        # resumed; stages are idempotent because every row is keyed by stable_uuid.
+        self.load_sources()
+        self.backfill_field_rep_identity()
+        self.backfill_campaign_assignments()
+        self.backfill_non_authoritative_assignment_audit()
+        self.load_legacy_alias_bridge()
+        self.backfill_doctors()
+        self.backfill_collaterals()
+        self.backfill_campaign_collaterals()
+        self.backfill_share_events()
+        self.backfill_collateral_transactions()
+        if not options["skip_mismatch_csv"]:
+            self.parse_and_backfill_assigned_roster(Path(options["mismatch_csv"]))
+        self.backfill_activity_events()
+
+        if profiler:
+            profiler.disable()
+            self.write_profile(profiler, options["profile_limit"])
+        for staged in self.staged_overlays.values():
+            staged.drop()
+
+        SourceMigrationBatchV2.objects.filter(migration_batch_id=self.batch_id).update(
+            completed_at=timezone.now(),
+            status="completed",
+        )
+
         self.stdout.write(self.style.SUCCESS("InClinic v2 backfill completed."))
         for key in sorted(self.counts):
             self.stdout.write(f"{key}: {self.counts[key]}")
 
+    def write_profile(self, profiler: cProfile.Profile, limit: int) -> None:
+        buffer = io.StringIO()
+        pstats.Stats(profiler, stream=buffer).sort_stats("tottime").print_stats(max(1, limit))
+        self.stdout.write("[PROFILE] Per-function call counts and time (sorted by own time):")
+        self.stdout.write(buffer.getvalue().rstrip())
+        for name, info in self.keys.stats().items():
+            lookups = info.hits + info.misses
+            hit_rate = (info.hits / lookups * 100) if lookups else 0.0
+            self.stdout.write(
+                f"[PROFILE] key cache {name}: hits={info.hits} misses={info.misses} "
+                f"size={info.currsize}/{info.maxsize} hit_rate={hit_rate:.1f}%"
+            )
+
     def inc(self, key: str, amount: int = 1):
         self.counts[key] = self.counts.get(key, 0) + amount
 
+    def save_checkpoint(self) -> None:
+        self.checkpoint["counts"] = self.counts
+        SourceMigrationBatchV2.objects.filter(migration_batch_id=self.batch_id).update(
+            checkpoint_json=to_json(self.checkpoint),
+        )
+
+    def run_stage(
+        self,
+        stage: str,
+        rows: Iterable[Any],
+        handler: Callable[[Any], None],
+        order_key: Callable[[Any], Any] | None = source_order_key,
+        batched: bool = False,
+    ) -> None:
+        """Run ``handler`` over ``rows`` in chunks, each committed with its checkpoint.
+
+        With ``batched`` the handler receives each chunk as a list instead of one row at a time.
+        """
+        state = self.checkpoint["stages"].setdefault(stage, {"status": "pending", "chunks_completed": 0, "rows": 0})
+        if state["status"] == "completed":
+            self.stdout.write(f"[RESUME] Skipping completed stage {stage}.")
+            return
+
+        rows = iter(sorted(rows, key=order_key) if order_key else rows)
+        chunk_size = self.checkpoint["chunk_size"]
+        if state["chunks_completed"]:
+            self.stdout.write(f"[RESUME] {stage}: skipping {state['chunks_completed']} completed chunk(s).")
+            skip = state["chunks_completed"] * chunk_size
+            next(islice(rows, skip, skip), None)
+        while True:
+            chunk = list(islice(rows, chunk_size))
+            if not chunk:
+                break
+            with transaction.atomic(using=self.default_alias):
+                if batched:
+                    handler(chunk)
+                else:
+                    for row in chunk:
+                        handler(row)
+                state["chunks_completed"] += 1
+                state["rows"] += len(chunk)
+                self.save_checkpoint()
+
+        state["status"] = "completed"
+        state["completed_at"] = timezone.now().isoformat()
+        self.save_checkpoint()
+
     def load_sources(self):
         self.master_fieldrep_table = getattr(settings, "MASTER_DB_FIELD_REP_TABLE", "campaign_fieldrep")
         self.master_assignment_table = getattr(settings, "MASTER_DB_CAMPAIGN_FIELD_REP_TABLE", "campaign_campaignfieldrep")
@@ -161,45 +297,49 @@ class Command(BaseCommand):
         self.campaign_assignments = fetch_rows(self.default_alias, "campaign_management_campaignassignment")
         self.admin_fieldrep_campaigns = fetch_rows(self.default_alias, "admin_dashboard_fieldrepcampaign")
 
-        csv_field_reps = load_source_csv(self.source_csv_paths["field_reps"]) if self.source_csv_paths["field_reps"] else []
-        csv_assignments = load_source_csv(self.source_csv_paths["master_assignments"]) if self.source_csv_paths["master_assignments"] else []
-        csv_doctors = load_source_csv(self.source_csv_paths["doctors"]) if self.source_csv_paths["doctors"] else []
-        csv_transactions = load_source_csv(self.source_csv_paths["transactions"]) if self.source_csv_paths["transactions"] else []
-
-        if csv_field_reps:
-            self.field_reps = csv_field_reps
-            self.inc("source_overlay.field_reps")
-        if csv_assignments:
-            self.master_assignments = csv_assignments
-            self.inc("source_overlay.master_assignments")
-        if csv_doctors:
-            self.doctors = csv_doctors
-            self.inc("source_overlay.doctors")
-        if csv_transactions:
-            self.transactions = csv_transactions
-            self.inc("source_overlay.transactions")
+        for key, path in self.source_csv_paths.items():
+            if not path:
+                continue
+            staged = StagedCsvTable(self.default_alias, key, path, self.csv_chunk_size)
+            if staged.load():
+                self.staged_overlays[key] = staged
+                # Assigned rather than incremented so a resumed run does not double count.
+                self.counts[f"source_overlay.{key}"] = staged.row_count
+            else:
+                staged.drop()
+
+        # Reps, assignments and doctors feed the shared lookup indexes below, so
+        # they are materialized; transactions stream from staging in their stage.
+        if "field_reps" in self.staged_overlays:
+            self.field_reps = list(self.staged_overlays["field_reps"].iter_rows())
+        if "master_assignments" in self.staged_overlays:
+            self.master_assignments = list(self.staged_overlays["master_assignments"].iter_rows())
+        if "doctors" in self.staged_overlays:
+            self.doctors = list(self.staged_overlays["doctors"].iter_rows())
+        if "transactions" in self.staged_overlays:
+            self.transactions = []
 
         self.fr_by_id = first_by(self.field_reps, "id")
         self.fr_by_brand = first_by(self.field_reps, "brand_supplied_field_rep_id")
         self.auth_by_id = first_by(self.master_auth_users, "id")
-        self.auth_by_email = {normalize_email(row.get("email")): row for row in self.master_auth_users if normalize_email(row.get("email"))}
+        self.auth_by_email = {self.keys.normalize_email(row.get("email")): row for row in self.master_auth_users if self.keys.normalize_email(row.get("email"))}
         self.fr_by_user_id = first_by(self.field_reps, "user_id")
         self.fr_by_auth_email = {}
         for fr in self.field_reps:
             auth = self.auth_by_id.get(clean_text(fr.get("user_id")))
-            if auth and normalize_email(auth.get("email")):
-                self.fr_by_auth_email[normalize_email(auth.get("email"))] = fr
+            if auth and self.keys.normalize_email(auth.get("email")):
+                self.fr_by_auth_email[self.keys.normalize_email(auth.get("email"))] = fr
 
         self.local_user_by_id = first_by(self.local_users, "id")
         self.local_campaign_by_id = first_by(self.local_campaigns, "id")
         self.doctor_resolution_rows = [
-            dict(row, phone_normalized=normalize_phone(row.get("phone")))
+            dict(row, phone_normalized=self.keys.normalize_phone(row.get("phone")))
             for row in self.doctors
             if not self.doctor_row_exclusion_reason(row)
         ]
-        self.doctors_by_phone = group_by(self.doctor_resolution_rows, "phone_normalized")
+        self.index_doctor_resolution(self.doctor_resolution_rows)
         self.authoritative_pairs = {
-            (normalize_campaign_id(row.get("campaign_id")), clean_text(row.get("field_rep_id")))
+            (self.keys.normalize_campaign_id(row.get("campaign_id")), clean_text(row.get("field_rep_id")))
             for row in self.master_assignments
         }
 
@@ -210,7 +350,7 @@ class Command(BaseCommand):
         return WRONG_DOCTOR_NUMBER_EXCLUSIONS_BY_RAW_DIGITS.get(self.raw_digits(phone))
 
     def duplicate_asm_override(self, phone: Any) -> dict[str, Any] | None:
-        return DUPLICATE_ASM_DOCTOR_OVERRIDES.get(normalize_phone(phone))
+        return DUPLICATE_ASM_DOCTOR_OVERRIDES.get(self.keys.normalize_phone(phone))
 
     def doctor_row_exclusion_reason(self, row: dict[str, Any]) -> str:
         wrong_number = self.wrong_doctor_number_exclusion(row.get("phone"))
@@ -231,7 +371,7 @@ class Command(BaseCommand):
         if consistency_status != "conflict":
             return ""
 
-        campaign_id_norm = normalize_campaign_id(row.get("brand_campaign_id"))
+        campaign_id_norm = self.keys.normalize_campaign_id(row.get("brand_campaign_id"))
         if campaign_id_norm in FIELD_REP_CONFLICT_TRANSACTION_EXCLUSION_CAMPAIGN_IDS:
             return "manual_target_campaign_field_rep_conflict_transaction_exclusion"
 
@@ -248,18 +388,18 @@ class Command(BaseCommand):
         )
 
     def field_rep_uuid(self, campaign_fieldrep_id: Any) -> str:
-        return stable_uuid("field_rep", clean_text(campaign_fieldrep_id))
+        return self.keys.stable_uuid("field_rep", clean_text(campaign_fieldrep_id))
 
     def campaign_uuid(self, campaign_id: Any) -> str:
-        return stable_uuid("campaign", normalize_campaign_id(campaign_id))
+        return self.keys.stable_uuid("campaign", self.keys.normalize_campaign_id(campaign_id))
 
     def doctor_uuid(self, phone: Any) -> str | None:
-        phone_norm = normalize_phone(phone)
-        return stable_uuid("doctor", phone_norm) if phone_norm else None
+        phone_norm = self.keys.normalize_phone(phone)
+        return self.keys.stable_uuid("doctor", phone_norm) if phone_norm else None
 
     def collateral_uuid(self, collateral_id: Any) -> str | None:
         value = clean_text(collateral_id)
-        return stable_uuid("collateral", value) if value else None
+        return self.keys.stable_uuid("collateral", value) if value else None
 
     def record_exception(self, *, database_alias: str, source_table: str, source_pk_value: Any, entity_type: str, issue_code: str, details: Any, raw_payload: Any, source_pk_column: str = "id"):
         MigrationExceptionV2.objects.create(
@@ -294,11 +434,11 @@ class Command(BaseCommand):
         }
 
     def backfill_field_rep_identity(self):
-        for fr in self.field_reps:
+        def backfill_field_rep(fr):
             base = {
                 **self.source_common(self.master_alias, self.master_fieldrep_table, fr, "campaign_fieldrep"),
                 **self.field_rep_identity_defaults(fr),
-                "phone_normalized": normalize_phone(fr.get("phone_number")) or None,
+                "phone_normalized": self.keys.normalize_phone(fr.get("phone_number")) or None,
             }
             for source_column, value in (
                 ("id", fr.get("id")),
@@ -308,7 +448,7 @@ class Command(BaseCommand):
                 value = clean_text(value)
                 if not value:
                     continue
-                pk = stable_uuid("field_rep_identity", self.master_fieldrep_table, source_column, value)
+                pk = self.keys.stable_uuid("field_rep_identity", self.master_fieldrep_table, source_column, value)
                 defaults = {
                     **base,
                     "source_column": source_column,
@@ -319,10 +459,12 @@ class Command(BaseCommand):
                 update_by_pk(InclinicFieldRepIdentityV2, pk, defaults)
                 self.inc("field_rep_identity.rows")
 
-        for user in self.local_users:
+        self.run_stage("field_rep_identity.field_reps", self.field_reps, backfill_field_rep)
+
+        def backfill_local_user(user):
             resolved_fr = None
             field_id = clean_text(user.get("field_id"))
-            email = normalize_email(user.get("email"))
+            email = self.keys.normalize_email(user.get("email"))
             if field_id:
                 resolved_fr = self.fr_by_brand.get(field_id)
             if not resolved_fr and email:
@@ -341,7 +483,7 @@ class Command(BaseCommand):
                 "user_management_is_active": parse_bool(user.get("is_active")),
                 "user_management_date_joined": user.get("date_joined"),
                 "email_normalized": email or None,
-                "phone_normalized": normalize_phone(user.get("phone_number")) or None,
+                "phone_normalized": self.keys.normalize_phone(user.get("phone_number")) or None,
             }
             if resolved_fr:
                 base.update(self.field_rep_identity_defaults(resolved_fr))
@@ -349,7 +491,7 @@ class Command(BaseCommand):
                 value = clean_text(value)
                 if not value:
                     continue
-                pk = stable_uuid("field_rep_identity", "user_management_user", source_column, value)
+                pk = self.keys.stable_uuid("field_rep_identity", "user_management_user", source_column, value)
                 update_by_pk(
                     InclinicFieldRepIdentityV2,
                     pk,
@@ -357,13 +499,15 @@ class Command(BaseCommand):
                         **base,
                         "source_column": source_column,
                         "source_value": value,
-                        "source_value_normalized": normalize_email(value) if source_column == "email" else value.lower(),
+                        "source_value_normalized": self.keys.normalize_email(value) if source_column == "email" else value.lower(),
                         "match_basis": "user_management_user_to_campaign_fieldrep" if resolved_fr else "user_management_user_unresolved",
                     },
                 )
                 self.inc("field_rep_identity.rows")
 
-        for auth in self.master_auth_users:
+        self.run_stage("field_rep_identity.local_users", self.local_users, backfill_local_user)
+
+        def backfill_master_auth_user(auth):
             resolved_fr = self.fr_by_user_id.get(clean_text(auth.get("id")))
             base = {
                 **self.source_common(self.master_alias, self.master_auth_table, auth, "auth_user", "resolved" if resolved_fr else "unresolved"),
@@ -374,7 +518,7 @@ class Command(BaseCommand):
                 "auth_user_email": clean_text(auth.get("email")),
                 "auth_user_is_active": parse_bool(auth.get("is_active")),
                 "auth_user_date_joined": auth.get("date_joined"),
-                "email_normalized": normalize_email(auth.get("email")) or None,
+                "email_normalized": self.keys.normalize_email(auth.get("email")) or None,
             }
             if resolved_fr:
                 base.update(self.field_rep_identity_defaults(resolved_fr))
@@ -382,7 +526,7 @@ class Command(BaseCommand):
                 value = clean_text(value)
                 if not value:
                     continue
-                pk = stable_uuid("field_rep_identity", self.master_auth_table, source_column, value)
+                pk = self.keys.stable_uuid("field_rep_identity", self.master_auth_table, source_column, value)
                 update_by_pk(
                     InclinicFieldRepIdentityV2,
                     pk,
@@ -390,14 +534,16 @@ class Command(BaseCommand):
                         **base,
                         "source_column": source_column,
                         "source_value": value,
-                        "source_value_normalized": normalize_email(value) if source_column == "email" else value.lower(),
+                        "source_value_normalized": self.keys.normalize_email(value) if source_column == "email" else value.lower(),
                         "match_basis": "auth_user_to_campaign_fieldrep" if resolved_fr else "auth_user_unresolved",
                     },
                 )
                 self.inc("field_rep_identity.rows")
 
+        self.run_stage("field_rep_identity.master_auth_users", self.master_auth_users, backfill_master_auth_user)
+
     def backfill_campaign_assignments(self):
-        for row in self.master_assignments:
+        def backfill_row(row):
             field_rep_id = clean_text(row.get("field_rep_id"))
             campaign_id = clean_text(row.get("campaign_id"))
             fr = self.fr_by_id.get(field_rep_id)
@@ -411,7 +557,7 @@ class Command(BaseCommand):
                     details={"field_rep_id": field_rep_id, "campaign_id": campaign_id},
                     raw_payload=row,
                 )
-            pk = stable_uuid("campaign_field_rep_assignment", row.get("id") or campaign_id, field_rep_id)
+            pk = self.keys.stable_uuid("campaign_field_rep_assignment", row.get("id") or campaign_id, field_rep_id)
             update_by_pk(
                 InclinicCampaignFieldRepAssignmentV2,
                 pk,
@@ -419,7 +565,7 @@ class Command(BaseCommand):
                     **self.source_common(self.master_alias, self.master_assignment_table, row, "campaign_campaignfieldrep"),
                     "campaign_uuid": self.campaign_uuid(campaign_id),
                     "legacy_campaign_id": campaign_id,
-                    "legacy_campaign_id_normalized": normalize_campaign_id(campaign_id),
+                    "legacy_campaign_id_normalized": self.keys.normalize_campaign_id(campaign_id),
                     "field_rep_uuid": self.field_rep_uuid(field_rep_id),
                     "campaign_fieldrep_id": field_rep_id,
                     "brand_supplied_field_rep_id": clean_text(fr.get("brand_supplied_field_rep_id")) if fr else "",
@@ -437,16 +583,18 @@ class Command(BaseCommand):
             )
             self.inc("campaign_assignment_v2.rows")
 
+        self.run_stage("campaign_assignments", self.master_assignments, backfill_row)
+
     def backfill_non_authoritative_assignment_audit(self):
-        for row in self.campaign_assignments:
+        def backfill_campaign_assignment(row):
             local_campaign = self.local_campaign_by_id.get(clean_text(row.get("campaign_id")))
             campaign_id = clean_text(local_campaign.get("brand_campaign_id")) if local_campaign else clean_text(row.get("campaign_id"))
             local_user = self.local_user_by_id.get(clean_text(row.get("field_rep_id")))
             fr = None
             if local_user:
-                fr = self.fr_by_brand.get(clean_text(local_user.get("field_id"))) or self.fr_by_auth_email.get(normalize_email(local_user.get("email")))
+                fr = self.fr_by_brand.get(clean_text(local_user.get("field_id"))) or self.fr_by_auth_email.get(self.keys.normalize_email(local_user.get("email")))
             field_rep_id = clean_text(fr.get("id")) if fr else ""
-            pk = stable_uuid("non_authoritative_assignment", "campaign_management_campaignassignment", row.get("id"))
+            pk = self.keys.stable_uuid("non_authoritative_assignment", "campaign_management_campaignassignment", row.get("id"))
             update_by_pk(
                 InclinicNonAuthoritativeAssignmentAuditV2,
                 pk,
@@ -454,7 +602,7 @@ class Command(BaseCommand):
                     **self.source_common(self.default_alias, "campaign_management_campaignassignment", row, "non_authoritative_assignment_audit", "audit_only"),
                     "resolved_campaign_uuid": self.campaign_uuid(campaign_id) if campaign_id else None,
                     "resolved_field_rep_uuid": self.field_rep_uuid(field_rep_id) if field_rep_id else None,
-                    "matches_authoritative_campaign_campaignfieldrep": (normalize_campaign_id(campaign_id), field_rep_id) in self.authoritative_pairs,
+                    "matches_authoritative_campaign_campaignfieldrep": (self.keys.normalize_campaign_id(campaign_id), field_rep_id) in self.authoritative_pairs,
                     "campaign_assignment_id": clean_text(row.get("id")),
                     "campaign_assignment_assigned_on": row.get("assigned_on"),
                     "campaign_assignment_campaign_id": clean_text(row.get("campaign_id")),
@@ -463,15 +611,17 @@ class Command(BaseCommand):
             )
             self.inc("non_authoritative_assignment_audit.rows")
 
-        for row in self.admin_fieldrep_campaigns:
+        self.run_stage("non_authoritative_audit.campaign_assignments", self.campaign_assignments, backfill_campaign_assignment)
+
+        def backfill_admin_fieldrep_campaign(row):
             local_campaign = self.local_campaign_by_id.get(clean_text(row.get("campaign_id")))
             campaign_id = clean_text(local_campaign.get("brand_campaign_id")) if local_campaign else clean_text(row.get("campaign_id"))
             local_user = self.local_user_by_id.get(clean_text(row.get("field_rep_id")))
             fr = None
             if local_user:
-                fr = self.fr_by_brand.get(clean_text(local_user.get("field_id"))) or self.fr_by_auth_email.get(normalize_email(local_user.get("email")))
+                fr = self.fr_by_brand.get(clean_text(local_user.get("field_id"))) or self.fr_by_auth_email.get(self.keys.normalize_email(local_user.get("email")))
             field_rep_id = clean_text(fr.get("id")) if fr else ""
-            pk = stable_uuid("non_authoritative_assignment", "admin_dashboard_fieldrepcampaign", row.get("id"))
+            pk = self.keys.stable_uuid("non_authoritative_assignment", "admin_dashboard_fieldrepcampaign", row.get("id"))
             update_by_pk(
                 InclinicNonAuthoritativeAssignmentAuditV2,
                 pk,
@@ -479,7 +629,7 @@ class Command(BaseCommand):
                     **self.source_common(self.default_alias, "admin_dashboard_fieldrepcampaign", row, "non_authoritative_assignment_audit", "audit_only"),
                     "resolved_campaign_uuid": self.campaign_uuid(campaign_id) if campaign_id else None,
                     "resolved_field_rep_uuid": self.field_rep_uuid(field_rep_id) if field_rep_id else None,
-                    "matches_authoritative_campaign_campaignfieldrep": (normalize_campaign_id(campaign_id), field_rep_id) in self.authoritative_pairs,
+                    "matches_authoritative_campaign_campaignfieldrep": (self.keys.normalize_campaign_id(campaign_id), field_rep_id) in self.authoritative_pairs,
                     "admin_fieldrepcampaign_id": clean_text(row.get("id")),
                     "admin_fieldrepcampaign_assigned_at": row.get("assigned_at"),
                     "admin_fieldrepcampaign_campaign_id": clean_text(row.get("campaign_id")),
@@ -489,10 +639,14 @@ class Command(BaseCommand):
             )
             self.inc("non_authoritative_assignment_audit.rows")
 
+        self.run_stage("non_authoritative_audit.admin_fieldrep_campaigns", self.admin_fieldrep_campaigns, backfill_admin_fieldrep_campaign)
+
     def load_legacy_alias_bridge(self):
         row_stub = {"id": "InclinicMapping1/InclinicMapping2", "created_at": timezone.now()}
-        for brand_id, rep_name, campaign_fieldrep_id, legacy_rep_id in LEGACY_DOCTOR_REP_ALIASES:
-            pk = stable_uuid("legacy_doctor_rep_alias", self.campaign_id_norm, brand_id, campaign_fieldrep_id, legacy_rep_id)
+
+        def backfill_alias(alias):
+            brand_id, rep_name, campaign_fieldrep_id, legacy_rep_id = alias
+            pk = self.keys.stable_uuid("legacy_doctor_rep_alias", self.campaign_id_norm, brand_id, campaign_fieldrep_id, legacy_rep_id)
             update_by_pk(
                 InclinicLegacyDoctorRepAliasV2,
                 pk,
@@ -514,23 +668,26 @@ class Command(BaseCommand):
             )
             self.inc("legacy_alias.rows")
 
+        self.run_stage("legacy_alias_bridge", LEGACY_DOCTOR_REP_ALIASES, backfill_alias, order_key=None)
+
     def backfill_doctors(self):
         aliases_by_legacy = group_by(
             [
                 {
                     "legacy_value": legacy,
-                    "legacy_alias_uuid": stable_uuid("legacy_doctor_rep_alias", self.campaign_id_norm, brand, cfr_id, legacy),
+                    "legacy_alias_uuid": self.keys.stable_uuid("legacy_doctor_rep_alias", self.campaign_id_norm, brand, cfr_id, legacy),
                 }
                 for brand, _name, cfr_id, legacy in LEGACY_DOCTOR_REP_ALIASES
             ],
             "legacy_value",
         )
-        for row in self.doctors:
-            phone_norm = normalize_phone(row.get("phone"))
+
+        def backfill_row(row):
+            phone_norm = self.keys.normalize_phone(row.get("phone"))
             legacy_rep_id = clean_text(row.get("rep_id"))
             alias = aliases_by_legacy.get(legacy_rep_id, [None])[0]
             exclusion_reason = self.doctor_row_exclusion_reason(row)
-            pk = stable_uuid("inclinic_doctor", row.get("id"))
+            pk = self.keys.stable_uuid("inclinic_doctor", row.get("id"))
             update_by_pk(
                 InclinicDoctorV2,
                 pk,
@@ -545,7 +702,7 @@ class Command(BaseCommand):
                     "is_current": not bool(exclusion_reason),
                     "doctor_uuid": self.doctor_uuid(phone_norm),
                     "display_name": clean_text(row.get("name")),
-                    "name_normalized": normalize_name(row.get("name")),
+                    "name_normalized": self.keys.normalize_name(row.get("name")),
                     "phone_raw": clean_text(row.get("phone")),
                     "phone_normalized": phone_norm,
                     "legacy_doctor_viewer_rep_id": legacy_rep_id,
@@ -560,13 +717,15 @@ class Command(BaseCommand):
             )
             self.inc("doctor_v2.rows")
 
+        self.run_stage("doctors", self.doctors, backfill_row)
+
     def backfill_collaterals(self):
-        for row in self.collaterals:
+        def backfill_row(row):
             campaign_id = ""
             local_campaign = self.local_campaign_by_id.get(clean_text(row.get("campaign_id")))
             if local_campaign:
                 campaign_id = clean_text(local_campaign.get("brand_campaign_id"))
-            pk = stable_uuid("collateral", row.get("id"))
+            pk = self.keys.stable_uuid("collateral", row.get("id"))
             update_by_pk(
                 InclinicCollateralV2,
                 pk,
@@ -600,11 +759,13 @@ class Command(BaseCommand):
             )
             self.inc("collateral_v2.rows")
 
+        self.run_stage("collaterals", self.collaterals, backfill_row)
+
     def backfill_campaign_collaterals(self):
-        for row in self.campaign_collaterals:
+        def backfill_row(row):
             local_campaign = self.local_campaign_by_id.get(clean_text(row.get("campaign_id")))
             campaign_id = clean_text(local_campaign.get("brand_campaign_id")) if local_campaign else clean_text(row.get("campaign_id"))
-            pk = stable_uuid("campaign_collateral", row.get("id"))
+            pk = self.keys.stable_uuid("campaign_collateral", row.get("id"))
             update_by_pk(
                 InclinicCampaignCollateralV2,
                 pk,
@@ -623,15 +784,33 @@ class Command(BaseCommand):
             )
             self.inc("campaign_collateral_v2.rows")
 
-    def resolve_doctor_from_phone(self, phone: Any) -> tuple[str | None, str | None, list[dict[str, Any]]]:
-        phone_norm = normalize_phone(phone)
-        candidates = self.doctors_by_phone.get(phone_norm, [])
+        self.run_stage("campaign_collaterals", self.campaign_collaterals, backfill_row)
+
+    def index_doctor_resolution(self, rows: list[dict[str, Any]]):
+        self.doctors_by_phone = group_by(rows, "phone_normalized")
+        # Shared by the share, transaction and roster stages so each phone is
+        # resolved to its doctor keys once per run instead of once per row.
+        # Doctor rows without a phone are indexed under "" like any other
+        # phone, so shares with an empty number still report them as ambiguous.
+        self.doctor_resolution_by_phone = {
+            phone_norm: self.doctor_resolution(phone_norm, candidates)
+            for phone_norm, candidates in self.doctors_by_phone.items()
+        }
+
+    def doctor_resolution(self, phone_norm: str, candidates: list[dict[str, Any]]) -> tuple[str | None, str | None, list[dict[str, Any]]]:
         if len(candidates) == 1:
-            return stable_uuid("doctor", phone_norm), stable_uuid("inclinic_doctor", candidates[0].get("id")), candidates
-        return (stable_uuid("doctor", phone_norm) if phone_norm else None), None, candidates
+            return self.keys.stable_uuid("doctor", phone_norm), self.keys.stable_uuid("inclinic_doctor", candidates[0].get("id")), candidates
+        return (self.keys.stable_uuid("doctor", phone_norm) if phone_norm else None), None, candidates
+
+    def resolve_doctor_from_phone(self, phone: Any) -> tuple[str | None, str | None, list[dict[str, Any]]]:
+        phone_norm = self.keys.normalize_phone(phone)
+        resolved = self.doctor_resolution_by_phone.get(phone_norm)
+        if resolved:
+            return resolved
+        return self.doctor_resolution(phone_norm, [])
 
     def backfill_share_events(self):
-        for row in self.share_logs:
+        def backfill_row(row):
             field_rep_id = clean_text(row.get("field_rep_id"))
             fr = self.fr_by_id.get(field_rep_id)
             exclusion = self.wrong_doctor_number_exclusion(row.get("doctor_identifier"))
@@ -650,12 +829,12 @@ class Command(BaseCommand):
                     details={"doctor_identifier": row.get("doctor_identifier"), "candidate_count": len(candidates)},
                     raw_payload=row,
                 )
-            field_rep_email = normalize_email(row.get("field_rep_email"))
+            field_rep_email = self.keys.normalize_email(row.get("field_rep_email"))
             auth = self.auth_by_id.get(clean_text(fr.get("user_id"))) if fr else None
             email_matches = None
             if field_rep_email and auth:
-                email_matches = field_rep_email == normalize_email(auth.get("email"))
-            pk = stable_uuid("share_event", row.get("id"))
+                email_matches = field_rep_email == self.keys.normalize_email(auth.get("email"))
+            pk = self.keys.stable_uuid("share_event", row.get("id"))
             update_by_pk(
                 InclinicShareEventV2,
                 pk,
@@ -673,7 +852,7 @@ class Command(BaseCommand):
                     "collateral_uuid": self.collateral_uuid(row.get("collateral_id")),
                     "doctor_uuid": doctor_uuid,
                     "inclinic_doctor_uuid": inclinic_doctor_uuid,
-                    "doctor_phone_normalized": normalize_phone(row.get("doctor_identifier")) or None,
+                    "doctor_phone_normalized": self.keys.normalize_phone(row.get("doctor_identifier")) or None,
                     "shared_by_field_rep_uuid": self.field_rep_uuid(field_rep_id) if fr else None,
                     "campaign_fieldrep_id": field_rep_id,
                     "field_rep_email_normalized": field_rep_email or None,
@@ -696,6 +875,8 @@ class Command(BaseCommand):
             )
             self.inc("share_event_v2.rows")
 
+        self.run_stage("share_events", self.share_logs, backfill_row)
+
     def transaction_consistency(
         self,
         row: dict[str, Any],
@@ -765,7 +946,7 @@ class Command(BaseCommand):
         )
 
     def backfill_collateral_transactions(self):
-        for row in self.transactions:
+        def backfill_row(row):
             field_rep_id = clean_text(row.get("field_rep_id"))
             raw_field_rep_unique_id = clean_text(row.get("field_rep_unique_id"))
             fr = self.fr_by_id.get(field_rep_id)
@@ -808,7 +989,7 @@ class Command(BaseCommand):
             else:
                 doctor_uuid, inclinic_doctor_uuid, candidates = self.resolve_doctor_from_phone(row.get("doctor_number"))
                 activity_status = "viewed" if parse_bool(row.get("has_viewed")) or row.get("viewed_at") or row.get("first_viewed_at") else "sent"
-            pk = stable_uuid("collateral_transaction", row.get("id"))
+            pk = self.keys.stable_uuid("collateral_transaction", row.get("id"))
             update_by_pk(
                 InclinicCollateralTransactionV2,
                 pk,
@@ -826,7 +1007,7 @@ class Command(BaseCommand):
                     "collateral_uuid": self.collateral_uuid(row.get("collateral_id")),
                     "doctor_uuid": doctor_uuid,
                     "inclinic_doctor_uuid": inclinic_doctor_uuid,
-                    "doctor_phone_normalized": normalize_phone(row.get("doctor_number")) or None,
+                    "doctor_phone_normalized": self.keys.normalize_phone(row.get("doctor_number")) or None,
                     "field_rep_uuid_from_campaign_fieldrep_id": self.field_rep_uuid(field_rep_id) if fr else None,
                     "field_rep_uuid_from_brand_supplied_id": self.field_rep_uuid(brand_fr.get("id")) if brand_fr else None,
                     "resolved_field_rep_uuid": resolved_uuid,
@@ -876,9 +1057,17 @@ class Command(BaseCommand):
             )
             self.inc("collateral_transaction_v2.rows")
 
+        staged = self.staged_overlays.get("transactions")
+        if staged:
+            # Staged rows are already deduplicated and in source-pk order.
+            self.run_stage("collateral_transactions", staged.iter_rows(), backfill_row, order_key=None)
+        else:
+            self.run_stage("collateral_transactions", self.transactions, backfill_row)
+
     def parse_and_backfill_assigned_roster(self, path: Path):
         parsed, exceptions = parse_mismatch_csv(path)
-        for exc in exceptions:
+
+        def record_parse_exception(exc):
             self.record_exception(
                 database_alias=self.default_alias,
                 source_table=path.name,
@@ -890,15 +1079,18 @@ class Command(BaseCommand):
                 raw_payload=exc["raw_payload"],
             )
 
+        self.run_stage("assigned_roster.parse_exceptions", exceptions, record_parse_exception, order_key=None)
+
         alias_by_brand = {
             brand: {
-                "legacy_alias_uuid": stable_uuid("legacy_doctor_rep_alias", self.campaign_id_norm, brand, cfr_id, legacy),
+                "legacy_alias_uuid": self.keys.stable_uuid("legacy_doctor_rep_alias", self.campaign_id_norm, brand, cfr_id, legacy),
                 "campaign_fieldrep_id": cfr_id,
                 "legacy_value": legacy,
             }
             for brand, _name, cfr_id, legacy in LEGACY_DOCTOR_REP_ALIASES
         }
-        for row in parsed:
+
+        def backfill_roster_row(row):
             brand_id = row["brand_supplied_field_rep_id"]
             fr = self.fr_by_brand.get(brand_id)
             if not fr:
@@ -912,9 +1104,9 @@ class Command(BaseCommand):
                     details=row,
                     raw_payload=row,
                 )
-                continue
+                return
 
-            staging_pk = stable_uuid("manual_correction_staging", self.campaign_id_norm, brand_id, row["doctor_phone_normalized"])
+            staging_pk = self.keys.stable_uuid("manual_correction_staging", self.campaign_id_norm, brand_id, row["doctor_phone_normalized"])
             update_by_pk(
                 InclinicManualRepDoctorCorrectionStagingV2,
                 staging_pk,
@@ -962,7 +1154,7 @@ class Command(BaseCommand):
                 chosen = candidates[0]
                 match_status = "ambiguous" if len(candidates) > 1 else "doctor_candidate"
 
-            roster_pk = stable_uuid("assigned_roster", self.campaign_id_norm, brand_id, row["doctor_phone_normalized"])
+            roster_pk = self.keys.stable_uuid("assigned_roster", self.campaign_id_norm, brand_id, row["doctor_phone_normalized"])
             update_by_pk(
                 InclinicAssignedDoctorRosterV2,
                 roster_pk,
@@ -983,7 +1175,7 @@ class Command(BaseCommand):
                     "campaign_fieldrep_id": clean_text(fr.get("id")),
                     "field_rep_uuid": self.field_rep_uuid(fr.get("id")),
                     "doctor_uuid": self.doctor_uuid(row["doctor_phone_normalized"]),
-                    "inclinic_doctor_uuid": stable_uuid("inclinic_doctor", chosen.get("id")) if chosen else None,
+                    "inclinic_doctor_uuid": self.keys.stable_uuid("inclinic_doctor", chosen.get("id")) if chosen else None,
                     "doctor_name_raw": row["doctor_name_raw"],
                     "doctor_name_normalized": row["doctor_name_normalized"],
                     "doctor_phone_raw": row["doctor_phone_raw"],
@@ -997,58 +1189,75 @@ class Command(BaseCommand):
             )
             self.inc("assigned_roster.rows")
 
+        self.run_stage("assigned_roster.rows", parsed, backfill_roster_row, order_key=None)
+
+    def activity_event_rows(self, tx: InclinicCollateralTransactionV2) -> dict[str, dict[str, Any]]:
+        event_specs = [
+            ("sent", tx.old_sent_at, tx.old_sent_at is not None, "sent_at", ""),
+            ("viewed", tx.old_viewed_at or tx.old_first_viewed_at, bool(tx.old_has_viewed or tx.old_viewed_at or tx.old_first_viewed_at), "has_viewed/viewed_at/first_viewed_at", ""),
+            ("first_viewed", tx.old_first_viewed_at, tx.old_first_viewed_at is not None, "first_viewed_at", ""),
+            ("last_viewed", tx.old_last_viewed_at, tx.old_last_viewed_at is not None, "last_viewed_at", ""),
+            ("pdf_downloaded", tx.old_last_viewed_at or tx.old_viewed_at, bool(tx.old_downloaded_pdf), "downloaded_pdf", ""),
+            ("pdf_completed", tx.old_viewed_last_page_at, bool(tx.old_pdf_completed), "pdf_completed", ""),
+            ("video_lt_50", tx.old_video_lt_50_at, bool(tx.old_video_view_lt_50), "video_view_lt_50/video_lt_50_at", clean_text(tx.old_video_view_lt_50)),
+            ("video_gt_50", tx.old_video_gt_50_at, bool(tx.old_video_view_gt_50), "video_view_gt_50/video_gt_50_at", ""),
+            ("video_100", tx.old_video_100_at, bool(tx.old_video_completed), "video_completed/video_100_at", ""),
+            ("video_watch_percentage", tx.old_last_viewed_at, bool(tx.old_video_watch_percentage), "video_watch_percentage", clean_text(tx.old_video_watch_percentage)),
+        ]
+        rows = {}
+        for activity_type, when, should_create, source_flag, value in event_specs:
+            if not should_create:
+                continue
+            # Event keys are unique per transaction, so they bypass the shared key cache.
+            pk = stable_uuid("doctor_activity_event", tx.transaction_uuid, activity_type, source_flag)
+            rows[pk] = {
+                "source_system": SYSTEM_NAME,
+                "source_database": tx.source_database,
+                "source_table": "sharing_management_collateraltransaction",
+                "source_pk_column": "id",
+                "source_pk_value": tx.old_id or tx.source_pk_value,
+                "source_created_at": tx.old_created_at,
+                "source_updated_at": tx.old_updated_at,
+                "migration_batch_id": self.batch_id,
+                "migrated_at": timezone.now(),
+                "verification_status": tx.verification_status,
+                "verification_basis": tx.field_rep_resolution_basis,
+                "is_current": True,
+                "valid_from": when,
+                "valid_to": None,
+                "raw_payload_json": tx.raw_payload_json,
+                "transaction_uuid": tx.transaction_uuid,
+                "share_event_uuid": None,
+                "doctor_uuid": tx.doctor_uuid,
+                "inclinic_doctor_uuid": tx.inclinic_doctor_uuid,
+                "campaign_uuid": tx.campaign_uuid,
+                "collateral_uuid": tx.collateral_uuid,
+                "field_rep_uuid_for_activity": tx.resolved_field_rep_uuid,
+                "activity_type": activity_type,
+                "activity_at": when,
+                "activity_value": value,
+                "source_flag_column": source_flag,
+            }
+        return rows
+
     def backfill_activity_events(self):
+        # Events are a pure function of each transaction row, so every chunk of
+        # transactions becomes one batched upsert instead of a query per event.
         transactions = InclinicCollateralTransactionV2.objects.filter(
             migration_batch_id=self.batch_id,
             is_current=True,
+        ).order_by("transaction_uuid")
+
+        def backfill_transaction_chunk(chunk):
+            rows = {}
+            for tx in chunk:
+                rows.update(self.activity_event_rows(tx))
+            self.inc("doctor_activity_event_v2.rows", bulk_upsert_by_pk(InclinicDoctorActivityEventV2, rows))
+
+        self.run_stage(
+            "activity_events",
+            transactions.iterator(chunk_size=self.checkpoint["chunk_size"]),
+            backfill_transaction_chunk,
+            order_key=None,
+            batched=True,
         )
-        for tx in transactions:
-            event_specs = [
-                ("sent", tx.old_sent_at, tx.old_sent_at is not None, "sent_at", ""),
-                ("viewed", tx.old_viewed_at or tx.old_first_viewed_at, bool(tx.old_has_viewed or tx.old_viewed_at or tx.old_first_viewed_at), "has_viewed/viewed_at/first_viewed_at", ""),
-                ("first_viewed", tx.old_first_viewed_at, tx.old_first_viewed_at is not None, "first_viewed_at", ""),
-                ("last_viewed", tx.old_last_viewed_at, tx.old_last_viewed_at is not None, "last_viewed_at", ""),
-                ("pdf_downloaded", tx.old_last_viewed_at or tx.old_viewed_at, bool(tx.old_downloaded_pdf), "downloaded_pdf", ""),
-                ("pdf_completed", tx.old_viewed_last_page_at, bool(tx.old_pdf_completed), "pdf_completed", ""),
-                ("video_lt_50", tx.old_video_lt_50_at, bool(tx.old_video_view_lt_50), "video_view_lt_50/video_lt_50_at", clean_text(tx.old_video_view_lt_50)),
-                ("video_gt_50", tx.old_video_gt_50_at, bool(tx.old_video_view_gt_50), "video_view_gt_50/video_gt_50_at", ""),
-                ("video_100", tx.old_video_100_at, bool(tx.old_video_completed), "video_completed/video_100_at", ""),
-                ("video_watch_percentage", tx.old_last_viewed_at, bool(tx.old_video_watch_percentage), "video_watch_percentage", clean_text(tx.old_video_watch_percentage)),
-            ]
-            for activity_type, when, should_create, source_flag, value in event_specs:
-                if not should_create:
-                    continue
-                pk = stable_uuid("doctor_activity_event", tx.transaction_uuid, activity_type, source_flag)
-                update_by_pk(
-                    InclinicDoctorActivityEventV2,
-                    pk,
-                    {
-                        "source_system": SYSTEM_NAME,
-                        "source_database": tx.source_database,
-                        "source_table": "sharing_management_collateraltransaction",
-                        "source_pk_column": "id",
-                        "source_pk_value": tx.old_id or tx.source_pk_value,
-                        "source_created_at": tx.old_created_at,
-                        "source_updated_at": tx.old_updated_at,
-                        "migration_batch_id": self.batch_id,
-                        "migrated_at": timezone.now(),
-                        "verification_status": tx.verification_status,
-                        "verification_basis": tx.field_rep_resolution_basis,
-                        "is_current": True,
-                        "valid_from": when,
-                        "valid_to": None,
-                        "raw_payload_json": tx.raw_payload_json,
-                        "transaction_uuid": tx.transaction_uuid,
-                        "share_event_uuid": None,
-                        "doctor_uuid": tx.doctor_uuid,
-                        "inclinic_doctor_uuid": tx.inclinic_doctor_uuid,
-                        "campaign_uuid": tx.campaign_uuid,
-                        "collateral_uuid": tx.collateral_uuid,
-                        "field_rep_uuid_for_activity": tx.resolved_field_rep_uuid,
-                        "activity_type": activity_type,
-                        "activity_at": when,
-                        "activity_value": value,
-                        "source_flag_column": source_flag,
-                    },
-                )
-                self.inc("doctor_activity_event_v2.rows")
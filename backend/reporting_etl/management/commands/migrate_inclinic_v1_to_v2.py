@@ -5,7 +5,6 @@ import io
 import json
 import traceback
 from contextlib import nullcontext
-from dataclasses import dataclass
 from pathlib import Path
 from time import monotonic
 from typing import Any
@@ -20,10 +19,7 @@ from reporting_etl.inclinic_v2 import (
     SYSTEM_NAME,
     TARGET_CAMPAIGN_ID,
     clean_text,
-    fetch_rows,
     normalize_campaign_id,
-    source_database,
-    stable_uuid,
     table_exists,
 )
 from reporting_etl.models import (
@@ -39,18 +35,7 @@ from reporting_etl.models import (
     SourceMigrationBatchV2,
 )
 from reporting_etl.v2_switch import activate_v2_batch
-
-
-@dataclass(frozen=True)
-class SourceValidationSpec:
-    label: str
-    alias: str
-    source_table: str
-    destination_model: Any
-    destination_table: str
-    destination_pk_field: str
-    critical_field_map: tuple[tuple[str, str], ...] = ()
-    required: bool = True
+from reporting_etl.v2_validation import SetBasedValidator, SourceValidationSpec
 
 
 SUCCESS_FIELDS = [
@@ -116,27 +101,6 @@ DRY_RUN_COUNT_FIELDS = [
 ]
 
 
-def _as_text(value: Any) -> str:
-    if value is None:
-        return ""
-    if hasattr(value, "isoformat"):
-        return value.isoformat(sep=" ")
-    return str(value).strip()
-
-
-def _same_value(left: Any, right: Any) -> bool:
-    left_text = _as_text(left)
-    right_text = _as_text(right)
-    if left_text == right_text:
-        return True
-    if left_text.lower() in {"true", "false"} or right_text.lower() in {"true", "false"}:
-        return (left_text.lower() in {"true", "1"}) == (right_text.lower() in {"true", "1"})
-    try:
-        return float(left_text) == float(right_text)
-    except Exception:
-        return False
-
-
 class Command(BaseCommand):
     help = (
         "Safely migrate InClinic V1 source tables into v2 lineage/reporting tables, "
@@ -176,10 +140,36 @@ class Command(BaseCommand):
                 "Can be passed multiple times. Ignored exceptions are still written to reports."
             ),
         )
+        parser.add_argument(
+            "--validation-workers",
+            type=int,
+            default=4,
+            help="Number of source tables validated in parallel. Dry runs always validate on one connection.",
+        )
+        parser.add_argument(
+            "--resume",
+            default="",
+            metavar="BATCH_ID",
+            help=(
+                "Resume a failed or interrupted batch from its last committed backfill checkpoint, "
+                "then validate the whole batch."
+            ),
+        )
 
     def handle(self, *args, **options):
         started = timezone.now()
         start_monotonic = monotonic()
+        self.resume = clean_text(options["resume"])
+        if self.resume:
+            if options["dry_run"]:
+                raise CommandError("--resume cannot be combined with --dry-run.")
+            if options["skip_backfill"]:
+                raise CommandError("--resume cannot be combined with --skip-backfill.")
+            if clean_text(options["batch_id"]) and clean_text(options["batch_id"]) != self.resume:
+                raise CommandError("--batch-id and --resume name different batches.")
+            if not SourceMigrationBatchV2.objects.filter(migration_batch_id=self.resume).exists():
+                raise CommandError(f"Cannot resume unknown migration batch {self.resume}.")
+            options["batch_id"] = self.resume
         self.batch_id = clean_text(options["batch_id"]) or f"inclinic_v1_to_v2_{started:%Y%m%d%H%M%S}"
         self.default_alias = options["default_alias"]
         self.master_alias = options["master_alias"]
@@ -190,6 +180,9 @@ class Command(BaseCommand):
         if self.dry_run and options["activate_v2"]:
             self.stdout.write(self.style.WARNING("[DRY RUN] Ignoring --activate-v2; dry runs never activate V2."))
             options["activate_v2"] = False
+        # Dry-run rows only exist inside this connection's open transaction,
+        # so worker threads on their own connections would not see them.
+        self.validation_workers = 1 if self.dry_run else max(1, options["validation_workers"])
         self.ignored_open_exception_codes = {
             clean_text(code).upper()
             for code in options["ignore_open_exception_code"]
@@ -209,6 +202,8 @@ class Command(BaseCommand):
         self.final_report_json_path = self.report_dir / "final_validation_report.json"
 
         self.stdout.write(f"[START] batch_id={self.batch_id}")
+        if self.resume:
+            self.stdout.write("[RESUME] Continuing backfill from the last committed checkpoint.")
         self.stdout.write(f"[REPORT_DIR] {self.report_dir}")
         if self.dry_run:
             self.stdout.write("[DRY RUN] Database writes will be rolled back after validation/count reporting.")
@@ -375,6 +370,7 @@ class Command(BaseCommand):
             "default_alias": self.default_alias,
             "master_alias": self.master_alias,
             "skip_mismatch_csv": options["skip_mismatch_csv"],
+            "resume": bool(self.resume),
             "stdout": backfill_stdout,
         }
         if options["mismatch_csv"]:
@@ -574,12 +570,21 @@ class Command(BaseCommand):
         failure_rows: list[dict[str, Any]] = []
         recon_rows: list[dict[str, Any]] = []
 
-        for spec in self._source_specs():
+        specs = self._source_specs()
+        for spec in specs:
             self.stdout.write(f"[VALIDATE] {spec.source_table} -> {spec.destination_table}")
             self._log(success_log, f"Validating {spec.source_table} -> {spec.destination_table}")
-            source_db = source_database(spec.alias)
 
-            if not table_exists(spec.alias, spec.source_table):
+        validator = SetBasedValidator(
+            batch_id=self.batch_id,
+            destination_alias=self.default_alias,
+            workers=self.validation_workers,
+        )
+        for result in validator.validate(specs):
+            spec = result.spec
+            source_db = result.source_database
+
+            if result.source_table_missing:
                 failure_rows.append(
                     self._failure_row(
                         source_db,
@@ -593,52 +598,29 @@ class Command(BaseCommand):
                 recon_rows.append(self._recon_row(spec, source_db, 0, 0, 1, 0, 0, "FAIL"))
                 continue
 
-            source_rows = fetch_rows(spec.alias, spec.source_table)
-            source_by_pk = {clean_text(row.get("id")): row for row in source_rows if clean_text(row.get("id"))}
-            destination_qs = spec.destination_model.objects.filter(
-                migration_batch_id=self.batch_id,
-                source_table=spec.source_table,
-            )
-
-            destination_by_source: dict[str, list[Any]] = {}
-            for dest in destination_qs:
-                destination_by_source.setdefault(clean_text(dest.source_pk_value), []).append(dest)
-
-            missing = 0
-            mismatches = 0
-            migrated_sources = 0
-            for source_pk, source_row in source_by_pk.items():
-                destination_rows = destination_by_source.get(source_pk, [])
-                if not destination_rows:
-                    missing += 1
-                    failure_rows.append(
-                        self._failure_row(
-                            source_db,
-                            spec.source_table,
-                            source_pk,
-                            spec.destination_table,
-                            "DESTINATION_RECORD_MISSING",
-                            "No v2 destination row found for this source primary key.",
-                        )
+            for source_pk in result.missing_pks:
+                failure_rows.append(
+                    self._failure_row(
+                        source_db,
+                        spec.source_table,
+                        source_pk,
+                        spec.destination_table,
+                        "DESTINATION_RECORD_MISSING",
+                        "No v2 destination row found for this source primary key.",
                     )
-                    continue
-
-                field_errors = self._validate_destination_rows(spec, source_row, destination_rows)
-                if field_errors:
-                    mismatches += 1
-                    failure_rows.append(
-                        self._failure_row(
-                            source_db,
-                            spec.source_table,
-                            source_pk,
-                            spec.destination_table,
-                            "CRITICAL_FIELD_MISMATCH",
-                            "; ".join(field_errors),
-                        )
+                )
+            for source_pk, field_errors in result.mismatches:
+                failure_rows.append(
+                    self._failure_row(
+                        source_db,
+                        spec.source_table,
+                        source_pk,
+                        spec.destination_table,
+                        "CRITICAL_FIELD_MISMATCH",
+                        "; ".join(field_errors),
                     )
-                    continue
-
-                migrated_sources += 1
+                )
+            for source_pk, destination_pks in result.matched:
                 success_rows.append(
                     {
                         "batch_id": self.batch_id,
@@ -647,61 +629,35 @@ class Command(BaseCommand):
                         "source_pk_column": "id",
                         "source_pk_value": source_pk,
                         "destination_table": spec.destination_table,
-                        "destination_pk_values": ",".join(
-                            clean_text(getattr(row, spec.destination_pk_field)) for row in destination_rows
-                        ),
+                        "destination_pk_values": ",".join(destination_pks),
                         "status": "migrated",
                         "validation_status": "matched",
-                        "message": f"{len(destination_rows)} destination row(s) verified.",
+                        "message": f"{len(destination_pks)} destination row(s) verified.",
                     }
                 )
 
-            status = "PASS" if missing == 0 and mismatches == 0 else "FAIL"
+            missing = len(result.missing_pks)
+            mismatches = len(result.mismatches)
+            migrated_sources = len(result.matched)
             recon_rows.append(
                 self._recon_row(
                     spec,
                     source_db,
-                    len(source_by_pk),
+                    result.total_source,
                     migrated_sources,
                     missing,
                     mismatches,
-                    destination_qs.count(),
-                    status,
+                    result.destination_rows,
+                    result.status,
                 )
             )
             self._log(
-                success_log if status == "PASS" else failure_log,
-                f"{spec.source_table}: source={len(source_by_pk)} migrated={migrated_sources} missing={missing} mismatches={mismatches} status={status}",
+                success_log if result.status == "PASS" else failure_log,
+                f"{spec.source_table}: source={result.total_source} migrated={migrated_sources} missing={missing} mismatches={mismatches} status={result.status}",
             )
 
         return success_rows, failure_rows, recon_rows
 
-    def _validate_destination_rows(self, spec: SourceValidationSpec, source_row: dict[str, Any], destination_rows: list[Any]) -> list[str]:
-        errors: list[str] = []
-        raw_payload_ok = False
-
-        for dest in destination_rows:
-            try:
-                raw_payload = json.loads(dest.raw_payload_json or "{}")
-            except json.JSONDecodeError:
-                raw_payload = {}
-            if clean_text(raw_payload.get("id")) == clean_text(source_row.get("id")):
-                raw_payload_ok = True
-
-        if not raw_payload_ok:
-            errors.append("raw_payload_json does not contain the source row id")
-
-        for source_field, dest_field in spec.critical_field_map:
-            source_value = source_row.get(source_field)
-            if any(_same_value(source_value, getattr(dest, dest_field, None)) for dest in destination_rows):
-                continue
-            errors.append(
-                f"{source_field}->{dest_field} mismatch source={_as_text(source_value)!r} "
-                f"dest={[ _as_text(getattr(dest, dest_field, None)) for dest in destination_rows ]!r}"
-            )
-
-        return errors
-
     def _failure_row(
         self,
         source_db: str,
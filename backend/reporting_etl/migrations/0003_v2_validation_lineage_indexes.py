@@ -0,0 +1,45 @@
+# Generated by Django 4.2.11 on 2026-10-19 16:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reporting_etl', '0002_inclinic_v2_schema'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='incliniccampaigncollateralv2',
+            index=models.Index(fields=['migration_batch_id', 'source_table', 'source_pk_value'], name='inclinic_cc_batch_src_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='incliniccampaignfieldrepassignmentv2',
+            index=models.Index(fields=['migration_batch_id', 'source_table', 'source_pk_value'], name='inclinic_cfra_batch_src_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='incliniccollateraltransactionv2',
+            index=models.Index(fields=['migration_batch_id', 'source_table', 'source_pk_value'], name='inclinic_ctx_batch_src_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='incliniccollateralv2',
+            index=models.Index(fields=['migration_batch_id', 'source_table', 'source_pk_value'], name='inclinic_coll_batch_src_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='inclinicdoctorv2',
+            index=models.Index(fields=['migration_batch_id', 'source_table', 'source_pk_value'], name='inclinic_doc_batch_src_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='inclinicfieldrepidentityv2',
+            index=models.Index(fields=['migration_batch_id', 'source_table', 'source_pk_value'], name='inclinic_fri_batch_src_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='inclinicnonauthoritativeassignmentauditv2',
+            index=models.Index(fields=['migration_batch_id', 'source_table', 'source_pk_value'], name='inclinic_naa_batch_src_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='inclinicshareeventv2',
+            index=models.Index(fields=['migration_batch_id', 'source_table', 'source_pk_value'], name='inclinic_share_batch_src_idx'),
+        ),
+    ]
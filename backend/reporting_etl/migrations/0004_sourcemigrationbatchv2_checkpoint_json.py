@@ -0,0 +1,18 @@
+# Generated by Django 4.2.11 on 2026-10-19 16:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reporting_etl', '0003_v2_validation_lineage_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='sourcemigrationbatchv2',
+            name='checkpoint_json',
+            field=models.TextField(default='{}'),
+        ),
+    ]
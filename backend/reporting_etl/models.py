@@ -36,6 +36,7 @@ class SourceMigrationBatchV2(models.Model):
     input_file_names = models.TextField(default="[]")
     created_by = models.CharField(max_length=120)
     notes = models.TextField(blank=True, null=True)
+    checkpoint_json = models.TextField(default="{}")
 
     class Meta:
         db_table = "source_migration_batch_v2"
@@ -134,6 +135,7 @@ class InclinicFieldRepIdentityV2(CommonSourceFields):
         indexes = [
             models.Index(fields=["source_table", "source_column", "source_value"]),
             models.Index(fields=["campaign_fieldrep_id", "brand_supplied_field_rep_id"]),
+            models.Index(fields=["migration_batch_id", "source_table", "source_pk_value"], name="inclinic_fri_batch_src_idx"),
         ]
 
 
@@ -162,6 +164,7 @@ class InclinicCampaignFieldRepAssignmentV2(CommonSourceFields):
         indexes = [
             models.Index(fields=["legacy_campaign_id_normalized", "campaign_fieldrep_id"]),
             models.Index(fields=["campaign_uuid", "field_rep_uuid"]),
+            models.Index(fields=["migration_batch_id", "source_table", "source_pk_value"], name="inclinic_cfra_batch_src_idx"),
         ]
 
 
@@ -184,7 +187,10 @@ class InclinicNonAuthoritativeAssignmentAuditV2(CommonSourceFields):
 
     class Meta:
         db_table = "inclinic_non_authoritative_assignment_audit_v2"
-        indexes = [models.Index(fields=["source_table", "source_pk_value"])]
+        indexes = [
+            models.Index(fields=["source_table", "source_pk_value"]),
+            models.Index(fields=["migration_batch_id", "source_table", "source_pk_value"], name="inclinic_naa_batch_src_idx"),
+        ]
 
 
 class InclinicLegacyDoctorRepAliasV2(CommonSourceFields):
@@ -231,6 +237,7 @@ class InclinicDoctorV2(CommonSourceFields):
         indexes = [
             models.Index(fields=["phone_normalized"]),
             models.Index(fields=["legacy_doctor_viewer_rep_id", "phone_normalized"]),
+            models.Index(fields=["migration_batch_id", "source_table", "source_pk_value"], name="inclinic_doc_batch_src_idx"),
         ]
 
 
@@ -310,6 +317,7 @@ class InclinicShareEventV2(CommonSourceFields):
         indexes = [
             models.Index(fields=["campaign_uuid", "shared_by_field_rep_uuid"]),
             models.Index(fields=["doctor_phone_normalized", "old_collateral_id"]),
+            models.Index(fields=["migration_batch_id", "source_table", "source_pk_value"], name="inclinic_share_batch_src_idx"),
         ]
 
 
@@ -374,6 +382,7 @@ class InclinicCollateralTransactionV2(CommonSourceFields):
             models.Index(fields=["campaign_uuid", "resolved_field_rep_uuid"]),
             models.Index(fields=["doctor_phone_normalized", "old_collateral_id"]),
             models.Index(fields=["field_rep_identifier_consistency_status"]),
+            models.Index(fields=["migration_batch_id", "source_table", "source_pk_value"], name="inclinic_ctx_batch_src_idx"),
         ]
 
 
@@ -429,7 +438,10 @@ class InclinicCollateralV2(CommonSourceFields):
 
     class Meta:
         db_table = "inclinic_collateral_v2"
-        indexes = [models.Index(fields=["old_id"])]
+        indexes = [
+            models.Index(fields=["old_id"]),
+            models.Index(fields=["migration_batch_id", "source_table", "source_pk_value"], name="inclinic_coll_batch_src_idx"),
+        ]
 
 
 class InclinicCampaignCollateralV2(CommonSourceFields):
@@ -450,4 +462,5 @@ class InclinicCampaignCollateralV2(CommonSourceFields):
         indexes = [
             models.Index(fields=["campaign_uuid", "collateral_uuid"]),
             models.Index(fields=["old_campaign_id", "old_collateral_id"]),
+            models.Index(fields=["migration_batch_id", "source_table", "source_pk_value"], name="inclinic_cc_batch_src_idx"),
         ]
@@ -1,3 +1,43 @@
-from django.test import TestCase
+from django.test import SimpleTestCase
 
-# Create your tests here.
+from reporting_etl.inclinic_v2 import KeyCache, stable_uuid
+from reporting_etl.management.commands.backfill_inclinic_v2 import Command
+
+
+class DoctorResolutionTests(SimpleTestCase):
+    def setUp(self):
+        self.command = Command()
+        self.command.keys = KeyCache()
+        self.command.index_doctor_resolution(
+            [
+                {"id": "1", "phone_normalized": "9800000001"},
+                {"id": "2", "phone_normalized": "9800000002"},
+                {"id": "3", "phone_normalized": "9800000002"},
+                {"id": "4", "phone_normalized": ""},
+                {"id": "5", "phone_normalized": ""},
+            ]
+        )
+
+    def test_single_candidate_resolves_inclinic_doctor(self):
+        doctor_uuid, inclinic_uuid, candidates = self.command.resolve_doctor_from_phone("+91 98000 00001")
+
+        self.assertEqual(doctor_uuid, stable_uuid("doctor", "9800000001"))
+        self.assertEqual(inclinic_uuid, stable_uuid("inclinic_doctor", "1"))
+        self.assertEqual(len(candidates), 1)
+
+    def test_shared_phone_is_ambiguous(self):
+        doctor_uuid, inclinic_uuid, candidates = self.command.resolve_doctor_from_phone("9800000002")
+
+        self.assertEqual(doctor_uuid, stable_uuid("doctor", "9800000002"))
+        self.assertIsNone(inclinic_uuid)
+        self.assertEqual(len(candidates), 2)
+
+    def test_empty_phone_still_reports_phoneless_doctors_as_ambiguous(self):
+        self.assertEqual(self.command.resolve_doctor_from_phone(""), (None, None, self.command.doctors_by_phone[""]))
+        self.assertEqual(len(self.command.resolve_doctor_from_phone(None)[2]), 2)
+
+    def test_unknown_phone_keeps_its_doctor_key(self):
+        self.assertEqual(
+            self.command.resolve_doctor_from_phone("9800000009"),
+            (stable_uuid("doctor", "9800000009"), None, []),
+        )
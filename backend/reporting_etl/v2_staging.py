@@ -0,0 +1,124 @@
+"""Streaming staging of brand CSV overlays for ``backfill_inclinic_v2``.
+
+Overlay exports can run to hundreds of megabytes and carry several versions
+of the same row. Instead of reading a whole file into a list, the file is
+parsed in chunks and bulk-inserted into a temporary table on the backfill
+connection. The latest version of each source row is then read back in
+source-pk order, one keyset-paginated query per batch: mysqlclient buffers a
+whole result set client-side, and an unbuffered cursor would block the writes
+the backfill makes on the same connection while it iterates.
+
+Only temporary-table DDL is used (``DROP TEMPORARY TABLE`` on MySQL, the key
+declared inside ``CREATE TEMPORARY TABLE``): any other DDL commits implicitly
+on MySQL, which would break the ``--dry-run`` rollback.
+"""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Any, Iterator
+
+from django.db import connections
+
+from reporting_etl.inclinic_v2 import clean_text, iter_source_csv
+
+
+DEFAULT_CSV_CHUNK_SIZE = 5000
+
+
+class StagedCsvTable:
+    """One CSV overlay staged into ``v2stage_<name>`` on ``alias``.
+
+    Temporary tables are scoped to the connection, so the staged rows are
+    visible to the backfill's own queries and vanish when it disconnects.
+    """
+
+    def __init__(self, alias: str, name: str, path: str | Path, chunk_size: int = DEFAULT_CSV_CHUNK_SIZE):
+        self.alias = alias
+        self.path = Path(path)
+        self.chunk_size = max(1, chunk_size)
+        self.connection = connections[alias]
+        self.table = f"v2stage_{name}"
+        self.row_count = 0
+
+    def _create(self, cursor) -> None:
+        qn = self.connection.ops.quote_name
+        if self.connection.vendor == "mysql":
+            # Binary collation keeps pk ordering and grouping byte-exact.
+            pk_type = "VARCHAR(191) CHARACTER SET utf8mb4 COLLATE utf8mb4_bin"
+            payload_type = "LONGTEXT"
+        else:
+            pk_type = "VARCHAR(191)"
+            payload_type = "TEXT"
+        self._drop(cursor)
+        cursor.execute(
+            f"CREATE TEMPORARY TABLE {qn(self.table)} ("
+            f"source_pk {pk_type} NOT NULL, "
+            f"pk_length INTEGER NOT NULL, "
+            f"ingested_at VARCHAR(64) NOT NULL, "
+            f"seq BIGINT NOT NULL, "
+            f"row_json {payload_type} NOT NULL, "
+            f"PRIMARY KEY (pk_length, source_pk, ingested_at, seq))"
+        )
+
+    def _drop(self, cursor) -> None:
+        keyword = "TEMPORARY TABLE" if self.connection.vendor == "mysql" else "TABLE"
+        cursor.execute(f"DROP {keyword} IF EXISTS {self.connection.ops.quote_name(self.table)}")
+
+    def load(self) -> int:
+        """Stream the CSV into the staging table and return the number of active rows staged."""
+        qn = self.connection.ops.quote_name
+        insert_sql = (
+            f"INSERT INTO {qn(self.table)} (source_pk, pk_length, ingested_at, seq, row_json) "
+            "VALUES (%s, %s, %s, %s, %s)"
+        )
+        seq = 0
+        with self.connection.cursor() as cursor:
+            self._create(cursor)
+            for chunk in iter_source_csv(self.path, self.chunk_size):
+                params = []
+                for row in chunk:
+                    pk = clean_text(row.get("id"))
+                    if not pk:
+                        continue
+                    seq += 1
+                    params.append((pk, len(pk), clean_text(row.get("_ingested_at")), seq, json.dumps(row)))
+                if params:
+                    cursor.executemany(insert_sql, params)
+                    self.row_count += len(params)
+        return self.row_count
+
+    def iter_rows(self) -> Iterator[dict[str, Any]]:
+        """Yield the latest version of each staged row, ordered like ``source_order_key``.
+
+        Versions of one pk arrive adjacent and oldest first, so the last one
+        seen before the pk changes wins, matching ``latest_by_pk``.
+        """
+        qn = self.connection.ops.quote_name
+        select_sql = f"SELECT pk_length, source_pk, ingested_at, seq, row_json FROM {qn(self.table)} "
+        after_sql = "WHERE (pk_length, source_pk, ingested_at, seq) > (%s, %s, %s, %s) "
+        order_sql = f"ORDER BY pk_length, source_pk, ingested_at, seq LIMIT {int(self.chunk_size)}"
+        current_pk = None
+        current_json = None
+        last_key = None
+        while True:
+            with self.connection.cursor() as cursor:
+                if last_key is None:
+                    cursor.execute(select_sql + order_sql)
+                else:
+                    cursor.execute(select_sql + after_sql + order_sql, list(last_key))
+                batch = cursor.fetchall()
+            if not batch:
+                break
+            for _pk_length, pk, _ingested_at, _seq, row_json in batch:
+                if current_pk is not None and pk != current_pk:
+                    yield json.loads(current_json)
+                current_pk, current_json = pk, row_json
+            last_key = batch[-1][:4]
+        if current_pk is not None:
+            yield json.loads(current_json)
+
+    def drop(self) -> None:
+        with self.connection.cursor() as cursor:
+            self._drop(cursor)
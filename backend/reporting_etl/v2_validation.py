@@ -0,0 +1,327 @@
+"""Set-based source-to-v2 validation for ``migrate_inclinic_v1_to_v2``.
+
+Existence and critical-field checks run as anti-joins between each source
+table and its v2 destination table on ``source_pk_value``. Only the primary
+keys that SQL flags as suspect are pulled back into Python, where they are
+re-checked with the exact comparison rules the report has always used.
+"""
+
+from __future__ import annotations
+
+import json
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Iterator
+
+from django.db import connections
+
+from reporting_etl.inclinic_v2 import clean_text, source_database, table_exists
+
+
+@dataclass(frozen=True)
+class SourceValidationSpec:
+    label: str
+    alias: str
+    source_table: str
+    destination_model: Any
+    destination_table: str
+    destination_pk_field: str
+    critical_field_map: tuple[tuple[str, str], ...] = ()
+    required: bool = True
+
+
+@dataclass
+class SpecValidationResult:
+    spec: SourceValidationSpec
+    source_database: str
+    source_table_missing: bool = False
+    total_source: int = 0
+    destination_rows: int = 0
+    missing_pks: list[str] = field(default_factory=list)
+    mismatches: list[tuple[str, list[str]]] = field(default_factory=list)
+    matched: list[tuple[str, list[str]]] = field(default_factory=list)
+
+    @property
+    def status(self) -> str:
+        if self.source_table_missing or self.missing_pks or self.mismatches:
+            return "FAIL"
+        return "PASS"
+
+
+def as_text(value: Any) -> str:
+    if value is None:
+        return ""
+    if hasattr(value, "isoformat"):
+        return value.isoformat(sep=" ")
+    return str(value).strip()
+
+
+def same_value(left: Any, right: Any) -> bool:
+    left_text = as_text(left)
+    right_text = as_text(right)
+    if left_text == right_text:
+        return True
+    if left_text.lower() in {"true", "false"} or right_text.lower() in {"true", "false"}:
+        return (left_text.lower() in {"true", "1"}) == (right_text.lower() in {"true", "1"})
+    try:
+        return float(left_text) == float(right_text)
+    except Exception:
+        return False
+
+
+def critical_field_errors(spec: SourceValidationSpec, source_row: dict[str, Any], destination_rows: list[Any]) -> list[str]:
+    errors: list[str] = []
+    raw_payload_ok = False
+
+    for dest in destination_rows:
+        try:
+            raw_payload = json.loads(dest.raw_payload_json or "{}")
+        except json.JSONDecodeError:
+            raw_payload = {}
+        if clean_text(raw_payload.get("id")) == clean_text(source_row.get("id")):
+            raw_payload_ok = True
+
+    if not raw_payload_ok:
+        errors.append("raw_payload_json does not contain the source row id")
+
+    for source_field, dest_field in spec.critical_field_map:
+        source_value = source_row.get(source_field)
+        if any(same_value(source_value, getattr(dest, dest_field, None)) for dest in destination_rows):
+            continue
+        errors.append(
+            f"{source_field}->{dest_field} mismatch source={as_text(source_value)!r} "
+            f"dest={[ as_text(getattr(dest, dest_field, None)) for dest in destination_rows ]!r}"
+        )
+
+    return errors
+
+
+def same_database(left_alias: str, right_alias: str) -> bool:
+    if left_alias == right_alias:
+        return True
+    left = connections[left_alias].settings_dict
+    right = connections[right_alias].settings_dict
+    return all(left.get(key) == right.get(key) for key in ("ENGINE", "NAME", "HOST", "PORT"))
+
+
+class SetBasedValidator:
+    """Validate v2 destination rows against their source tables in SQL.
+
+    Specs whose source table lives in a different database than the v2
+    tables (the master RDS tables) have their id and critical columns staged
+    into a temporary table on the destination connection first, so every
+    spec is checked with the same anti-join queries.
+    """
+
+    def __init__(self, *, batch_id: str, destination_alias: str, workers: int = 1, chunk_size: int = 2000):
+        self.batch_id = batch_id
+        self.destination_alias = destination_alias
+        self.workers = max(1, workers)
+        self.chunk_size = max(1, chunk_size)
+
+    def validate(self, specs: list[SourceValidationSpec]) -> list[SpecValidationResult]:
+        if self.workers == 1 or len(specs) < 2:
+            return [self.validate_spec(spec) for spec in specs]
+        with ThreadPoolExecutor(max_workers=min(self.workers, len(specs))) as pool:
+            return list(pool.map(self._validate_spec_in_thread, specs))
+
+    def _validate_spec_in_thread(self, spec: SourceValidationSpec) -> SpecValidationResult:
+        try:
+            return self.validate_spec(spec)
+        finally:
+            connections.close_all()
+
+    def validate_spec(self, spec: SourceValidationSpec) -> SpecValidationResult:
+        result = SpecValidationResult(spec=spec, source_database=source_database(spec.alias))
+        if not table_exists(spec.alias, spec.source_table):
+            result.source_table_missing = True
+            return result
+
+        conn = connections[self.destination_alias]
+        qn = conn.ops.quote_name
+        source_columns = self._source_columns(spec)
+        staged_table = ""
+        if same_database(spec.alias, self.destination_alias):
+            source_relation = qn(spec.source_table)
+        else:
+            staged_table = self._stage_source(spec, source_columns)
+            source_relation = qn(staged_table)
+
+        try:
+            dest_table = qn(spec.destination_model._meta.db_table)
+            dest_pk = qn(spec.destination_model._meta.get_field(spec.destination_pk_field).column)
+            source_pk = self._char(conn, "s.id")
+            match = "d.migration_batch_id = %s AND d.source_table = %s AND d.source_pk_value = " + source_pk
+            match_params = [self.batch_id, spec.source_table]
+
+            result.total_source = self._scalar(
+                conn, f"SELECT COUNT(*) FROM {source_relation} s WHERE s.id IS NOT NULL", []
+            )
+            result.destination_rows = spec.destination_model.objects.using(self.destination_alias).filter(
+                migration_batch_id=self.batch_id,
+                source_table=spec.source_table,
+            ).count()
+
+            result.missing_pks = [
+                clean_text(row[0])
+                for row in self._stream(
+                    conn,
+                    f"SELECT {source_pk} FROM {source_relation} s "
+                    f"WHERE s.id IS NOT NULL AND NOT EXISTS (SELECT 1 FROM {dest_table} d WHERE {match})",
+                    match_params,
+                )
+            ]
+
+            suspect_checks = [self._payload_has_id(conn, source_pk)]
+            for source_field, dest_field in spec.critical_field_map:
+                dest_column = qn(spec.destination_model._meta.get_field(dest_field).column)
+                source_expr = f"s.{qn(source_field)}" if source_field in source_columns else "NULL"
+                suspect_checks.append(
+                    f"{self._normalized(conn, 'd.' + dest_column)} = {self._normalized(conn, source_expr)}"
+                )
+            suspect_sql = (
+                f"SELECT {source_pk} FROM {source_relation} s "
+                f"WHERE s.id IS NOT NULL AND EXISTS (SELECT 1 FROM {dest_table} d WHERE {match}) AND ("
+                + " OR ".join(
+                    f"NOT EXISTS (SELECT 1 FROM {dest_table} d WHERE {match} AND ({check}))"
+                    for check in suspect_checks
+                )
+                + ")"
+            )
+            suspect_pks = [
+                clean_text(row[0])
+                for row in self._stream(conn, suspect_sql, [self.batch_id, spec.source_table] + match_params * len(suspect_checks))
+            ]
+            result.mismatches = self._recheck(spec, suspect_pks)
+
+            failed = {pk for pk, _errors in result.mismatches}
+            destination_by_source: dict[str, list[str]] = {}
+            for source_value, dest_value in self._stream(
+                conn,
+                f"SELECT {source_pk}, d.{dest_pk} FROM {source_relation} s INNER JOIN {dest_table} d ON {match} "
+                "WHERE s.id IS NOT NULL",
+                match_params,
+            ):
+                source_value = clean_text(source_value)
+                if source_value not in failed:
+                    destination_by_source.setdefault(source_value, []).append(clean_text(dest_value))
+            result.matched = sorted(destination_by_source.items())
+        finally:
+            if staged_table:
+                self._drop_staged(conn, staged_table)
+
+        return result
+
+    def _recheck(self, spec: SourceValidationSpec, suspect_pks: list[str]) -> list[tuple[str, list[str]]]:
+        mismatches: list[tuple[str, list[str]]] = []
+        source_conn = connections[spec.alias]
+        qn = source_conn.ops.quote_name
+        for start in range(0, len(suspect_pks), self.chunk_size):
+            chunk = suspect_pks[start:start + self.chunk_size]
+            placeholders = ", ".join(["%s"] * len(chunk))
+            with source_conn.cursor() as cursor:
+                cursor.execute(f"SELECT * FROM {qn(spec.source_table)} WHERE id IN ({placeholders})", chunk)
+                columns = [col[0] for col in cursor.description]
+                source_rows = [dict(zip(columns, row)) for row in cursor.fetchall()]
+            source_by_pk = {clean_text(row.get("id")): row for row in source_rows}
+
+            destination_by_source: dict[str, list[Any]] = {}
+            for dest in spec.destination_model.objects.using(self.destination_alias).filter(
+                migration_batch_id=self.batch_id,
+                source_table=spec.source_table,
+                source_pk_value__in=chunk,
+            ):
+                destination_by_source.setdefault(clean_text(dest.source_pk_value), []).append(dest)
+
+            for source_pk in chunk:
+                source_row = source_by_pk.get(source_pk)
+                destination_rows = destination_by_source.get(source_pk, [])
+                if source_row is None or not destination_rows:
+                    continue
+                errors = critical_field_errors(spec, source_row, destination_rows)
+                if errors:
+                    mismatches.append((source_pk, errors))
+        return mismatches
+
+    def _source_columns(self, spec: SourceValidationSpec) -> set[str]:
+        conn = connections[spec.alias]
+        with conn.cursor() as cursor:
+            return {col.name for col in conn.introspection.get_table_description(cursor, spec.source_table)}
+
+    def _stage_source(self, spec: SourceValidationSpec, source_columns: set[str]) -> str:
+        source_conn = connections[spec.alias]
+        conn = connections[self.destination_alias]
+        qn = conn.ops.quote_name
+        staged_table = f"v2val_{spec.label}"
+        fields = [source_field for source_field, _dest_field in spec.critical_field_map if source_field != "id"]
+        selected = ["id"] + [name for name in fields if name in source_columns]
+
+        self._drop_staged(conn, staged_table)
+        column_sql = ", ".join(["id VARCHAR(255) NOT NULL PRIMARY KEY"] + [f"{qn(name)} TEXT NULL" for name in fields])
+        with conn.cursor() as cursor:
+            cursor.execute(f"CREATE TEMPORARY TABLE {qn(staged_table)} ({column_sql})")
+
+        insert_sql = (
+            f"INSERT INTO {qn(staged_table)} ({', '.join(qn(name) for name in selected)}) "
+            f"VALUES ({', '.join(['%s'] * len(selected))})"
+        )
+        select_sql = (
+            f"SELECT {', '.join(source_conn.ops.quote_name(name) for name in selected)} "
+            f"FROM {source_conn.ops.quote_name(spec.source_table)} WHERE id IS NOT NULL"
+        )
+        with source_conn.cursor() as source_cursor:
+            source_cursor.execute(select_sql)
+            while True:
+                rows = source_cursor.fetchmany(self.chunk_size)
+                if not rows:
+                    break
+                with conn.cursor() as cursor:
+                    cursor.executemany(
+                        insert_sql,
+                        [[None if value is None else as_text(value) for value in row] for row in rows],
+                    )
+        return staged_table
+
+    def _drop_staged(self, conn, staged_table: str) -> None:
+        keyword = "TEMPORARY TABLE" if conn.vendor == "mysql" else "TABLE"
+        with conn.cursor() as cursor:
+            cursor.execute(f"DROP {keyword} IF EXISTS {conn.ops.quote_name(staged_table)}")
+
+    def _stream(self, conn, sql: str, params: list[Any]) -> Iterator[tuple[Any, ...]]:
+        with conn.cursor() as cursor:
+            cursor.execute(sql, params)
+            while True:
+                rows = cursor.fetchmany(self.chunk_size)
+                if not rows:
+                    return
+                yield from rows
+
+    def _scalar(self, conn, sql: str, params: list[Any]) -> int:
+        with conn.cursor() as cursor:
+            cursor.execute(sql, params)
+            return int(cursor.fetchone()[0] or 0)
+
+    def _char(self, conn, expr: str) -> str:
+        return f"CAST({expr} AS CHAR)" if conn.vendor == "mysql" else f"CAST({expr} AS TEXT)"
+
+    def _normalized(self, conn, expr: str) -> str:
+        # Binary comparison on MySQL so case-insensitive collations cannot hide a mismatch.
+        text = f"COALESCE(TRIM({self._char(conn, expr)}), '')"
+        return f"CAST({text} AS BINARY)" if conn.vendor == "mysql" else text
+
+    def _payload_has_id(self, conn, source_pk: str) -> str:
+        # raw_payload_json is written by to_json(sort_keys=True), so the id key
+        # renders as `"id": 12,` / `"id": 12}` for numeric ids or `"id": "12"`.
+        patterns = [
+            ("'%%\"id\": '", source_pk, "',%%'"),
+            ("'%%\"id\": '", source_pk, "'}%%'"),
+            ("'%%\"id\": \"'", source_pk, "'\"%%'"),
+        ]
+        clauses = []
+        for prefix, value, suffix in patterns:
+            if conn.vendor == "mysql":
+                pattern = f"CONCAT({prefix}, {value}, {suffix})"
+            else:
+                pattern = f"{prefix} || {value} || {suffix}"
+            clauses.append(f"d.raw_payload_json LIKE {pattern}")
+        return " OR ".join(clauses)
@@ -1,5 +1,36 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 class SharingManagementConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'sharing_management'
+
+    def ready(self):
+        from sharing_management.fieldrep_context import invalidate_fieldrep_contexts
+        from sharing_management.services.message_templates import invalidate_message_templates
+        from sharing_management.services.schema_registry import clear_on_migrate
+        from utils.cache_generation import connect_save_delete
+
+        post_migrate.connect(clear_on_migrate, dispatch_uid="sharing_management_schema_registry")
+
+        # Any of these can change which message template wins for a share.
+        template_sources = (
+            "collateral_management.CollateralMessage",
+            "collateral_management.CampaignCollateral",
+            "collateral_management.Collateral",
+            "campaign_management.CampaignCollateral",
+            "campaign_management.Campaign",
+        )
+        connect_save_delete(invalidate_message_templates, template_sources, "share_message_template")
+
+        # Any of these can change who a logged-in field rep is or which
+        # campaigns they may share for.
+        from campaign_management.master_models import MasterCampaignFieldRep, MasterFieldRep
+
+        assignment_sources = (
+            "campaign_management.CampaignAssignment",
+            "admin_dashboard.FieldRepCampaign",
+            MasterCampaignFieldRep,
+            MasterFieldRep,
+        )
+        connect_save_delete(invalidate_fieldrep_contexts, assignment_sources, "fieldrep_context")
@@ -0,0 +1,232 @@
+# sharing_management/fieldrep_context.py
+"""
+Per-session field-rep identity, resolved once and kept in the session.
+
+Field-rep pages used to re-resolve the portal user, the master rep and its
+campaign ids on every request. ``get_fieldrep_context(request)`` resolves each
+piece the first time a view asks for it and stores the ids in the session.
+The stored copy is rebuilt when the session identity changes, when any
+campaign assignment changes (a global generation bumped from signals), or
+after FIELDREP_CONTEXT_MAX_AGE seconds, so a deactivated rep is not served
+from the session forever.
+
+The generation lives in the default cache. With a per-process backend (the
+default LocMemCache) a bump only reaches the process that made it, so a
+change saved by a Celery worker or an upload job in another web worker is
+only picked up once FIELDREP_CONTEXT_MAX_AGE passes. Anything that
+authorizes a share therefore uses ``FieldRepContext.checked_master_rep()``,
+which re-reads the rep's status and campaigns from master.
+"""
+from __future__ import annotations
+
+import time
+from dataclasses import asdict, dataclass
+from typing import Optional
+
+from django.conf import settings
+
+from campaign_management.campaign_ids import campaign_id_variants
+from utils.cache_generation import CacheGeneration
+
+
+SESSION_KEY = "fieldrep_context"
+_generation = CacheGeneration("fieldrep_context:generation")
+CONTEXT_MAX_AGE = getattr(settings, "FIELDREP_CONTEXT_MAX_AGE", 300)
+
+
+def invalidate_fieldrep_contexts(*args, **kwargs) -> None:
+    """
+    Make every stored context stale (in this process only, with a
+    per-process cache; see the module docstring).
+
+    Connected to saves/deletes of portal and master campaign assignments and
+    master reps; bulk writes that skip signals call it directly.
+    """
+    _generation.bump()
+
+
+@dataclass(frozen=True)
+class MasterRepContext:
+    rep_id: int
+    email: str
+    field_id: str
+    portal_user_id: Optional[int]
+    campaign_ids: tuple[str, ...]
+
+    @property
+    def campaign_variants(self) -> list[str]:
+        variants = []
+        for campaign_id in self.campaign_ids:
+            variants.extend(campaign_id_variants(campaign_id))
+        return list(dict.fromkeys(value for value in variants if value))
+
+
+class FieldRepContext:
+    """Lazily resolved identity for the field rep logged into ``session``."""
+
+    def __init__(self, session, data: dict):
+        self._session = session
+        self._data = data
+        self._portal_users = {}
+        self._master_rep_checked = False
+
+    @property
+    def session_rep_id(self) -> str:
+        return self._data["identity"][0]
+
+    def _store(self, key, value) -> None:
+        self._data[key] = value
+        self._session[SESSION_KEY] = self._data
+
+    @property
+    def portal_user_id(self) -> Optional[int]:
+        """
+        Portal user for the Gmail login session: by field id, then email, then
+        the session id itself. Misses are not stored, so a user created later
+        in the request is found next time.
+        """
+        if self._data.get("portal_user_id"):
+            return self._data["portal_user_id"]
+
+        from user_management.models import User
+
+        session_rep_id, email, field_id, _ = self._data["identity"]
+        user_id = None
+        if field_id:
+            user_id = User.objects.filter(field_id=field_id, role="field_rep").values_list("id", flat=True).first()
+        if not user_id and email:
+            user_id = User.objects.filter(email=email, role="field_rep").values_list("id", flat=True).first()
+        if not user_id and str(session_rep_id).isdigit():
+            user_id = User.objects.filter(id=int(session_rep_id)).values_list("id", flat=True).first()
+
+        if user_id:
+            self._store("portal_user_id", user_id)
+        return user_id
+
+    @property
+    def master_rep(self) -> Optional[MasterRepContext]:
+        """
+        Active master rep for the password login session, whose field_rep_id is
+        the MasterFieldRep id. Resolving it also mirrors the portal user and its
+        assignments, which used to happen on every page load.
+        """
+        stored = self._data.get("master_rep")
+        if stored:
+            return MasterRepContext(**{**stored, "campaign_ids": tuple(stored["campaign_ids"])})
+
+        from campaign_management.master_models import MasterFieldRep
+        from sharing_management.views import (
+            _ensure_portal_user_for_master_fieldrep,
+            _master_db_alias,
+            _master_get_campaign_ids_for_fieldrep,
+        )
+
+        try:
+            rep = (
+                MasterFieldRep.objects.using(_master_db_alias())
+                .select_related("user")
+                .filter(id=int(self.session_rep_id), is_active=True)
+                .first()
+            )
+        except Exception:
+            rep = None
+        if not rep:
+            return None
+
+        portal_user = _ensure_portal_user_for_master_fieldrep(rep)
+        if portal_user:
+            self._portal_users[portal_user.pk] = portal_user
+        master_rep = MasterRepContext(
+            rep_id=int(rep.id),
+            email=(rep.user.email or ""),
+            field_id=(rep.brand_supplied_field_rep_id or ""),
+            portal_user_id=getattr(portal_user, "pk", None),
+            campaign_ids=tuple(_master_get_campaign_ids_for_fieldrep(int(rep.id))),
+        )
+        # Mirroring may have created assignments and bumped the generation;
+        # stamp the copy with the generation as of now so it is not rebuilt again.
+        self._data["generation"] = _generation.current()
+        self._store("master_rep", {**asdict(master_rep), "campaign_ids": list(master_rep.campaign_ids)})
+        self._master_rep_checked = True
+        return master_rep
+
+    def checked_master_rep(self) -> Optional[MasterRepContext]:
+        """
+        ``master_rep`` re-validated against master: the rep must still be
+        active, and its campaign ids are re-read. Call it before authorizing
+        a share. An assignment revoked in another process may not have bumped
+        this process's generation, so the stored copy alone is not enough.
+        """
+        master_rep = self.master_rep
+        if master_rep is None or self._master_rep_checked:
+            return master_rep
+
+        from campaign_management.master_models import MasterFieldRep
+        from sharing_management.views import _master_db_alias, _master_get_campaign_ids_for_fieldrep
+
+        try:
+            active = (
+                MasterFieldRep.objects.using(_master_db_alias())
+                .filter(id=master_rep.rep_id, is_active=True)
+                .exists()
+            )
+            campaign_ids = tuple(_master_get_campaign_ids_for_fieldrep(master_rep.rep_id)) if active else ()
+        except Exception:
+            active = False
+        if not active:
+            self._data.pop("master_rep", None)
+            self._session[SESSION_KEY] = self._data
+            return None
+
+        self._master_rep_checked = True
+        if campaign_ids != master_rep.campaign_ids:
+            master_rep = MasterRepContext(**{**asdict(master_rep), "campaign_ids": campaign_ids})
+            self._store("master_rep", {**asdict(master_rep), "campaign_ids": list(campaign_ids)})
+        return master_rep
+
+    def portal_user(self, user_id: Optional[int] = None):
+        """The portal User row for ``user_id`` (default: portal_user_id), loaded once per request."""
+        user_id = user_id or self.portal_user_id
+        if not user_id:
+            return None
+        if user_id not in self._portal_users:
+            from user_management.models import User
+
+            self._portal_users[user_id] = User.objects.filter(pk=user_id).first()
+        return self._portal_users[user_id]
+
+
+def _session_identity(session) -> list:
+    return [
+        str(session.get("field_rep_id") or ""),
+        session.get("field_rep_email") or "",
+        session.get("field_rep_field_id") or "",
+        str(session.get("master_fieldrep_id") or ""),
+    ]
+
+
+def load_fieldrep_context(session) -> Optional[FieldRepContext]:
+    identity = _session_identity(session)
+    if not identity[0]:
+        session.pop(SESSION_KEY, None)
+        return None
+
+    stored = session.get(SESSION_KEY)
+    if (
+        isinstance(stored, dict)
+        and stored.get("identity") == identity
+        and stored.get("generation") == _generation.current()
+        and time.time() - stored.get("built_at", 0) < CONTEXT_MAX_AGE
+    ):
+        return FieldRepContext(session, stored)
+
+    data = {"identity": identity, "generation": _generation.current(), "built_at": time.time()}
+    session[SESSION_KEY] = data
+    return FieldRepContext(session, data)
+
+
+def get_fieldrep_context(request) -> Optional[FieldRepContext]:
+    """The request's field-rep context, or None without a field-rep session."""
+    if not hasattr(request, "_fieldrep_context"):
+        request._fieldrep_context = load_fieldrep_context(request.session)
+    return request._fieldrep_context
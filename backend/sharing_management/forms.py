@@ -1,3 +1,4 @@
+import codecs
 import csv, io, re
 import logging
 
@@ -11,12 +12,20 @@ from django.utils import timezone
 from django.utils.text import slugify
 from django.utils.safestring import mark_safe
 from user_management.models import User
-from doctor_viewer.models import Doctor, DoctorCollateral, DoctorEngagement
+from doctor_viewer.models import Doctor, DoctorEngagement
 from collateral_management.models import Collateral
 from collateral_management.models import CampaignCollateral as CMCampaignCollateral
 from campaign_management.campaign_ids import resolve_portal_campaign
 from campaign_management.models import Campaign
 from .models import ShareLog
+from .services.bulk_share_import import (
+    DEFAULT_DEDUPE_WINDOW,
+    BulkShareImporter,
+    CollateralIndex,
+    FieldRepIndex,
+    ShareImportRow,
+)
+from upload_jobs.services import check_upload_size
 
 # ─── Common constants ──────────────────────────────────────────────────────────
 CHANNEL_CHOICES = (
@@ -172,12 +181,8 @@ class ShareForm(forms.Form):
         super().__init__(*args, **kwargs)
 
         self.user = user
-        from django.utils import timezone
-        from django.db.models import Q
         from campaign_management.models import Campaign
-        from collateral_management.models import CampaignCollateral as CMCampaignCollateral
-
-        today = timezone.now().date()
+        from collateral_management.live_index import live_collaterals
 
         # --------------------------------------------------
         # STEP 1: Filter collaterals safely
@@ -185,18 +190,11 @@ class ShareForm(forms.Form):
         if brand_campaign_id:
             campaign = resolve_portal_campaign(brand_campaign_id, sync_from_master=True)
             if campaign:
-                cc_qs = CMCampaignCollateral.objects.filter(
-                    campaign=campaign,
-                    collateral__is_active=True
-                ).filter(
-                    Q(start_date__isnull=True) | Q(start_date__lte=today),
-                    Q(end_date__isnull=True) | Q(end_date__gte=today),
-                )
-
-                self.fields['collateral'].queryset = Collateral.objects.filter(
-                    id__in=cc_qs.values_list('collateral_id', flat=True),
-                    is_active=True
-                ).order_by('-created_at')
+                # Live today through the campaign's CampaignCollateral window
+                self.fields['collateral'].queryset = live_collaterals(
+                    campaign.pk,
+                    bridge_only=True,
+                ).filter(is_active=True).order_by('-created_at')
             else:
                 self.fields['collateral'].queryset = Collateral.objects.none()
         else:
@@ -391,8 +389,21 @@ class CalendarCampaignCollateralForm(forms.ModelForm):
         return instance
 
 
+# ─── Bulk share imports (shared) ──────────────────────────────────────────────
+def _format_row_errors(row_errors, prefix="Row"):
+    return [f"{prefix} {row_no}: {msg}" for row_no, msg in sorted(row_errors, key=lambda e: e[0])]
+
+
+class BulkShareImportMixin:
+    """
+    Shared by the bulk share forms. ``save()`` resolves rows in memory and hands
+    them to BulkShareImporter, reporting through ``progress``.
+    """
+    progress = None  # optional callable(stage, done, total)
+
+
 # ─── Bulk *manual* share (existing) ────────────────────────────────────────────
-class BulkManualShareForm(forms.Form):
+class BulkManualShareForm(BulkShareImportMixin, forms.Form):
     """
     Expects a CSV with header row:
 
@@ -409,12 +420,8 @@ class BulkManualShareForm(forms.Form):
                    "collateral_id,share_channel,message_text"),
     )
 
-    MAX_SIZE = 2 * 1024 * 1024  # 2 MB
-
     def clean_csv_file(self):
-        f = self.cleaned_data["csv_file"]
-        if f.size > self.MAX_SIZE:
-            raise ValidationError("CSV larger than 2 MB")
+        f = check_upload_size(self.cleaned_data["csv_file"])
         return f
 
     def save(self, *, user_request, campaign=None):
@@ -423,12 +430,8 @@ class BulkManualShareForm(forms.Form):
             created_count, all_messages, errors
         """
         from django.contrib.auth import get_user_model
-        from django.utils import timezone
-        from datetime import timedelta
         from campaign_management.models import CampaignAssignment
         from admin_dashboard.models import FieldRepCampaign
-        from shortlink_management.models import ShortLink
-        from shortlink_management.utils import generate_short_code
 
         UserModel = get_user_model()
 
@@ -507,60 +510,55 @@ class BulkManualShareForm(forms.Form):
             file_obj.seek(0)
             reader = csv.DictReader(file_obj)
 
+            parsed, row_errors = [], []
             for row_no, r in enumerate(reader, start=2):
-                try:
-                    rep_email = r.get("field_rep_email", "").strip()
-                    doctor_name = r.get("doctor_name", "").strip()
-                    doctor_contact = r.get("doctor_contact", "").strip()
-                    col_id = r.get("collateral_id", "").strip()
-                    share_channel = r.get("share_channel", "").strip() or "WhatsApp"
-                    message_text = (r.get("message_text") or "").strip()
-
-                    if not any([rep_email, doctor_name, doctor_contact]):
-                        continue
-
-                    rep = UserModel.objects.filter(role="field_rep", email__iexact=rep_email).first()
-                    if not rep:
-                        raise ValueError(f"Field rep {rep_email} not found")
-
-                    col = None
-                    if col_id:
-                        col = Collateral.objects.get(id=int(col_id))
-
-                    cutoff = timezone.now() - timedelta(hours=24)
-                    if ShareLog.objects.filter(
-                        field_rep=rep,
-                        doctor_identifier=doctor_contact or doctor_name,
-                        collateral=col,
-                        share_channel=share_channel,
-                        share_timestamp__gte=cutoff
-                    ).exists():
-                        continue
-
-                    sl, _ = ShortLink.objects.get_or_create(
-                        resource_type="collateral",
-                        resource_id=col.id,
-                        defaults=dict(
-                            short_code=generate_short_code(),
-                            is_active=True,
-                            created_by=user_request,
-                        ),
-                    )
-
-                    ShareLog.objects.create(
-                        short_link=sl,
-                        field_rep=rep,
-                        doctor_identifier=doctor_contact or doctor_name,
-                        share_channel=share_channel,
-                        message_text=message_text,
-                        collateral=col,
-                        uploaded_by=user_request,   # ✅ THIS IS THE FIX
-                    )
-
-                    created += 1
+                rep_email = (r.get("field_rep_email") or "").strip()
+                doctor_name = (r.get("doctor_name") or "").strip()
+                doctor_contact = (r.get("doctor_contact") or "").strip()
+                if not any([rep_email, doctor_name, doctor_contact]):
+                    continue
+                parsed.append((
+                    row_no,
+                    rep_email,
+                    doctor_contact or doctor_name,
+                    (r.get("collateral_id") or "").strip(),
+                    (r.get("share_channel") or "").strip() or "WhatsApp",
+                    (r.get("message_text") or "").strip(),
+                ))
+
+            reps = FieldRepIndex(UserModel.objects.filter(role="field_rep"))
+            collaterals = CollateralIndex(col_id for _, _, _, col_id, _, _ in parsed if col_id)
+
+            rows = []
+            for row_no, rep_email, identifier, col_id, share_channel, message_text in parsed:
+                rep = reps.find([("email_ci", rep_email)])
+                if not rep:
+                    row_errors.append((row_no, f"Field rep {rep_email} not found"))
+                    continue
+                if not col_id:
+                    row_errors.append((row_no, "collateral_id is required"))
+                    continue
+                col = collaterals.get(col_id)
+                if not col:
+                    row_errors.append((row_no, f"Collateral {col_id} not found"))
+                    continue
+                rows.append(ShareImportRow(
+                    row_no=row_no,
+                    rep=rep,
+                    collateral=col,
+                    phone=identifier,
+                    share_channel=share_channel,
+                    message_text=message_text,
+                ))
 
-                except Exception as exc:
-                    errors.append(f"Row {row_no}: {exc}")
+            result = BulkShareImporter(
+                short_link_created_by=user_request,
+                active_short_links_only=False,
+                dedupe_window=DEFAULT_DEDUPE_WINDOW,
+                progress=self.progress,
+            ).run(rows)
+            created += result.created
+            errors.extend(_format_row_errors(row_errors + result.errors))
 
         else:
             errors.append("Invalid CSV format. Please use the provided template.")
@@ -576,7 +574,7 @@ logger = logging.getLogger(__name__)
 _whatsapp_re = re.compile(r"^\+?\d{10,15}$")
 
 
-class BulkPreMappedUploadForm(forms.Form):
+class BulkPreMappedUploadForm(BulkShareImportMixin, forms.Form):
     """
     CSV with header row:
 
@@ -588,69 +586,18 @@ class BulkPreMappedUploadForm(forms.Form):
         help_text="Columns: Doctor Name, Whatsapp Number, Field Rep ID (collateral_id optional)",
     )
 
-    MAX_SIZE = 2 * 1024 * 1024  # 2 MB
-
     # 1️⃣ basic size & extension checks
     def clean_csv_file(self):
-        f = self.cleaned_data["csv_file"]
-        if f.size > self.MAX_SIZE:
-            raise ValidationError("File larger than 2 MB.")
+        f = check_upload_size(self.cleaned_data["csv_file"])
         if not f.name.lower().endswith(".csv"):
             raise ValidationError("Only .csv files are accepted.")
         return f
 
-    # 2️⃣ helper – get / create doctor
-    def _doctor_for_row(self, name: str, phone: str, rep: User) -> Doctor:
-        obj, _ = Doctor.objects.get_or_create(
-            rep=rep,
-            phone=phone,
-            defaults={"name": name.strip().title()},
-        )
-        return obj
-
-    # 3️⃣ helper – create map + share-log
-    def _create_link_and_sharelog(self, doctor, collateral, rep):
-        from shortlink_management.models import ShortLink
-        from shortlink_management.utils import generate_short_code
-
-        DoctorCollateral.objects.get_or_create(
-            doctor=doctor,
-            collateral=collateral,
-        )
-
-        short = (
-            ShortLink.objects.filter(
-                resource_type="collateral",
-                resource_id=collateral.id,
-                is_active=True,
-            ).first()
-            or ShortLink.objects.create(
-                short_code=generate_short_code(8),
-                resource_type="collateral",
-                resource_id=collateral.id,
-                created_by=rep,
-                is_active=True,
-            )
-        )
-
-        return ShareLog.objects.create(
-            short_link=short,
-            field_rep=rep,
-            doctor_identifier=doctor.phone,
-            share_channel="WhatsApp",
-            message_text="",
-            collateral=collateral,
-        )
-
-    # 4️⃣ parse, validate & save
+    # 2️⃣ parse, validate & save
     def save(self, *, admin_user):
         """
         Returns (created_count, errors_list)
         """
-        from collateral_management.models import Collateral
-
-        created = 0
-        errors = []
 
         try:
             content = self.cleaned_data["csv_file"].read().decode(
@@ -698,6 +645,7 @@ class BulkPreMappedUploadForm(forms.Form):
                 f"Found columns: {', '.join(fieldnames)}"
             ]
 
+        parsed, row_errors = [], []
         for row_no, row in enumerate(reader, start=2):
             try:
                 name = (row.get(doctor_name_col) or "").strip()
@@ -720,51 +668,52 @@ class BulkPreMappedUploadForm(forms.Form):
                 if not _whatsapp_re.match(phone):
                     raise ValueError(f"Invalid WhatsApp number: {phone_raw}")
 
-                # Resolve collateral
-                if collateral_raw:
-                    try:
-                        collateral = Collateral.objects.get(id=int(collateral_raw))
-                    except (ValueError, Collateral.DoesNotExist):
-                        raise ValueError(f"Invalid collateral_id '{collateral_raw}'")
-                else:
-                    collateral = (
-                        Collateral.objects.filter(is_active=True)
-                        .order_by("-created_at")
-                        .first()
-                    )
-                    if not collateral:
-                        raise ValueError("No active collateral available")
-
-                # Resolve field rep
-                try:
-                    rep = User.objects.get(pk=int(rep_id_raw), role="field_rep")
-                except (ValueError, User.DoesNotExist):
-                    try:
-                        rep = User.objects.get(
-                            field_id=rep_id_raw, role="field_rep"
-                        )
-                    except User.DoesNotExist:
-                        raise ValueError(
-                            f"Field Rep '{rep_id_raw}' not found"
-                        )
+                parsed.append((row_no, name, phone, rep_id_raw, collateral_raw))
+            except Exception as exc:
+                row_errors.append((row_no, str(exc)))
+
+        # Resolve reps and collaterals against preloaded indexes
+        reps = FieldRepIndex()
+        collaterals = CollateralIndex(raw for *_, raw in parsed if raw)
+
+        rows = []
+        for row_no, name, phone, rep_id_raw, collateral_raw in parsed:
+            if collateral_raw:
+                collateral = collaterals.get(collateral_raw)
+                if not collateral:
+                    row_errors.append((row_no, f"Invalid collateral_id '{collateral_raw}'"))
+                    continue
+            else:
+                collateral = collaterals.default
+                if not collateral:
+                    row_errors.append((row_no, "No active collateral available"))
+                    continue
 
-                with transaction.atomic():
-                    doctor = self._doctor_for_row(name, phone, rep)
-                    self._create_link_and_sharelog(
-                        doctor, collateral, rep
-                    )
+            rep = reps.find([("pk", rep_id_raw), ("field_id", rep_id_raw)])
+            if not rep:
+                row_errors.append((row_no, f"Field Rep '{rep_id_raw}' not found"))
+                continue
 
-                created += 1
+            rows.append(ShareImportRow(
+                row_no=row_no,
+                rep=rep,
+                collateral=collateral,
+                phone=phone,
+                doctor_name=name.strip().title(),
+            ))
 
-            except Exception as exc:
-                errors.append(f"Line {row_no}: {exc}")
+        result = BulkShareImporter(
+            short_link_created_by=lambda row: row.rep,
+            map_doctors=True,
+            progress=self.progress,
+        ).run(rows)
 
-        return created, errors
+        return result.created, _format_row_errors(row_errors + result.errors, prefix="Line")
 
 
 
 # ─── Bulk *manual* – WhatsApp‑only ───────────────────────────────────────────
-class BulkManualWhatsappShareForm(forms.Form):
+class BulkManualWhatsappShareForm(BulkShareImportMixin, forms.Form):
     """
     CSV (<2 MB) with **two or three columns, no header**:
 
@@ -776,12 +725,9 @@ class BulkManualWhatsappShareForm(forms.Form):
                    "Only field_rep_id and phone_number are required<br>"
                    "Example: FR22,+919876543210 or FR22,Dr. John,+919876543210"),
     )
-    MAX_SIZE = 2 * 1024 * 1024  # 2 MB
 
     def clean_csv_file(self):
-        f = self.cleaned_data["csv_file"]
-        if f.size > self.MAX_SIZE:
-            raise ValidationError("CSV larger than 2 MB")
+        f = check_upload_size(self.cleaned_data["csv_file"])
         return f
 
     def save(self, *, user_request):
@@ -790,10 +736,6 @@ class BulkManualWhatsappShareForm(forms.Form):
         Returns (created_cnt, errors[list]).
         """
         from django.contrib.auth import get_user_model
-        from shortlink_management.models import ShortLink
-        from shortlink_management.utils import generate_short_code
-        from django.utils import timezone
-        from datetime import timedelta
 
         data = self.cleaned_data["csv_file"].read().decode()
         file_obj = io.StringIO(data)
@@ -827,68 +769,46 @@ class BulkManualWhatsappShareForm(forms.Form):
             )
             start_row = 1
 
+        reps = FieldRepIndex(UserModel.objects.filter(role="field_rep"))
+        default_col = None
+        row_errors, rows = [], []
+
         for row_no, row in enumerate(rows_iter, start=start_row):
             try:
                 # Ensure we have at least 2 columns (doctor_name is optional)
                 if len(row) < 2:
                     raise ValueError(f"Row has only {len(row)} columns. Expected at least 2: field_rep_id, phone_number")
-                
+
                 # Pad row to 3 columns if doctor_name is missing
                 row = list(row) + [""] * (3 - len(row))
                 rep_email, doctor_name, phone_number = row
-                
-                # Validate required fields
-                doctor_name = doctor_name.strip() if doctor_name else ""
-                # If doctor name is empty, use field rep ID as doctor identifier
-                if not doctor_name:
-                    doctor_name = rep_email  # Use field rep ID as doctor name
 
                 # field‑rep (accept both email and field rep ID)
-                rep = None
                 rep_email = rep_email.strip() if rep_email else ""
-                
+
                 if not rep_email:
                     raise ValueError("Field Rep email/ID cannot be empty")
-                
-                # Try multiple approaches to find the field rep
-                search_attempts = [
-                    # Exact email match
-                    lambda: UserModel.objects.filter(email=rep_email, role="field_rep").first(),
-                    # Case-insensitive email match
-                    lambda: UserModel.objects.filter(email__iexact=rep_email, role="field_rep").first(),
-                    # Exact field_id match
-                    lambda: UserModel.objects.filter(field_id=rep_email, role="field_rep").first(),
-                    # Case-insensitive field_id match
-                    lambda: UserModel.objects.filter(field_id__iexact=rep_email, role="field_rep").first(),
-                    # Partial field_id match
-                    lambda: UserModel.objects.filter(field_id__icontains=rep_email, role="field_rep").first(),
-                    # Username match
-                    lambda: UserModel.objects.filter(username__iexact=rep_email, role="field_rep").first(),
-                ]
-                
-                for attempt in search_attempts:
-                    rep = attempt()
-                    if rep:
-                        break
-                
-                # Try numeric conversion for primary key
-                if not rep:
-                    try:
-                        rep_id_numeric = int(rep_email)
-                        rep = UserModel.objects.filter(pk=rep_id_numeric, role="field_rep").first()
-                    except (ValueError, TypeError):
-                        pass
-                
+
+                rep = reps.find([
+                    ("email", rep_email),
+                    ("email_ci", rep_email),
+                    ("field_id", rep_email),
+                    ("field_id_ci", rep_email),
+                    ("field_id_contains", rep_email),
+                    ("username_ci", rep_email),
+                    ("pk", rep_email),
+                ])
+
                 if not rep:
                     # AUTO-CREATE field rep if not found
                     try:
                         from django.contrib.auth.hashers import make_password
                         import string
                         import random
-                        
+
                         # Generate a default password
                         default_password = ''.join(random.choices(string.ascii_letters + string.digits, k=8))
-                        
+
                         # Determine if rep_email looks like an email or field ID
                         if '@' in rep_email:
                             # It's an email
@@ -900,9 +820,9 @@ class BulkManualWhatsappShareForm(forms.Form):
                             field_id = rep_email
                             email = f'{rep_email}@example.com'
                             username = f'fieldrep_{rep_email.lower()}'
-                        
+
                         # Create new field rep user
-                        new_rep = UserModel.objects.create(
+                        rep = UserModel.objects.create(
                             username=username,
                             email=email,
                             field_id=field_id,
@@ -910,12 +830,11 @@ class BulkManualWhatsappShareForm(forms.Form):
                             password=make_password(default_password),
                             is_active=True
                         )
-                        
-                        rep = new_rep
-                        print(f"DEBUG: Auto-created new field rep: {new_rep}")
-                        
+                        reps.add(rep)
+                        logger.info("Auto-created field rep %s", rep)
+
                     except Exception as create_error:
-                        print(f"DEBUG: Failed to create field rep: {create_error}")
+                        logger.warning("Failed to create field rep: %s", create_error)
                         # Provide helpful error message with available field reps
                         available_reps = UserModel.objects.filter(role="field_rep").values_list('email', 'field_id', 'username')[:5]
                         if available_reps:
@@ -925,15 +844,16 @@ class BulkManualWhatsappShareForm(forms.Form):
                             raise ValueError(f"Field Rep with email or ID '{rep_email}' not found. No field representatives exist in the system.")
 
                 # Use the most recent active collateral as default
-                col = Collateral.objects.filter(is_active=True).order_by('-created_at').first()
-                if not col:
+                if default_col is None:
+                    default_col = Collateral.objects.filter(is_active=True).order_by('-created_at').first()
+                if not default_col:
                     raise ValueError("No active collaterals found in system. Please create at least one active collateral first.")
 
                 # quick phone sanity
                 phone_number = phone_number.strip() if phone_number else ""
                 if not phone_number:
                     raise ValueError("Phone number cannot be empty")
-                
+
                 # Handle scientific notation from Excel (e.g., 9.19812E+11)
                 try:
                     if 'E' in phone_number.upper() or 'e' in phone_number:
@@ -941,51 +861,29 @@ class BulkManualWhatsappShareForm(forms.Form):
                         phone_number = str(int(float(phone_number)))
                 except:
                     pass  # If conversion fails, use original value
-                
+
                 digits = "".join(ch for ch in phone_number if ch.isdigit())
                 if len(digits) < 8:
                     raise ValueError("phone_number looks too short")
 
-                # Check for duplicate in last 24 hours
-                cutoff_time = timezone.now() - timedelta(hours=24)
-                duplicate_exists = ShareLog.objects.filter(
-                    field_rep=rep,
-                    doctor_identifier=digits,
-                    collateral=col,
-                    share_channel="WhatsApp",
-                    share_timestamp__gte=cutoff_time
-                ).exists()
-
-                if duplicate_exists:
-                    continue  # Skip duplicate
-
-                # short‑link (create or reuse)
-                sl, _ = ShortLink.objects.get_or_create(
-                    resource_type="collateral",
-                    resource_id=col.id,
-                    defaults=dict(
-                        short_code=generate_short_code(),
-                        is_active=True,
-                        created_by=user_request,
-                    ),
-                )
-
-                ShareLog.objects.create(
-                    short_link=sl,
-                    field_rep=rep,
-                    doctor_identifier=digits,
-                    share_channel="WhatsApp",
-                    message_text="",
-                    collateral=col,
-                )
-                created += 1
+                rows.append(ShareImportRow(row_no=row_no, rep=rep, collateral=default_col, phone=digits))
 
             except Exception as exc:
-                errors.append(f"Row {row_no}: {exc}")
+                row_errors.append((row_no, str(exc)))
+
+        # Duplicates within the last 24 hours are skipped
+        result = BulkShareImporter(
+            short_link_created_by=user_request,
+            active_short_links_only=False,
+            dedupe_window=DEFAULT_DEDUPE_WINDOW,
+            progress=self.progress,
+        ).run(rows)
+        created = result.created
+        errors = _format_row_errors(row_errors + result.errors)
 
         return created, errors
 
-class BulkPreFilledWhatsappShareForm(forms.Form):
+class BulkPreFilledWhatsappShareForm(BulkShareImportMixin, forms.Form):
     """
     CSV with header: Doctor Name, Whatsapp Number, Field Rep ID (collateral_id, message_text optional)
     """
@@ -994,12 +892,8 @@ class BulkPreFilledWhatsappShareForm(forms.Form):
         help_text="CSV must include Doctor Name, Whatsapp Number, Field Rep ID (collateral_id, message_text optional)",
     )
 
-    MAX_SIZE = 2 * 1024 * 1024
-
     def clean_csv_file(self):
-        f = self.cleaned_data["csv_file"]
-        if f.size > self.MAX_SIZE:
-            raise ValidationError("File is too large.")
+        f = check_upload_size(self.cleaned_data["csv_file"])
         if not f.name.lower().endswith(".csv"):
             raise ValidationError("Only CSV files allowed.")
         return f
@@ -1014,11 +908,6 @@ class BulkPreFilledWhatsappShareForm(forms.Form):
             }
         """
         from django.contrib.auth import get_user_model
-        from collateral_management.models import Collateral as CModel
-        from shortlink_management.models import ShortLink
-        from shortlink_management.utils import generate_short_code
-        from django.utils import timezone
-        from datetime import timedelta
         from django.conf import settings
 
         f = io.StringIO(self.cleaned_data["csv_file"].read().decode())
@@ -1035,46 +924,44 @@ class BulkPreFilledWhatsappShareForm(forms.Form):
             stats["errors"].append("CSV must include: Doctor Name, Whatsapp Number, Field Rep ID")
             return stats
 
+        reps = FieldRepIndex(UserModel.objects.filter(role="field_rep"))
+        parsed, row_errors = [], []
+
         for row_no, row in enumerate(reader, start=2):  # header = row 1
-            try:
-                # Support both your headers and standard headers
-                name = (row.get("doctor_name") or row.get("Doctor Name") or "").strip()
-                phone = (row.get("whatsapp_number") or row.get("Whatsapp Number") or "").strip()
-                rep_id = (row.get("fieldrep_id") or row.get("Field Rep ID") or "").strip()
-                col_id = (row.get("collateral_id") or "").strip()
-                message_text = (row.get("message_text") or "").strip()
-
-                if not all([name, phone, rep_id]):
-                    raise ValueError("Missing required column value")
+            # Support both your headers and standard headers
+            name = (row.get("doctor_name") or row.get("Doctor Name") or "").strip()
+            phone = (row.get("whatsapp_number") or row.get("Whatsapp Number") or "").strip()
+            rep_id = (row.get("fieldrep_id") or row.get("Field Rep ID") or "").strip()
+            col_id = (row.get("collateral_id") or "").strip()
+            message_text = (row.get("message_text") or "").strip()
+
+            if not all([name, phone, rep_id]):
+                row_errors.append((row_no, "Missing required column value"))
+                continue
+            parsed.append((row_no, phone, rep_id, col_id, message_text))
+
+        collaterals = CollateralIndex((col_id for _, _, _, col_id, _ in parsed if col_id), active_only=True)
 
+        rows = []
+        for row_no, phone, rep_id, col_id, message_text in parsed:
+            try:
                 # Get field rep - handle both integer and string field_rep_id
-                try:
-                    # First try to find by field_id (which can be string like "FR1234")
-                    rep = UserModel.objects.filter(role="field_rep", field_id=rep_id).first()
-                    if not rep:
-                        # If not found by field_id, try by username pattern
-                        rep = UserModel.objects.filter(role="field_rep", username=f"field_rep_{rep_id}").first()
-                    if not rep:
-                        # Last resort: try if rep_id is a numeric user ID
-                        try:
-                            rep = UserModel.objects.get(id=int(rep_id), role="field_rep")
-                        except (ValueError, UserModel.DoesNotExist):
-                            pass
-                    
-                    if not rep:
-                        raise ValueError(f"Unknown fieldrep_id «{rep_id}»")
-                except Exception:
+                rep = reps.find([
+                    ("field_id", rep_id),
+                    ("username", f"field_rep_{rep_id}"),
+                    ("pk", rep_id),
+                ])
+                if not rep:
                     raise ValueError(f"Unknown fieldrep_id «{rep_id}»")
 
                 # Get collateral (optional - use default if not provided)
                 if col_id:
-                    try:
-                        col = CModel.objects.get(id=int(col_id), is_active=True)
-                    except Exception:
+                    col = collaterals.get(col_id)
+                    if not col:
                         raise ValueError(f"Unknown/Inactive collateral_id «{col_id}»")
                 else:
                     # Use the most recent active collateral as default
-                    col = CModel.objects.filter(is_active=True).order_by('-created_at').first()
+                    col = collaterals.default
                     if not col:
                         raise ValueError("No collateral_id provided and no active collaterals found in system.")
 
@@ -1086,56 +973,34 @@ class BulkPreFilledWhatsappShareForm(forms.Form):
                         phone = str(int(float(phone)))
                 except:
                     pass  # If conversion fails, use original value
-                
+
                 digits = "".join(ch for ch in phone if ch.isdigit() or ch == "+")
                 if len(digits) < 8:
                     raise ValueError("Invalid whatsapp_number")
 
-                # Check for duplicate in last 24 hours
-                cutoff_time = timezone.now() - timedelta(hours=24)
-                duplicate_exists = ShareLog.objects.filter(
-                    field_rep=rep,
-                    doctor_identifier=digits,
+                rows.append(ShareImportRow(
+                    row_no=row_no,
+                    rep=rep,
                     collateral=col,
-                    share_channel="WhatsApp",
-                    share_timestamp__gte=cutoff_time
-                ).exists()
-
-                if duplicate_exists:
-                    continue  # Skip duplicate
-
-                # Create/find short link
-                sl = ShortLink.objects.filter(
-                    resource_type="collateral", resource_id=col.id, is_active=True
-                ).first()
-                if not sl:
-                    sl = ShortLink.objects.create(
-                        resource_type="collateral",
-                        resource_id=col.id,
-                        short_code=generate_short_code(length=8),
-                        is_active=True,
-                        created_by=admin_user if getattr(admin_user, "is_authenticated", False) else None,
-                    )
-
-                # Create ShareLog
-                share_log = ShareLog.objects.create(
-                    short_link=sl,
-                    field_rep=rep,
-                    doctor_identifier=digits,
-                    share_channel="WhatsApp",
+                    phone=digits,
                     message_text=message_text,
-                    collateral=col,
-                )
-                
-                stats["logs"].append(share_log)
-                stats["created"] += 1
+                ))
 
             except Exception as e:
-                msg = f"Row {row_no}: {e}"
-                stats["errors"].append(msg)
-
+                row_errors.append((row_no, str(e)))
+
+        # Duplicates within the last 24 hours are skipped
+        result = BulkShareImporter(
+            short_link_created_by=admin_user if getattr(admin_user, "is_authenticated", False) else None,
+            dedupe_window=DEFAULT_DEDUPE_WINDOW,
+            progress=self.progress,
+        ).run(rows)
+
+        stats["created"] = result.created
+        stats["logs"] = result.share_logs
+        stats["errors"] = _format_row_errors(row_errors + result.errors)
         return stats
-class BulkPreMappedByLoginForm(forms.Form):
+class BulkPreMappedByLoginForm(BulkShareImportMixin, forms.Form):
     """
     Pre-register doctor ↔ collateral without sending via WhatsApp/SMS/Email.
     CSV with REQUIRED header: Doctor Name, Gmail ID, Field Rep ID (collateral_id optional)
@@ -1143,144 +1008,114 @@ class BulkPreMappedByLoginForm(forms.Form):
     csv_file = forms.FileField(
         help_text="CSV with header: Doctor Name,Gmail ID,Field Rep ID (collateral_id optional)"
     )
-    MAX_SIZE = 2 * 1024 * 1024  # 2 MB
 
     def clean_csv_file(self):
-        f = self.cleaned_data["csv_file"]
-        if f.size > self.MAX_SIZE:
-            raise ValidationError("CSV larger than 2 MB")
+        f = check_upload_size(self.cleaned_data["csv_file"])
         return f
 
     def _digits(self, s: str) -> str:
         return "".join(ch for ch in (s or "") if ch.isdigit() or ch == "+")
 
-    def _doctor_for_row(self, rep, name: str, phone: str):
-        digits = self._digits(phone)
-        if not digits:
-            raise ValueError("Missing/invalid whatsapp_number")
-        doc, created = Doctor.objects.get_or_create(
-            rep=rep, phone=digits,
-            defaults={"name": name or digits, "source": "manual"}
-        )
-        # keep name updated if newly provided
-        if not created and name and doc.name != name:
-            doc.name = name
-            doc.save(update_fields=["name"])
-        return doc, created
-
     def save(self, *, admin_user):
         import io
         from django.contrib.auth import get_user_model
-        from collateral_management.models import Collateral as CModel  # to avoid name clash
-        from shortlink_management.models import ShortLink
-        from shortlink_management.utils import generate_short_code
         from django.conf import settings
 
         file_obj = io.StringIO(self.cleaned_data["csv_file"].read().decode())
         reader = csv.DictReader(file_obj)
 
-        created_doctors = 0
-        created_or_existing_links = 0
-        updated_mappings = 0
-        errors, rows = [], []
-
         UserModel = get_user_model()
+        reps = FieldRepIndex(UserModel.objects.filter(role="field_rep"))
+        parsed, row_errors = [], []
 
         for row_no, row in enumerate(reader, start=2):  # header = row 1
-            try:
-                # Support both your headers and standard headers
-                name   = (row.get("doctor_name") or row.get("Doctor Name") or "").strip()
-                email  = (row.get("gmail_id") or row.get("Gmail ID") or "").strip()
-                phone  = (row.get("whatsapp_number") or "").strip()
-                rep_id = (row.get("fieldrep_id") or row.get("Field Rep ID") or "").strip()
-                col_id = (row.get("collateral_id") or "").strip()
-
-                if not rep_id:
-                    raise ValueError("Field Rep ID is required")
-                
-                # Use email as primary contact, phone as fallback
-                primary_contact = email if email else phone
+            # Support both your headers and standard headers
+            name   = (row.get("doctor_name") or row.get("Doctor Name") or "").strip()
+            email  = (row.get("gmail_id") or row.get("Gmail ID") or "").strip()
+            phone  = (row.get("whatsapp_number") or "").strip()
+            rep_id = (row.get("fieldrep_id") or row.get("Field Rep ID") or "").strip()
+            col_id = (row.get("collateral_id") or "").strip()
+
+            if not rep_id:
+                row_errors.append((row_no, "Field Rep ID is required"))
+                continue
+
+            # Use email as primary contact, phone as fallback
+            parsed.append((row_no, name, email if email else phone, rep_id, col_id))
+
+        collaterals = CollateralIndex((col_id for *_, col_id in parsed if col_id), active_only=True)
 
+        rows = []
+        for row_no, name, primary_contact, rep_id, col_id in parsed:
+            try:
                 # field rep - handle both integer and string field_rep_id
-                try:
-                    # First try to find by field_id (which can be string like "FR1234")
-                    rep = UserModel.objects.filter(role="field_rep", field_id=rep_id).first()
-                    if not rep:
-                        # If not found by field_id, try by username pattern
-                        rep = UserModel.objects.filter(role="field_rep", username=f"field_rep_{rep_id}").first()
-                    if not rep:
-                        # Last resort: try if rep_id is a numeric user ID
-                        try:
-                            rep = UserModel.objects.get(id=int(rep_id), role="field_rep")
-                        except (ValueError, UserModel.DoesNotExist):
-                            pass
-                    
-                    if not rep:
-                        raise ValueError(f"Unknown fieldrep_id «{rep_id}»")
-                except Exception:
+                rep = reps.find([
+                    ("field_id", rep_id),
+                    ("username", f"field_rep_{rep_id}"),
+                    ("pk", rep_id),
+                ])
+                if not rep:
                     raise ValueError(f"Unknown fieldrep_id «{rep_id}»")
 
                 # collateral (optional - use default if not provided)
                 if col_id:
-                    try:
-                        col = CModel.objects.get(id=int(col_id), is_active=True)
-                    except Exception:
+                    col = collaterals.get(col_id)
+                    if not col:
                         raise ValueError(f"Unknown/Inactive collateral_id «{col_id}»")
                 else:
                     # Use the most recent active collateral as default
-                    col = CModel.objects.filter(is_active=True).order_by('-created_at').first()
+                    col = collaterals.default
                     if not col:
                         raise ValueError("No collateral_id provided and no active collaterals found in system.")
 
-                # doctor - use email as primary contact, phone as fallback
-                doctor, d_created = self._doctor_for_row(rep, name, primary_contact)
-                if d_created:
-                    created_doctors += 1
+                digits = self._digits(primary_contact)
+                if not digits:
+                    raise ValueError("Missing/invalid whatsapp_number")
 
-                # mapping
-                dc, mapping_created = DoctorCollateral.objects.get_or_create(
-                    doctor=doctor, collateral=col
-                )
-                if mapping_created:
-                    updated_mappings += 1
-
-                # short link (one-per-collateral)
-                sl = ShortLink.objects.filter(
-                    resource_type="collateral", resource_id=col.id, is_active=True
-                ).first()
-                if not sl:
-                    sl = ShortLink.objects.create(
-                        resource_type="collateral",
-                        resource_id=col.id,
-                        short_code=generate_short_code(length=8),
-                        is_active=True,
-                        created_by=admin_user if getattr(admin_user, "is_authenticated", False) else None,
-                    )
-                created_or_existing_links += 1
-
-                # Generate short URL using request context or fallback
-                try:
-                    from django.urls import reverse
-                    short_url = reverse('resolve_shortlink', args=[sl.short_code])
-                except:
-                    # Fallback to relative URL if reverse fails
-                    short_url = f"/view/{sl.short_code}"
-                rows.append({
-                    "row": row_no,
-                    "doctor": f"{doctor.name} ({doctor.phone})",
-                    "short_url": short_url,
-                    "error": "",
-                })
+                rows.append(ShareImportRow(row_no=row_no, rep=rep, collateral=col, phone=digits, doctor_name=name or digits))
             except Exception as e:
-                msg = f"Row {row_no}: {e}"
-                errors.append(msg)
-                rows.append({"row": row_no, "doctor": "", "short_url": "", "error": str(e)})
+                row_errors.append((row_no, str(e)))
+
+        # doctor + mapping + short link (one-per-collateral); no share logs
+        result = BulkShareImporter(
+            short_link_created_by=admin_user if getattr(admin_user, "is_authenticated", False) else None,
+            map_doctors=True,
+            update_doctor_names=True,
+            create_share_logs=False,
+            progress=self.progress,
+        ).run(rows)
+
+        # Generate short URL using request context or fallback
+        short_urls = {}
+        for collateral_id, sl in result.short_links.items():
+            try:
+                from django.urls import reverse
+                short_urls[collateral_id] = reverse('resolve_shortlink', args=[sl.short_code])
+            except:
+                # Fallback to relative URL if reverse fails
+                short_urls[collateral_id] = f"/view/{sl.short_code}"
+
+        report = [
+            {"row": row_no, "doctor": "", "short_url": "", "error": msg}
+            for row_no, msg in row_errors + result.errors
+        ]
+        for row in rows:
+            doctor = result.doctors.get((row.rep.id, row.phone))
+            if doctor is None:
+                continue
+            report.append({
+                "row": row.row_no,
+                "doctor": f"{doctor.name} ({doctor.phone})",
+                "short_url": short_urls.get(row.collateral.id, ""),
+                "error": "",
+            })
+        report.sort(key=lambda r: r["row"])
 
         return {
-            "created": created_doctors,
-            "updated": updated_mappings,
-            "errors": errors,
-            "rows": rows,
+            "created": result.created_doctors,
+            "updated": result.created_mappings,
+            "errors": _format_row_errors(row_errors + result.errors),
+            "rows": report,
         }
 
 
@@ -1307,7 +1142,6 @@ class DoctorBulkUploadForm(forms.Form):
         help_text="Columns: Doctor Name, Doctor Number, Field Rep Number, Field Rep Mail",
     )
 
-    MAX_SIZE = 2 * 1024 * 1024
     REQUIRED_COLUMNS = [
         "Doctor Name",
         "Doctor Number",
@@ -1329,10 +1163,12 @@ class DoctorBulkUploadForm(forms.Form):
         },
     ]
 
+    EXISTS_CHUNK_SIZE = 1000
+    SAVE_BATCH_SIZE = 1000
+    progress = None  # optional callable(stage, done, total), set by the upload job
+
     def clean_csv_file(self):
-        f = self.cleaned_data["csv_file"]
-        if f.size > self.MAX_SIZE:
-            raise ValidationError("CSV larger than 2 MB.")
+        f = check_upload_size(self.cleaned_data["csv_file"])
         if not f.name.lower().endswith(".csv"):
             raise ValidationError("Only .csv files are accepted.")
         return f
@@ -1361,46 +1197,67 @@ class DoctorBulkUploadForm(forms.Form):
                 header_map[required] = actual
         return header_map, missing
 
-    def validate_rows(self, *, campaign):
-        content = self.cleaned_data["csv_file"].read().decode("utf-8-sig", errors="ignore")
-        self.cleaned_data["csv_file"].seek(0)
-
-        reader = csv.DictReader(io.StringIO(content))
-        if not reader.fieldnames:
-            return [], ["CSV file is empty or missing the header row."]
-
-        header_map, missing_columns = self._resolve_header_map(reader.fieldnames)
-        if missing_columns:
-            return [], [f"Missing required columns: {', '.join(missing_columns)}"]
-
-        assigned_reps = (
-            User.objects.filter(role="field_rep", active=True)
-            .filter(
-                Q(assigned_campaigns__campaign=campaign)
-                | Q(campaign_assignments_campaign_mgmt__campaign=campaign)
-            )
-            .distinct()
-        )
-        all_reps = User.objects.filter(role="field_rep", active=True).distinct()
-
+    def _rep_maps(self, campaign):
+        """
+        (phone, email) -> rep id for the reps assigned to ``campaign``, plus the
+        keys of every active field rep. Only the key columns are loaded.
+        """
         def build_map(queryset):
             rep_map = {}
-            for rep in queryset:
-                key = (
-                    self._normalize_phone(getattr(rep, "phone_number", "")),
-                    (getattr(rep, "email", "") or "").strip().lower(),
-                )
+            for rep_id, phone_number, email in queryset.order_by("id").values_list("id", "phone_number", "email"):
+                key = (self._normalize_phone(phone_number or ""), (email or "").strip().lower())
                 if key[0] and key[1]:
-                    rep_map[key] = rep
+                    rep_map[key] = rep_id
             return rep_map
 
-        assigned_rep_map = build_map(assigned_reps)
-        all_rep_map = build_map(all_reps)
+        active_reps = User.objects.filter(role="field_rep", active=True)
+        assigned_reps = active_reps.filter(
+            Q(assigned_campaigns__campaign=campaign)
+            | Q(campaign_assignments_campaign_mgmt__campaign=campaign)
+        ).distinct()
+        return build_map(assigned_reps), set(build_map(active_reps))
+
+    def _existing_doctor_keys(self, pairs):
+        """Which (rep_id, phone) pairs already have a Doctor, checked in chunks."""
+        existing = set()
+        pairs = sorted(pairs)
+        for start in range(0, len(pairs), self.EXISTS_CHUNK_SIZE):
+            chunk = pairs[start:start + self.EXISTS_CHUNK_SIZE]
+            wanted = set(chunk)
+            existing.update(
+                key
+                for key in Doctor.objects.filter(
+                    rep_id__in={rep_id for rep_id, _ in chunk},
+                    phone__in={phone for _, phone in chunk},
+                ).values_list("rep_id", "phone")
+                if key in wanted
+            )
+        return existing
 
-        cleaned_rows = []
-        errors = []
-        seen_doctors = set()
+    def iter_validated_rows(self, *, campaign):
+        """
+        Yield (row_no, cleaned_row, errors) per data row, where exactly one of
+        cleaned_row / errors is set. A header problem is yielded once with
+        row_no=None.
+
+        The file is parsed once, then duplicates against the database are
+        resolved with one chunked query over all (rep, phone) pairs.
+        """
+        upload = self.cleaned_data["csv_file"]
+        upload.seek(0)
+        reader = csv.DictReader(codecs.iterdecode(upload, "utf-8-sig", errors="ignore"))
+        if not reader.fieldnames:
+            yield None, None, ["CSV file is empty or missing the header row."]
+            return
 
+        header_map, missing_columns = self._resolve_header_map(reader.fieldnames)
+        if missing_columns:
+            yield None, None, [f"Missing required columns: {', '.join(missing_columns)}"]
+            return
+
+        assigned_rep_map, known_rep_keys = self._rep_maps(campaign)
+
+        parsed = []
         for row_no, row in enumerate(reader, start=2):
             if not any((value or "").strip() for value in row.values()):
                 continue
@@ -1427,47 +1284,69 @@ class DoctorBulkUploadForm(forms.Form):
             except ValidationError:
                 row_errors.append("Field Rep Mail is invalid")
 
-            rep = None
+            rep_id = None
             if not row_errors:
-                rep = assigned_rep_map.get((rep_number, rep_mail))
-                if not rep:
-                    if all_rep_map.get((rep_number, rep_mail)):
+                rep_id = assigned_rep_map.get((rep_number, rep_mail))
+                if rep_id is None:
+                    if (rep_number, rep_mail) in known_rep_keys:
                         row_errors.append("Field rep is not assigned to the selected campaign")
                     else:
                         row_errors.append("Field rep does not exist")
 
-            if rep and not row_errors:
-                duplicate_key = (rep.pk, doctor_number)
+            parsed.append((row_no, rep_id, doctor_name, doctor_number, row_errors))
+
+            if self.progress and len(parsed) % self.EXISTS_CHUNK_SIZE == 0:
+                self.progress("parsing", len(parsed), 0)
+
+        existing = self._existing_doctor_keys(
+            (rep_id, doctor_number)
+            for _, rep_id, _, doctor_number, row_errors in parsed
+            if not row_errors
+        )
+
+        seen_doctors = set()
+        for row_no, rep_id, doctor_name, doctor_number, row_errors in parsed:
+            if not row_errors:
+                duplicate_key = (rep_id, doctor_number)
                 if duplicate_key in seen_doctors:
                     row_errors.append("Duplicate doctors for field reps found in uploaded CSV")
-                elif Doctor.objects.filter(rep=rep, phone=doctor_number).exists():
+                elif duplicate_key in existing:
                     row_errors.append("Doctor already exists for specific field rep")
                 else:
                     seen_doctors.add(duplicate_key)
 
             if row_errors:
-                errors.append(f"Row {row_no}: {'; '.join(row_errors)}")
-                continue
-
-            cleaned_rows.append(
-                {
-                    "rep": rep,
+                yield row_no, None, row_errors
+            else:
+                yield row_no, {
+                    "rep_id": rep_id,
                     "doctor_name": doctor_name,
                     "doctor_number": doctor_number,
-                }
-            )
+                }, None
 
+        if self.progress:
+            self.progress("validated", len(parsed), len(parsed))
+
+    def validate_rows(self, *, campaign):
+        cleaned_rows = []
+        errors = []
+        for row_no, cleaned_row, row_errors in self.iter_validated_rows(campaign=campaign):
+            if row_errors:
+                errors.append(f"Row {row_no}: {'; '.join(row_errors)}" if row_no else row_errors[0])
+            else:
+                cleaned_rows.append(cleaned_row)
         return cleaned_rows, errors
 
     def save_validated_rows(self, rows):
-        created = 0
+        doctors = [
+            Doctor(
+                rep_id=row["rep_id"],
+                name=row["doctor_name"],
+                phone=row["doctor_number"],
+                source="manual",
+            )
+            for row in rows
+        ]
         with transaction.atomic():
-            for row in rows:
-                Doctor.objects.create(
-                    rep=row["rep"],
-                    name=row["doctor_name"],
-                    phone=row["doctor_number"],
-                    source="manual",
-                )
-                created += 1
-        return created
+            Doctor.objects.bulk_create(doctors, batch_size=self.SAVE_BATCH_SIZE)
+        return len(doctors)
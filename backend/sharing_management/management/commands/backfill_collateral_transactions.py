@@ -4,6 +4,7 @@ from django.db import connection
 
 from doctor_viewer.models import DoctorEngagement
 from sharing_management.models import ShareLog
+from sharing_management.services.schema_registry import table_columns
 from sharing_management.services.transactions import (
     upsert_from_sharelog,
     mark_viewed,
@@ -20,15 +21,6 @@ class Command(BaseCommand):
         parser.add_argument("--share-id", dest="share_ids", action="append", type=int)
         parser.add_argument("--limit", dest="limit", type=int, default=0)
 
-    def _table_columns(self, table_name):
-        with connection.cursor() as cursor:
-            if table_name not in connection.introspection.table_names(cursor):
-                return set()
-            return {
-                column.name
-                for column in connection.introspection.get_table_description(cursor, table_name)
-            }
-
     def _hydrate_optional_sharelog_columns(self, share_log, columns):
         optional = [name for name in ("brand_campaign_id", "field_rep_email") if name in columns]
         for name in optional:
@@ -101,7 +93,7 @@ class Command(BaseCommand):
         share_ids = opts.get("share_ids") or []
         if isinstance(share_ids, int):
             share_ids = [share_ids]
-        columns = self._table_columns(ShareLog._meta.db_table)
+        columns = table_columns(ShareLog._meta.db_table)
         safe_fields = [
             "id",
             "short_link",
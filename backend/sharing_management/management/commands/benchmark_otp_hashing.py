@@ -0,0 +1,49 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from sharing_management.utils.credential_hashing import (
+    HmacSha256Scheme,
+    LegacyPbkdf2Scheme,
+    Pbkdf2Scheme,
+)
+
+
+class Command(BaseCommand):
+    help = "Report OTP verifications per second for each credential hashing scheme."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--seconds",
+            type=float,
+            default=1.0,
+            help="Time budget per scheme (default 1s).",
+        )
+        parser.add_argument(
+            "--pbkdf2-iterations",
+            type=int,
+            action="append",
+            dest="iterations",
+            help="Also time tagged PBKDF2 at this iteration count (repeatable).",
+        )
+
+    def handle(self, *args, **options):
+        budget = max(options["seconds"], 0.01)
+        schemes = [("hmac-sha256", HmacSha256Scheme()), ("pbkdf2-legacy (260000)", LegacyPbkdf2Scheme())]
+        for iterations in options["iterations"] or []:
+            schemes.append((f"pbkdf2-sha256 ({iterations})", Pbkdf2Scheme(iterations)))
+
+        context = "doctor:+910000000000:1"
+        for label, scheme in schemes:
+            stored = scheme.hash("123456", context)
+            count = 0
+            started = time.perf_counter()
+            elapsed = 0.0
+            while elapsed < budget:
+                scheme.verify("123456", stored, context)
+                count += 1
+                elapsed = time.perf_counter() - started
+            self.stdout.write(
+                f"{label:<28} {count / elapsed:>12,.0f} verifications/s  "
+                f"({elapsed / count * 1000:.3f} ms each)"
+            )
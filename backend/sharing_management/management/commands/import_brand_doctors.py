@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import csv
 import string
+import time
 from collections import defaultdict
 from pathlib import Path
 
@@ -10,7 +11,8 @@ from django.core.exceptions import ValidationError
 from django.core.management.base import BaseCommand, CommandError
 from django.core.validators import validate_email
 from django.db import transaction
-from django.db.models import Q
+from django.db.models import Min, Q
+from django.db.models.functions import Lower
 
 from admin_dashboard.views import _ensure_portal_user_for_master_rep
 from campaign_management.master_models import MasterCampaign, MasterFieldRep
@@ -19,6 +21,7 @@ from user_management.models import User
 
 
 MASTER_DB_ALIAS = getattr(settings, "MASTER_DB_ALIAS", "master")
+DEFAULT_BULK_BATCH_SIZE = 1000
 
 
 class Command(BaseCommand):
@@ -95,6 +98,21 @@ class Command(BaseCommand):
             dest="report_path",
             help="Optional path for the execution report CSV. Defaults next to the source CSV.",
         )
+        parser.add_argument(
+            "--bulk",
+            action="store_true",
+            help=(
+                "Prefetch existing doctors and insert new ones with chunked bulk_create. "
+                "Prints periodic progress instead of one line per row."
+            ),
+        )
+        parser.add_argument(
+            "--batch-size",
+            dest="batch_size",
+            type=int,
+            default=DEFAULT_BULK_BATCH_SIZE,
+            help=f"Rows per insert batch in --bulk mode (default: {DEFAULT_BULK_BATCH_SIZE})",
+        )
 
     @staticmethod
     def _normalize_phone(value: str | None) -> str:
@@ -344,12 +362,43 @@ class Command(BaseCommand):
             "doctor_id": "",
         }
 
+    @staticmethod
+    def _existing_doctors(rep_ids) -> dict[tuple[int, str], int]:
+        """(rep_id, phone) -> doctor id for every doctor of the given portal users."""
+        existing = {}
+        rep_ids = sorted(set(rep_ids))
+        for start in range(0, len(rep_ids), DEFAULT_BULK_BATCH_SIZE):
+            chunk = rep_ids[start:start + DEFAULT_BULK_BATCH_SIZE]
+            for doctor_id, rep_id, phone in (
+                Doctor.objects.filter(rep_id__in=chunk).order_by("id").values_list("id", "rep_id", "phone")
+            ):
+                existing.setdefault((rep_id, phone), doctor_id)
+        return existing
+
+    def _prefetch_portal_state(self, rep_emails: set[str]) -> dict:
+        """
+        Portal users by lower-cased email and their existing doctors, loaded up
+        front so --bulk validation does not query per row.
+        """
+        portal_user_ids = dict(
+            User.objects.annotate(email_lower=Lower("email"))
+            .filter(email_lower__in=sorted(rep_emails))
+            .values("email_lower")
+            .annotate(first_id=Min("id"))
+            .values_list("email_lower", "first_id")
+        ) if rep_emails else {}
+        return {
+            "portal_user_ids": portal_user_ids,
+            "existing_doctors": self._existing_doctors(portal_user_ids.values()),
+        }
+
     def _evaluate_rows(
         self,
         *,
         rows,
         headers,
         lookups,
+        prefetched=None,
     ):
         ready_rows = []
         report_rows = []
@@ -403,18 +452,26 @@ class Command(BaseCommand):
                     report_row["master_brand_id"] = str(getattr(master_rep, "brand_id", "") or "")
                     report_row["master_match_source"] = match_source
 
-            portal_user = None
+            portal_user_id = None
             if master_rep:
-                portal_user = User.objects.filter(email__iexact=rep_email).first()
+                if prefetched is not None:
+                    portal_user_id = prefetched["portal_user_ids"].get(rep_email)
+                    doctor_exists = (portal_user_id, doctor_phone) in prefetched["existing_doctors"]
+                else:
+                    portal_user = User.objects.filter(email__iexact=rep_email).first()
+                    portal_user_id = portal_user.pk if portal_user else None
+                    doctor_exists = bool(
+                        portal_user and Doctor.objects.filter(rep=portal_user, phone=doctor_phone).exists()
+                    )
                 duplicate_key = (master_rep.pk, doctor_phone)
                 if duplicate_key in seen:
                     row_errors.append("Duplicate doctor found in uploaded CSV for the same field rep")
-                elif portal_user and Doctor.objects.filter(rep=portal_user, phone=doctor_phone).exists():
+                elif portal_user_id and doctor_exists:
                     row_errors.append("Doctor already exists for specific field rep")
                 else:
                     seen.add(duplicate_key)
-                if portal_user:
-                    report_row["portal_user_id"] = str(portal_user.pk)
+                if portal_user_id:
+                    report_row["portal_user_id"] = str(portal_user_id)
 
             if row_errors:
                 report_row["status"] = "skipped"
@@ -496,31 +553,144 @@ class Command(BaseCommand):
 
         return created, skipped
 
+    def _save_rows_bulk(
+        self,
+        *,
+        rows,
+        report_rows,
+        source: str,
+        dry_run: bool,
+        batch_size: int,
+        report_writer,
+    ) -> tuple[int, int]:
+        """
+        --bulk counterpart of _save_rows.
+
+        Portal users are resolved once per master rep and existing (rep, phone)
+        pairs are prefetched, so each batch needs one bulk_create plus one query
+        to read back the new doctor ids. Report rows are written batch by batch
+        in file order and progress is printed once per batch.
+        """
+        created = 0
+        skipped = 0
+        ready_by_row = {row["report_row"]["row_number"]: row for row in rows}
+        portal_users = {}
+        existing = {}
+
+        if not dry_run:
+            for row in rows:
+                master_rep = row["master_rep"]
+                if master_rep.pk in portal_users:
+                    continue
+                try:
+                    portal_users[master_rep.pk] = _ensure_portal_user_for_master_rep(master_rep)
+                except Exception as exc:
+                    portal_users[master_rep.pk] = exc
+            existing = self._existing_doctors(
+                user.pk for user in portal_users.values() if isinstance(user, User)
+            )
+
+        total = len(report_rows)
+        started = time.monotonic()
+        for start in range(0, total, batch_size):
+            batch = report_rows[start:start + batch_size]
+            pending = []
+
+            for report_row in batch:
+                row = ready_by_row.get(report_row["row_number"])
+                if row is None:
+                    continue
+                if dry_run:
+                    report_row["status"] = "dry_run"
+                    report_row["message"] = "Validated successfully; doctor not created because --dry-run was used"
+                    skipped += 1
+                    continue
+
+                portal_user = portal_users[row["master_rep"].pk]
+                if not isinstance(portal_user, User):
+                    report_row["status"] = "error"
+                    report_row["message"] = str(portal_user)
+                    skipped += 1
+                    continue
+                report_row["portal_user_id"] = str(portal_user.pk)
+
+                key = (portal_user.pk, row["doctor_phone"])
+                if key in existing:
+                    report_row["status"] = "skipped"
+                    report_row["doctor_id"] = str(existing[key])
+                    report_row["message"] = "Doctor already exists for specific field rep"
+                    skipped += 1
+                    continue
+
+                # Claimed before the insert so a repeat within the file is skipped.
+                existing[key] = ""
+                pending.append((key, row))
+
+            if pending:
+                try:
+                    with transaction.atomic():
+                        Doctor.objects.bulk_create(
+                            [
+                                Doctor(
+                                    rep_id=rep_id,
+                                    name=row["doctor_name"],
+                                    phone=phone,
+                                    source=source,
+                                )
+                                for (rep_id, phone), row in pending
+                            ],
+                            ignore_conflicts=True,
+                        )
+                    # ignore_conflicts leaves pks unset, so read them back.
+                    existing.update(self._existing_doctors({rep_id for (rep_id, _), _ in pending}))
+                    for key, row in pending:
+                        report_row = row["report_row"]
+                        report_row["status"] = "created"
+                        report_row["doctor_id"] = str(existing.get(key) or "")
+                        report_row["message"] = "Doctor created successfully"
+                    created += len(pending)
+                except Exception as exc:
+                    for key, row in pending:
+                        existing.pop(key, None)
+                        row["report_row"]["status"] = "error"
+                        row["report_row"]["message"] = str(exc)
+                    skipped += len(pending)
+                    self.stdout.write(self.style.ERROR(f"[ERROR] batch starting row={batch[0]['row_number']} reason={exc}"))
+
+            report_writer.writerows(batch)
+            done = start + len(batch)
+            elapsed = max(time.monotonic() - started, 1e-6)
+            self.stdout.write(
+                f"Progress: {done}/{total} rows created={created} skipped={skipped} "
+                f"({done / elapsed:.0f} rows/sec)"
+            )
+
+        return created, skipped
+
     def _default_report_path(self, *, csv_path: Path, dry_run: bool) -> Path:
         suffix = "_doctor_import_dry_run_report.csv" if dry_run else "_doctor_import_report.csv"
         return csv_path.with_name(f"{csv_path.stem}{suffix}")
 
+    REPORT_FIELDNAMES = [
+        "row_number",
+        "field_rep_email",
+        "field_rep_id",
+        "field_rep_phone",
+        "doctor_name",
+        "doctor_phone",
+        "status",
+        "message",
+        "master_field_rep_id",
+        "master_brand_id",
+        "master_match_source",
+        "portal_user_id",
+        "doctor_id",
+    ]
+
     def _write_report(self, *, report_rows: list[dict], report_path: Path) -> None:
         report_path.parent.mkdir(parents=True, exist_ok=True)
         with report_path.open("w", encoding="utf-8", newline="") as handle:
-            writer = csv.DictWriter(
-                handle,
-                fieldnames=[
-                    "row_number",
-                    "field_rep_email",
-                    "field_rep_id",
-                    "field_rep_phone",
-                    "doctor_name",
-                    "doctor_phone",
-                    "status",
-                    "message",
-                    "master_field_rep_id",
-                    "master_brand_id",
-                    "master_match_source",
-                    "portal_user_id",
-                    "doctor_id",
-                ],
-            )
+            writer = csv.DictWriter(handle, fieldnames=self.REPORT_FIELDNAMES)
             writer.writeheader()
             writer.writerows(report_rows)
 
@@ -530,6 +700,10 @@ class Command(BaseCommand):
         source = options["source"]
         dry_run = bool(options["dry_run"])
         report_path = Path(options["report_path"]).expanduser() if options.get("report_path") else None
+        bulk = bool(options["bulk"])
+        batch_size = options["batch_size"]
+        if batch_size < 1:
+            raise CommandError("--batch-size must be a positive integer.")
 
         brand_id, master_campaign_id = self._derive_brand_context(
             brand_id=options.get("brand_id"),
@@ -549,6 +723,7 @@ class Command(BaseCommand):
             rows=rows,
             headers=headers,
             lookups=lookups,
+            prefetched=self._prefetch_portal_state(rep_emails) if bulk else None,
         )
         final_report_path = report_path or self._default_report_path(csv_path=csv_path, dry_run=dry_run)
 
@@ -563,39 +738,64 @@ class Command(BaseCommand):
             f"csv_rep_emails={len(rep_emails)}"
         )
 
-        for report_row in report_rows:
-            if report_row["status"] == "skipped":
-                match_segment = (
-                    f"match={report_row['master_match_source']} "
-                    if report_row["master_match_source"]
-                    else ""
-                )
-                self.stdout.write(
-                    self.style.WARNING(
-                        f"[SKIP] row={report_row['row_number']} "
-                        f"rep_email={report_row['field_rep_email']} "
-                        f"doctor={report_row['doctor_name']} ({report_row['doctor_phone']}) "
-                        f"{match_segment}"
-                        f"reason={report_row['message']}"
+        if not bulk:
+            for report_row in report_rows:
+                if report_row["status"] == "skipped":
+                    match_segment = (
+                        f"match={report_row['master_match_source']} "
+                        if report_row["master_match_source"]
+                        else ""
+                    )
+                    self.stdout.write(
+                        self.style.WARNING(
+                            f"[SKIP] row={report_row['row_number']} "
+                            f"rep_email={report_row['field_rep_email']} "
+                            f"doctor={report_row['doctor_name']} ({report_row['doctor_phone']}) "
+                            f"{match_segment}"
+                            f"reason={report_row['message']}"
+                        )
                     )
-                )
 
         if not report_rows:
             self.stdout.write(self.style.WARNING("No doctor rows found in the CSV."))
             return
 
-        created, skipped_during_save = self._save_rows(rows=ready_rows, source=source, dry_run=dry_run)
+        save_started = time.monotonic()
+        if bulk:
+            self.stdout.write(
+                f"Validation skipped {len(report_rows) - len(ready_rows)} rows; see the report CSV for reasons."
+            )
+            final_report_path.parent.mkdir(parents=True, exist_ok=True)
+            with final_report_path.open("w", encoding="utf-8", newline="") as handle:
+                report_writer = csv.DictWriter(handle, fieldnames=self.REPORT_FIELDNAMES)
+                report_writer.writeheader()
+                created, skipped_during_save = self._save_rows_bulk(
+                    rows=ready_rows,
+                    report_rows=report_rows,
+                    source=source,
+                    dry_run=dry_run,
+                    batch_size=batch_size,
+                    report_writer=report_writer,
+                )
+        else:
+            created, skipped_during_save = self._save_rows(rows=ready_rows, source=source, dry_run=dry_run)
+        save_elapsed = time.monotonic() - save_started
+
         skipped_total = sum(1 for row in report_rows if row["status"] in {"skipped", "error", "dry_run"})
         if skipped_during_save and skipped_total < skipped_during_save:
             skipped_total = skipped_during_save
 
-        self._write_report(report_rows=report_rows, report_path=final_report_path)
+        if not bulk:
+            self._write_report(report_rows=report_rows, report_path=final_report_path)
 
         self.stdout.write("")
         self.stdout.write(f"Report CSV: {final_report_path}")
         self.stdout.write(f"Total rows processed: {len(report_rows)}")
         self.stdout.write(f"Created: {created}")
         self.stdout.write(f"Not created / skipped: {skipped_total}")
+        if bulk:
+            rate = len(report_rows) / save_elapsed if save_elapsed > 0 else float(len(report_rows))
+            self.stdout.write(f"Throughput: {rate:.0f} rows/sec ({save_elapsed:.2f}s)")
 
         if dry_run:
             self.stdout.write(self.style.SUCCESS("Dry run completed. Review the report CSV for details."))
@@ -0,0 +1,52 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS
+
+from collateral_management.models import CollateralMessage
+from sharing_management.models import ShareLog
+from sharing_management.services.schema_registry import clear_table_schemas, get_table_schema
+
+
+class Command(BaseCommand):
+    help = (
+        "Clear and re-introspect the cached table schemas used by the share flows. "
+        "Running web workers pick this up only when the default cache is shared "
+        "between processes; with a per-process cache they must be restarted."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--database", default=DEFAULT_DB_ALIAS)
+        parser.add_argument(
+            "--table",
+            dest="tables",
+            action="append",
+            help="Table to introspect (repeatable). Defaults to the share-flow tables.",
+        )
+
+    def handle(self, *args, **options):
+        using = options["database"]
+        tables = options["tables"] or [ShareLog._meta.db_table, CollateralMessage._meta.db_table]
+
+        clear_table_schemas(using)
+        for table in tables:
+            schema = get_table_schema(table, using)
+            if schema is None:
+                self.stdout.write(self.style.WARNING(f"{table}: table not found"))
+                continue
+            not_null = ", ".join(schema.not_null_columns()) or "-"
+            self.stdout.write(
+                f"{table}: {len(schema.columns)} columns; NOT NULL: {not_null}"
+            )
+        self.stdout.write(self.style.SUCCESS("Table schema registry refreshed."))
+        if _cache_is_per_process():
+            self.stdout.write(
+                self.style.WARNING(
+                    "The default cache is per-process: restart the web and worker "
+                    "processes so they stop using their cached schemas."
+                )
+            )
+
+
+def _cache_is_per_process() -> bool:
+    backend = settings.CACHES.get("default", {}).get("BACKEND", "")
+    return backend.endswith(("LocMemCache", "DummyCache"))
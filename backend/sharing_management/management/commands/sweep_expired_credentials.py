@@ -0,0 +1,60 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from sharing_management.services.credential_retention import (
+    RETENTION_BATCH_SIZE,
+    RETENTION_BATCH_SLEEP,
+    sweep_expired_credentials,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete expired OTPs (doctor verification and rep login) and WhatsApp "
+        "login-audit rows past retention, in small primary-key batches."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=RETENTION_BATCH_SIZE,
+            help=f"Rows per DELETE (default {RETENTION_BATCH_SIZE}).",
+        )
+        parser.add_argument(
+            "--sleep",
+            type=float,
+            default=RETENTION_BATCH_SLEEP,
+            help=f"Seconds to pause between batches (default {RETENTION_BATCH_SLEEP}).",
+        )
+        parser.add_argument(
+            "--archive-dir",
+            help="Append deleted rows to <table>-<date>.csv files in this directory first.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only count the rows that would be removed.",
+        )
+
+    def handle(self, *args, **options):
+        dry_run = options["dry_run"]
+        verb = "would remove" if dry_run else "removed"
+
+        def report(batch):
+            self.stdout.write(f"{batch.table}: {verb} {batch.deleted} rows in {batch.seconds * 1000:.1f} ms")
+
+        started = time.monotonic()
+        totals = sweep_expired_credentials(
+            batch_size=options["batch_size"],
+            sleep=options["sleep"],
+            archive_dir=options.get("archive_dir"),
+            dry_run=dry_run,
+            on_batch=report,
+        )
+        for table, count in totals.items():
+            self.stdout.write(f"{table}: {verb} {count} rows in total")
+        self.stdout.write(
+            self.style.SUCCESS(f"Retention sweep done in {time.monotonic() - started:.1f}s.")
+        )
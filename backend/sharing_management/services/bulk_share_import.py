@@ -0,0 +1,418 @@
+# sharing_management/services/bulk_share_import.py
+"""
+Set-based engine behind the bulk share CSV forms.
+
+The forms parse their own CSV layouts into ShareImportRow objects, resolving
+reps and collaterals through FieldRepIndex / CollateralIndex (one query each).
+BulkShareImporter then pre-loads the short links, doctors, doctor↔collateral
+mappings and recent share logs the rows touch, and writes whatever is missing
+with bulk_create in chunks.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from datetime import timedelta
+from typing import Any, Callable, Iterable, Optional
+
+from django.db import transaction
+from django.utils import timezone
+
+from collateral_management.models import Collateral
+from doctor_viewer.models import Doctor, DoctorCollateral
+from sharing_management.models import ShareLog
+from user_management.models import User
+
+
+DEFAULT_BATCH_SIZE = 1000
+DEFAULT_DEDUPE_WINDOW = timedelta(hours=24)
+
+# Progress callbacks receive (stage, done, total).
+ProgressCallback = Callable[[str, int, int], None]
+
+
+def _chunks(items: list, size: int):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+class FieldRepIndex:
+    """
+    In-memory lookups over every field rep, loaded with one query.
+
+    ``find()`` takes (lookup, key) pairs and returns the first rep matched,
+    mirroring the chained ``.filter(...).first()`` fallbacks the forms used.
+    """
+
+    def __init__(self, queryset=None):
+        queryset = queryset if queryset is not None else User.objects.filter(role="field_rep")
+        self._reps: list = []
+        self._by: dict[str, dict] = {
+            "pk": {},
+            "email": {},
+            "email_ci": {},
+            "field_id": {},
+            "field_id_ci": {},
+            "username": {},
+            "username_ci": {},
+        }
+        self._contains_cache: dict[str, Any] = {}
+        for rep in queryset.only("id", "email", "field_id", "username").order_by("id").iterator():
+            self.add(rep)
+
+    def add(self, rep) -> None:
+        self._reps.append(rep)
+        email = rep.email or ""
+        field_id = rep.field_id or ""
+        username = rep.username or ""
+        for lookup, key in (
+            ("pk", str(rep.pk)),
+            ("email", email),
+            ("email_ci", email.lower()),
+            ("field_id", field_id),
+            ("field_id_ci", field_id.lower()),
+            ("username", username),
+            ("username_ci", username.lower()),
+        ):
+            if key:
+                self._by[lookup].setdefault(key, rep)
+        self._contains_cache.clear()
+
+    def _lookup(self, lookup: str, key: str):
+        if lookup == "field_id_contains":
+            if key not in self._contains_cache:
+                needle = key.lower()
+                self._contains_cache[key] = next(
+                    (rep for rep in self._reps if needle in (rep.field_id or "").lower()),
+                    None,
+                )
+            return self._contains_cache[key]
+        if lookup.endswith("_ci"):
+            key = key.lower()
+        elif lookup == "pk":
+            try:
+                key = str(int(key))
+            except (TypeError, ValueError):
+                return None
+        return self._by[lookup].get(key)
+
+    def find(self, attempts: Iterable[tuple[str, str]]):
+        for lookup, key in attempts:
+            key = (key or "").strip()
+            if not key:
+                continue
+            rep = self._lookup(lookup, key)
+            if rep is not None:
+                return rep
+        return None
+
+
+class CollateralIndex:
+    """Collaterals referenced by a file, loaded with one ``in_bulk`` query."""
+
+    def __init__(self, raw_ids: Iterable[Any], *, active_only: bool = False):
+        ids = set()
+        for raw in raw_ids:
+            try:
+                ids.add(int(str(raw).strip()))
+            except (TypeError, ValueError):
+                continue
+        queryset = Collateral.objects.all()
+        if active_only:
+            queryset = queryset.filter(is_active=True)
+        self._by_id = queryset.in_bulk(ids) if ids else {}
+        self._default = None
+        self._default_loaded = False
+
+    def get(self, raw_id):
+        try:
+            return self._by_id.get(int(str(raw_id).strip()))
+        except (TypeError, ValueError):
+            return None
+
+    @property
+    def default(self):
+        """Most recent active collateral, used when a row names none."""
+        if not self._default_loaded:
+            self._default = Collateral.objects.filter(is_active=True).order_by("-created_at").first()
+            self._default_loaded = True
+        return self._default
+
+
+@dataclass
+class ShareImportRow:
+    row_no: int
+    rep: Any
+    collateral: Any
+    phone: str
+    doctor_name: str = ""
+    share_channel: str = "WhatsApp"
+    message_text: str = ""
+
+
+@dataclass
+class ShareImportResult:
+    share_logs: list = field(default_factory=list)
+    doctors: dict = field(default_factory=dict)        # (rep_id, phone) -> Doctor
+    short_links: dict = field(default_factory=dict)    # collateral_id -> ShortLink
+    created_doctors: int = 0
+    created_mappings: int = 0
+    skipped_duplicates: int = 0
+    errors: list = field(default_factory=list)         # (row_no, message)
+
+    @property
+    def created(self) -> int:
+        return len(self.share_logs)
+
+
+class BulkShareImporter:
+    """
+    Write the doctors, mappings, short links and share logs for a batch of rows.
+
+    short_link_created_by: owner for new short links; a callable is called with
+        the first row that needs the link (e.g. ``lambda row: row.rep``).
+    active_short_links_only: reuse only active links (otherwise any link).
+    with_doctors / map_doctors: get-or-create Doctor rows / DoctorCollateral rows.
+    update_doctor_names: rename existing doctors whose CSV name differs.
+    create_share_logs: insert a ShareLog per row.
+    dedupe_window: skip rows already shared (rep, identifier, collateral,
+        channel) within this window, including earlier rows of the same file.
+    """
+
+    def __init__(
+        self,
+        *,
+        short_link_created_by=None,
+        active_short_links_only: bool = True,
+        with_doctors: bool = False,
+        map_doctors: bool = False,
+        update_doctor_names: bool = False,
+        create_share_logs: bool = True,
+        dedupe_window: Optional[timedelta] = None,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        progress: Optional[ProgressCallback] = None,
+    ):
+        self.short_link_created_by = short_link_created_by
+        self.active_short_links_only = active_short_links_only
+        self.with_doctors = with_doctors or map_doctors
+        self.map_doctors = map_doctors
+        self.update_doctor_names = update_doctor_names
+        self.create_share_logs = create_share_logs
+        self.dedupe_window = dedupe_window
+        self.batch_size = max(1, int(batch_size or DEFAULT_BATCH_SIZE))
+        self.progress = progress
+
+    def _report(self, stage: str, done: int, total: int) -> None:
+        if self.progress:
+            self.progress(stage, done, total)
+
+    # ------------------------------------------------------------------
+    # Short links
+    # ------------------------------------------------------------------
+    def _load_short_links(self, rows: list[ShareImportRow], result: ShareImportResult) -> None:
+        from shortlink_management.models import ShortLink
+        from shortlink_management.utils import generate_short_code
+
+        first_row_by_collateral = {}
+        for row in rows:
+            first_row_by_collateral.setdefault(row.collateral.id, row)
+
+        queryset = ShortLink.objects.filter(
+            resource_type="collateral",
+            resource_id__in=list(first_row_by_collateral),
+        )
+        if self.active_short_links_only:
+            queryset = queryset.filter(is_active=True)
+        for link in queryset.order_by("id"):
+            result.short_links.setdefault(link.resource_id, link)
+
+        missing = [cid for cid in first_row_by_collateral if cid not in result.short_links]
+        if not missing:
+            return
+
+        for collateral_id in missing:
+            owner = self.short_link_created_by
+            if callable(owner):
+                owner = owner(first_row_by_collateral[collateral_id])
+            link = ShortLink.objects.create(
+                short_code=generate_short_code(8),
+                resource_type="collateral",
+                resource_id=collateral_id,
+                created_by=owner,
+                is_active=True,
+            )
+            result.short_links[collateral_id] = link
+
+    # ------------------------------------------------------------------
+    # Doctors and mappings
+    # ------------------------------------------------------------------
+    def _fetch_doctors(self, keys: list[tuple[int, str]], into: dict) -> None:
+        for chunk in _chunks(keys, self.batch_size):
+            wanted = set(chunk)
+            queryset = Doctor.objects.filter(
+                rep_id__in={rep_id for rep_id, _ in chunk},
+                phone__in={phone for _, phone in chunk},
+            ).order_by("id")
+            for doctor in queryset:
+                key = (doctor.rep_id, doctor.phone)
+                if key in wanted:
+                    into.setdefault(key, doctor)
+
+    def _load_doctors(self, rows: list[ShareImportRow], result: ShareImportResult) -> None:
+        names: dict[tuple[int, str], str] = {}
+        for row in rows:
+            names.setdefault((row.rep.id, row.phone), row.doctor_name)
+            if self.update_doctor_names and row.doctor_name:
+                names[(row.rep.id, row.phone)] = row.doctor_name
+
+        keys = list(names)
+        self._fetch_doctors(keys, result.doctors)
+
+        missing = [key for key in keys if key not in result.doctors]
+        if missing:
+            for chunk in _chunks(missing, self.batch_size):
+                Doctor.objects.bulk_create(
+                    [Doctor(rep_id=rep_id, phone=phone, name=names[(rep_id, phone)]) for rep_id, phone in chunk],
+                    batch_size=self.batch_size,
+                )
+            # Not every backend returns primary keys from bulk_create.
+            self._fetch_doctors(missing, result.doctors)
+            result.created_doctors = sum(1 for key in missing if key in result.doctors)
+
+        if self.update_doctor_names:
+            renamed = []
+            missing_keys = set(missing)
+            for key, doctor in result.doctors.items():
+                if key in missing_keys:
+                    continue
+                name = names.get(key)
+                if name and doctor.name != name:
+                    doctor.name = name
+                    renamed.append(doctor)
+            if renamed:
+                Doctor.objects.bulk_update(renamed, ["name"], batch_size=self.batch_size)
+
+        self._report("doctors", len(keys), len(keys))
+
+    def _map_doctors(self, rows: list[ShareImportRow], result: ShareImportResult) -> None:
+        pairs = []
+        seen = set()
+        for row in rows:
+            doctor = result.doctors.get((row.rep.id, row.phone))
+            if doctor is None:
+                continue
+            pair = (doctor.id, row.collateral.id)
+            if pair not in seen:
+                seen.add(pair)
+                pairs.append(pair)
+
+        existing = set()
+        for chunk in _chunks(pairs, self.batch_size):
+            existing.update(
+                DoctorCollateral.objects.filter(
+                    doctor_id__in={doctor_id for doctor_id, _ in chunk},
+                    collateral_id__in={collateral_id for _, collateral_id in chunk},
+                ).values_list("doctor_id", "collateral_id")
+            )
+
+        missing = [pair for pair in pairs if pair not in existing]
+        for chunk in _chunks(missing, self.batch_size):
+            DoctorCollateral.objects.bulk_create(
+                [DoctorCollateral(doctor_id=doctor_id, collateral_id=collateral_id) for doctor_id, collateral_id in chunk],
+                batch_size=self.batch_size,
+                ignore_conflicts=True,
+            )
+        result.created_mappings = len(missing)
+        self._report("mappings", len(pairs), len(pairs))
+
+    # ------------------------------------------------------------------
+    # Share logs
+    # ------------------------------------------------------------------
+    def _recent_share_keys(self, rows: list[ShareImportRow]) -> set:
+        if not self.dedupe_window:
+            return set()
+        cutoff = timezone.now() - self.dedupe_window
+        rep_ids = sorted({row.rep.id for row in rows})
+        collateral_ids = {row.collateral.id for row in rows}
+        keys = set()
+        for chunk in _chunks(rep_ids, self.batch_size):
+            keys.update(
+                ShareLog.objects.filter(
+                    field_rep_id__in=chunk,
+                    collateral_id__in=collateral_ids,
+                    share_timestamp__gte=cutoff,
+                ).values_list("field_rep_id", "doctor_identifier", "collateral_id", "share_channel")
+            )
+        return keys
+
+    def _insert_share_logs(self, pending: list[tuple[ShareImportRow, ShareLog]], result: ShareImportResult) -> None:
+        done = 0
+        for chunk in _chunks(pending, self.batch_size):
+            objs = [share_log for _, share_log in chunk]
+            try:
+                with transaction.atomic():
+                    ShareLog.objects.bulk_create(objs, batch_size=self.batch_size)
+                result.share_logs.extend(objs)
+            except Exception:
+                # Fall back to row-by-row so the error lands on the right line.
+                for row, share_log in chunk:
+                    try:
+                        with transaction.atomic():
+                            share_log.save(force_insert=True)
+                        result.share_logs.append(share_log)
+                    except Exception as exc:
+                        result.errors.append((row.row_no, str(exc)))
+            done += len(chunk)
+            self._report("share_logs", done, len(pending))
+
+    def _build_share_logs(self, rows: list[ShareImportRow], result: ShareImportResult) -> list:
+        recent = self._recent_share_keys(rows)
+        now = timezone.now()
+        pending = []
+        for row in rows:
+            key = (row.rep.id, row.phone, row.collateral.id, row.share_channel)
+            if self.dedupe_window:
+                if key in recent:
+                    result.skipped_duplicates += 1
+                    continue
+                recent.add(key)
+            pending.append((
+                row,
+                ShareLog(
+                    short_link=result.short_links.get(row.collateral.id),
+                    collateral_id=row.collateral.id,
+                    field_rep_id=row.rep.id,
+                    field_rep_email=row.rep.email or "",
+                    doctor_identifier=row.phone,
+                    share_channel=row.share_channel,
+                    share_timestamp=now,
+                    message_text=row.message_text or "",
+                ),
+            ))
+        return pending
+
+    # ------------------------------------------------------------------
+    def run(self, rows: Iterable[ShareImportRow]) -> ShareImportResult:
+        rows = list(rows)
+        result = ShareImportResult()
+        if not rows:
+            return result
+
+        if self.create_share_logs:
+            rows_to_share = self._build_share_logs(rows, result)
+            touched = [row for row, _ in rows_to_share]
+        else:
+            rows_to_share = []
+            touched = rows
+
+        self._load_short_links(touched, result)
+        for _, share_log in rows_to_share:
+            share_log.short_link = result.short_links.get(share_log.collateral_id)
+
+        if self.with_doctors:
+            self._load_doctors(touched, result)
+        if self.map_doctors:
+            self._map_doctors(touched, result)
+        if rows_to_share:
+            self._insert_share_logs(rows_to_share, result)
+
+        return result
@@ -0,0 +1,127 @@
+# sharing_management/services/credential_retention.py
+"""
+Retention sweep for the OTP and WhatsApp login-audit tables.
+
+Rows are removed in primary-key batches, each its own short DELETE, with an
+optional pause in between so the shared MySQL never sees a long-running
+lock. With ``archive_dir`` set, each batch is appended to a CSV per table
+before it is deleted.
+"""
+from __future__ import annotations
+
+import csv
+import os
+import time
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Callable, Iterator, Optional
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+
+from shortlink_management.models import DoctorVerificationOTP
+from user_management.models import LoginAuditWhatsApp, RepLoginOTP
+
+
+RETENTION_BATCH_SIZE = getattr(settings, "CREDENTIAL_RETENTION_BATCH_SIZE", 1000)
+RETENTION_BATCH_SLEEP = getattr(settings, "CREDENTIAL_RETENTION_BATCH_SLEEP", 0.2)
+# Keep expired/verified OTPs around briefly for support lookups.
+OTP_RETENTION_HOURS = getattr(settings, "OTP_RETENTION_HOURS", 24)
+LOGIN_AUDIT_RETENTION_DAYS = getattr(settings, "LOGIN_AUDIT_RETENTION_DAYS", 90)
+
+
+@dataclass
+class BatchResult:
+    table: str
+    deleted: int
+    seconds: float
+
+
+def _sweep_targets(now):
+    otp_cutoff = now - timedelta(hours=OTP_RETENTION_HOURS)
+    audit_cutoff = now - timedelta(days=LOGIN_AUDIT_RETENTION_DAYS)
+    # Verified OTPs carry the same expires_at, so one indexed range covers
+    # expired and verified rows alike.
+    return [
+        (DoctorVerificationOTP, Q(expires_at__lt=otp_cutoff)),
+        (RepLoginOTP, Q(expires_at__lt=otp_cutoff)),
+        (LoginAuditWhatsApp, Q(created_at__lt=audit_cutoff)),
+    ]
+
+
+def _archive(model, pks, archive_dir: str, now) -> None:
+    fields = [f.attname for f in model._meta.concrete_fields]
+    path = os.path.join(archive_dir, f"{model._meta.db_table}-{now:%Y%m%d}.csv")
+    new_file = not os.path.exists(path)
+    with open(path, "a", newline="", encoding="utf-8") as fh:
+        writer = csv.writer(fh)
+        if new_file:
+            writer.writerow(fields)
+        for row in model.objects.filter(pk__in=pks).order_by("pk").values_list(*fields):
+            writer.writerow([value.hex() if isinstance(value, (bytes, memoryview)) else value for value in row])
+
+
+def _sweep_model(model, condition, *, batch_size, sleep, archive_dir, dry_run, now) -> Iterator[BatchResult]:
+    table = model._meta.db_table
+    last_pk = None
+    while True:
+        started = time.monotonic()
+        qs = model.objects.filter(condition)
+        if last_pk is not None:
+            qs = qs.filter(pk__gt=last_pk)
+        pks = list(qs.order_by("pk").values_list("pk", flat=True)[:batch_size])
+        if not pks:
+            return
+        last_pk = pks[-1]
+
+        if dry_run:
+            deleted = len(pks)
+        else:
+            if archive_dir:
+                _archive(model, pks, archive_dir, now)
+            # Re-check the condition so a row refreshed since the SELECT survives.
+            deleted, _ = model.objects.filter(condition, pk__in=pks).delete()
+        yield BatchResult(table, deleted, time.monotonic() - started)
+
+        if len(pks) < batch_size:
+            return
+        if sleep:
+            time.sleep(sleep)
+
+
+def sweep_expired_credentials(
+    *,
+    batch_size: Optional[int] = None,
+    sleep: Optional[float] = None,
+    archive_dir: Optional[str] = None,
+    dry_run: bool = False,
+    on_batch: Optional[Callable[[BatchResult], None]] = None,
+) -> dict[str, int]:
+    """
+    Delete expired/verified OTPs and login-audit rows past retention.
+
+    Returns rows removed per table; ``on_batch`` is called after every batch.
+    """
+    batch_size = max(int(batch_size or RETENTION_BATCH_SIZE), 1)
+    sleep = RETENTION_BATCH_SLEEP if sleep is None else max(float(sleep), 0.0)
+    if archive_dir:
+        os.makedirs(archive_dir, exist_ok=True)
+
+    now = timezone.now()
+    totals = {}
+    for model, condition in _sweep_targets(now):
+        totals[model._meta.db_table] = 0
+        for result in _sweep_model(
+            model,
+            condition,
+            batch_size=batch_size,
+            sleep=sleep,
+            archive_dir=archive_dir,
+            dry_run=dry_run,
+            now=now,
+        ):
+            totals[result.table] += result.deleted
+            if on_batch:
+                on_batch(result)
+    return totals
@@ -0,0 +1,144 @@
+# sharing_management/services/master_access.py
+from __future__ import annotations
+
+import hashlib
+from typing import Iterable, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db.models import Case, Exists, IntegerField, OuterRef, Value, When
+
+from campaign_management.master_models import MasterCampaignFieldRep, MasterFieldRep
+
+
+# Master reps and assignments change rarely, but a deactivated rep should stop
+# logging in quickly, so entries only live for a short window.
+MASTER_CACHE_TIMEOUT = getattr(settings, "FIELDREP_MASTER_CACHE_SECONDS", 60)
+
+
+def master_db_alias() -> str:
+    return getattr(settings, "MASTER_DB_ALIAS", "master")
+
+
+def _key(kind: str, *parts) -> str:
+    digest = hashlib.sha1("|".join(str(p or "").strip().lower() for p in parts).encode("utf-8")).hexdigest()
+    return f"master_access:{kind}:{digest}"
+
+
+def _assignment_key(master_rep_id, campaign_candidates: Iterable[str]) -> str:
+    return _key("assigned", master_rep_id, *sorted(campaign_candidates))
+
+
+def _rep_key(field_id: str, gmail_id: str) -> str:
+    return _key("rep", gmail_id, field_id)
+
+
+def _valid_campaign_ids(campaign_candidates) -> list[str]:
+    """Drop candidates the master campaign_id column cannot hold (it is a UUID)."""
+    target_field = MasterCampaignFieldRep._meta.get_field("campaign").target_field
+    valid = []
+    for candidate in campaign_candidates or []:
+        if not candidate:
+            continue
+        try:
+            target_field.to_python(candidate)
+        except ValidationError:
+            continue
+        valid.append(candidate)
+    return valid
+
+
+def _rep_queryset(field_id: str, gmail_id: str):
+    """
+    Active reps for ``gmail_id``, best identifier match first.
+
+    Same precedence as trying brand-supplied id + email, then username + email,
+    then email only, but in one query.
+    """
+    qs = (
+        MasterFieldRep.objects.using(master_db_alias())
+        .select_related("user")
+        .filter(is_active=True, user__email__iexact=gmail_id)
+    )
+    if not field_id:
+        return qs.order_by("pk")
+    return qs.annotate(
+        match_rank=Case(
+            When(brand_supplied_field_rep_id__iexact=field_id, then=Value(0)),
+            When(user__username__iexact=field_id, then=Value(1)),
+            default=Value(2),
+            output_field=IntegerField(),
+        )
+    ).order_by("match_rank", "pk")
+
+
+def get_master_fieldrep(
+    field_id: str,
+    gmail_id: str,
+    campaign_candidates: Optional[Iterable[str]] = None,
+) -> tuple[Optional[MasterFieldRep], Optional[bool]]:
+    """
+    Look up the active master rep for a login and, if campaign ids are given,
+    whether the rep is assigned to any of them.
+
+    Returns (rep, assigned); ``assigned`` is None when no campaign was asked
+    for. Hits are cached for MASTER_CACHE_TIMEOUT; misses are not, so a rep
+    added in master can log in straight away.
+    """
+    gmail_id = (gmail_id or "").strip().lower()
+    field_id = (field_id or "").strip()
+    wants_assignment = bool(campaign_candidates)
+    candidates = _valid_campaign_ids(campaign_candidates)
+    if not gmail_id:
+        return None, None
+
+    rep_key = _rep_key(field_id, gmail_id)
+    master_rep = cache.get(rep_key)
+    if master_rep is not None:
+        if not wants_assignment:
+            return master_rep, None
+        return master_rep, is_master_assigned(master_rep.pk, candidates)
+
+    qs = _rep_queryset(field_id, gmail_id)
+    if candidates:
+        qs = qs.annotate(
+            is_assigned=Exists(
+                MasterCampaignFieldRep.objects.using(master_db_alias()).filter(
+                    field_rep_id=OuterRef("pk"),
+                    campaign_id__in=candidates,
+                )
+            )
+        )
+    master_rep = qs.first()
+    if master_rep is None:
+        return None, (False if wants_assignment else None)
+
+    cache.set(rep_key, master_rep, MASTER_CACHE_TIMEOUT)
+    if not wants_assignment:
+        return master_rep, None
+
+    assigned = bool(getattr(master_rep, "is_assigned", False))
+    if assigned:
+        cache.set(_assignment_key(master_rep.pk, candidates), True, MASTER_CACHE_TIMEOUT)
+    return master_rep, assigned
+
+
+def is_master_assigned(master_rep_id, campaign_candidates: Iterable[str]) -> bool:
+    """Whether the master rep is linked to any of the campaign ids; positive answers are cached."""
+    candidates = _valid_campaign_ids(campaign_candidates)
+    if not master_rep_id or not candidates:
+        return False
+
+    key = _assignment_key(master_rep_id, candidates)
+    if cache.get(key):
+        return True
+
+    assigned = (
+        MasterCampaignFieldRep.objects.using(master_db_alias())
+        .filter(field_rep_id=master_rep_id, campaign_id__in=candidates)
+        .exists()
+    )
+    if assigned:
+        cache.set(key, True, MASTER_CACHE_TIMEOUT)
+    return assigned
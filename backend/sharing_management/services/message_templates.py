@@ -0,0 +1,159 @@
+# sharing_management/services/message_templates.py
+from __future__ import annotations
+
+from typing import Optional
+
+from django.conf import settings
+from django.core.cache import cache
+
+from campaign_management.campaign_ids import campaign_id_variants
+from sharing_management.services.schema_registry import table_columns
+from myproject.applog import get_logger
+from utils.cache_generation import CacheGeneration
+
+
+# Signals only reach the process that saved the change; with a per-process
+# cache backend this timeout bounds how long other workers can lag behind.
+TEMPLATE_CACHE_TIMEOUT = getattr(settings, "SHARE_MESSAGE_TEMPLATE_CACHE_SECONDS", 300)
+_generation = CacheGeneration("share_message_template:generation")
+log = get_logger(__name__)
+
+# Cached marker for "no custom template", so misses are cached as well.
+_NO_TEMPLATE = ""
+
+
+def _normalize_kind(message_kind) -> str:
+    return "reminder" if str(message_kind).strip().lower() == "reminder" else "initial"
+
+
+def _cache_key(brand_campaign_id: str, collateral_id, message_kind: str) -> str:
+    return f"share_message_template:{_generation.current()}:{brand_campaign_id}:{collateral_id}:{message_kind}"
+
+
+def invalidate_message_templates(*args, **kwargs) -> None:
+    """
+    Drop every resolved template by moving to a new cache generation.
+
+    Connected to saves/deletes of CollateralMessage and the campaign/collateral
+    bridge models, since any of them can change which template wins.
+    """
+    _generation.bump()
+
+
+def _resolve_uncached(collateral_id, brand_campaign_id: str, message_kind: str) -> tuple[Optional[str], bool]:
+    """
+    Walk the fallback chains and return (winning template, had_error).
+
+    Order: CollateralMessage by campaign variants, the collateral_management
+    bridge, the campaign_management bridge, then the collateral's own campaign.
+    """
+    from campaign_management.models import CampaignCollateral as CampaignMgmtCampaignCollateral
+    from collateral_management.models import (
+        CampaignCollateral as CollateralMgmtCampaignCollateral,
+        Collateral as CollateralModel,
+        CollateralMessage,
+    )
+
+    variants = campaign_id_variants(brand_campaign_id)
+    had_error = False
+
+    reminder_column_supported = False
+    if message_kind == "reminder":
+        try:
+            reminder_column_supported = "reminder_message" in table_columns(CollateralMessage._meta.db_table)
+        except Exception as e:
+            had_error = True
+            log.warning("message_template_introspection_failed", error=e)
+
+    def _pick_template(queryset) -> Optional[str]:
+        fields = ["message"]
+        if reminder_column_supported:
+            fields.append("reminder_message")
+
+        row = queryset.values(*fields).order_by("-id").first()
+        if not row:
+            return None
+
+        if message_kind == "reminder" and reminder_column_supported:
+            reminder_template = (row.get("reminder_message") or "").strip()
+            if reminder_template:
+                return reminder_template
+
+        return (row.get("message") or "").strip() or None
+
+    def _messages_for(campaign):
+        if campaign is None:
+            return None
+        return CollateralMessage.objects.filter(campaign=campaign, collateral_id=collateral_id, is_active=True)
+
+    def _by_campaign_variants():
+        return CollateralMessage.objects.filter(
+            campaign__brand_campaign_id__in=variants,
+            collateral_id=collateral_id,
+            is_active=True,
+        )
+
+    def _via_bridge(bridge_model):
+        campaign_collateral = (
+            bridge_model.objects.select_related("campaign")
+            .filter(campaign__brand_campaign_id__in=variants, collateral_id=collateral_id)
+            .order_by("-id")
+            .first()
+        )
+        return _messages_for(getattr(campaign_collateral, "campaign", None))
+
+    def _via_collateral():
+        collateral_obj = CollateralModel.objects.select_related("campaign").filter(id=collateral_id).first()
+        return _messages_for(getattr(collateral_obj, "campaign", None))
+
+    chains = []
+    if variants:
+        chains += [
+            ("brand-specific lookup", _by_campaign_variants),
+            ("collateral bridge fallback", lambda: _via_bridge(CollateralMgmtCampaignCollateral)),
+            ("legacy bridge fallback", lambda: _via_bridge(CampaignMgmtCampaignCollateral)),
+        ]
+    chains.append(("direct collateral fallback", _via_collateral))
+
+    for label, messages_queryset in chains:
+        try:
+            queryset = messages_queryset()
+            template = _pick_template(queryset) if queryset is not None else None
+            if template:
+                return template, had_error
+        except Exception as e:
+            had_error = True
+            log.warning("message_template_lookup_failed", source=label, error=e)
+
+    return None, had_error
+
+
+def resolve_message_template(collateral_id, brand_campaign_id=None, message_kind="initial") -> Optional[str]:
+    """
+    Raw template text that wins for (campaign, collateral, kind), or None for the default message.
+
+    Resolutions are cached until a relevant model is saved or deleted. Lookups
+    that hit a database error are not cached, so a transient failure cannot pin
+    the default message.
+    """
+    bc_id = (str(brand_campaign_id).strip() if brand_campaign_id else "")
+    message_kind = _normalize_kind(message_kind)
+    key = _cache_key(bc_id, collateral_id, message_kind)
+
+    cached = cache.get(key)
+    if cached is not None:
+        return cached or None
+
+    template, had_error = _resolve_uncached(collateral_id, bc_id, message_kind)
+    if not had_error:
+        cache.set(key, template or _NO_TEMPLATE, TEMPLATE_CACHE_TIMEOUT)
+    return template
+
+
+def render_share_message(template: Optional[str], collateral_link: str) -> str:
+    if template:
+        return template.replace("$collateralLinks", collateral_link)
+    return (
+        "Hello Doctor, please check this: "
+        f"{collateral_link}"
+    )
@@ -0,0 +1,100 @@
+# sharing_management/services/schema_registry.py
+from __future__ import annotations
+
+import threading
+from dataclasses import dataclass
+from typing import Optional
+
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from utils.cache_generation import CacheGeneration
+
+
+@dataclass(frozen=True)
+class TableSchema:
+    table: str
+    # column name -> null_ok, in table order
+    columns: dict[str, bool]
+
+    @property
+    def column_names(self) -> set[str]:
+        return set(self.columns)
+
+    def has_column(self, name: str) -> bool:
+        return name in self.columns
+
+    def not_null_columns(self) -> list[str]:
+        return [name for name, null_ok in self.columns.items() if not null_ok]
+
+
+_schemas: dict[tuple[str, str], Optional[TableSchema]] = {}
+_lock = threading.Lock()
+# Each process keeps its own registry and drops it when the shared generation
+# moves on. That only reaches other workers when the default cache is shared
+# (e.g. Redis/Memcached); with a per-process cache they need a restart.
+_generation = CacheGeneration("table_schema_registry:generation")
+_loaded_generation: Optional[int] = None
+
+
+def _introspect(table: str, using: str) -> Optional[TableSchema]:
+    connection = connections[using]
+    with connection.cursor() as cursor:
+        if table not in connection.introspection.table_names(cursor):
+            return None
+        desc = connection.introspection.get_table_description(cursor, table)
+    return TableSchema(
+        table=table,
+        columns={c.name: bool(getattr(c, "null_ok", True)) for c in desc},
+    )
+
+
+def get_table_schema(table: str, using: str = DEFAULT_DB_ALIAS) -> Optional[TableSchema]:
+    """
+    Column metadata for ``table``, introspected once per process generation.
+
+    Returns None when the table does not exist. The registry is cleared after
+    ``migrate`` (post_migrate) and by the ``refresh_table_schemas`` command,
+    see ``clear_table_schemas`` for which processes that reaches.
+    """
+    global _loaded_generation
+
+    key = (using, table)
+    generation = _generation.current()
+    if generation == _loaded_generation:
+        try:
+            return _schemas[key]
+        except KeyError:
+            pass
+
+    with _lock:
+        if generation != _loaded_generation:
+            _schemas.clear()
+            _loaded_generation = generation
+        if key not in _schemas:
+            _schemas[key] = _introspect(table, using)
+        return _schemas[key]
+
+
+def table_columns(table: str, using: str = DEFAULT_DB_ALIAS) -> set[str]:
+    schema = get_table_schema(table, using)
+    return schema.column_names if schema else set()
+
+
+def clear_table_schemas(using: Optional[str] = None) -> None:
+    """
+    Drop cached schemas here and start a new registry generation.
+
+    Other processes re-introspect every table on their next lookup, but only
+    if they share the default cache; otherwise they need a restart.
+    """
+    _generation.bump()
+    with _lock:
+        if using is None:
+            _schemas.clear()
+            return
+        for key in [k for k in _schemas if k[0] == using]:
+            del _schemas[key]
+
+
+def clear_on_migrate(sender=None, using=DEFAULT_DB_ALIAS, **kwargs) -> None:
+    clear_table_schemas(using)
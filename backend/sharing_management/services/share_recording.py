@@ -0,0 +1,321 @@
+# sharing_management/services/share_recording.py
+from __future__ import annotations
+
+import re
+import urllib.parse
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from campaign_management.campaign_ids import canonical_brand_campaign_id
+from doctor_viewer.models import Doctor
+from sharing_management.models import ShareLog
+from sharing_management.services.message_templates import render_share_message, resolve_message_template
+from sharing_management.services.schema_registry import get_table_schema
+from sharing_management.services.transactions import upsert_from_sharelog
+from myproject.applog import get_logger
+
+
+log = get_logger(__name__)
+
+
+@dataclass
+class RecordedShare:
+    share_log_id: Optional[int]
+    doctor_id: int
+    message: str
+    wa_url: str
+
+
+def _last10(phone: str) -> str:
+    digits = re.sub(r"\D", "", phone or "")
+    return digits[-10:] if len(digits) >= 10 else digits
+
+
+def _link_with_share_id(url: str, share_id) -> str:
+    if not url or not share_id:
+        return url
+
+    try:
+        parsed = urllib.parse.urlsplit(url)
+        query = urllib.parse.parse_qsl(parsed.query, keep_blank_values=True)
+        query = [(key, value) for key, value in query if key not in {"share_id", "s", "share"}]
+        query.append(("share_id", str(share_id)))
+        return urllib.parse.urlunsplit(parsed._replace(query=urllib.parse.urlencode(query)))
+    except Exception:
+        separator = "&" if "?" in url else "?"
+        return f"{url}{separator}share_id={share_id}"
+
+
+def _existing_share_log_id(short_link_id, phone_last10: str) -> Optional[int]:
+    rows = (
+        ShareLog.objects.filter(short_link_id=short_link_id)
+        .exclude(doctor_identifier__isnull=True)
+        .exclude(doctor_identifier__exact="")
+        .values_list("id", "doctor_identifier")
+        .order_by("-id")[:50]
+    )
+    for share_log_id, doctor_identifier in rows:
+        if _last10(doctor_identifier or "") == phone_last10:
+            return share_log_id
+    return None
+
+
+def _insert_share_log(desired: dict[str, Any], *, now, phone_e164: str, rep_user_id: str) -> Optional[int]:
+    """
+    Raw INSERT into ShareLog, limited to the columns the live table has.
+
+    The table and model can be out of sync, so NOT NULL columns the caller did
+    not provide get best-effort defaults instead of relying on ORM create().
+    """
+    table = ShareLog._meta.db_table
+    schema = get_table_schema(table)
+    col_null_ok = dict(schema.columns) if schema else {}
+
+    for col, null_ok in col_null_ok.items():
+        if col == "id" or null_ok or col in desired:
+            continue
+        if col in ("created_at", "updated_at", "share_timestamp", "sent_at", "timestamp"):
+            desired[col] = now
+        elif col in ("share_channel", "channel"):
+            desired[col] = "WhatsApp"
+        elif col in ("doctor_identifier", "doctor_number", "whatsapp_number"):
+            desired[col] = phone_e164
+        elif col in ("field_rep_id", "fieldrep_id"):
+            desired[col] = rep_user_id
+        elif col.endswith("_id"):
+            desired[col] = rep_user_id or "0"
+        else:
+            desired[col] = ""
+
+    insert_cols = [c for c in desired if c in col_null_ok and c != "id"]
+    qn = connection.ops.quote_name
+    sql = (
+        f"INSERT INTO {qn(table)} ({', '.join(qn(c) for c in insert_cols)}) "
+        f"VALUES ({', '.join(['%s'] * len(insert_cols))})"
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [desired[c] for c in insert_cols])
+        return cursor.lastrowid
+
+
+def _update_message_text(share_log_id: int, message: str) -> None:
+    schema = get_table_schema(ShareLog._meta.db_table)
+    if not schema or not schema.has_column("message_text"):
+        return
+    qn = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"UPDATE {qn(ShareLog._meta.db_table)} SET {qn('message_text')} = %s WHERE id = %s",
+            [message, share_log_id],
+        )
+
+
+def _transaction_share_log(share_log_id, *, short_link, collateral_id, phone_e164, field_rep_id, field_rep_email, brand_campaign_id, now, inserted) -> Optional[ShareLog]:
+    """
+    ShareLog for upsert_from_sharelog. A row inserted just now is built from
+    the values in hand; an existing one keeps its stored timestamp, phone and
+    rep, since those key its CollateralTransaction row.
+    """
+    if inserted:
+        share_timestamp = now
+    else:
+        stored = (
+            ShareLog.objects
+            .only("id", "doctor_identifier", "share_timestamp", "field_rep_id")
+            .filter(id=share_log_id)
+            .first()
+        )
+        if stored is None:
+            return None
+        share_timestamp = stored.share_timestamp
+        phone_e164 = stored.doctor_identifier
+        field_rep_id = stored.field_rep_id
+    share_log = ShareLog(
+        id=share_log_id,
+        short_link=short_link,
+        collateral_id=collateral_id,
+        doctor_identifier=phone_e164,
+        share_channel="WhatsApp",
+        share_timestamp=share_timestamp,
+    )
+    share_log.field_rep_id = field_rep_id
+    share_log.__dict__["field_rep_email"] = field_rep_email or ""
+    share_log.__dict__["brand_campaign_id"] = brand_campaign_id
+    return share_log
+
+
+def record_whatsapp_share(
+    *,
+    rep_user,
+    field_rep_id,
+    field_rep_email: str,
+    field_rep_field_id: str,
+    brand_campaign_id: str,
+    doctor_name: str,
+    phone_e164: str,
+    collateral_id: int,
+    collateral_link: str,
+    short_link,
+    message_kind: str = "initial",
+) -> RecordedShare:
+    """
+    Record one WhatsApp share and return the personalized message and wa.me URL.
+
+    The doctor, ShareLog and CollateralTransaction rows are written in one
+    transaction; the only master lookup on this path is the campaign id sync.
+    Identity backfill from master and the legacy log_manual_doctor_share row
+    run after commit in
+    ``sharing_management.tasks.complete_share_recording_task``.
+    """
+    now = timezone.now()
+    phone_last10 = _last10(phone_e164)
+    # Master-synced, as the ShareLog and CollateralTransaction rows have always been keyed.
+    stored_brand_campaign_id = canonical_brand_campaign_id(brand_campaign_id, sync_from_master=True)
+    template = resolve_message_template(collateral_id, brand_campaign_id=brand_campaign_id, message_kind=message_kind)
+    share_field_rep_id = str(field_rep_id or getattr(rep_user, "id", "") or "")
+
+    with transaction.atomic():
+        doctor_obj, _created = Doctor.objects.update_or_create(
+            rep=rep_user,
+            phone=phone_last10,
+            defaults={"name": doctor_name},
+        )
+
+        share_log_id = _existing_share_log_id(short_link.id, phone_last10)
+        inserted = False
+        if not share_log_id:
+            try:
+                with transaction.atomic():
+                    share_log_id = _insert_share_log(
+                        {
+                            "short_link_id": short_link.id,
+                            "doctor_identifier": phone_e164,
+                            "share_channel": "WhatsApp",
+                            "share_timestamp": now,
+                            "created_at": now,
+                            "updated_at": now,
+                            "collateral_id": collateral_id,
+                            "field_rep_id": share_field_rep_id,
+                            "field_rep_email": field_rep_email or "",
+                            "brand_campaign_id": stored_brand_campaign_id,
+                            "message_text": render_share_message(template, collateral_link),
+                        },
+                        now=now,
+                        phone_e164=phone_e164,
+                        rep_user_id=str(getattr(rep_user, "id", "") or field_rep_id or ""),
+                    )
+                inserted = bool(share_log_id)
+            except Exception as e:
+                log.warning("sharelog_insert_failed", short_link_id=short_link.id, error=e)
+
+        message = render_share_message(template, _link_with_share_id(collateral_link, share_log_id))
+        if share_log_id:
+            try:
+                with transaction.atomic():
+                    # The share_id is only known after the INSERT, so the
+                    # personalized message is written back with one UPDATE; a
+                    # re-share refreshes it with the message just sent.
+                    _update_message_text(share_log_id, message)
+                    tx_share_log = _transaction_share_log(
+                        share_log_id,
+                        short_link=short_link,
+                        collateral_id=collateral_id,
+                        phone_e164=phone_e164,
+                        field_rep_id=share_field_rep_id,
+                        field_rep_email=field_rep_email,
+                        brand_campaign_id=stored_brand_campaign_id,
+                        now=now,
+                        inserted=inserted,
+                    )
+                    if tx_share_log is not None:
+                        upsert_from_sharelog(
+                            tx_share_log,
+                            brand_campaign_id=stored_brand_campaign_id,
+                            doctor_name=doctor_name or None,
+                            field_rep_unique_id=field_rep_field_id or None,
+                            sent_at=tx_share_log.share_timestamp,
+                            resolve_identity=False,
+                        )
+            except Exception as e:
+                log.warning("transaction_upsert_failed", share_log_id=share_log_id, error=e)
+
+        transaction.on_commit(
+            lambda: dispatch_share_followup(
+                share_log_id=share_log_id,
+                short_link_id=short_link.id,
+                rep_user_id=rep_user.id,
+                phone_e164=phone_e164,
+                collateral_id=collateral_id,
+                brand_campaign_id=brand_campaign_id or "",
+                doctor_name=doctor_name or "",
+                field_rep_field_id=field_rep_field_id or "",
+                field_rep_email=field_rep_email or "",
+            )
+        )
+
+    wa_number = re.sub(r"\D", "", phone_e164)
+    return RecordedShare(
+        share_log_id=share_log_id,
+        doctor_id=doctor_obj.id,
+        message=message,
+        wa_url=f"https://wa.me/{wa_number}?text={urllib.parse.quote(message)}",
+    )
+
+
+def complete_share_recording(
+    *,
+    share_log_id,
+    short_link_id,
+    rep_user_id,
+    phone_e164,
+    collateral_id,
+    brand_campaign_id="",
+    doctor_name="",
+    field_rep_field_id="",
+    field_rep_email="",
+) -> None:
+    """Deferred, best-effort half of a share: master identity backfill and legacy logging."""
+    if share_log_id:
+        try:
+            share_log = ShareLog.objects.select_related("short_link").filter(id=share_log_id).first()
+            if share_log:
+                share_log.__dict__["field_rep_email"] = field_rep_email
+                share_log.__dict__["brand_campaign_id"] = canonical_brand_campaign_id(
+                    brand_campaign_id,
+                    sync_from_master=True,
+                )
+                upsert_from_sharelog(
+                    share_log,
+                    brand_campaign_id=brand_campaign_id,
+                    doctor_name=doctor_name or None,
+                    field_rep_unique_id=field_rep_field_id or None,
+                    sent_at=getattr(share_log, "share_timestamp", None),
+                )
+        except Exception as e:
+            log.warning("transaction_identity_backfill_failed", share_log_id=share_log_id, error=e)
+
+    try:
+        from sharing_management.utils.db_operations import log_manual_doctor_share
+
+        log_manual_doctor_share(
+            short_link_id=short_link_id,
+            field_rep_id=rep_user_id,
+            phone_e164=phone_e164,
+            collateral_id=collateral_id,
+        )
+    except Exception as e:
+        log.warning("manual_doctor_share_log_failed", short_link_id=short_link_id, error=e)
+
+
+def dispatch_share_followup(**kwargs) -> None:
+    """Queue the deferred share work; run it inline if the task queue is unreachable."""
+    from sharing_management.tasks import complete_share_recording_task
+
+    try:
+        complete_share_recording_task.apply_async(kwargs=kwargs, retry=False)
+    except Exception as e:
+        log.info("share_followup_inline", error=e)
+        complete_share_recording(**kwargs)
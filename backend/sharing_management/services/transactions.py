@@ -11,6 +11,9 @@ from django.utils import timezone
 
 from campaign_management.campaign_ids import canonical_brand_campaign_id
 from sharing_management.models import CollateralTransaction, ShareLog
+from myproject.applog import get_logger
+
+log = get_logger(__name__)
 
 
 MASTER_ALIAS = getattr(settings, "MASTER_DB_ALIAS", "master")
@@ -203,9 +206,10 @@ def _brand_field_id_from_master(share_log: ShareLog, field_rep_id: Any) -> str:
 def _resolve_brand_supplied_field_id(
     share_log: ShareLog,
     explicit_field_id: Optional[str] = None,
+    resolve_identity: bool = True,
 ) -> str:
     explicit = _as_str(explicit_field_id).strip()
-    if explicit:
+    if explicit or not resolve_identity:
         return explicit
 
     field_rep_id = getattr(share_log, "field_rep_id", None)
@@ -260,14 +264,9 @@ def _maybe_backfill_field_rep_id(share_log: ShareLog) -> None:
 
         share_log.field_rep_id = int(fr.id)
         share_log.save(update_fields=["field_rep_id"])
-        print(
-            "[TXDBG] backfilled ShareLog.field_rep_id=",
-            share_log.field_rep_id,
-            " share_log.id=",
-            share_log.id,
-        )
+        log.debug("field_rep_backfilled", share_log_id=share_log.id, field_rep_id=share_log.field_rep_id)
     except Exception as e:
-        print("[TXDBG] backfill field_rep_id failed:", e)
+        log.warning("field_rep_backfill_failed", share_log_id=getattr(share_log, "id", None), error=e)
 
 
 def _base_transaction_values(
@@ -276,31 +275,27 @@ def _base_transaction_values(
     doctor_name: Optional[str] = None,
     field_rep_unique_id: Optional[str] = None,
     sent_at=None,
+    resolve_identity: bool = True,
 ) -> Optional[dict[str, Any]]:
     if not share_log:
         return None
 
-    _maybe_backfill_field_rep_id(share_log)
+    if resolve_identity:
+        _maybe_backfill_field_rep_id(share_log)
 
     field_rep_id = getattr(share_log, "field_rep_id", None)
     if field_rep_id is None:
-        print(
-            "[TXDBG] ShareLog.field_rep_id is None; skipping transaction upsert. share_log.id=",
-            getattr(share_log, "id", None),
-        )
+        log.debug("transaction_skipped", reason="no_field_rep", share_log_id=getattr(share_log, "id", None))
         return None
 
     collateral_id = _resolve_collateral_id(share_log)
     if collateral_id is None:
-        print(
-            "[TXDBG] ShareLog collateral is missing; skipping transaction upsert. share_log.id=",
-            getattr(share_log, "id", None),
-        )
+        log.debug("transaction_skipped", reason="no_collateral", share_log_id=getattr(share_log, "id", None))
         return None
 
     event_at = sent_at or getattr(share_log, "share_timestamp", None) or timezone.now()
     bc_raw = _as_str(brand_campaign_id).strip() or _infer_brand_campaign_id(share_log)
-    bc_id = canonical_brand_campaign_id(bc_raw, sync_from_master=True)
+    bc_id = canonical_brand_campaign_id(bc_raw, sync_from_master=resolve_identity)
     doctor_number = _as_str(getattr(share_log, "doctor_identifier", "")).strip()
     doctor_name_value = _as_str(doctor_name).strip()
 
@@ -310,6 +305,7 @@ def _base_transaction_values(
         "field_rep_unique_id": _resolve_brand_supplied_field_id(
             share_log,
             explicit_field_id=field_rep_unique_id,
+            resolve_identity=resolve_identity,
         ),
         "doctor_name": doctor_name_value,
         "doctor_number": doctor_number,
@@ -404,7 +400,7 @@ def _save_transaction(
         )
         return obj
     except Exception as e:
-        print(f"[TXDBG] {action_name} failed:", e)
+        log.warning("transaction_update_failed", action=action_name, transaction_id=snapshot_values.get("transaction_id"), error=e)
         return None
 
 
@@ -414,11 +410,16 @@ def upsert_from_sharelog(
     doctor_name: Optional[str] = None,
     field_rep_unique_id: Optional[str] = None,
     sent_at=None,
+    resolve_identity: bool = True,
 ):
     """
     Create or update the transaction row for this ShareLog.
     transaction_id is persisted as:
       brandsuppliedfieldid-doctornumber-collateralid-datetime
+
+    resolve_identity=False skips every master-DB lookup (field rep backfill,
+    brand-supplied id, campaign sync) so the row can be written on the request
+    path; a later call with the default fills those in.
     """
     base_values = _base_transaction_values(
         share_log=share_log,
@@ -426,6 +427,7 @@ def upsert_from_sharelog(
         doctor_name=doctor_name,
         field_rep_unique_id=field_rep_unique_id,
         sent_at=sent_at,
+        resolve_identity=resolve_identity,
     )
     if not base_values:
         return None
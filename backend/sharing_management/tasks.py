@@ -0,0 +1,14 @@
+from celery import shared_task
+
+from sharing_management.services.credential_retention import sweep_expired_credentials
+from sharing_management.services.share_recording import complete_share_recording
+
+@shared_task
+def complete_share_recording_task(**kwargs):
+    complete_share_recording(**kwargs)
+
+
+@shared_task
+def sweep_expired_credentials_task():
+    return sweep_expired_credentials()
+
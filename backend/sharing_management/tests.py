@@ -1,3 +1,31 @@
-from django.test import TestCase
+from unittest import mock
 
-# Create your tests here.
+from django.test import SimpleTestCase
+
+from sharing_management.services import schema_registry
+
+
+class SchemaRegistryTests(SimpleTestCase):
+    def setUp(self):
+        schema_registry.clear_table_schemas()
+        self.introspect = mock.patch.object(
+            schema_registry,
+            "_introspect",
+            side_effect=lambda table, using: schema_registry.TableSchema(table, {"id": False}),
+        ).start()
+        self.addCleanup(mock.patch.stopall)
+
+    def test_schema_is_introspected_once(self):
+        schema_registry.get_table_schema("sharing_management_sharelog")
+        schema_registry.get_table_schema("sharing_management_sharelog")
+
+        self.assertEqual(self.introspect.call_count, 1)
+
+    def test_generation_bump_from_another_process_drops_cached_schemas(self):
+        schema_registry.get_table_schema("sharing_management_sharelog")
+
+        # What a refresh in another process leaves behind in a shared cache.
+        schema_registry._generation.bump()
+        schema_registry.get_table_schema("sharing_management_sharelog")
+
+        self.assertEqual(self.introspect.call_count, 2)
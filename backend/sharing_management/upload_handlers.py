@@ -0,0 +1,27 @@
+# sharing_management/upload_handlers.py
+"""Background handlers for the sharing_management CSV uploads (see upload_jobs)."""
+from campaign_management.models import Campaign
+from upload_jobs.handlers import UploadOutcome, form_errors, register, split_row_error
+
+from sharing_management import forms as share_forms
+
+
+@register("doctor_bulk_upload")
+def doctor_bulk_upload(job, upload, progress):
+    campaign = Campaign.objects.get(pk=job.params["campaign_id"])
+
+    form = share_forms.DoctorBulkUploadForm(data={}, files={"csv_file": upload})
+    if not form.is_valid():
+        return UploadOutcome(errors=form_errors(form))
+
+    form.progress = progress
+    cleaned_rows, ingestion_errors = form.validate_rows(campaign=campaign)
+    if not ingestion_errors and not cleaned_rows:
+        ingestion_errors = ["No doctor rows found in the uploaded CSV."]
+
+    # All-or-nothing, as in the synchronous upload: any bad row blocks the file.
+    if ingestion_errors:
+        return UploadOutcome(errors=[split_row_error(e) for e in ingestion_errors])
+
+    return UploadOutcome(created=form.save_validated_rows(cleaned_rows))
+
@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import hashlib
+import hmac
+import struct
+
+from django.conf import settings
+
+
+# Salt the legacy PBKDF2 hashes were created with (see db_operations.SALT).
+LEGACY_SALT = b'inclinic_salt_2024'
+LEGACY_ITERATIONS = 260000
+
+
+class CredentialScheme:
+    """
+    One way of hashing a short secret. ``tag`` prefixes every stored hash so
+    rows made by different schemes can live side by side in one column.
+    """
+    name = ""
+    tag = b""
+    size = 32  # bytes after the tag
+
+    def digest(self, secret: str, context: str = "") -> bytes:
+        raise NotImplementedError
+
+    def hash(self, secret: str, context: str = "") -> bytes:
+        return self.tag + self.digest(secret, context)
+
+    def owns(self, stored: bytes) -> bool:
+        return len(stored) == len(self.tag) + self.size and stored.startswith(self.tag)
+
+    def verify(self, secret: str, stored: bytes, context: str = "") -> bool:
+        return hmac.compare_digest(self.hash(secret, context), stored)
+
+
+class HmacSha256Scheme(CredentialScheme):
+    """
+    Keyed HMAC for OTPs: microseconds per check instead of a PBKDF2 run.
+
+    A 6-digit OTP lives for minutes, so stretching adds nothing an attacker
+    with the table but not the key could not brute-force anyway; the secret
+    key is what protects it. ``context`` binds the hash to its user/link.
+    """
+    name = "hmac-sha256"
+    tag = b"h1$"
+
+    def __init__(self, key: bytes | None = None):
+        if key is None:
+            key = (getattr(settings, "OTP_HMAC_KEY", "") or settings.SECRET_KEY).encode()
+        self._key = hashlib.sha256(b"inclinic-otp-hmac:" + key).digest()
+
+    def digest(self, secret: str, context: str = "") -> bytes:
+        return hmac.new(self._key, f"{context}\x00{secret}".encode(), hashlib.sha256).digest()
+
+
+class Pbkdf2Scheme(CredentialScheme):
+    """Tagged PBKDF2-SHA256; the iteration count is stored with the hash."""
+    name = "pbkdf2-sha256"
+    tag = b"p1$"
+    size = 4 + 32  # iteration count + digest
+
+    def __init__(self, iterations: int = LEGACY_ITERATIONS, salt: bytes = LEGACY_SALT):
+        self.iterations = int(iterations)
+        self.salt = salt
+
+    def digest(self, secret: str, context: str = "") -> bytes:
+        return struct.pack(">I", self.iterations) + hashlib.pbkdf2_hmac(
+            "sha256", secret.encode(), self.salt, self.iterations
+        )
+
+    def verify(self, secret: str, stored: bytes, context: str = "") -> bool:
+        (iterations,) = struct.unpack(">I", stored[len(self.tag):len(self.tag) + 4])
+        return hmac.compare_digest(Pbkdf2Scheme(iterations, self.salt).hash(secret, context), stored)
+
+
+class LegacyPbkdf2Scheme(CredentialScheme):
+    """Untagged PBKDF2-SHA256 with the static salt, as written before hashes were tagged."""
+    name = "pbkdf2-legacy"
+    tag = b""
+
+    def digest(self, secret: str, context: str = "") -> bytes:
+        return hashlib.pbkdf2_hmac("sha256", secret.encode(), LEGACY_SALT, LEGACY_ITERATIONS)
+
+
+class CredentialHasher:
+    """
+    Hash with ``preferred``; verify against any of ``preferred`` + ``accepted``.
+
+    ``verify`` returns (ok, needs_rehash); needs_rehash is True when a correct
+    secret matched a scheme other than the preferred one, so the caller can
+    store ``hash(secret)`` in its place.
+    """
+
+    def __init__(self, preferred: CredentialScheme, accepted: tuple[CredentialScheme, ...] = ()):
+        self.preferred = preferred
+        # Tagged schemes first, so the untagged legacy scheme is the fallback.
+        self.schemes = sorted((preferred, *accepted), key=lambda s: not s.tag)
+
+    def hash(self, secret: str, context: str = "") -> bytes:
+        return self.preferred.hash(secret, context)
+
+    def scheme_for(self, stored) -> CredentialScheme | None:
+        stored = bytes(stored or b"")
+        return next((scheme for scheme in self.schemes if stored and scheme.owns(stored)), None)
+
+    def verify(self, secret: str, stored, context: str = "") -> tuple[bool, bool]:
+        stored = bytes(stored or b"")
+        scheme = self.scheme_for(stored)
+        if scheme is None or not scheme.verify(secret or "", stored, context):
+            return False, False
+        return True, scheme is not self.preferred
+
+
+SCHEMES = {
+    HmacSha256Scheme.name: HmacSha256Scheme,
+    Pbkdf2Scheme.name: lambda: Pbkdf2Scheme(getattr(settings, "OTP_PBKDF2_ITERATIONS", LEGACY_ITERATIONS)),
+}
+
+
+def otp_hasher() -> CredentialHasher:
+    """
+    Hasher for short-lived OTPs. OTP_HASH_SCHEME picks the scheme new OTPs get
+    (default hmac-sha256); OTPs already issued under the old untagged PBKDF2
+    keep verifying until they expire.
+    """
+    preferred = SCHEMES[getattr(settings, "OTP_HASH_SCHEME", HmacSha256Scheme.name)]()
+    accepted = tuple(
+        scheme for scheme in (HmacSha256Scheme(), Pbkdf2Scheme(), LegacyPbkdf2Scheme())
+        if scheme.name != preferred.name
+    )
+    return CredentialHasher(preferred, accepted)
+
+
+def hash_security_answer(answer: str) -> bytes:
+    """
+    PBKDF2 for long-lived security answers. These stay untagged because the
+    existing queries match answers by hash equality in SQL.
+    """
+    return LegacyPbkdf2Scheme().hash(answer)
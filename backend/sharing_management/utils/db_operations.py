@@ -1,4 +1,3 @@
-import hashlib
 import os
 from datetime import datetime
 import re
@@ -12,10 +11,15 @@ SALT = b'inclinic_salt_2024'
 from django.conf import settings
 from django.db import connections
 
+from sharing_management.utils.credential_hashing import hash_security_answer, otp_hasher
+from myproject.applog import get_logger
+
 MASTER_DB_ALIAS = getattr(settings, "MASTER_DB_ALIAS", "master")
 if MASTER_DB_ALIAS not in settings.DATABASES:
     MASTER_DB_ALIAS = "default"
 
+log = get_logger(__name__)
+
 def master_conn():
     return connections[MASTER_DB_ALIAS]
 
@@ -40,12 +44,7 @@ def register_field_representative(field_id, email, whatsapp_number, password, se
         hashed_password = make_password(password)
         
         # Hash the security answer using PBKDF2
-        security_answer_hash = hashlib.pbkdf2_hmac(
-            'sha256', 
-            security_answer.encode(), 
-            SALT, 
-            260000
-        ).hex()
+        security_answer_hash = hash_security_answer(security_answer).hex()
         
         with connection.cursor() as cursor:
             cursor.execute("""
@@ -63,7 +62,7 @@ def register_field_representative(field_id, email, whatsapp_number, password, se
         
         return True
     except Exception as e:
-        print(f"Error registering field representative: {e}")
+        log.warning("register_field_rep_failed", error=e)
         return False
 
 def validate_forgot_password(email, security_question_id, security_answer):
@@ -80,12 +79,7 @@ def validate_forgot_password(email, security_question_id, security_answer):
     """
     try:
         # Hash the security answer using PBKDF2
-        security_answer_hash = hashlib.pbkdf2_hmac(
-            'sha256', 
-            security_answer.encode(), 
-            SALT, 
-            260000
-        ).hex()
+        security_answer_hash = hash_security_answer(security_answer).hex()
         
         with connection.cursor() as cursor:
             cursor.execute("""
@@ -97,7 +91,7 @@ def validate_forgot_password(email, security_question_id, security_answer):
             return result is not None
             
     except Exception as e:
-        print(f"Error validating forgot password: {e}")
+        log.warning("validate_forgot_password_failed", error=e)
         return False
 
 def get_security_question_by_email(email):
@@ -124,7 +118,7 @@ def get_security_question_by_email(email):
             return result if result else (None, None)
             
     except Exception as e:
-        print(f"Error getting security question: {e}")
+        log.warning("security_question_lookup_failed", error=e)
         return (None, None)
 
 def register_user_management_user(email, username, password, security_answers):
@@ -163,12 +157,7 @@ def register_user_management_user(email, username, password, security_answers):
             
             # Insert security answers
             for question_id, answer in security_answers:
-                security_answer_hash = hashlib.pbkdf2_hmac(
-                    'sha256', 
-                    answer.encode(), 
-                    SALT, 
-                    260000
-                )
+                security_answer_hash = hash_security_answer(answer)
                 
                 cursor.execute("""
                     INSERT INTO user_security_answer 
@@ -178,7 +167,7 @@ def register_user_management_user(email, username, password, security_answers):
         
         return True
     except Exception as e:
-        print(f"Error registering user management user: {e}")
+        log.warning("register_user_failed", error=e)
         return False
 
 def set_temp_password(email, system_password):
@@ -202,7 +191,7 @@ def set_temp_password(email, system_password):
             
             return cursor.rowcount > 0
     except Exception as e:
-        print(f"Error setting temp password: {e}")
+        log.warning("set_temp_password_failed", error=e)
         return False
 
 def copy_prefilled_doctor(rep_id, prefilled_doctor_id):
@@ -227,7 +216,7 @@ def copy_prefilled_doctor(rep_id, prefilled_doctor_id):
             
             return cursor.rowcount > 0
     except Exception as e:
-        print(f"Error copying prefilled doctor: {e}")
+        log.warning("copy_prefilled_doctor_failed", error=e)
         return False
 
 def validate_user_forgot_password(email, security_answer):
@@ -243,12 +232,7 @@ def validate_user_forgot_password(email, security_answer):
     """
     try:
         # Hash the security answer using PBKDF2
-        security_answer_hash = hashlib.pbkdf2_hmac(
-            'sha256', 
-            security_answer.encode(), 
-            SALT, 
-            260000
-        )
+        security_answer_hash = hash_security_answer(security_answer)
         
         with connection.cursor() as cursor:
             cursor.execute("""
@@ -264,7 +248,7 @@ def validate_user_forgot_password(email, security_answer):
             return result is not None
             
     except Exception as e:
-        print(f"Error validating user forgot password: {e}")
+        log.warning("validate_user_forgot_password_failed", error=e)
         return False
 
 def get_user_security_questions_by_email(email):
@@ -291,7 +275,7 @@ def get_user_security_questions_by_email(email):
             return results if results else []
             
     except Exception as e:
-        print(f"Error getting user security questions: {e}")
+        log.warning("user_security_questions_failed", error=e)
         return []
 
 def generate_and_store_otp(field_id, phone_number):
@@ -318,13 +302,8 @@ def generate_and_store_otp(field_id, phone_number):
             # Generate 6-digit OTP
             otp = str(secrets.randbelow(1000000)).zfill(6)
             
-            # Hash the OTP using PBKDF2
-            otp_hash = hashlib.pbkdf2_hmac(
-                'sha256', 
-                otp.encode(), 
-                SALT, 
-                260000
-            )
+            # Hash the OTP with the configured OTP scheme
+            otp_hash = otp_hasher().hash(otp, context=f"rep_login:{user_id}")
             
             # Set expiration (10 minutes from now)
             expires_at = datetime.now() + timedelta(minutes=10)
@@ -342,7 +321,7 @@ def generate_and_store_otp(field_id, phone_number):
             return True, otp, user_id, user_data
             
     except Exception as e:
-        print(f"Error generating OTP: {e}")
+        log.warning("rep_otp_generate_failed", error=e)
         return False, None, None, None
 
 def log_whatsapp_login_attempt(user_id, success, ip_address=None, user_agent=None):
@@ -368,7 +347,7 @@ def log_whatsapp_login_attempt(user_id, success, ip_address=None, user_agent=Non
             
             return True
     except Exception as e:
-        print(f"Error logging WhatsApp login attempt: {e}")
+        log.warning("whatsapp_login_audit_failed", error=e)
         return False
 
 
@@ -393,21 +372,15 @@ def verify_otp(field_id, phone_number, otp, ip_address=None, user_agent=None):
             return False, None, None
         
         with connection.cursor() as cursor:
-            # Hash the provided OTP
-            otp_hash = hashlib.pbkdf2_hmac(
-                'sha256', 
-                otp.encode(), 
-                SALT, 
-                260000
-            )
-            
-            # Check if OTP is valid and not expired
+            # Fetch the unexpired OTP and check it against its own scheme, so
+            # OTPs issued before a scheme change still verify
             cursor.execute("""
-                SELECT 1 FROM rep_login_otp 
-                WHERE user_id = %s AND otp_hash = %s AND expires_at > NOW()
-            """, [user_id, otp_hash])
+                SELECT otp_hash FROM rep_login_otp 
+                WHERE user_id = %s AND expires_at > NOW()
+            """, [user_id])
+            row = cursor.fetchone()
             
-            if cursor.fetchone():
+            if row and otp_hasher().verify(otp, row[0], context=f"rep_login:{user_id}")[0]:
                 # OTP is valid - delete it and log success
                 cursor.execute("DELETE FROM rep_login_otp WHERE user_id = %s", [user_id])
                 log_whatsapp_login_attempt(user_id, True, ip_address, user_agent)
@@ -423,7 +396,7 @@ def verify_otp(field_id, phone_number, otp, ip_address=None, user_agent=None):
                 return False, None, None
             
     except Exception as e:
-        print(f"Error verifying OTP: {e}")
+        log.warning("rep_otp_verify_failed", error=e)
         return False, None, None 
 
 def authenticate_field_representative_direct(field_id, phone_number, ip_address=None, user_agent=None):
@@ -450,7 +423,7 @@ def authenticate_field_representative_direct(field_id, phone_number, ip_address=
         return True, user_id, user_data
             
     except Exception as e:
-        print(f"Error authenticating field representative directly: {e}")
+        log.warning("rep_direct_auth_failed", error=e)
         return False, None, None
 
 def _last10_digits(phone: str) -> str:
@@ -531,7 +504,7 @@ def lookup_user_by_field_and_phone(field_id, phone_input):
         return False, None, None
 
     except Exception as e:
-        print(f"Error looking up user: {e}")
+        log.warning("rep_lookup_failed", error=e)
         return False, None, None
 
 def generate_doctor_verification_otp(phone_e164, short_link_id):
@@ -553,13 +526,8 @@ def generate_doctor_verification_otp(phone_e164, short_link_id):
             # Generate 6-digit OTP
             otp = str(secrets.randbelow(1000000)).zfill(6)
             
-            # Hash the OTP using PBKDF2
-            otp_hash = hashlib.pbkdf2_hmac(
-                'sha256', 
-                otp.encode(), 
-                SALT, 
-                260000
-            )
+            # Hash the OTP with the configured OTP scheme
+            otp_hash = otp_hasher().hash(otp, context=f"doctor:{phone_e164}:{short_link_id}")
             
             # Set expiration (10 minutes from now)
             expires_at = datetime.now() + timedelta(minutes=10)
@@ -578,7 +546,7 @@ def generate_doctor_verification_otp(phone_e164, short_link_id):
             try:
                 # This is a placeholder for actual WhatsApp API integration
                 # In production, replace this with your WhatsApp API provider
-                print(f"📱 WhatsApp OTP sent to {phone_e164}: {otp}")
+                log.info("doctor_otp_sent", phone=phone_e164, short_link_id=short_link_id, otp_id=otp_id)
                 
                 # Example WhatsApp API integration (uncomment and configure):
                 # import requests
@@ -613,18 +581,18 @@ def generate_doctor_verification_otp(phone_e164, short_link_id):
                 # #     print(f"WhatsApp API error: {response.text}")
                 # #     return False, None, None
                 
-                # For development/testing - remove this in production
-                print(f"🔧 Development Mode: OTP {otp} would be sent to {phone_e164} via WhatsApp")
+                # For development/testing: the code itself only shows up at DEBUG
+                log.debug("doctor_otp_dev_code", phone=phone_e164, otp=otp)
                 
             except Exception as whatsapp_error:
-                print(f"WhatsApp API error: {whatsapp_error}")
+                log.warning("doctor_otp_send_failed", phone=phone_e164, error=whatsapp_error)
                 # Don't fail the entire operation if WhatsApp fails
                 # In production, you might want to handle this differently
             
             return True, otp, otp_id
             
     except Exception as e:
-        print(f"Error generating doctor verification OTP: {e}")
+        log.warning("doctor_otp_generate_failed", error=e)
         return False, None, None
 
 
@@ -663,28 +631,31 @@ def verify_doctor_otp(phone_e164, short_link_id, otp):
             if expires_at < datetime.now():
                 return False, None
                 
-            # Step 2: Hash the provided OTP and compare
-            provided_otp_hash = hashlib.pbkdf2_hmac(
-                'sha256', 
-                otp.encode(), 
-                SALT, 
-                260000
-            )
-            
-            # Compare hashes
-            if provided_otp_hash == stored_otp_hash:
-                # Step 3: Mark as verified
-                cursor.execute("""
-                    UPDATE doctor_verification_otp
-                    SET verified_at = NOW()
-                    WHERE id = %s
-                """, [otp_id])
+            # Step 2: Check the provided OTP against the stored hash's scheme
+            hasher = otp_hasher()
+            context = f"doctor:{phone_e164}:{short_link_id}"
+            otp_ok, needs_rehash = hasher.verify(otp, stored_otp_hash, context=context)
+            
+            if otp_ok:
+                # Step 3: Mark as verified (moving an old-scheme hash to the current one)
+                if needs_rehash:
+                    cursor.execute("""
+                        UPDATE doctor_verification_otp
+                        SET verified_at = NOW(), otp_hash = %s
+                        WHERE id = %s
+                    """, [hasher.hash(otp, context=context), otp_id])
+                else:
+                    cursor.execute("""
+                        UPDATE doctor_verification_otp
+                        SET verified_at = NOW()
+                        WHERE id = %s
+                    """, [otp_id])
                 return True, otp_id
             else:
                 return False, None
                 
     except Exception as e:
-        print(f"Error verifying doctor OTP: {e}")
+        log.warning("doctor_otp_verify_failed", error=e)
         return False, None
 
 
@@ -750,10 +721,10 @@ def log_manual_doctor_share(short_link_id, field_rep_id, phone_e164, collateral_
             )
             return True
         except (ShortLink.DoesNotExist, Collateral.DoesNotExist) as e:
-            print(f"Foreign key object not found: {e}")
+            log.warning("manual_doctor_share_missing_fk", short_link_id=short_link_id, collateral_id=collateral_id, error=e)
             return False
     except Exception as e:
-        print(f"Error logging manual doctor share: {e}")
+        log.warning("manual_doctor_share_failed", error=e)
         return False
 
 
@@ -835,7 +806,6 @@ def verify_doctor_whatsapp_number(phone_input, short_link_id):
             return digits[-10:] if len(digits) >= 10 else digits
 
         input_last10 = last10(phone_input)
-        print(f"DEBUG: Input last10 digits = {input_last10}")
 
         with connection.cursor() as cursor:
             cursor.execute("""
@@ -849,20 +819,15 @@ def verify_doctor_whatsapp_number(phone_input, short_link_id):
 
         for (stored_phone,) in rows:
             stored_last10 = last10(stored_phone)
-            print(
-                f"DEBUG: Comparing stored {stored_phone} "
-                f"(last10={stored_last10})"
-            )
-
             if stored_last10 == input_last10:
-                print("DEBUG: WhatsApp verification SUCCESS")
+                log.debug("doctor_whatsapp_verified", short_link_id=short_link_id, candidates=len(rows))
                 return True
 
-        print("DEBUG: WhatsApp verification FAILED")
+        log.debug("doctor_whatsapp_not_matched", short_link_id=short_link_id, candidates=len(rows))
         return False
 
     except Exception as e:
-        print(f"Error verifying doctor WhatsApp number: {e}")
+        log.warning("doctor_whatsapp_verify_failed", error=e)
         return False
 
 
@@ -891,7 +856,7 @@ def grant_download_access(short_link_id):
             
             return True
     except Exception as e:
-        print(f"Error granting download access: {e}")
+        log.warning("grant_download_access_failed", error=e)
         return False
 
 def authenticate_field_representative(email, password):
@@ -951,7 +916,7 @@ def authenticate_field_representative(email, password):
         return None, None, None
 
     except Exception as e:
-        print(f"Error authenticating field representative: {e}")
+        log.warning("rep_auth_failed", error=e)
         return None, None, None
 
 
@@ -980,5 +945,5 @@ def reset_field_representative_password(email, new_password):
             return cursor.rowcount > 0
             
     except Exception as e:
-        print(f"Error resetting password: {e}")
+        log.warning("reset_password_failed", error=e)
         return False
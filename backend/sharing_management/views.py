@@ -12,6 +12,7 @@ from django.contrib import messages
 from django.contrib.auth import get_user_model
 from django.contrib.auth.hashers import check_password as django_check_password
 from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
 from django.core.mail import send_mail
 from django.core.paginator import Paginator
 from django.db.models import Count, Q
@@ -23,6 +24,7 @@ from django.views.decorators.cache import never_cache
 from django.views.decorators.csrf import csrf_exempt
 
 from .decorators import dashboard_access_required, field_rep_required
+from .fieldrep_context import get_fieldrep_context
 from .forms import CollateralForm, DoctorBulkUploadForm, ShareForm
 from sharing_management.forms import CalendarCampaignCollateralForm
 
@@ -57,6 +59,10 @@ from doctor_viewer.models import Doctor, DoctorEngagement
 from shortlink_management.models import ShortLink
 from shortlink_management.utils import generate_short_code
 
+from sharing_management.services.master_access import MASTER_CACHE_TIMEOUT, get_master_fieldrep, is_master_assigned
+from sharing_management.services.message_templates import render_share_message, resolve_message_template
+from sharing_management.services.share_recording import record_whatsapp_share
+from upload_jobs.services import create_upload_job, remember_upload_job
 from sharing_management.services.transactions import (
     mark_downloaded_pdf,
     mark_pdf_progress,
@@ -66,6 +72,7 @@ from sharing_management.services.transactions import (
 )
 
 from utils.recaptcha import recaptcha_required
+from myproject.applog import get_logger
 
 import logging
 import re
@@ -75,30 +82,16 @@ from django.conf import settings
 from django.db import connections
 from django.db.utils import OperationalError
 from django.contrib.auth.hashers import make_password
-import os
 import uuid
 
 logger = logging.getLogger(__name__)
+# Debug output is off unless APP_LOG_LEVELS enables it for this module
+# (e.g. APP_LOG_LEVELS=sharing_management.views=DEBUG).
+log = get_logger(__name__)
 
-# Toggle if you want to disable later
-SM_VERBOSE_LOGS = getattr(settings, "SHARING_MANAGEMENT_VERBOSE_LOGS", True)
-
-
-def _smdbg(msg: str) -> None:
-    """
-    Sharing-management debug logger.
-    Enabled when settings.DEBUG=True OR settings.SHARING_MGMT_DEBUG=True
-    """
-    try:
-        from django.conf import settings
-        if getattr(settings, "DEBUG", False) or getattr(settings, "SHARING_MGMT_DEBUG", False):
-            print(f"[SMDBG] {msg}", flush=True)
-    except Exception:
-        # Never break runtime due to logging
-        pass
 
 def _fieldrep_dbg_enabled() -> bool:
-    return bool(getattr(settings, "FIELDREP_DEBUG_LOGS", False) or os.environ.get("FIELDREP_DEBUG_LOGS") == "1")
+    return log.isEnabledFor(logging.DEBUG)
 
 def _dbg(request, msg: str, **kv) -> None:
     if not _fieldrep_dbg_enabled():
@@ -119,9 +112,7 @@ def _dbg(request, msg: str, **kv) -> None:
             s = s[:400] + "...(truncated)"
         return s
 
-    parts = " ".join([f"{k}={_safe(v)}" for k, v in kv.items()])
-    line = f"[FIELDREP][{rid}] {msg}" + (f" | {parts}" if parts else "")
-    print(line)
+    log.debug(msg, stacklevel=2, rid=rid, **{k: _safe(v) for k, v in kv.items()})
 
 
 _CAMPAIGN_UUID_RE = re.compile(r"^[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}$")
@@ -461,9 +452,16 @@ def _complete_fieldrep_gmail_login(
     gmail_id = (gmail_id or "").strip().lower()
     brand_campaign_id = (brand_campaign_id or "").strip()
 
+    assigned = None
     if not master_rep:
         try:
-            master_rep = _master_get_fieldrep(field_id=field_id, gmail_id=gmail_id, request=request)
+            # One query resolves both the rep and its campaign assignment.
+            master_rep, assigned = _master_get_fieldrep(
+                field_id=field_id,
+                gmail_id=gmail_id,
+                campaign_raw=brand_campaign_id,
+                request=request,
+            )
         except Exception as e:
             _dbg(request, "MASTER lookup exception", err=str(e))
             master_rep = None
@@ -492,7 +490,8 @@ def _complete_fieldrep_gmail_login(
         gmail_id = _first_non_empty(getattr(getattr(master_rep, "user", None), "email", "")).lower()
 
     if brand_campaign_id and master_rep:
-        assigned = _master_is_assigned(master_rep, brand_campaign_id, request=request)
+        if assigned is None:
+            assigned = _master_is_assigned(master_rep, brand_campaign_id, request=request)
         if not assigned:
             _dbg(request, "BLOCKED: master assignment missing", master_fieldrep_id=master_rep.pk, campaign=brand_campaign_id)
             return None, assignment_error_message
@@ -568,62 +567,44 @@ def _get_security_questions_safe(request=None):
         _dbg(request, "SecurityQuestion raw SQL FAILED", table=table, err=str(e))
         return []
 
-def _master_get_fieldrep(field_id: str, gmail_id: str, request=None):
+def _master_get_fieldrep(field_id: str, gmail_id: str, campaign_raw: str = "", request=None):
     """
     Attempts to locate field rep in MASTER DB via master_models.
-    """
-    alias = _master_db_alias()
-    try:
-        from campaign_management.master_models import MasterFieldRep
-    except Exception as e:
-        _dbg(request, "IMPORT FAIL master_models.MasterFieldRep", err=str(e))
-        return None
-
-    qs = MasterFieldRep.objects.using(alias).select_related("user").filter(is_active=True)
-
-    attempts = []
-    if field_id and gmail_id:
-        attempts.append(("brand_supplied_field_rep_id+email",
-                         qs.filter(brand_supplied_field_rep_id__iexact=field_id, user__email__iexact=gmail_id)))
-        attempts.append(("username+email",
-                         qs.filter(user__username__iexact=field_id, user__email__iexact=gmail_id)))
-    if gmail_id:
-        attempts.append(("email-only", qs.filter(user__email__iexact=gmail_id)))
-
-    for label, q in attempts:
-        rep = q.first()
-        _dbg(request, "MASTER fieldrep lookup", label=label, found=bool(rep), alias=alias,
-             field_id=field_id, gmail=gmail_id,
-             master_fieldrep_id=getattr(rep, "pk", None),
-             master_user_id=getattr(rep, "user_id", None),
-             master_brand_id=getattr(rep, "brand_id", None))
-        if rep:
-            return rep
-    return None
-
-def _master_is_assigned(master_rep, campaign_raw: str, request=None) -> bool:
-    alias = _master_db_alias()
-    if not master_rep or not campaign_raw:
-        return False
-
-    try:
-        from campaign_management.master_models import MasterCampaignFieldRep
-    except Exception as e:
-        _dbg(request, "IMPORT FAIL MasterCampaignFieldRep", err=str(e))
-        return False
 
+    Returns (master_rep, assigned). ``assigned`` is None unless ``campaign_raw``
+    is given, in which case it comes from the same query as the rep.
+    """
+    candidates = _master_campaign_candidates(campaign_raw) if campaign_raw else []
+    rep, assigned = get_master_fieldrep(field_id, gmail_id, candidates)
+    _dbg(request, "MASTER fieldrep lookup", found=bool(rep), alias=_master_db_alias(),
+         field_id=field_id, gmail=gmail_id, campaign_candidates=candidates, assigned=assigned,
+         master_fieldrep_id=getattr(rep, "pk", None),
+         master_user_id=getattr(rep, "user_id", None),
+         master_brand_id=getattr(rep, "brand_id", None))
+    return rep, assigned
+
+def _master_campaign_candidates(campaign_raw: str) -> list[str]:
     norm = _normalize_campaign_id(campaign_raw)
     candidates = []
     for c in [campaign_raw, norm, (campaign_raw or "").replace("-", ""), (campaign_raw or "").lower().replace("-", "")]:
         c = (c or "").strip()
         if c and c not in candidates:
             candidates.append(c)
+    return candidates
 
-    qs = MasterCampaignFieldRep.objects.using(alias).filter(field_rep_id=master_rep.pk, campaign_id__in=candidates)
-    exists = qs.exists()
+def _master_is_assigned(master_rep, campaign_raw: str, request=None) -> bool:
+    alias = _master_db_alias()
+    if not master_rep or not campaign_raw:
+        return False
+
+    norm = _normalize_campaign_id(campaign_raw)
+    candidates = _master_campaign_candidates(campaign_raw)
+    exists = is_master_assigned(master_rep.pk, candidates)
 
     # Extra debug samples
     if _fieldrep_dbg_enabled():
+        from campaign_management.master_models import MasterCampaignFieldRep
+
         rep_campaigns = list(
             MasterCampaignFieldRep.objects.using(alias)
             .filter(field_rep_id=master_rep.pk)
@@ -666,9 +647,11 @@ def _ensure_portal_fieldrep_user(email: str, field_id: str, request=None):
     if not user:
         base = (email.split("@")[0] if email and "@" in email else f"fieldrep_{field_id or uuid.uuid4().hex[:6]}").strip()
         base = (base or "fieldrep")[:140]
+        # One query for every username the suffix loop could collide with.
+        taken = set(UserModel.objects.filter(username__startswith=base).values_list("username", flat=True))
         username = base
         suffix = 0
-        while UserModel.objects.filter(username=username).exists():
+        while username in taken:
             suffix += 1
             username = f"{base}_{suffix}"[:150]
 
@@ -710,7 +693,12 @@ def _ensure_portal_fieldrep_user(email: str, field_id: str, request=None):
 def _portal_sync_assignment(portal_user, brand_campaign_id: str, request=None):
     """
     Best-effort: ensures CampaignAssignment/FieldRepCampaign exist in portal DB if campaign exists there.
+    A successful sync is remembered briefly so repeat logins skip the lookups.
     """
+    synced_key = f"portal_assignment_synced:{getattr(portal_user, 'pk', '')}:{(brand_campaign_id or '').strip().lower()}"
+    if cache.get(synced_key):
+        return True
+
     try:
         from campaign_management.models import Campaign, CampaignAssignment
         from admin_dashboard.models import FieldRepCampaign
@@ -743,14 +731,15 @@ def _portal_sync_assignment(portal_user, brand_campaign_id: str, request=None):
          portal_user_id=portal_user.id,
          ca_created=ca_created,
          frc_created=frc_created)
+    cache.set(synced_key, True, MASTER_CACHE_TIMEOUT)
     return True
 
 def _smdbg(request, msg: str, **kwargs):
     """
-    Debug printer for sharing_management.
+    Debug logger for sharing_management.
     DO NOT log passwords.
     """
-    if not SM_VERBOSE_LOGS:
+    if not _fieldrep_dbg_enabled():
         return
     safe = {}
     for k, v in kwargs.items():
@@ -760,18 +749,9 @@ def _smdbg(request, msg: str, **kwargs):
         else:
             safe[k] = v
 
-    prefix = f"[SMDBG] {timezone.now().isoformat(timespec='seconds')}"
     if request is not None:
-        prefix += f" path={getattr(request, 'path', '')} method={getattr(request, 'method', '')}"
-    line = f"{prefix} :: {msg} :: {safe}"
-    try:
-        print(line)
-    except Exception:
-        pass
-    try:
-        logger.info(line)
-    except Exception:
-        pass
+        safe = {"path": getattr(request, "path", ""), "method": getattr(request, "method", ""), **safe}
+    log.debug(msg, stacklevel=2, **safe)
 
 
 def _master_db_alias() -> str:
@@ -944,8 +924,7 @@ def _split_full_name(full_name: str) -> tuple[str, str]:
 
 def _normalize_phone_e164(raw_phone: str, default_country_code: str = "91") -> str:
     digits = re.sub(r"\D", "", (raw_phone or ""))
-    if SM_VERBOSE_LOGS:
-        print(f"[SMDBG] _normalize_phone_e164 raw={raw_phone!r} digits={digits!r}")
+    log.debug("normalize_phone", raw=raw_phone, digits=digits)
 
     if not digits:
         return ""
@@ -1232,9 +1211,7 @@ def find_or_create_short_link(collateral, user):
             is_active=True,
         ).first()
         if existing:
-            # minimal debug (no request object here)
-            if SM_VERBOSE_LOGS:
-                print(f"[SMDBG] find_or_create_short_link existing short_code={existing.short_code} resource_id={existing.resource_id}")
+            log.debug("short_link_reused", short_code=existing.short_code, resource_id=existing.resource_id)
             return existing
 
         short_code = generate_short_code(length=8)
@@ -1246,12 +1223,10 @@ def find_or_create_short_link(collateral, user):
             date_created=timezone.now(),
             is_active=True,
         )
-        if SM_VERBOSE_LOGS:
-            print(f"[SMDBG] find_or_create_short_link created short_code={obj.short_code} resource_id={obj.resource_id}")
+        log.debug("short_link_created", short_code=obj.short_code, resource_id=obj.resource_id)
         return obj
     except Exception as e:
-        if SM_VERBOSE_LOGS:
-            print(f"[SMDBG] find_or_create_short_link ERROR: {e}")
+        log.warning("short_link_create_failed", collateral_id=getattr(collateral, "id", None), error=e)
         raise
 
 
@@ -1263,151 +1238,19 @@ def get_brand_specific_message(
     brand_campaign_id=None,
     message_kind="initial",
 ):
-    from django.db import connection
-
-    from collateral_management.models import (
-        CampaignCollateral as CollateralMgmtCampaignCollateral,
-        Collateral as CollateralModel,
-        CollateralMessage,
+    log.debug(
+        "brand_message_requested",
+        brand_campaign_id=brand_campaign_id,
+        collateral_id=collateral_id,
+        message_kind=message_kind,
     )
-    from campaign_management.models import CampaignCollateral as CampaignMgmtCampaignCollateral
-
-    bc_id = (str(brand_campaign_id).strip() if brand_campaign_id else "")
-    campaign_variants = _campaign_id_variants(bc_id)
-    message_kind = "reminder" if str(message_kind).strip().lower() == "reminder" else "initial"
-    if SM_VERBOSE_LOGS:
-        print(
-            f"[SMDBG] get_brand_specific_message bc_id={bc_id!r} "
-            f"campaign_variants={campaign_variants!r} collateral_id={collateral_id!r} "
-            f"message_kind={message_kind!r}"
-        )
-
-    reminder_column_supported = False
-    if message_kind == "reminder":
-        try:
-            with connection.cursor() as cursor:
-                desc = connection.introspection.get_table_description(cursor, CollateralMessage._meta.db_table)
-            reminder_column_supported = any(getattr(col, "name", "") == "reminder_message" for col in desc)
-        except Exception as e:
-            if SM_VERBOSE_LOGS:
-                print(f"[SMDBG] get_brand_specific_message reminder-column introspection ERROR: {e}")
-
-    def _render_custom_message(queryset):
-        fields = ["message"]
-        if reminder_column_supported:
-            fields.append("reminder_message")
-
-        row = queryset.values(*fields).order_by("-id").first()
-        if not row:
-            return None
-
-        if message_kind == "reminder" and reminder_column_supported:
-            reminder_template = (row.get("reminder_message") or "").strip()
-            if reminder_template:
-                return reminder_template.replace("$collateralLinks", collateral_link)
-
-        message_template = (row.get("message") or "").strip()
-        if message_template:
-            return message_template.replace("$collateralLinks", collateral_link)
-        return None
-
-    try:
-        if campaign_variants:
-            rendered_message = _render_custom_message(
-                CollateralMessage.objects.filter(
-                    campaign__brand_campaign_id__in=campaign_variants,
-                    collateral_id=collateral_id,
-                    is_active=True,
-                )
-            )
-            if rendered_message:
-                return rendered_message
-    except Exception as e:
-        if SM_VERBOSE_LOGS:
-            print(f"[SMDBG] get_brand_specific_message brand-specific lookup ERROR: {e}")
-
-    try:
-        if campaign_variants:
-            campaign_collateral = (
-                CollateralMgmtCampaignCollateral.objects.select_related("campaign")
-                .filter(campaign__brand_campaign_id__in=campaign_variants, collateral_id=collateral_id)
-                .order_by("-id")
-                .first()
-            )
-            if campaign_collateral and getattr(campaign_collateral, "campaign", None):
-                rendered_message = _render_custom_message(
-                    CollateralMessage.objects.filter(
-                        campaign=campaign_collateral.campaign,
-                        collateral_id=collateral_id,
-                        is_active=True,
-                    )
-                )
-                if rendered_message:
-                    return rendered_message
-    except Exception as e:
-        if SM_VERBOSE_LOGS:
-            print(f"[SMDBG] get_brand_specific_message collateral bridge fallback ERROR: {e}")
 
-    try:
-        if campaign_variants:
-            campaign_collateral = (
-                CampaignMgmtCampaignCollateral.objects.select_related("campaign")
-                .filter(campaign__brand_campaign_id__in=campaign_variants, collateral_id=collateral_id)
-                .order_by("-id")
-                .first()
-            )
-            if campaign_collateral and getattr(campaign_collateral, "campaign", None):
-                rendered_message = _render_custom_message(
-                    CollateralMessage.objects.filter(
-                        campaign=campaign_collateral.campaign,
-                        collateral_id=collateral_id,
-                        is_active=True,
-                    )
-                )
-                if rendered_message:
-                    return rendered_message
-    except Exception as e:
-        if SM_VERBOSE_LOGS:
-            print(f"[SMDBG] get_brand_specific_message legacy bridge fallback ERROR: {e}")
-
-    try:
-        collateral_obj = CollateralModel.objects.select_related("campaign").filter(id=collateral_id).first()
-        if collateral_obj and getattr(collateral_obj, "campaign", None):
-            rendered_message = _render_custom_message(
-                CollateralMessage.objects.filter(
-                    campaign=collateral_obj.campaign,
-                    collateral_id=collateral_id,
-                    is_active=True,
-                )
-            )
-            if rendered_message:
-                return rendered_message
-    except Exception as e:
-        if SM_VERBOSE_LOGS:
-            print(f"[SMDBG] get_brand_specific_message direct collateral fallback ERROR: {e}")
-
-    return (
-        "Hello Doctor, please check this: "
-        f"{collateral_link}"
+    template = resolve_message_template(
+        collateral_id,
+        brand_campaign_id=brand_campaign_id,
+        message_kind=message_kind,
     )
-
-
-def _link_with_share_id(url: str, share_id) -> str:
-    if not url or not share_id:
-        return url
-
-    try:
-        parsed = urllib.parse.urlsplit(url)
-        query = urllib.parse.parse_qsl(parsed.query, keep_blank_values=True)
-        query = [(key, value) for key, value in query if key not in {"share_id", "s", "share"}]
-        query.append(("share_id", str(share_id)))
-        return urllib.parse.urlunsplit(
-            parsed._replace(query=urllib.parse.urlencode(query))
-        )
-    except Exception:
-        separator = "&" if "?" in url else "?"
-        return f"{url}{separator}share_id={share_id}"
-
+    return render_share_message(template, collateral_link)
 
 
 def _clear_google_session_keys(request: HttpRequest) -> None:
@@ -1523,8 +1366,8 @@ def doctor_view_log(request):
                 )
         except ShareLog.DoesNotExist:
             pass
-        except Exception as e:
-            print("[doctor_view_log] error updating ShareLog/CollateralTransaction:", str(e))
+        except Exception:
+            log.exception("doctor_view_log_update_failed")
             return JsonResponse({"ok": False, "error": "Failed to update transaction"}, status=500)
 
     return JsonResponse({"ok": True, "event": event})
@@ -2017,26 +1860,22 @@ def fieldrep_share_collateral(request, brand_campaign_id=None):
         messages.error(request, "Please login first.")
         return redirect("fieldrep_login")
 
-    # Fetch rep from master for validation + sync to portal user
+    # Master rep, its portal mirror and campaign ids are resolved once per
+    # session (and re-resolved when assignments change), not per request.
+    fieldrep_context = get_fieldrep_context(request)
     rep = None
-    try:
-        rep = (
-            MasterFieldRep.objects.using(_master_db_alias())
-            .select_related("user", "brand")
-            .filter(id=int(master_field_rep_id), is_active=True)
-            .first()
-        )
-    except Exception:
-        rep = None
+    if fieldrep_context:
+        # A share is authorized against master as it is now, not the session copy.
+        rep = fieldrep_context.checked_master_rep() if request.method == "POST" else fieldrep_context.master_rep
 
     if not rep:
         messages.error(request, "Field rep not found or inactive. Please login again.")
         return redirect("fieldrep_login")
 
-    portal_user = _ensure_portal_user_for_master_fieldrep(rep)
+    portal_user = fieldrep_context.portal_user(rep.portal_user_id) if rep.portal_user_id else None
 
     # Determine allowed campaign ids for this rep
-    allowed_campaign_ids = _master_get_campaign_ids_for_fieldrep(int(rep.id))
+    allowed_campaign_ids = list(rep.campaign_ids)
 
     # If a campaign is specified, enforce it belongs to rep
     if brand_campaign_id:
@@ -2053,14 +1892,9 @@ def fieldrep_share_collateral(request, brand_campaign_id=None):
                     "doctors": [],
                 },
             )
-        campaign_ids_to_use = [brand_campaign_id]
+        campaign_id_variants_to_use = list(dict.fromkeys(v for v in _campaign_id_variants(brand_campaign_id) if v))
     else:
-        campaign_ids_to_use = allowed_campaign_ids
-
-    campaign_id_variants_to_use = []
-    for campaign_id in campaign_ids_to_use:
-        campaign_id_variants_to_use.extend(_campaign_id_variants(campaign_id))
-    campaign_id_variants_to_use = list(dict.fromkeys([value for value in campaign_id_variants_to_use if value]))
+        campaign_id_variants_to_use = rep.campaign_variants
 
     # Collaterals filtered by campaign dates + is_active (DEFAULT DB)
     collaterals_list: list[dict] = []
@@ -2097,7 +1931,7 @@ def fieldrep_share_collateral(request, brand_campaign_id=None):
                 }
             )
     except Exception as e:
-        print(f"[fieldrep_share_collateral] Error fetching collaterals: {e}")
+        log.warning("fieldrep_collaterals_failed", brand_campaign_id=brand_campaign_id, error=e)
         messages.error(request, "Error loading collaterals. Please try again.")
         collaterals_list = []
 
@@ -2116,7 +1950,7 @@ def fieldrep_share_collateral(request, brand_campaign_id=None):
     doctors_with_status = _doctor_rows_with_status(
         doctors,
         selected_collateral_id,
-        current_field_rep_id=int(rep.id),
+        current_field_rep_id=rep.rep_id,
     )
 
     if request.method == "POST":
@@ -2169,8 +2003,8 @@ def fieldrep_share_collateral(request, brand_campaign_id=None):
                 sl = ShareLog.objects.create(
                     short_link=short_link,
                     collateral=collateral_obj,
-                    field_rep_id=int(rep.id),
-                    field_rep_email=(rep.user.email or ""),
+                    field_rep_id=rep.rep_id,
+                    field_rep_email=rep.email,
                     doctor_identifier=phone_e164,
                     share_channel="WhatsApp",
                     share_timestamp=timezone.now(),
@@ -2184,7 +2018,7 @@ def fieldrep_share_collateral(request, brand_campaign_id=None):
                         sl,
                         brand_campaign_id=stored_brand_campaign_id,
                         doctor_name=doctor_name or None,
-                        field_rep_unique_id=(rep.brand_supplied_field_rep_id or "") or None,
+                        field_rep_unique_id=rep.field_id or None,
                         sent_at=sl.share_timestamp,
                     )
                 except Exception:
@@ -2431,14 +2265,11 @@ def fieldrep_gmail_share_collateral(request, brand_campaign_id=None):
     """
     Kept behavior: prepares WhatsApp message.
     FIX: ensure ShareLog row is created with doctor_identifier so /view/collateral/verify/ can match.
-    Logs: print() only.
+    Logs: module logger at DEBUG.
     """
-    import urllib.parse as _up
-    import re as _re
     from datetime import timedelta
 
     from django.contrib import messages
-    from django.db import connection
     from django.shortcuts import redirect, render
     from django.utils import timezone
 
@@ -2447,63 +2278,47 @@ def fieldrep_gmail_share_collateral(request, brand_campaign_id=None):
     from collateral_management.models import CampaignCollateral as CMCampaignCollateral2
     from user_management.models import User as UMUser
 
-    from sharing_management.models import ShareLog, CollateralTransaction
+    from sharing_management.models import CollateralTransaction
     from doctor_viewer.models import Doctor
     from collateral_management.models import Collateral
 
-    print("[SMDBG] ===== fieldrep_gmail_share_collateral START =====")
-    print(f"[SMDBG] method={request.method} path={request.path} full_path={request.get_full_path()}")
-    print(f"[SMDBG] GET={dict(request.GET)}")
-
     field_rep_id = request.session.get("field_rep_id")
     field_rep_email = request.session.get("field_rep_email")
     field_rep_field_id = request.session.get("field_rep_field_id")
     session_campaign = request.session.get("brand_campaign_id")
 
-    print(
-        f"[SMDBG] session field_rep_id={field_rep_id} field_rep_email={field_rep_email} "
-        f"field_rep_field_id={field_rep_field_id} session_campaign={session_campaign}"
-    )
-
     if brand_campaign_id is None:
         brand_campaign_id = request.GET.get("brand_campaign_id") or request.GET.get("campaign")
-    print(f"[SMDBG] resolved brand_campaign_id={brand_campaign_id}")
+    log.debug(
+        "gmail_share_start",
+        method=request.method,
+        path=request.get_full_path(),
+        field_rep_id=field_rep_id,
+        field_rep_email=field_rep_email,
+        field_rep_field_id=field_rep_field_id,
+        session_campaign=session_campaign,
+        brand_campaign_id=brand_campaign_id,
+    )
 
     if not field_rep_id:
         messages.error(request, "Please login first.")
-        print("[SMDBG] STOP: no session field_rep_id -> redirect fieldrep_login")
+        log.debug("gmail_share_stop", reason="no_session_field_rep")
         return redirect("fieldrep_login")
 
-    # small helper for comparing phones
-    def _last10(phone: str) -> str:
-        digits = _re.sub(r"\D", "", phone or "")
-        return digits[-10:] if len(digits) >= 10 else digits
-
-    # Resolve actual_user (portal user) for doctors/shortlinks
+    # Resolve actual_user (portal user) for doctors/shortlinks; the id lookup
+    # (field_id, then email, then session id) is cached in the session.
     actual_user = None
     try:
-        if field_rep_field_id:
-            actual_user = UMUser.objects.filter(field_id=field_rep_field_id, role="field_rep").first()
-            if actual_user:
-                print(f"[SMDBG] actual_user by field_id -> {actual_user.id}")
-        if not actual_user and field_rep_email:
-            actual_user = UMUser.objects.filter(email=field_rep_email, role="field_rep").first()
-            if actual_user:
-                print(f"[SMDBG] actual_user by email -> {actual_user.id}")
-        if not actual_user:
-            try:
-                actual_user = UMUser.objects.get(id=int(field_rep_id))
-                print(f"[SMDBG] actual_user by session id -> {actual_user.id}")
-            except Exception:
-                actual_user = None
+        fieldrep_context = get_fieldrep_context(request)
+        actual_user = fieldrep_context.portal_user() if fieldrep_context else None
     except Exception as e:
-        print("[SMDBG] ERROR resolving actual_user:", e)
+        log.warning("gmail_share_user_resolve_failed", field_rep_id=field_rep_id, error=e)
         actual_user = None
 
     if actual_user:
-        print(f"[SMDBG] final actual_user.id={actual_user.id} username={getattr(actual_user,'username','')} email={getattr(actual_user,'email','')}")
+        log.debug("gmail_share_user", user_id=actual_user.id, email=getattr(actual_user, "email", ""))
     else:
-        print("[SMDBG] WARNING: actual_user could not be resolved")
+        log.warning("gmail_share_user_unresolved", field_rep_id=field_rep_id)
 
     # Build collateral list
     collaterals_list = []
@@ -2532,11 +2347,15 @@ def fieldrep_gmail_share_collateral(request, brand_campaign_id=None):
             collateral_collaterals = [x.collateral for x in cc2 if x.collateral]
 
             merged = list({c.id: c for c in (campaign_collaterals + collateral_collaterals) if getattr(c, "id", None)}.values())
-            print(f"[SMDBG] collaterals from campaign filters: c1={len(campaign_collaterals)} c2={len(collateral_collaterals)} merged={len(merged)}")
+            log.debug(
+                "gmail_share_campaign_collaterals",
+                campaign_mgmt=len(campaign_collaterals),
+                collateral_mgmt=len(collateral_collaterals),
+                merged=len(merged),
+            )
             collaterals = merged
         else:
             collaterals = CMCollateral.objects.filter(is_active=True).order_by("-created_at")
-            print(f"[SMDBG] collaterals from all actives: count={collaterals.count()}")
 
         for c in collaterals:
             if not actual_user:
@@ -2551,20 +2370,25 @@ def fieldrep_gmail_share_collateral(request, brand_campaign_id=None):
                 "short_code": short_link.short_code,
             })
 
-        print(f"[SMDBG] collaterals_list prepared count={len(collaterals_list)} ids={[x['id'] for x in collaterals_list]}")
+        log.debug("gmail_share_collaterals", ids=[x["id"] for x in collaterals_list])
     except Exception as e:
-        print("[SMDBG] ERROR fetching collaterals:", e)
+        log.warning("gmail_share_collaterals_failed", brand_campaign_id=brand_campaign_id, error=e)
         collaterals_list = []
         messages.error(request, "Error loading collaterals. Please try again.")
 
     selected_collateral_id = (request.GET.get("collateral") or "").strip()
     if not selected_collateral_id and collaterals_list:
         selected_collateral_id = str(collaterals_list[0]["id"])
-    print(f"[SMDBG] selected_collateral_id(GET/default)={selected_collateral_id}")
 
     # Assigned doctors
     assigned_doctors = Doctor.objects.filter(rep=actual_user) if actual_user else Doctor.objects.none()
-    print(f"[SMDBG] assigned_doctors count={assigned_doctors.count() if hasattr(assigned_doctors,'count') else len(list(assigned_doctors))}")
+    if _fieldrep_dbg_enabled():
+        # the count is an extra query, only worth it when debugging
+        log.debug(
+            "gmail_share_page",
+            selected_collateral_id=selected_collateral_id,
+            assigned_doctors=assigned_doctors.count(),
+        )
 
     doctors_with_status = _doctor_rows_with_status(
         assigned_doctors,
@@ -2576,9 +2400,7 @@ def fieldrep_gmail_share_collateral(request, brand_campaign_id=None):
     # POST (share)
     # -----------------------------
     if request.method == "POST":
-        print("[SMDBG] ----- POST RECEIVED -----")
-        print(f"[SMDBG] POST keys={list(request.POST.keys())}")
-        print(f"[SMDBG] POST={dict(request.POST)}")
+        log.debug("gmail_share_post", keys=list(request.POST.keys()))
 
         doctor_name = (request.POST.get("doctor_name") or "").strip()
         doctor_whatsapp = (request.POST.get("doctor_whatsapp") or "").strip()
@@ -2599,37 +2421,35 @@ def fieldrep_gmail_share_collateral(request, brand_campaign_id=None):
                     doctor_name = doc_obj.name or "Doctor"
                     # stored phone is last10, normalize to E164
                     doctor_whatsapp = doc_obj.phone
-                    print(f"[SMDBG] quick-send resolved doctor_id={doctor_id} name={doctor_name} phone={doctor_whatsapp}")
+                    log.debug("gmail_share_quick_send_doctor", doctor_id=doctor_id)
             except Exception as e:
-                print("[SMDBG] quick-send doctor lookup failed:", e)
+                log.warning("gmail_share_quick_send_lookup_failed", doctor_id=doctor_id, error=e)
 
-        print(f"[SMDBG] doctor_name={doctor_name} doctor_whatsapp={doctor_whatsapp} collateral_id_str={collateral_id_str}")
+        log.debug("gmail_share_target", doctor_name=doctor_name, doctor_whatsapp=doctor_whatsapp, collateral=collateral_id_str)
 
         if not collateral_id_str.isdigit():
             messages.error(request, "Please select a valid collateral.")
-            print("[SMDBG] STOP: collateral_id invalid")
+            log.debug("gmail_share_stop", reason="invalid_collateral_id", collateral=collateral_id_str)
             return redirect(request.path + (f"?brand_campaign_id={brand_campaign_id}&collateral={selected_collateral_id}" if brand_campaign_id else ""))
 
         collateral_id = int(collateral_id_str)
         selected_collateral = next((c for c in collaterals_list if c["id"] == collateral_id), None)
-        print(f"[SMDBG] selected_collateral found={bool(selected_collateral)}")
 
         if not selected_collateral:
             messages.error(request, "Selected collateral not found.")
-            print("[SMDBG] STOP: selected collateral not in collaterals_list")
+            log.debug("gmail_share_stop", reason="collateral_not_listed", collateral_id=collateral_id)
             return redirect(request.path)
 
         # Manual entry required (updated: allow doctor_id-based quick-send)
         if not doctor_name or not doctor_whatsapp:
             messages.error(request, "Please select a doctor or fill all required fields.")
-            print("[SMDBG] STOP: missing doctor_name/doctor_whatsapp (no doctor_id resolved)")
+            log.debug("gmail_share_stop", reason="missing_doctor")
             return redirect(request.path + (f"?brand_campaign_id={brand_campaign_id}&collateral={selected_collateral_id}" if brand_campaign_id else ""))
 
         phone_e164 = _normalize_phone_e164(doctor_whatsapp)
-        print(f"[SMDBG] normalized phone_e164={phone_e164}")
         if not phone_e164:
             messages.error(request, "Please enter a valid WhatsApp number.")
-            print("[SMDBG] STOP: invalid phone")
+            log.debug("gmail_share_stop", reason="invalid_phone")
             return redirect(request.path)
 
         # Ensure rep_user exists
@@ -2644,211 +2464,48 @@ def fieldrep_gmail_share_collateral(request, brand_campaign_id=None):
                     role="field_rep",
                     field_id=field_rep_field_id or "",
                 )
-                print(f"[SMDBG] created rep_user id={rep_user.id}")
+                log.info("gmail_share_rep_user_created", user_id=rep_user.id, field_rep_id=field_rep_id)
             except Exception as e:
-                print("[SMDBG] ERROR creating rep_user:", e)
+                log.warning("gmail_share_rep_user_create_failed", field_rep_id=field_rep_id, error=e)
                 messages.error(request, "Unable to resolve field rep user.")
                 return redirect(request.path)
 
-        print(f"[SMDBG] rep_user.id={rep_user.id}")
-
-        # Upsert doctor
-        phone_last10 = _last10(phone_e164)
-        doctor_obj, created = Doctor.objects.update_or_create(
-            rep=rep_user,
-            phone=phone_last10,
-            defaults={"name": doctor_name},
-        )
-        print(f"[SMDBG] Doctor upserted id={doctor_obj.id} created={created} phone_last10={phone_last10}")
 
         # Resolve collateral and short link
         try:
             collateral_obj = Collateral.objects.get(id=collateral_id, is_active=True)
         except Exception as e:
-            print("[SMDBG] ERROR Collateral get:", e)
+            log.debug("gmail_share_stop", reason="collateral_unavailable", collateral_id=collateral_id, error=e)
             messages.error(request, "Collateral not found / inactive.")
             return redirect(request.path)
 
         short_link = find_or_create_short_link(collateral_obj, rep_user)
-        print(f"[SMDBG] short_link resolved id={short_link.id} code={short_link.short_code}")
 
-        message = get_brand_specific_message(
-            collateral_id,
-            selected_collateral["name"],
-            selected_collateral["link"],
+        # Doctor, ShareLog (with doctor_identifier, so doctor_collateral_verify can
+        # match the WhatsApp number) and CollateralTransaction in one transaction;
+        # master lookups and legacy logging run after commit.
+        recorded = record_whatsapp_share(
+            rep_user=rep_user,
+            field_rep_id=field_rep_id,
+            field_rep_email=field_rep_email,
+            field_rep_field_id=field_rep_field_id,
             brand_campaign_id=brand_campaign_id,
+            doctor_name=doctor_name,
+            phone_e164=phone_e164,
+            collateral_id=collateral_id,
+            collateral_link=selected_collateral["link"],
+            short_link=short_link,
             message_kind=message_kind,
         )
+        log.debug(
+            "gmail_share_recorded",
+            rep_user_id=rep_user.id,
+            short_link_id=short_link.id,
+            doctor_id=recorded.doctor_id,
+            share_log_id=recorded.share_log_id,
+        )
 
-        # ------------------------------------------------------------
-        # IMPORTANT FIX: ensure ShareLog row exists with doctor_identifier
-        # so doctor_collateral_verify can match WhatsApp number.
-        # We DO NOT rely on ORM create() because your table/model may be out-of-sync.
-        # ------------------------------------------------------------
-        matched_sharelog_id = None
-        input_last10 = _last10(phone_e164)
-
-        try:
-            existing_rows = list(
-                ShareLog.objects.filter(short_link_id=short_link.id)
-                .exclude(doctor_identifier__isnull=True)
-                .exclude(doctor_identifier__exact="")
-                .values("id", "doctor_identifier")
-                .order_by("-id")[:50]
-            )
-            print(f"[SMDBG] ShareLog existing rows for short_link_id={short_link.id}: count={len(existing_rows)}")
-            for row in existing_rows:
-                if _last10(row.get("doctor_identifier") or "") == input_last10:
-                    matched_sharelog_id = row["id"]
-                    break
-            print(f"[SMDBG] ShareLog match by last10 -> {matched_sharelog_id}")
-        except Exception as e:
-            print("[SMDBG] ERROR reading ShareLog existing rows:", e)
-
-        if not matched_sharelog_id:
-            print("[SMDBG] ShareLog not found for this doctor+short_link; attempting raw SQL insert")
-
-            try:
-                table = ShareLog._meta.db_table
-                now = timezone.now()
-
-                with connection.cursor() as cursor:
-                    desc = connection.introspection.get_table_description(cursor, table)
-                    col_null_ok = {c.name: bool(getattr(c, "null_ok", True)) for c in desc}
-                    cols = list(col_null_ok.keys())
-
-                    # Candidate values (only inserted if column exists)
-                    stored_brand_campaign_id = canonical_brand_campaign_id(brand_campaign_id, sync_from_master=True)
-                    desired = {
-                        "short_link_id": short_link.id,
-                        "doctor_identifier": phone_e164,
-                        "share_channel": "WhatsApp",
-                        "share_timestamp": now,
-                        "created_at": now,
-                        "updated_at": now,
-                        "collateral_id": collateral_id,
-
-                        "field_rep_id": str(field_rep_id or getattr(rep_user, "id", "") or ""),
-                        "field_rep_email": field_rep_email or "",
-                        "brand_campaign_id": stored_brand_campaign_id,
-                        "message_text": message,
-                    }
-
-                    # Fill required NOT NULL cols if they exist and we didn't set them
-                    for col, null_ok in col_null_ok.items():
-                        if col == "id":
-                            continue
-                        if null_ok:
-                            continue
-                        if col in desired:
-                            continue
-
-                        # best-effort defaults
-                        if col in ("created_at", "updated_at", "share_timestamp", "sent_at", "timestamp"):
-                            desired[col] = now
-                        elif col in ("share_channel", "channel"):
-                            desired[col] = "WhatsApp"
-                        elif col in ("doctor_identifier", "doctor_number", "whatsapp_number"):
-                            desired[col] = phone_e164
-                        elif col in ("field_rep_id", "fieldrep_id"):
-                            desired[col] = str(getattr(rep_user, "id", "") or field_rep_id or "")
-                        elif col.endswith("_id"):
-                            desired[col] = str(getattr(rep_user, "id", "") or "0")
-                        else:
-                            desired[col] = ""
-
-                    insert_cols = [c for c in desired.keys() if c in cols and c != "id"]
-                    insert_vals = [desired[c] for c in insert_cols]
-
-                    qn = connection.ops.quote_name
-                    table_q = qn(table)
-                    cols_q = ", ".join(qn(c) for c in insert_cols)
-                    placeholders = ", ".join(["%s"] * len(insert_cols))
-                    sql = f"INSERT INTO {table_q} ({cols_q}) VALUES ({placeholders})"
-
-                    print(f"[SMDBG] ShareLog INSERT cols={insert_cols}")
-                    cursor.execute(sql, insert_vals)
-                    matched_sharelog_id = cursor.lastrowid
-                    print(f"[SMDBG] ShareLog INSERT OK id={matched_sharelog_id}")
-
-            except Exception as e:
-                print("[SMDBG] ERROR inserting ShareLog row:", e)
-
-        if matched_sharelog_id:
-            try:
-                tx_share_log = (
-                    ShareLog.objects
-                    .only(
-                        "id",
-                        "short_link",
-                        "collateral",
-                        "doctor_identifier",
-                        "share_channel",
-                        "share_timestamp",
-                        "field_rep_id",
-                    )
-                    .filter(id=matched_sharelog_id)
-                    .first()
-                )
-                if tx_share_log:
-                    tx_share_log.__dict__["field_rep_email"] = field_rep_email or ""
-                    tx_share_log.__dict__["brand_campaign_id"] = canonical_brand_campaign_id(
-                        brand_campaign_id,
-                        sync_from_master=True,
-                    )
-                    upsert_from_sharelog(
-                        tx_share_log,
-                        brand_campaign_id=brand_campaign_id or "",
-                        doctor_name=doctor_name or None,
-                        field_rep_unique_id=field_rep_field_id or None,
-                        sent_at=getattr(tx_share_log, "share_timestamp", None),
-                    )
-                    print("[SMDBG] CollateralTransaction upsert OK for share_log_id=", matched_sharelog_id)
-            except Exception as e:
-                print("[SMDBG] CollateralTransaction upsert ERROR:", e)
-
-        if matched_sharelog_id:
-            personalized_link = _link_with_share_id(selected_collateral["link"], matched_sharelog_id)
-            message = get_brand_specific_message(
-                collateral_id,
-                selected_collateral["name"],
-                personalized_link,
-                brand_campaign_id=brand_campaign_id,
-                message_kind=message_kind,
-            )
-
-            try:
-                with connection.cursor() as cursor:
-                    table = ShareLog._meta.db_table
-                    desc = connection.introspection.get_table_description(cursor, table)
-                    cols = {c.name for c in desc}
-                    if "message_text" in cols:
-                        qn = connection.ops.quote_name
-                        cursor.execute(
-                            f"UPDATE {qn(table)} SET {qn('message_text')} = %s WHERE id = %s",
-                            [message, matched_sharelog_id],
-                        )
-                        print("[SMDBG] ShareLog message_text updated with personalized share_id link")
-            except Exception as e:
-                print("[SMDBG] ShareLog message_text update ERROR:", e)
-
-        # Best-effort existing logging helper (optional)
-        try:
-            from sharing_management.utils.db_operations import log_manual_doctor_share
-            log_manual_doctor_share(
-                short_link_id=short_link.id,
-                field_rep_id=rep_user.id,
-                phone_e164=phone_e164,
-                collateral_id=collateral_id,
-            )
-            print("[SMDBG] log_manual_doctor_share() OK")
-        except Exception as e:
-            print("[SMDBG] log_manual_doctor_share() ERROR:", e)
-
-        # Build WhatsApp URL
-        wa_number = _re.sub(r"\D", "", phone_e164).lstrip("+")
-        wa_url = f"https://wa.me/{wa_number}?text={_up.quote(message)}"
-        print(f"[SMDBG] FINAL wa_url={wa_url}")
+        wa_url = recorded.wa_url
 
         return redirect(wa_url)
 
@@ -2948,20 +2605,23 @@ def doctor_bulk_upload(request):
         return redirect(f"{reverse('fieldrep_dashboard')}?campaign={campaign_filter}")
 
     form = DoctorBulkUploadForm()
-    ingestion_errors = []
-    created_count = 0
-    upload_completed = False
 
     if request.method == "POST":
         form = DoctorBulkUploadForm(request.POST, request.FILES)
         if form.is_valid():
-            cleaned_rows, ingestion_errors = form.validate_rows(campaign=campaign)
-            if not ingestion_errors and not cleaned_rows:
-                ingestion_errors = ["No doctor rows found in the uploaded CSV."]
-            elif not ingestion_errors:
-                created_count = form.save_validated_rows(cleaned_rows)
-                upload_completed = True
-                form = DoctorBulkUploadForm()
+            # Validation and inserts run as an upload job
+            # (sharing_management.upload_handlers.doctor_bulk_upload).
+            job = create_upload_job(
+                "doctor_bulk_upload",
+                form.cleaned_data["csv_file"],
+                user=request.user,
+                params={
+                    "campaign_id": campaign.pk,
+                    "back_url": f"{reverse('fieldrep_dashboard')}?campaign={campaign_filter}",
+                },
+            )
+            remember_upload_job(request, job)
+            return redirect("upload_job_detail", job_uid=job.uid)
 
     return render(
         request,
@@ -2970,9 +2630,6 @@ def doctor_bulk_upload(request):
             "form": form,
             "campaign_filter": campaign_filter,
             "campaign": campaign,
-            "ingestion_errors": ingestion_errors,
-            "created_count": created_count,
-            "upload_completed": upload_completed,
         },
     )
 
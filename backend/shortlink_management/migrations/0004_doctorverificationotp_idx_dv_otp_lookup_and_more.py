@@ -0,0 +1,21 @@
+# Generated by Django 4.2.11 on 2026-10-19 16:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shortlink_management', '0003_shortlink_click_count'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='doctorverificationotp',
+            index=models.Index(fields=['phone_e164', 'short_link', 'verified_at', 'created_at'], name='idx_dv_otp_lookup'),
+        ),
+        migrations.AddIndex(
+            model_name='doctorverificationotp',
+            index=models.Index(fields=['expires_at'], name='idx_dv_otp_expires'),
+        ),
+    ]
@@ -62,6 +62,14 @@ class DoctorVerificationOTP(models.Model):
     class Meta:
         db_table = 'doctor_verification_otp'
         ordering = ['-created_at']
+        indexes = [
+            # verify_doctor_otp: latest unverified OTP for a phone + short link
+            models.Index(
+                fields=['phone_e164', 'short_link', 'verified_at', 'created_at'],
+                name='idx_dv_otp_lookup',
+            ),
+            models.Index(fields=['expires_at'], name='idx_dv_otp_expires'),
+        ]
     
     def __str__(self):
         return f"OTP for {self.phone_e164} - {self.short_link.short_code}"
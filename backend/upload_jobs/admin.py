@@ -0,0 +1,9 @@
+# upload_jobs/admin.py
+from django.contrib import admin
+from upload_jobs.models import UploadJob
+
+@admin.register(UploadJob)
+class UploadJobAdmin(admin.ModelAdmin):
+    list_display = ('uid', 'kind', 'status', 'processed_rows', 'total_rows', 'error_count', 'created_by', 'created_at')
+    list_filter = ('kind', 'status')
+    readonly_fields = ('uid', 'task_id', 'started_at', 'finished_at')
@@ -0,0 +1,11 @@
+from django.apps import AppConfig
+
+class UploadJobsConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'upload_jobs'
+
+    def ready(self):
+        from django.utils.module_loading import autodiscover_modules
+
+        # Each app registers its CSV handlers in <app>/upload_handlers.py
+        autodiscover_modules("upload_handlers")
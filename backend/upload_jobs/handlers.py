@@ -0,0 +1,62 @@
+# upload_jobs/handlers.py
+"""
+Registry of upload-job handlers.
+
+Apps register handlers in an ``upload_handlers`` module (autodiscovered in
+UploadJobsConfig.ready)::
+
+    @register("doctor_bulk_upload")
+    def doctor_bulk_upload(job, upload, progress):
+        ...
+        return UploadOutcome(created=..., errors=[...])
+
+``upload`` is a django File over the stored CSV; ``progress(stage, done, total)``
+records progress on the job (writes are throttled).
+"""
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+
+
+_HANDLERS: dict[str, Callable] = {}
+
+_ROW_PREFIX_RE = re.compile(r"^(?:Row|Line)\s+(\d+):\s*(.*)$", re.S)
+
+
+@dataclass
+class UploadOutcome:
+    created: int = 0
+    updated: int = 0
+    errors: list = field(default_factory=list)    # (row_number or None, message)
+    results: list = field(default_factory=list)   # dict rows for the results CSV
+    summary: dict = field(default_factory=dict)
+
+
+def register(kind: str):
+    def decorator(func):
+        _HANDLERS[kind] = func
+        return func
+    return decorator
+
+
+def get_handler(kind: str) -> Optional[Callable]:
+    return _HANDLERS.get(kind)
+
+
+def registered_kinds() -> list[str]:
+    return sorted(_HANDLERS)
+
+
+def split_row_error(message) -> tuple[Optional[int], str]:
+    """Turn the forms' "Row 12: ..." / "Line 12: ..." strings into (12, "...")."""
+    text = str(message)
+    match = _ROW_PREFIX_RE.match(text)
+    if match:
+        return int(match.group(1)), match.group(2)
+    return None, text
+
+
+def form_errors(form) -> list[tuple[None, str]]:
+    return [(None, str(error)) for errors in form.errors.values() for error in errors]
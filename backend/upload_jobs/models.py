@@ -0,0 +1,89 @@
+# upload_jobs/models.py
+import uuid
+
+from django.conf import settings
+from django.db import models
+from django.utils import timezone
+
+
+class UploadJob(models.Model):
+    """
+    One CSV upload processed in the background.
+
+    The uploaded file is stored as-is; a Celery task hands it to the handler
+    registered for ``kind`` (see upload_jobs.handlers) and records progress,
+    row-level errors and a downloadable results CSV here.
+    """
+
+    STATUS_PENDING = "pending"
+    STATUS_RUNNING = "running"
+    STATUS_SUCCEEDED = "succeeded"
+    STATUS_FAILED = "failed"
+    STATUS_CHOICES = (
+        (STATUS_PENDING, "Pending"),
+        (STATUS_RUNNING, "Running"),
+        (STATUS_SUCCEEDED, "Succeeded"),
+        (STATUS_FAILED, "Failed"),
+    )
+
+    uid = models.UUIDField(default=uuid.uuid4, editable=False, unique=True)
+    kind = models.CharField(max_length=64, db_index=True)
+    status = models.CharField(max_length=16, choices=STATUS_CHOICES, default=STATUS_PENDING, db_index=True)
+
+    upload = models.FileField(upload_to="upload_jobs/%Y/%m/%d/")
+    original_name = models.CharField(max_length=255, blank=True, default="")
+    params = models.JSONField(default=dict, blank=True)
+
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="upload_jobs",
+    )
+    task_id = models.CharField(max_length=255, blank=True, default="")
+
+    stage = models.CharField(max_length=64, blank=True, default="")
+    total_rows = models.PositiveIntegerField(default=0)
+    processed_rows = models.PositiveIntegerField(default=0)
+    created_count = models.PositiveIntegerField(default=0)
+    updated_count = models.PositiveIntegerField(default=0)
+    error_count = models.PositiveIntegerField(default=0)
+    summary = models.JSONField(default=dict, blank=True)
+    failure_message = models.TextField(blank=True, default="")
+    results = models.FileField(upload_to="upload_jobs/results/%Y/%m/%d/", blank=True, default="")
+
+    created_at = models.DateTimeField(default=timezone.now, db_index=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+
+    def __str__(self):
+        return f"UploadJob({self.kind}, {self.uid}, {self.status})"
+
+    @property
+    def is_finished(self) -> bool:
+        return self.status in (self.STATUS_SUCCEEDED, self.STATUS_FAILED)
+
+    @property
+    def progress_percent(self) -> int:
+        if self.status == self.STATUS_SUCCEEDED:
+            return 100
+        if not self.total_rows:
+            return 0
+        return min(100, int(self.processed_rows * 100 / self.total_rows))
+
+
+class UploadJobError(models.Model):
+    job = models.ForeignKey(UploadJob, on_delete=models.CASCADE, related_name="row_errors")
+    row_number = models.PositiveIntegerField(null=True, blank=True)
+    message = models.TextField()
+
+    class Meta:
+        ordering = ["row_number", "id"]
+        indexes = [models.Index(fields=["job", "row_number"])]
+
+    def __str__(self):
+        return f"Row {self.row_number}: {self.message}"
@@ -0,0 +1,181 @@
+# upload_jobs/services.py
+from __future__ import annotations
+
+import csv
+import io
+import os
+import time
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.files import File
+from django.core.files.base import ContentFile
+from django.db import transaction
+from django.utils import timezone
+
+from upload_jobs.handlers import get_handler
+from upload_jobs.models import UploadJob, UploadJobError
+from myproject.applog import get_logger
+
+
+# Uploads are processed off the request path, so the old 2 MB cap is gone;
+# this only guards against absurd files.
+MAX_UPLOAD_BYTES = getattr(settings, "UPLOAD_JOB_MAX_BYTES", 100 * 1024 * 1024)
+PROGRESS_WRITE_INTERVAL = getattr(settings, "UPLOAD_JOB_PROGRESS_INTERVAL_SECONDS", 1.0)
+ERROR_BATCH_SIZE = 1000
+SESSION_JOBS_KEY = "upload_job_uids"
+SESSION_JOBS_LIMIT = 20
+
+log = get_logger(__name__)
+
+
+def check_upload_size(upload, label="CSV"):
+    if MAX_UPLOAD_BYTES and upload.size > MAX_UPLOAD_BYTES:
+        raise ValidationError(f"{label} larger than {MAX_UPLOAD_BYTES // (1024 * 1024)} MB.")
+    return upload
+
+
+def create_upload_job(kind: str, upload, *, user=None, params=None) -> UploadJob:
+    """Store ``upload`` and queue it for ``kind``'s handler once the transaction commits."""
+    if get_handler(kind) is None:
+        raise ValueError(f"No upload handler registered for {kind!r}")
+
+    original_name = os.path.basename(getattr(upload, "name", "") or "upload.csv")
+    upload.seek(0)
+    job = UploadJob(
+        kind=kind,
+        original_name=original_name,
+        params=params or {},
+        created_by=user if getattr(user, "is_authenticated", False) else None,
+    )
+    job.upload.save(original_name, upload, save=False)
+    job.save()
+
+    transaction.on_commit(lambda: dispatch_upload_job(job.pk))
+    return job
+
+
+def remember_upload_job(request, job: UploadJob) -> None:
+    """Let the uploading session open the job page, even without a Django user."""
+    session = getattr(request, "session", None)
+    if session is None:
+        return
+    uids = [uid for uid in session.get(SESSION_JOBS_KEY, []) if uid != str(job.uid)]
+    session[SESSION_JOBS_KEY] = (uids + [str(job.uid)])[-SESSION_JOBS_LIMIT:]
+
+
+def session_upload_job_uids(request) -> list[str]:
+    session = getattr(request, "session", None)
+    return list(session.get(SESSION_JOBS_KEY, [])) if session is not None else []
+
+
+def dispatch_upload_job(job_id: int) -> None:
+    """Queue the job; run it inline if the task queue is unreachable."""
+    from upload_jobs.tasks import run_upload_job
+
+    try:
+        result = run_upload_job.apply_async(args=[job_id], retry=False)
+    except Exception as e:
+        log.info("upload_job_inline", job_id=job_id, error=e)
+        run_job(job_id)
+        return
+    UploadJob.objects.filter(pk=job_id).update(task_id=result.id or "")
+
+
+class _ProgressWriter:
+    def __init__(self, job_id: int):
+        self.job_id = job_id
+        self._last_write = 0.0
+
+    def __call__(self, stage: str, done: int, total: int) -> None:
+        now = time.monotonic()
+        if done < total and now - self._last_write < PROGRESS_WRITE_INTERVAL:
+            return
+        self._last_write = now
+        UploadJob.objects.filter(pk=self.job_id).update(
+            stage=stage[:64],
+            processed_rows=max(0, int(done)),
+            total_rows=max(0, int(total)),
+        )
+
+
+def _results_csv(outcome) -> bytes:
+    buffer = io.StringIO()
+    if outcome.results:
+        fieldnames = list(dict.fromkeys(key for row in outcome.results for key in row))
+        writer = csv.DictWriter(buffer, fieldnames=fieldnames, extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(outcome.results)
+    else:
+        writer = csv.writer(buffer)
+        writer.writerow(["row", "status", "message"])
+        for row_number, message in sorted(outcome.errors, key=lambda e: (e[0] is not None, e[0] or 0)):
+            writer.writerow([row_number or "", "error", message])
+    return buffer.getvalue().encode("utf-8")
+
+
+def run_job(job_id: int) -> None:
+    # Claim the job so a redelivered task cannot process the same file twice.
+    claimed = UploadJob.objects.filter(pk=job_id, status=UploadJob.STATUS_PENDING).update(
+        status=UploadJob.STATUS_RUNNING,
+        started_at=timezone.now(),
+    )
+    if not claimed:
+        return
+
+    job = UploadJob.objects.get(pk=job_id)
+    handler = get_handler(job.kind)
+    try:
+        if handler is None:
+            raise ValueError(f"No upload handler registered for {job.kind!r}")
+        with job.upload.open("rb") as fh:
+            outcome = handler(job, File(fh, name=job.original_name), _ProgressWriter(job.pk))
+    except Exception as e:
+        log.warning("upload_job_failed", job_uid=job.uid, kind=job.kind, error=e)
+        UploadJob.objects.filter(pk=job.pk).update(
+            status=UploadJob.STATUS_FAILED,
+            failure_message=str(e),
+            finished_at=timezone.now(),
+        )
+        return
+
+    errors = [
+        UploadJobError(job=job, row_number=row_number, message=str(message))
+        for row_number, message in outcome.errors
+    ]
+    UploadJobError.objects.bulk_create(errors, batch_size=ERROR_BATCH_SIZE)
+
+    job.results.save(f"{job.uid}.csv", ContentFile(_results_csv(outcome)), save=False)
+    job.created_count = outcome.created
+    job.updated_count = outcome.updated
+    job.error_count = len(errors)
+    job.summary = outcome.summary
+    job.processed_rows = max(job.processed_rows, job.total_rows)
+    job.status = UploadJob.STATUS_SUCCEEDED
+    job.finished_at = timezone.now()
+    job.save(update_fields=[
+        "results", "created_count", "updated_count", "error_count", "summary",
+        "processed_rows", "status", "finished_at",
+    ])
+
+
+def job_status_payload(job: UploadJob, *, error_limit: int = 50) -> dict:
+    return {
+        "id": str(job.uid),
+        "kind": job.kind,
+        "status": job.status,
+        "finished": job.is_finished,
+        "stage": job.stage,
+        "processed_rows": job.processed_rows,
+        "total_rows": job.total_rows,
+        "progress_percent": job.progress_percent,
+        "created": job.created_count,
+        "updated": job.updated_count,
+        "error_count": job.error_count,
+        "errors": [
+            {"row": e.row_number, "message": e.message}
+            for e in job.row_errors.all()[:error_limit]
+        ],
+        "failure_message": job.failure_message,
+        "summary": job.summary,
+    }
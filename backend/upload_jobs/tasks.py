@@ -0,0 +1,7 @@
+from celery import shared_task
+
+from upload_jobs.services import run_job
+
+@shared_task
+def run_upload_job(job_id):
+    run_job(job_id)
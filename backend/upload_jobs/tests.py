@@ -0,0 +1,133 @@
+import shutil
+import tempfile
+
+from django.contrib.auth.models import AnonymousUser
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.http import Http404
+from django.test import RequestFactory, TestCase, override_settings
+
+from upload_jobs import handlers
+from upload_jobs.handlers import UploadOutcome
+from upload_jobs.models import UploadJob
+from upload_jobs.services import create_upload_job, remember_upload_job, run_job
+from upload_jobs.views import _get_job_for_request
+from user_management.models import User
+
+
+class UploadJobTestCase(TestCase):
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.calls = []
+        self.register("test_ok", self.ok_handler)
+        self.register("test_boom", self.failing_handler)
+
+    def register(self, kind, func):
+        handlers.register(kind)(func)
+        self.addCleanup(handlers._HANDLERS.pop, kind, None)
+
+    def ok_handler(self, job, upload, progress):
+        self.calls.append(upload.read())
+        progress("rows", 2, 2)
+        return UploadOutcome(created=1, updated=1, errors=[(2, "bad phone")])
+
+    def failing_handler(self, job, upload, progress):
+        self.calls.append(upload.read())
+        raise RuntimeError("cannot parse")
+
+    def make_job(self, kind="test_ok", user=None):
+        # Created outside any on_commit dispatch: TestCase never commits.
+        return create_upload_job(kind, SimpleUploadedFile("rows.csv", b"a,b\n1,2\n"), user=user)
+
+
+class RunJobTests(UploadJobTestCase):
+    def test_success_records_counts_errors_and_results(self):
+        job = self.make_job()
+
+        run_job(job.pk)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, UploadJob.STATUS_SUCCEEDED)
+        self.assertEqual((job.created_count, job.updated_count, job.error_count), (1, 1, 1))
+        self.assertEqual(list(job.row_errors.values_list("row_number", "message")), [(2, "bad phone")])
+        self.assertIn(b"bad phone", job.results.read())
+        self.assertIsNotNone(job.finished_at)
+        self.assertEqual(self.calls, [b"a,b\n1,2\n"])
+
+    def test_handler_exception_fails_the_job(self):
+        job = self.make_job("test_boom")
+
+        with self.assertLogs("upload_jobs.services", "WARNING"):
+            run_job(job.pk)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, UploadJob.STATUS_FAILED)
+        self.assertEqual(job.failure_message, "cannot parse")
+        self.assertIsNotNone(job.finished_at)
+
+    def test_unregistered_kind_fails_the_job(self):
+        job = self.make_job()
+        handlers._HANDLERS.pop("test_ok")
+
+        with self.assertLogs("upload_jobs.services", "WARNING"):
+            run_job(job.pk)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, UploadJob.STATUS_FAILED)
+        self.assertIn("test_ok", job.failure_message)
+
+    def test_job_is_claimed_once(self):
+        job = self.make_job()
+
+        run_job(job.pk)
+        run_job(job.pk)  # redelivered task
+
+        self.assertEqual(len(self.calls), 1)
+
+    def test_running_job_is_not_picked_up_again(self):
+        job = self.make_job()
+        UploadJob.objects.filter(pk=job.pk).update(status=UploadJob.STATUS_RUNNING)
+
+        run_job(job.pk)
+
+        self.assertEqual(self.calls, [])
+        job.refresh_from_db()
+        self.assertEqual(job.status, UploadJob.STATUS_RUNNING)
+
+
+class JobAccessTests(UploadJobTestCase):
+    def setUp(self):
+        super().setUp()
+        self.creator = User.objects.create_user(username="creator", password="x", phone_number="9000000101")
+        self.other = User.objects.create_user(username="other", password="x", phone_number="9000000102")
+        self.staff = User.objects.create_user(username="staff", password="x", is_staff=True, phone_number="9000000103")
+        self.job = self.make_job(user=self.creator)
+
+    def request_for(self, user=None, session=None):
+        request = RequestFactory().get("/")
+        request.user = user or AnonymousUser()
+        request.session = session if session is not None else {}
+        return request
+
+    def test_creator_and_staff_see_the_job(self):
+        for user in (self.creator, self.staff):
+            self.assertEqual(_get_job_for_request(self.request_for(user), self.job.uid), self.job)
+
+    def test_other_user_gets_404(self):
+        with self.assertRaises(Http404):
+            _get_job_for_request(self.request_for(self.other), self.job.uid)
+
+    def test_uploading_session_sees_its_job(self):
+        session_job = self.make_job()  # field-rep session: no Django user
+        session = {}
+        remember_upload_job(self.request_for(session=session), session_job)
+
+        self.assertEqual(_get_job_for_request(self.request_for(session=session), session_job.uid), session_job)
+        with self.assertRaises(Http404):
+            _get_job_for_request(self.request_for(session={}), session_job.uid)
+        with self.assertRaises(Http404):
+            _get_job_for_request(self.request_for(session=session), self.job.uid)
@@ -0,0 +1,10 @@
+# upload_jobs/urls.py
+
+from django.urls import path
+from . import views
+
+urlpatterns = [
+    path("jobs/<uuid:job_uid>/", views.upload_job_detail, name="upload_job_detail"),
+    path("jobs/<uuid:job_uid>/status/", views.upload_job_status, name="upload_job_status"),
+    path("jobs/<uuid:job_uid>/results.csv", views.upload_job_results, name="upload_job_results"),
+]
@@ -0,0 +1,67 @@
+# upload_jobs/views.py
+import csv
+import io
+
+from django.http import FileResponse, Http404, HttpResponse, JsonResponse
+from django.shortcuts import get_object_or_404, render
+from django.views.decorators.cache import never_cache
+
+from sharing_management.decorators import dashboard_access_required
+from upload_jobs.models import UploadJob
+from upload_jobs.services import job_status_payload, session_upload_job_uids
+
+
+def _get_job_for_request(request, job_uid) -> UploadJob:
+    """
+    The job, if the request may see it: staff, the user who created it, or
+    the session that uploaded it (field-rep and publisher sessions have no
+    Django user). Anyone else gets a 404, not a 403, so job ids do not leak.
+    """
+    job = get_object_or_404(UploadJob, uid=job_uid)
+    user = getattr(request, "user", None)
+    if user is not None and user.is_authenticated:
+        if user.is_staff or job.created_by_id == user.pk:
+            return job
+    if str(job.uid) in session_upload_job_uids(request):
+        return job
+    raise Http404("Upload job not found")
+
+
+@dashboard_access_required
+@never_cache
+def upload_job_detail(request, job_uid):
+    job = _get_job_for_request(request, job_uid)
+    return render(request, "upload_jobs/job_detail.html", {
+        "job": job,
+        "back_url": (job.params or {}).get("back_url") or "",
+    })
+
+
+@dashboard_access_required
+@never_cache
+def upload_job_status(request, job_uid):
+    """Polling endpoint for the job page."""
+    job = _get_job_for_request(request, job_uid)
+    return JsonResponse(job_status_payload(job))
+
+
+@dashboard_access_required
+@never_cache
+def upload_job_results(request, job_uid):
+    job = _get_job_for_request(request, job_uid)
+    filename = f"{job.kind}_{job.uid}_results.csv"
+
+    if job.results:
+        return FileResponse(job.results.open("rb"), as_attachment=True, filename=filename, content_type="text/csv")
+
+    # Failed or still running: return whatever row errors are recorded so far.
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(["row", "status", "message"])
+    for row_number, message in job.row_errors.values_list("row_number", "message"):
+        writer.writerow([row_number or "", "error", message])
+    if job.failure_message:
+        writer.writerow(["", "failed", job.failure_message])
+    response = HttpResponse(buffer.getvalue(), content_type="text/csv")
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
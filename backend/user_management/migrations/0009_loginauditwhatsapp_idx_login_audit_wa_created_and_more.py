@@ -0,0 +1,21 @@
+# Generated by Django 4.2.11 on 2026-10-19 16:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user_management', '0008_loginauditwhatsapp'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='loginauditwhatsapp',
+            index=models.Index(fields=['created_at'], name='idx_login_audit_wa_created'),
+        ),
+        migrations.AddIndex(
+            model_name='reploginotp',
+            index=models.Index(fields=['expires_at'], name='idx_rep_login_otp_expires'),
+        ),
+    ]
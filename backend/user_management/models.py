@@ -117,6 +117,9 @@ class RepLoginOTP(models.Model):
     
     class Meta:
         db_table = 'rep_login_otp'
+        indexes = [
+            models.Index(fields=['expires_at'], name='idx_rep_login_otp_expires'),
+        ]
     
     def __str__(self):
         return f"OTP for {self.user.username} (expires: {self.expires_at})"
@@ -144,6 +147,9 @@ class LoginAuditWhatsApp(models.Model):
     class Meta:
         db_table = 'login_audit_whatsapp'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['created_at'], name='idx_login_audit_wa_created'),
+        ]
     
     def __str__(self):
         return f"{self.user.username} - {'Success' if self.success else 'Failed'} - {self.created_at}"
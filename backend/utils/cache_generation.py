@@ -0,0 +1,48 @@
+# utils/cache_generation.py
+"""
+Generation counters for invalidating whole families of cache entries.
+
+Cached values embed ``generation.current()`` in their key (or alongside the
+value); ``generation.bump()`` moves every reader to a new generation, so the
+old entries are simply never read again and expire on their own.
+
+The counter lives in the default cache. Signals and bumps only reach other
+processes if that cache is shared; with a per-process backend each caller
+must bound staleness some other way (a timeout, or a re-check before acting).
+"""
+from __future__ import annotations
+
+from typing import Callable, Iterable
+
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save
+
+
+class CacheGeneration:
+    def __init__(self, key: str):
+        self.key = key
+
+    def current(self) -> int:
+        generation = cache.get(self.key)
+        if generation is None:
+            cache.add(self.key, 1, None)
+            generation = cache.get(self.key) or 1
+        return generation
+
+    def bump(self, *args, **kwargs) -> None:
+        """Start a new generation. Accepts any arguments, so it can be a signal receiver."""
+        try:
+            cache.incr(self.key)
+        except ValueError:
+            cache.set(self.key, 2, None)
+
+
+def connect_save_delete(receiver: Callable, senders: Iterable, dispatch_prefix: str) -> None:
+    """Connect ``receiver`` to post_save and post_delete of each sender (model or "app.Model" label)."""
+    from django.apps import apps
+
+    for sender in senders:
+        model = apps.get_model(sender) if isinstance(sender, str) else sender
+        label = model._meta.label
+        for action, signal in (("save", post_save), ("delete", post_delete)):
+            signal.connect(receiver, sender=model, dispatch_uid=f"{dispatch_prefix}_{action}_{label}")
@@ -2,6 +2,10 @@ import requests, os
 from django.conf import settings
 from django.http import HttpResponseForbidden
 
+from myproject.applog import get_logger
+
+log = get_logger(__name__)
+
 VERIFY_URL = "https://www.google.com/recaptcha/api/siteverify"
 def verify_recaptcha(token: str, min_score: float = 0.5) -> bool:
     data = {
@@ -12,7 +16,7 @@ def verify_recaptcha(token: str, min_score: float = 0.5) -> bool:
     if not r.ok:
         return False
     js = r.json()
-    print('Google response', js)
+    log.debug("recaptcha_response", success=js.get('success'), score=js.get('score'), action=js.get('action'), errors=js.get('error-codes'))
     return js.get('success') and js.get('score', 0) >= min_score
 
 